@@ -0,0 +1,85 @@
+"""Benchmark suite for Spirrow-Cognilens (``cognilens-bench``)."""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+from typing import Optional
+
+from cognilens.config import load_settings
+from cognilens.recorder import load_trace
+
+from . import calibrate as calibrate_bench
+from . import replay as replay_bench
+from .startup import format_report, run_startup_benchmark
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    """Entry point for the benchmark CLI."""
+    parser = argparse.ArgumentParser(prog="cognilens-bench", description=__doc__)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    startup = commands.add_parser("startup", help="Measure import time against a budget")
+    startup.add_argument("--module", default="cognilens.tools")
+    startup.add_argument("--budget-ms", type=float, default=500.0)
+    startup.add_argument("--runs", type=int, default=3)
+
+    replay = commands.add_parser("replay", help="Replay a recorded tool-call trace")
+    replay.add_argument("trace", type=Path, help="JSONL trace written by the recorder")
+    replay.add_argument(
+        "--config", type=Path, help="Settings file selecting the backend (default: config.yaml)"
+    )
+    replay.add_argument(
+        "--speed", type=float, default=1.0, help="Time-scaling factor for recorded arrivals"
+    )
+    load = replay.add_mutually_exclusive_group()
+    load.add_argument("--concurrency", type=int, help="Closed loop with this many workers")
+    load.add_argument("--rate", type=float, help="Open-loop Poisson arrivals per second")
+    replay.add_argument("--limit", type=int, help="Replay only the first N calls")
+    replay.add_argument("--seed", type=int, default=0)
+
+    calibrate = commands.add_parser(
+        "calibrate-tokens", help="Fit the token estimator's ratios against tiktoken"
+    )
+    calibrate.add_argument("corpus", type=Path, nargs="+", help="Text files to calibrate on")
+    calibrate.add_argument("--encoding", default="cl100k_base")
+    calibrate.add_argument(
+        "--write", action="store_true", help="Store the ratios in the shipped calibration table"
+    )
+
+    args = parser.parse_args(argv)
+
+    if args.command == "startup":
+        report = run_startup_benchmark(args.module, args.budget_ms, args.runs)
+        print(format_report(report))
+        sys.exit(0 if report.passed else 1)
+
+    if args.command == "replay":
+        if args.config is not None:
+            if not args.config.exists():
+                parser.error(f"config file not found: {args.config}")
+            load_settings(args.config)
+        entries = load_trace(args.trace, args.limit)
+        replay_report = asyncio.run(
+            replay_bench.replay(
+                entries,
+                speed=args.speed,
+                concurrency=args.concurrency,
+                rate=args.rate,
+                seed=args.seed,
+            )
+        )
+        print(replay_bench.format_report(replay_report))
+        sys.exit(1 if replay_report.errors else 0)
+
+    if args.command == "calibrate-tokens":
+        calibration = calibrate_bench.calibrate(args.corpus, args.encoding)
+        print(calibrate_bench.format_report(calibration))
+        if args.write:
+            path = calibrate_bench.write_ratios(args.encoding, calibration["ratios"])
+            print(f"Wrote {path}")
+
+
+__all__ = ["main"]
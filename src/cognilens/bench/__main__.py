@@ -0,0 +1,5 @@
+"""Allow running the benchmark suite with ``python -m cognilens.bench``."""
+
+from . import main
+
+main()
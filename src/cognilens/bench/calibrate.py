@@ -0,0 +1,74 @@
+"""Fit the token estimator's per-script ratios against a tiktoken encoding."""
+
+from __future__ import annotations
+
+import json
+import re
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Any, Optional
+
+from cognilens.llm.token_estimator import TokenEstimator, fit_token_ratios
+
+RATIOS_PATH = Path(__file__).resolve().parent.parent / "llm" / "token_ratios.json"
+
+
+def iter_samples(paths: list[Path], window_chars: int = 2000) -> Iterator[str]:
+    """Split corpus files into paragraphs of at most ``window_chars``."""
+    for path in paths:
+        text = path.read_text(encoding="utf-8", errors="replace")
+        for paragraph in re.split(r"\n\s*\n", text):
+            for start in range(0, len(paragraph), window_chars):
+                sample = paragraph[start : start + window_chars]
+                if sample.strip():
+                    yield sample
+
+
+def calibrate(paths: list[Path], encoding: str = "cl100k_base") -> dict[str, Any]:
+    """Fit ratios for ``encoding`` on a corpus and report the estimate's error.
+
+    Args:
+        paths: Text files to calibrate on (mix languages and code you expect)
+        encoding: tiktoken encoding name
+
+    Returns:
+        Dictionary with the fitted ``ratios`` and error statistics
+    """
+    import tiktoken
+
+    tokenizer = tiktoken.get_encoding(encoding)
+    samples = [(text, len(tokenizer.encode(text))) for text in iter_samples(paths)]
+    if not samples:
+        raise ValueError("No text found in the calibration corpus")
+    ratios = fit_token_ratios(samples)
+
+    estimator = TokenEstimator(ratios)
+    errors = [abs(estimator.estimate(text) - tokens) / tokens for text, tokens in samples]
+    return {
+        "encoding": encoding,
+        "samples": len(samples),
+        "tokens": sum(tokens for _, tokens in samples),
+        "mean_error": round(sum(errors) / len(errors), 4),
+        "max_error": round(max(errors), 4),
+        "ratios": ratios,
+    }
+
+
+def write_ratios(encoding: str, ratios: dict[str, float], path: Optional[Path] = None) -> Path:
+    """Store fitted ratios in the shipped calibration table."""
+    path = path or RATIOS_PATH
+    data: dict[str, Any] = (
+        json.loads(path.read_text()) if path.exists() else {"default": encoding, "tables": {}}
+    )
+    data["tables"][encoding] = ratios
+    path.write_text(json.dumps(data, indent=2) + "\n")
+    return path
+
+
+def format_report(report: dict[str, Any]) -> str:
+    lines = [
+        f"Calibrated {report['encoding']} on {report['samples']} samples ({report['tokens']} tokens)",
+        f"  mean error {report['mean_error']:.1%}, max error {report['max_error']:.1%}",
+    ]
+    lines += [f"  {script:<10} {ratio:.4f}" for script, ratio in report["ratios"].items()]
+    return "\n".join(lines)
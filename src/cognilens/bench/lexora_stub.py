@@ -0,0 +1,76 @@
+"""In-process stand-in for a Lexora server.
+
+Serves the completion (single and batch form), tokenize and health routes
+through an httpx transport, so the Lexora client can be exercised and
+benchmarked without a model server. Each request costs a fixed overhead plus
+a smaller per-prompt time, which is what makes batching pay off on a real
+inference server.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+from dataclasses import dataclass, field
+from typing import Optional
+
+import httpx
+
+from cognilens.llm.token_estimator import estimate_tokens
+
+
+@dataclass
+class LexoraStub:
+    """Simulated Lexora endpoint with request accounting.
+
+    Attributes:
+        request_seconds: Fixed latency of every completion request
+        prompt_seconds: Additional latency per prompt in the request
+        requests: Number of completion requests served
+        batch_sizes: Prompts per completion request, in arrival order
+    """
+
+    request_seconds: float = 0.0
+    prompt_seconds: float = 0.0
+    requests: int = 0
+    batch_sizes: list[int] = field(default_factory=list)
+
+    def transport(self) -> httpx.MockTransport:
+        """Transport to pass to ``httpx.AsyncClient(transport=...)``."""
+        return httpx.MockTransport(self.handle)
+
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        """Serve one HTTP request."""
+        path = request.url.path
+        if path == "/health":
+            return httpx.Response(200, json={"status": "ok"})
+        if path == "/v1/tokenize":
+            text = json.loads(request.content).get("text", "")
+            return httpx.Response(200, json={"count": estimate_tokens(text)})
+        if path == "/v1/completions":
+            return await self._complete(json.loads(request.content))
+        return httpx.Response(404, json={"error": f"unknown route {path}"})
+
+    async def _complete(self, body: dict) -> httpx.Response:
+        prompt = body.get("prompt", "")
+        prompts = prompt if isinstance(prompt, list) else [prompt]
+        self.requests += 1
+        self.batch_sizes.append(len(prompts))
+        await asyncio.sleep(self.request_seconds + self.prompt_seconds * len(prompts))
+
+        model = body.get("model", "stub")
+        results = [self._completion(p, body.get("max_tokens")) for p in prompts]
+        if isinstance(prompt, list):
+            return httpx.Response(200, json={"model": model, "results": results})
+        return httpx.Response(200, json={"model": model, **results[0]})
+
+    @staticmethod
+    def _completion(prompt: str, max_tokens: Optional[int]) -> dict:
+        # Echo the last line of the prompt, which is where the text usually sits
+        lines = prompt.strip().splitlines() or [""]
+        content = lines[-1][: (max_tokens or 256) * 4]
+        return {
+            "content": content,
+            "tokens_used": estimate_tokens(prompt) + estimate_tokens(content),
+            "finish_reason": "stop",
+        }
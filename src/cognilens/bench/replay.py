@@ -0,0 +1,250 @@
+"""Replay of recorded tool traffic against the configured backend."""
+
+from __future__ import annotations
+
+import asyncio
+import random
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+from cognilens.config import TraceArguments
+from cognilens.llm.resilience import is_retryable
+from cognilens.recorder import TraceEntry, materialize_arguments
+
+ToolFunction = Callable[..., Awaitable[dict[str, Any]]]
+
+# Errors a replayed call may fail with: invalid or unresolvable arguments,
+# missing files, exhausted budgets and timeouts
+_CALL_ERRORS = (ValueError, TypeError, LookupError, RuntimeError, OSError, TimeoutError)
+
+
+# Arguments naming local files or repositories, unusable once redacted
+_LOCAL_PATH_FIELDS = ("path", "repo")
+
+
+def _is_call_error(exc: Exception) -> bool:
+    """Check whether a call failed in an expected way, including backend errors.
+
+    Backend SDK errors are recognized as in the retry logic, by their status
+    code or class name, so that neither SDK has to be imported here.
+    """
+    return (
+        isinstance(exc, _CALL_ERRORS)
+        or isinstance(getattr(exc, "status_code", None), int)
+        or is_retryable(exc)
+    )
+
+
+def replay_tools() -> dict[str, ToolFunction]:
+    """Tool implementations a trace can be replayed against, by tool name."""
+    from cognilens import tools
+
+    return {name: getattr(tools, name) for name in tools.__all__}
+
+
+@dataclass
+class CallResult:
+    """Outcome of one replayed call."""
+
+    tool: str
+    latency_ms: float
+    recorded_ms: float
+    error: Optional[str] = None
+
+
+@dataclass
+class ReplayReport:
+    """Latency and throughput of a replay run."""
+
+    mode: str
+    wall_seconds: float
+    results: list[CallResult] = field(default_factory=list)
+    skipped: int = 0
+
+    @property
+    def errors(self) -> int:
+        return sum(1 for r in self.results if r.error is not None)
+
+    @property
+    def throughput(self) -> float:
+        """Completed calls per second of wall time."""
+        return len(self.results) / self.wall_seconds if self.wall_seconds > 0 else 0.0
+
+
+def percentile(values: list[float], fraction: float) -> float:
+    """Nearest-rank percentile of ``values`` (0.0 when empty)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(int(fraction * len(ordered)), len(ordered) - 1)]
+
+
+def is_replayable(entry: TraceEntry, tools: dict[str, ToolFunction]) -> bool:
+    """Check whether a recorded call can be issued again.
+
+    Server-only tools are skipped, as are file and repository reads from
+    redacted or hashed traces, whose paths were replaced.
+    """
+    if entry.tool not in tools:
+        return False
+    if entry.arguments_mode == TraceArguments.RAW.value:
+        return True
+    return not any(entry.arguments.get(key) for key in _LOCAL_PATH_FIELDS)
+
+
+def arrival_offsets(
+    entries: list[TraceEntry],
+    speed: float = 1.0,
+    rate: Optional[float] = None,
+    seed: int = 0,
+) -> list[float]:
+    """Start times of the calls relative to the start of the replay.
+
+    Args:
+        entries: Calls in recorded order
+        speed: Time-scaling factor for recorded arrivals (2.0 replays twice as fast)
+        rate: Open-loop Poisson arrival rate in calls per second, replacing
+            the recorded arrival times
+        seed: Seed for the Poisson arrivals
+
+    Returns:
+        One offset in seconds per entry
+    """
+    if rate is not None:
+        rng = random.Random(seed)
+        offsets, now = [], 0.0
+        for _ in entries:
+            offsets.append(now)
+            now += rng.expovariate(rate)
+        return offsets
+    if not entries:
+        return []
+    first = entries[0].ts
+    return [(entry.ts - first) / speed for entry in entries]
+
+
+async def _call(tool: ToolFunction, entry: TraceEntry) -> CallResult:
+    arguments = materialize_arguments(entry.arguments)
+    started = time.perf_counter()
+    error = None
+    try:
+        await tool(**arguments)
+    except Exception as exc:
+        if not _is_call_error(exc):
+            raise
+        error = type(exc).__name__
+    return CallResult(
+        tool=entry.tool,
+        latency_ms=(time.perf_counter() - started) * 1000,
+        recorded_ms=entry.duration_ms,
+        error=error,
+    )
+
+
+async def replay(
+    entries: list[TraceEntry],
+    *,
+    speed: float = 1.0,
+    concurrency: Optional[int] = None,
+    rate: Optional[float] = None,
+    seed: int = 0,
+    tools: Optional[dict[str, ToolFunction]] = None,
+) -> ReplayReport:
+    """Replay recorded calls and measure latency and throughput.
+
+    By default calls are issued at their recorded times, scaled by ``speed``
+    (open loop). ``rate`` issues them at Poisson arrivals instead, and
+    ``concurrency`` replaces arrivals with a fixed number of workers issuing
+    the calls back to back (closed loop).
+
+    Args:
+        entries: Recorded calls
+        speed: Time-scaling factor for recorded arrivals
+        concurrency: Number of closed-loop workers
+        rate: Open-loop arrival rate in calls per second
+        seed: Seed for Poisson arrivals
+        tools: Tool implementations by name (defaults to cognilens.tools)
+
+    Returns:
+        ReplayReport
+    """
+    if concurrency is not None and rate is not None:
+        raise ValueError("Pass either concurrency or rate, not both")
+    tools = tools if tools is not None else replay_tools()
+    runnable = [entry for entry in entries if is_replayable(entry, tools)]
+    skipped = len(entries) - len(runnable)
+
+    started = time.perf_counter()
+    if concurrency is not None:
+        mode = f"closed loop, {concurrency} workers"
+        pending = iter(runnable)
+        results: list[CallResult] = []
+
+        async def worker() -> None:
+            for entry in pending:
+                results.append(await _call(tools[entry.tool], entry))
+
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+    else:
+        mode = (
+            f"open loop, {rate:g} calls/s" if rate is not None else f"recorded arrivals x{speed:g}"
+        )
+
+        async def fire(entry: TraceEntry, offset: float) -> CallResult:
+            await asyncio.sleep(max(offset - (time.perf_counter() - started), 0.0))
+            return await _call(tools[entry.tool], entry)
+
+        offsets = arrival_offsets(runnable, speed, rate, seed)
+        results = list(await asyncio.gather(*map(fire, runnable, offsets)))
+
+    return ReplayReport(
+        mode=mode,
+        wall_seconds=time.perf_counter() - started,
+        results=results,
+        skipped=skipped,
+    )
+
+
+def _latency_row(name: str, results: list[CallResult]) -> str:
+    latencies = [r.latency_ms for r in results]
+    recorded = [r.recorded_ms for r in results]
+    return (
+        f"  {name:<22}{len(results):>7}"
+        + "".join(f"{percentile(latencies, p):>10.1f}" for p in (0.5, 0.9, 0.99))
+        + f"{max(latencies):>10.1f}{percentile(recorded, 0.5):>14.1f}"
+    )
+
+
+def format_report(report: ReplayReport) -> str:
+    """Render a replay report for the terminal."""
+    lines = [
+        (
+            f"replayed {len(report.results)} calls in {report.wall_seconds:.2f} s "
+            f"({report.throughput:.2f} calls/s, {report.mode}); "
+            f"{report.errors} errors, {report.skipped} skipped"
+        ),
+    ]
+    if not report.results:
+        return "\n".join(lines)
+
+    lines.append(
+        f"  {'tool':<22}{'calls':>7}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}"
+        f"{'max ms':>10}{'recorded p50':>14}"
+    )
+    by_tool: dict[str, list[CallResult]] = {}
+    for result in report.results:
+        by_tool.setdefault(result.tool, []).append(result)
+    lines.extend(_latency_row(tool, results) for tool, results in sorted(by_tool.items()))
+    lines.append(_latency_row("all", report.results))
+
+    errors: dict[str, int] = {}
+    for result in report.results:
+        if result.error is not None:
+            errors[result.error] = errors.get(result.error, 0) + 1
+    if errors:
+        lines.append(
+            "errors: " + ", ".join(f"{name} x{count}" for name, count in sorted(errors.items()))
+        )
+    return "\n".join(lines)
@@ -0,0 +1,108 @@
+"""Start-up time benchmark based on ``python -X importtime``."""
+
+from __future__ import annotations
+
+import statistics
+import subprocess
+import sys
+from dataclasses import dataclass, field
+
+# Modules that must only be imported when their provider is first used
+LAZY_MODULES = ("openai", "tiktoken", "httpx")
+
+
+@dataclass
+class ImportTiming:
+    """Cumulative import time of a single module, in microseconds."""
+
+    module: str
+    self_us: int
+    cumulative_us: int
+
+
+@dataclass
+class StartupReport:
+    """Result of a start-up benchmark run."""
+
+    module: str
+    budget_ms: float
+    runs_ms: list[float]
+    slowest: list[ImportTiming] = field(default_factory=list)
+    eager_modules: list[str] = field(default_factory=list)
+
+    @property
+    def median_ms(self) -> float:
+        return statistics.median(self.runs_ms)
+
+    @property
+    def passed(self) -> bool:
+        return self.median_ms <= self.budget_ms and not self.eager_modules
+
+
+def parse_importtime(output: str) -> list[ImportTiming]:
+    """Parse the stderr of ``python -X importtime`` into timings."""
+    timings: list[ImportTiming] = []
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|", 2)
+        timings.append(
+            ImportTiming(
+                module=name.strip(),
+                self_us=int(self_us),
+                cumulative_us=int(cumulative_us),
+            )
+        )
+    return timings
+
+
+def measure_import(module: str) -> tuple[list[ImportTiming], list[str]]:
+    """Import a module in a fresh interpreter.
+
+    Returns:
+        Import timings and the lazy modules that were nonetheless imported
+    """
+    probe = (
+        f"import sys, {module}\nprint(','.join(m for m in {LAZY_MODULES!r} if m in sys.modules))"
+    )
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", probe],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    eager = [m for m in proc.stdout.strip().split(",") if m]
+    return parse_importtime(proc.stderr), eager
+
+
+def run_startup_benchmark(
+    module: str = "cognilens.tools",
+    budget_ms: float = 500.0,
+    runs: int = 3,
+    top: int = 10,
+) -> StartupReport:
+    """Measure the import time of ``module`` against a budget."""
+    report = StartupReport(module=module, budget_ms=budget_ms, runs_ms=[])
+    for _ in range(runs):
+        timings, eager = measure_import(module)
+        total = next((t for t in timings if t.module == module), None)
+        report.runs_ms.append(total.cumulative_us / 1000 if total else 0.0)
+        report.eager_modules = eager
+        report.slowest = sorted(timings, key=lambda t: t.self_us, reverse=True)[:top]
+    return report
+
+
+def format_report(report: StartupReport) -> str:
+    """Render a start-up report for the terminal."""
+    lines = [
+        f"import {report.module}: median {report.median_ms:.1f} ms "
+        f"(budget {report.budget_ms:.0f} ms, runs: "
+        + ", ".join(f"{ms:.1f}" for ms in report.runs_ms)
+        + ")",
+        "slowest modules (self time):",
+    ]
+    lines.extend(f"  {t.self_us / 1000:8.1f} ms  {t.module}" for t in report.slowest)
+    if report.eager_modules:
+        lines.append("eagerly imported provider modules: " + ", ".join(report.eager_modules))
+    lines.append("PASS" if report.passed else "FAIL")
+    return "\n".join(lines)
@@ -0,0 +1,151 @@
+"""Content-addressed store for tool inputs and results.
+
+Texts are keyed by the SHA-256 of their UTF-8 encoding and referred to by
+handles of the form ``handle:<sha256 hex>``. Clients can pass a handle
+wherever a tool takes text, and can check which hashes the server holds
+before uploading anything. Entries expire after a TTL and the least recently
+used are evicted beyond a total size cap.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+
+from cognilens.config import BlobStoreConfig, get_settings
+
+HANDLE_PREFIX = "handle:"
+RESOURCE_URI_TEMPLATE = "cognilens://blobs/{digest}"
+
+_HANDLE = re.compile(r"handle:[0-9a-f]{64}")
+
+
+def digest_text(text: str) -> str:
+    """SHA-256 hex digest of a text's UTF-8 encoding."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def is_handle(value: str) -> bool:
+    """Check whether a tool argument is a handle reference.
+
+    Only an exact ``handle:<sha256 hex>`` counts; any other text, including
+    prose that happens to start with "handle:", is literal input.
+    """
+    return _HANDLE.fullmatch(value) is not None
+
+
+def parse_handle(value: str) -> str:
+    """Return the digest from ``handle:<digest>`` (a bare digest is accepted too)."""
+    digest = value.removeprefix(HANDLE_PREFIX)
+    digest = digest.strip().lower()
+    if len(digest) != 64 or any(c not in "0123456789abcdef" for c in digest):
+        raise ValueError(f"Invalid handle: {value!r}")
+    return digest
+
+
+@dataclass
+class _Blob:
+    text: str
+    size: int
+    expires_at: float
+
+
+class BlobStore:
+    """In-memory content-addressed text store with a size cap and TTL."""
+
+    def __init__(self, max_bytes: int, ttl_seconds: float) -> None:
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._blobs: OrderedDict[str, _Blob] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def put(self, text: str) -> Optional[str]:
+        """Store a text and return its handle.
+
+        Storing a text again refreshes its TTL. Texts larger than the size cap
+        are not stored and get no handle (None).
+        """
+        encoded = text.encode("utf-8")
+        if len(encoded) > self.max_bytes:
+            return None
+        digest = hashlib.sha256(encoded).hexdigest()
+        with self._lock:
+            self._expire()
+            blob = self._blobs.get(digest)
+            if blob is not None:
+                blob.expires_at = time.monotonic() + self.ttl_seconds
+                self._blobs.move_to_end(digest)
+            else:
+                self._blobs[digest] = _Blob(text, len(encoded), time.monotonic() + self.ttl_seconds)
+                self._bytes += len(encoded)
+                while self._bytes > self.max_bytes:
+                    _, evicted = self._blobs.popitem(last=False)
+                    self._bytes -= evicted.size
+        return HANDLE_PREFIX + digest
+
+    def get(self, handle: str) -> str:
+        """Return the text for a handle.
+
+        Raises:
+            KeyError: If the handle is unknown or expired
+        """
+        digest = parse_handle(handle)
+        with self._lock:
+            self._expire()
+            blob = self._blobs.get(digest)
+            if blob is None:
+                raise KeyError(f"Unknown or expired handle: {HANDLE_PREFIX}{digest}")
+            self._blobs.move_to_end(digest)
+            return blob.text
+
+    def contains(self, digest: str) -> bool:
+        """Check whether the store holds a text with this digest."""
+        digest = parse_handle(digest)
+        with self._lock:
+            self._expire()
+            return digest in self._blobs
+
+    def resolve(self, value: str) -> str:
+        """Return the referenced text for a handle, or the value itself."""
+        return self.get(value) if is_handle(value) else value
+
+    def _expire(self) -> None:
+        now = time.monotonic()
+        for digest in [d for d, b in self._blobs.items() if b.expires_at <= now]:
+            self._bytes -= self._blobs.pop(digest).size
+
+    def stats(self) -> dict[str, int]:
+        """Number of entries and total bytes held."""
+        with self._lock:
+            self._expire()
+            return {"entries": len(self._blobs), "bytes": self._bytes}
+
+
+# Global store instance
+_store: Optional[BlobStore] = None
+_store_config: Optional[BlobStoreConfig] = None
+
+
+def get_blob_store() -> Optional[BlobStore]:
+    """Get the shared blob store, or None if it is disabled."""
+    global _store, _store_config
+    config = get_settings().blobs
+    if not config.enabled:
+        return None
+    if _store is None or _store_config is not config:
+        _store = BlobStore(config.max_bytes, config.ttl_seconds)
+        _store_config = config
+    return _store
+
+
+def reset_blob_store() -> None:
+    """Reset the shared store (useful for testing)."""
+    global _store, _store_config
+    _store = None
+    _store_config = None
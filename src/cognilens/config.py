@@ -24,8 +24,15 @@ class SmartModelSelectionConfig(BaseModel):
 
     enabled: bool = False
     cache_ttl_seconds: int = 300
+    # TTLs are randomized by +/- this fraction so refreshes don't synchronize
+    cache_ttl_jitter: float = Field(default=0.1, ge=0.0, lt=1.0)
+    # Stale capabilities are served while refreshing, but never past this age
+    cache_max_age_seconds: int = 3600
     classify_tasks: bool = True
     fallback_to_default: bool = True
+    # Start generating on the default model if selection takes longer than
+    # this; the work is kept when selection agrees or finishes later
+    speculative_start_seconds: Optional[float] = Field(default=None, gt=0)
     strategy_capability_map: dict[str, str] = Field(
         default_factory=lambda: {
             "concise": "summarization",
@@ -33,10 +40,122 @@ class SmartModelSelectionConfig(BaseModel):
             "bullet": "summarization",
             "code_aware": "code",
             "diff": "reasoning",
+            "log": "reasoning",
+            "structured": "summarization",
         }
     )
 
 
+class ResilienceConfig(BaseModel):
+    """Retry, retry budget and request hedging configuration for generate calls."""
+
+    enabled: bool = True
+    backoff_base_seconds: float = Field(default=0.25, gt=0)
+    backoff_max_seconds: float = Field(default=8.0, gt=0)
+    # Retries may add at most this fraction of extra load on top of normal traffic
+    retry_budget_ratio: float = Field(default=0.1, ge=0.0, le=1.0)
+    retry_budget_min_per_second: float = Field(default=1.0, ge=0.0)
+    retry_budget_window_seconds: float = Field(default=10.0, gt=0)
+    hedging_enabled: bool = False
+    hedge_percentile: float = Field(default=0.95, gt=0.0, lt=1.0)
+    hedge_min_samples: int = Field(default=20, ge=1)
+    hedge_initial_delay_seconds: float = Field(default=2.0, gt=0)
+    hedge_model: Optional[str] = None
+
+
+class AdaptiveConcurrencyConfig(BaseModel):
+    """AIMD concurrency limits for generate calls, per endpoint and model."""
+
+    enabled: bool = False
+    initial_limit: int = Field(default=8, ge=1)
+    min_limit: int = Field(default=1, ge=1)
+    max_limit: int = Field(default=64, ge=1)
+    # The limit shrinks by this factor on throttling, timeouts or high latency
+    backoff_ratio: float = Field(default=0.5, gt=0.0, lt=1.0)
+    # Latency above this multiple of the recent minimum counts as queueing
+    latency_tolerance: float = Field(default=2.0, gt=1.0)
+    latency_window: int = Field(default=100, ge=1)
+
+
+class RateLimitConfig(BaseModel):
+    """Client-side request and token rate limits (OpenAI-compatible providers)."""
+
+    enabled: bool = False
+    # Limits per model; None learns the limit from rate-limit response headers
+    requests_per_minute: Optional[int] = Field(default=None, ge=1)
+    tokens_per_minute: Optional[int] = Field(default=None, ge=1)
+    # Resync the buckets from x-ratelimit-* response headers
+    sync_from_headers: bool = True
+
+
+class LoadBalancingStrategy(str, Enum):
+    """Endpoint selection strategies."""
+
+    POWER_OF_TWO = "power_of_two"
+    LEAST_OUTSTANDING = "least_outstanding"
+
+
+class LoadBalancingConfig(BaseModel):
+    """Load balancing, health checking and circuit breaking across endpoints."""
+
+    strategy: LoadBalancingStrategy = LoadBalancingStrategy.POWER_OF_TWO
+    health_check_interval_seconds: float = Field(default=10.0, gt=0)
+    failure_threshold: int = Field(default=5, ge=1)
+    open_seconds: float = Field(default=30.0, gt=0)
+    half_open_max_requests: int = Field(default=1, ge=1)
+    # Route prompts sharing this many leading characters to the same endpoint
+    # (0 disables session affinity)
+    affinity_prefix_chars: int = Field(default=512, ge=0)
+    # Give up affinity when the pinned endpoint has this many more requests in
+    # flight than the least loaded one
+    affinity_max_imbalance: int = Field(default=4, ge=0)
+
+
+class MicroBatchConfig(BaseModel):
+    """Micro-batching of concurrent generate calls into multi-prompt requests (Lexora)."""
+
+    enabled: bool = False
+    # Calls sharing model and parameters that arrive within this window are batched
+    window_ms: float = Field(default=5.0, gt=0)
+    max_batch_size: int = Field(default=16, ge=1)
+
+
+class JitterDistribution(str, Enum):
+    """Distributions of the random factor applied to simulated latencies."""
+
+    NONE = "none"
+    UNIFORM = "uniform"
+    NORMAL = "normal"
+    LOGNORMAL = "lognormal"
+
+
+class MockModelProfile(BaseModel):
+    """Simulated performance of one model served by the mock client."""
+
+    # Time to first token, plus prompt processing at prefill_tokens_per_second
+    ttft_seconds: float = Field(default=0.0, ge=0.0)
+    prefill_tokens_per_second: Optional[float] = Field(default=None, gt=0)
+    # Decode speed; None generates the whole output instantly
+    tokens_per_second: Optional[float] = Field(default=None, gt=0)
+    jitter: JitterDistribution = JitterDistribution.NONE
+    # Relative spread of the jitter factor (half-width for uniform, sigma otherwise)
+    jitter_spread: float = Field(default=0.1, ge=0.0)
+
+
+class MockLLMConfig(BaseModel):
+    """Performance model of the mock LLM client (all off by default)."""
+
+    # Profiles by model name; other models use default_profile
+    models: dict[str, MockModelProfile] = Field(default_factory=dict)
+    default_profile: MockModelProfile = Field(default_factory=MockModelProfile)
+    # Concurrent generations the simulated server batches; more requests queue
+    batch_capacity: Optional[int] = Field(default=None, ge=1)
+    # Fraction of requests failing with a 503 or hanging until the client timeout
+    failure_rate: float = Field(default=0.0, ge=0.0, le=1.0)
+    timeout_rate: float = Field(default=0.0, ge=0.0, le=1.0)
+    seed: Optional[int] = None
+
+
 class LLMConfig(BaseModel):
     """LLM client configuration."""
 
@@ -44,10 +163,86 @@ class LLMConfig(BaseModel):
     model: str = "gpt-4o-mini"
     api_key: Optional[str] = None
     base_url: Optional[str] = None
+    # Additional backend endpoints; when set, requests are balanced across them
+    endpoints: list[str] = Field(default_factory=list)
     timeout: int = 30
     max_retries: int = 3
-    smart_selection: SmartModelSelectionConfig = Field(
-        default_factory=SmartModelSelectionConfig
+    smart_selection: SmartModelSelectionConfig = Field(default_factory=SmartModelSelectionConfig)
+    resilience: ResilienceConfig = Field(default_factory=ResilienceConfig)
+    load_balancing: LoadBalancingConfig = Field(default_factory=LoadBalancingConfig)
+    concurrency: AdaptiveConcurrencyConfig = Field(default_factory=AdaptiveConcurrencyConfig)
+    rate_limit: RateLimitConfig = Field(default_factory=RateLimitConfig)
+    batching: MicroBatchConfig = Field(default_factory=MicroBatchConfig)
+    mock: MockLLMConfig = Field(default_factory=MockLLMConfig)
+
+    def endpoint_urls(self, default: Optional[str] = None) -> list[str]:
+        """Return the configured endpoint URLs, falling back to base_url."""
+        if self.endpoints:
+            return list(self.endpoints)
+        url = self.base_url or default
+        return [url] if url else []
+
+
+class LogDigestConfig(BaseModel):
+    """Template mining for the ``log`` compression style."""
+
+    # Send the digest to the LLM, or return it directly
+    use_llm: bool = True
+    # Drain parse tree depth (length and depth - 2 leading tokens route a line)
+    depth: int = Field(default=4, ge=3)
+    # Fraction of tokens a line must share with a template to join it
+    similarity_threshold: float = Field(default=0.5, gt=0, le=1)
+    max_children: int = Field(default=100, ge=1)
+    # Digest limits: most frequent templates, distinct error lines, traces
+    max_templates: int = Field(default=100, ge=1)
+    max_error_lines: int = Field(default=200, ge=0)
+    max_traces: int = Field(default=20, ge=0)
+    max_examples: int = Field(default=3, ge=1)
+
+
+class StructuredDigestConfig(BaseModel):
+    """Schema inference for the ``structured`` compression style."""
+
+    # Send the digest to the LLM, or return it directly
+    use_llm: bool = True
+    # Containers nested up to this depth are streamed; deeper values (and
+    # array elements) are decoded one at a time
+    stream_depth: int = Field(default=4, ge=1)
+    # Scalar fields with at most this many distinct values are shown as enums
+    max_enum_values: int = Field(default=8, ge=1)
+    max_depth: int = Field(default=6, ge=1)
+    max_fields: int = Field(default=40, ge=1)
+    max_samples: int = Field(default=3, ge=0)
+    sample_chars: int = Field(default=400, ge=20)
+
+
+class PatchConfig(BaseModel):
+    """Per-file summarization of unified diffs and ``git format-patch`` text."""
+
+    # Output budget of each file's summary and of the merged summary
+    file_summary_tokens: int = Field(default=150, ge=1)
+    summary_tokens: int = Field(default=500, ge=1)
+    # Longer per-file diffs are cut at a line boundary before summarizing
+    max_file_chars: int = Field(default=20000, ge=100)
+    # Files whose summaries are generated at the same time
+    max_concurrent_files: int = Field(default=8, ge=1)
+    # Files summarized locally instead of by the LLM
+    local_lockfiles: bool = True
+    local_whitespace: bool = True
+    lockfiles: list[str] = Field(
+        default_factory=lambda: [
+            "package-lock.json",
+            "npm-shrinkwrap.json",
+            "yarn.lock",
+            "pnpm-lock.yaml",
+            "poetry.lock",
+            "uv.lock",
+            "Pipfile.lock",
+            "Cargo.lock",
+            "Gemfile.lock",
+            "composer.lock",
+            "go.sum",
+        ]
     )
 
 
@@ -57,6 +252,45 @@ class CompressionConfig(BaseModel):
     default_ratio: float = Field(default=0.3, ge=0.1, le=0.9)
     min_ratio: float = Field(default=0.1, ge=0.05, le=0.5)
     max_ratio: float = Field(default=0.9, ge=0.5, le=1.0)
+    # Trim outputs exceeding the requested token budget at natural boundaries
+    enforce_output_budget: bool = True
+    # Follow-up call restoring preserve items the model dropped (an extra
+    # LLM call whenever one is missing, so off by default)
+    repair_enabled: bool = False
+    repair_max_tokens: int = Field(default=150, ge=1)
+    repair_max_items: int = Field(default=5, ge=1)
+    repair_snippet_chars: int = Field(default=300, ge=20)
+    log: LogDigestConfig = Field(default_factory=LogDigestConfig)
+    structured: StructuredDigestConfig = Field(default_factory=StructuredDigestConfig)
+    patch: PatchConfig = Field(default_factory=PatchConfig)
+
+
+class ChunkCacheConfig(BaseModel):
+    """Chunk-level summary cache for large documents."""
+
+    enabled: bool = False
+    # Documents at least this long are summarized chunk by chunk
+    min_document_chars: int = Field(default=20000, ge=1)
+    avg_chunk_chars: int = Field(default=4000, ge=1)
+    min_chunk_chars: int = Field(default=1000, ge=1)
+    max_chunk_chars: int = Field(default=12000, ge=1)
+    chunk_summary_tokens: int = Field(default=200, ge=1)
+    max_entries: int = Field(default=4096, ge=1)
+
+
+class SummaryTreeConfig(BaseModel):
+    """Hierarchical summary trees for multi-resolution zoom."""
+
+    avg_chunk_chars: int = Field(default=4000, ge=1)
+    min_chunk_chars: int = Field(default=1000, ge=1)
+    max_chunk_chars: int = Field(default=12000, ge=1)
+    # Target size of every node's summary
+    node_summary_tokens: int = Field(default=200, ge=1)
+    # Children summarized into each parent node
+    fan_out: int = Field(default=4, ge=2)
+    # Built trees kept for later zoom requests, and cached node summaries
+    max_trees: int = Field(default=64, ge=1)
+    max_node_summaries: int = Field(default=16384, ge=1)
 
 
 class SummarizationConfig(BaseModel):
@@ -64,6 +298,94 @@ class SummarizationConfig(BaseModel):
 
     default_max_tokens: int = 500
     default_style: str = "concise"
+    chunk_cache: ChunkCacheConfig = Field(default_factory=ChunkCacheConfig)
+    tree: SummaryTreeConfig = Field(default_factory=SummaryTreeConfig)
+
+
+class HistoryConfig(BaseModel):
+    """Compression history store settings."""
+
+    enabled: bool = False
+    path: str = "~/.cognilens/history.db"
+    # Store input text alongside its hash (off by default for privacy)
+    store_content: bool = False
+    batch_size: int = Field(default=50, ge=1)
+    flush_interval_seconds: float = Field(default=1.0, gt=0)
+    # Records beyond this many pending writes are dropped
+    max_queue: int = Field(default=10000, ge=1)
+
+
+class TraceArguments(str, Enum):
+    """How tool arguments are stored in recorded traces."""
+
+    RAW = "raw"
+    # Text replaced by synthetic text of the same length and script mix
+    REDACTED = "redacted"
+    # Text replaced by its SHA-256 and shape; replay synthesizes the text
+    HASHED = "hashed"
+
+
+class RecorderConfig(BaseModel):
+    """Recording of tool calls to a JSONL trace for load-test replay."""
+
+    enabled: bool = False
+    path: str = "~/.cognilens/traces/tool_calls.jsonl"
+    arguments: TraceArguments = TraceArguments.REDACTED
+    # String arguments kept verbatim in redacted and hashed traces: enum
+    # values, git refs and summary tree node ids, which replay needs as is
+    keep_fields: list[str] = Field(
+        default_factory=lambda: ["style", "mode", "base", "head", "node"]
+    )
+    # Calls beyond this many pending writes are dropped
+    max_queue: int = Field(default=10000, ge=1)
+
+
+class BudgetAction(str, Enum):
+    """What happens to generate calls once a token budget is used up."""
+
+    REJECT = "reject"
+    # Continue on usage.downgrade_model
+    DOWNGRADE = "downgrade"
+
+
+class UsageConfig(BaseModel):
+    """Token accounting per tool, model and session, with optional budgets."""
+
+    enabled: bool = True
+    # Backend tokens a single MCP session, or the whole server, may use per window
+    session_token_budget: Optional[int] = Field(default=None, ge=1)
+    global_token_budget: Optional[int] = Field(default=None, ge=1)
+    # Budgets reset after this many seconds (None: never)
+    budget_window_seconds: Optional[float] = Field(default=3600.0, gt=0)
+    on_exceeded: BudgetAction = BudgetAction.REJECT
+    downgrade_model: Optional[str] = None
+    # Sessions tracked individually; the least recently active beyond this
+    # are folded into one aggregate
+    max_sessions: int = Field(default=1000, ge=1)
+
+
+class FilesConfig(BaseModel):
+    """Settings for reading tool input from local files."""
+
+    # Directories tools may read from; file input is disabled when empty
+    allowed_roots: list[str] = Field(default_factory=list)
+    max_files: int = Field(default=100, ge=1)
+    max_file_bytes: int = Field(default=50 * 1024 * 1024, ge=1)
+    # Total size of the files one path or glob may match
+    max_total_bytes: int = Field(default=200 * 1024 * 1024, ge=1)
+    # Decoded file contents kept in memory, keyed by path, mtime and size
+    cache_max_bytes: int = Field(default=64 * 1024 * 1024, ge=0)
+    # Time limit for reading a diff between two refs of a local repository
+    git_timeout_seconds: float = Field(default=30.0, gt=0)
+
+
+class BlobStoreConfig(BaseModel):
+    """Settings for the server-side store of inputs and results."""
+
+    # Off by default: when on, every tool call hashes and keeps its texts
+    enabled: bool = False
+    max_bytes: int = Field(default=256 * 1024 * 1024, ge=1)
+    ttl_seconds: float = Field(default=3600.0, gt=0)
 
 
 class ServerConfig(BaseModel):
@@ -86,6 +408,11 @@ class Settings(BaseSettings):
     llm: LLMConfig = Field(default_factory=LLMConfig)
     compression: CompressionConfig = Field(default_factory=CompressionConfig)
     summarization: SummarizationConfig = Field(default_factory=SummarizationConfig)
+    history: HistoryConfig = Field(default_factory=HistoryConfig)
+    files: FilesConfig = Field(default_factory=FilesConfig)
+    blobs: BlobStoreConfig = Field(default_factory=BlobStoreConfig)
+    recorder: RecorderConfig = Field(default_factory=RecorderConfig)
+    usage: UsageConfig = Field(default_factory=UsageConfig)
 
     @classmethod
     def from_yaml(cls, path: Path) -> "Settings":
@@ -122,6 +449,13 @@ def get_settings() -> Settings:
     return _settings
 
 
+def load_settings(path: Path) -> Settings:
+    """Load settings from a YAML file and make them the global settings."""
+    global _settings
+    _settings = Settings.from_yaml(path)
+    return _settings
+
+
 def reset_settings() -> None:
     """Reset settings (useful for testing)."""
     global _settings
@@ -1,6 +1,9 @@
 """Core compression engine and types."""
 
-from .compressor import CompressionEngine
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
+
 from .types import (
     CompressionRequest,
     CompressionResult,
@@ -10,6 +13,20 @@ from .types import (
     ProgressiveStage,
 )
 
+if TYPE_CHECKING:
+    from .compressor import CompressionEngine
+
+
+def __getattr__(name: str) -> Any:
+    # The engine imports prompts, strategies and LLM clients, which import
+    # cognilens.core.types themselves; loading it lazily avoids import cycles.
+    if name == "CompressionEngine":
+        from .compressor import CompressionEngine
+
+        return CompressionEngine
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 __all__ = [
     "CompressionEngine",
     "CompressionStyle",
@@ -0,0 +1,66 @@
+"""Cache of per-chunk summaries for content-defined chunks."""
+
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+from cognilens.config import ChunkCacheConfig, get_settings
+
+# (chunk id, style, model, target tokens)
+ChunkKey = tuple[str, str, str, int]
+
+
+class ChunkSummaryCache:
+    """LRU cache of chunk summaries keyed by chunk hash, style, model and target."""
+
+    def __init__(self, max_entries: int = 4096) -> None:
+        self.max_entries = max_entries
+        self._entries: OrderedDict[ChunkKey, str] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: ChunkKey) -> Optional[str]:
+        with self._lock:
+            summary = self._entries.get(key)
+            if summary is not None:
+                self._entries.move_to_end(key)
+            return summary
+
+    def put(self, key: ChunkKey, summary: str) -> None:
+        with self._lock:
+            self._entries[key] = summary
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+# Global cache instance
+_cache: Optional[ChunkSummaryCache] = None
+_cache_config: Optional[ChunkCacheConfig] = None
+
+
+def get_chunk_summary_cache() -> Optional[ChunkSummaryCache]:
+    """Get the shared chunk summary cache, or None if it is disabled."""
+    global _cache, _cache_config
+    config = get_settings().summarization.chunk_cache
+    if not config.enabled:
+        return None
+    if _cache is None or _cache_config is not config:
+        _cache = ChunkSummaryCache(config.max_entries)
+        _cache_config = config
+    return _cache
+
+
+def reset_chunk_summary_cache() -> None:
+    """Reset the shared cache (useful for testing)."""
+    global _cache, _cache_config
+    _cache = None
+    _cache_config = None
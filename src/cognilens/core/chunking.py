@@ -0,0 +1,132 @@
+"""Text chunking for inputs that exceed a model's context window."""
+
+from __future__ import annotations
+
+import hashlib
+import re
+import zlib
+from typing import Optional
+
+# Boundaries to split on, from coarsest to finest
+SEPARATORS = ("\n\n", "\n", "。", ". ", " ")
+
+
+def split_text(text: str, max_chars: int) -> list[str]:
+    """Split text into chunks of at most ``max_chars`` characters.
+
+    Splits on paragraph, line, sentence and word boundaries in that order of
+    preference, packing consecutive pieces greedily; text without any usable
+    boundary is cut at ``max_chars``.
+
+    Args:
+        text: Text to split
+        max_chars: Maximum chunk size in characters
+
+    Returns:
+        Non-empty list of chunks that concatenate back to ``text``
+    """
+    if max_chars <= 0:
+        raise ValueError("max_chars must be positive")
+    if len(text) <= max_chars:
+        return [text]
+    return _split(text, max_chars, 0)
+
+
+def _split(text: str, max_chars: int, level: int) -> list[str]:
+    if len(text) <= max_chars:
+        return [text]
+    if level >= len(SEPARATORS):
+        return [text[i : i + max_chars] for i in range(0, len(text), max_chars)]
+
+    separator = SEPARATORS[level]
+    parts = text.split(separator)
+    if len(parts) == 1:
+        return _split(text, max_chars, level + 1)
+
+    # Keep the separator attached so chunks concatenate back to the input
+    pieces = [part + separator for part in parts[:-1]] + [parts[-1]]
+    chunks: list[str] = []
+    current = ""
+    for piece in pieces:
+        if len(current) + len(piece) <= max_chars:
+            current += piece
+            continue
+        if current:
+            chunks.append(current)
+        if len(piece) > max_chars:
+            chunks.extend(_split(piece, max_chars, level + 1))
+            current = ""
+        else:
+            current = piece
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+# Positions after which a content-defined boundary may be placed
+_CANDIDATE_PATTERN = re.compile(r"\n|。|[.!?] ")
+
+# Characters before a candidate position that decide whether it is a boundary
+BOUNDARY_WINDOW_CHARS = 48
+
+
+def content_defined_chunks(
+    text: str,
+    avg_chars: int = 4000,
+    min_chars: int = 1000,
+    max_chars: int = 12000,
+) -> list[str]:
+    """Split text at content-defined boundaries.
+
+    Boundaries are chosen among line and sentence ends by hashing the
+    ``BOUNDARY_WINDOW_CHARS`` characters before each candidate, so whether a
+    position is a boundary depends only on nearby content: an edit moves at
+    most the boundaries around it and every other chunk keeps its content
+    (and hash). The chance of accepting a candidate grows with the text it
+    covers, giving chunks of about ``avg_chars`` whatever the line length.
+
+    Args:
+        text: Text to split
+        avg_chars: Target average chunk size
+        min_chars: Minimum chunk size (except for the last chunk)
+        max_chars: Maximum chunk size; a chunk reaching it is cut at its last
+            candidate, or with split_text if it has none
+
+    Returns:
+        Non-empty list of chunks that concatenate back to ``text``
+    """
+    if not 0 < min_chars <= avg_chars <= max_chars:
+        raise ValueError("Expected 0 < min_chars <= avg_chars <= max_chars")
+    if len(text) <= min_chars:
+        return [text]
+
+    boundaries: list[int] = []
+    start = previous = 0
+    eligible: Optional[int] = None  # Last candidate at least min_chars past start
+    for match in _CANDIDATE_PATTERN.finditer(text):
+        position = match.end()
+        step, previous = position - previous, position
+        if position - start > max_chars and eligible is not None:
+            # No boundary was accepted in time: cut at the last eligible candidate
+            boundaries.append(eligible)
+            start, eligible = eligible, None
+        if position - start < min_chars:
+            continue
+        eligible = position
+        window = text[max(position - BOUNDARY_WINDOW_CHARS, 0) : position]
+        if zlib.crc32(window.encode("utf-8")) % avg_chars < step:
+            boundaries.append(position)
+            start, eligible = position, None
+
+    chunks: list[str] = []
+    start = 0
+    for end in [*boundaries, len(text)]:
+        if end > start:
+            chunks.extend(split_text(text[start:end], max_chars))
+        start = end
+    return chunks
+
+
+def chunk_id(chunk: str) -> str:
+    """Stable identifier of a chunk's content."""
+    return hashlib.blake2b(chunk.encode("utf-8"), digest_size=16).hexdigest()
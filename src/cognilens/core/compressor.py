@@ -2,15 +2,47 @@
 
 from __future__ import annotations
 
-from typing import Optional
+import asyncio
+import functools
+import inspect
+import itertools
+import time
+from collections.abc import Awaitable, Callable
+from typing import Any, Optional, TypeVar
 
 from cognilens.config import get_settings
-from cognilens.llm import LLMClient, create_llm_client
+from cognilens.history import (
+    HistoryRecord,
+    HistoryStore,
+    TimedLLMClient,
+    collect_timings,
+    content_hash,
+    get_history_store,
+    timed,
+)
+from cognilens.llm import LLMClient, get_llm_client, unwrap_client
 from cognilens.llm.lexora_client import LexoraClient
-from cognilens.llm.model_selector import ModelSelection, ModelSelector
+from cognilens.llm.model_selector import ModelSelection, ModelSelector, SelectionMethod
+from cognilens.prompts.budget import PromptBudget
 from cognilens.prompts.builder import PromptBuilder
 from cognilens.strategies import get_strategy
+from cognilens.taskgraph import task_group
+from cognilens.usage import MeteredLLMClient, get_usage_tracker
 
+from .chunk_cache import ChunkSummaryCache, get_chunk_summary_cache
+from .chunking import chunk_id, content_defined_chunks, split_text
+from .patch import FilePatch, parse_patch
+from .quality import assess_quality, measure_output
+from .repair import find_snippets, splice
+from .summary_tree import (
+    SummaryNode,
+    SummaryTree,
+    SummaryTreeStore,
+    get_summary_tree_store,
+    node_id,
+    select_nodes,
+)
+from .trimming import trim_to_tokens
 from .types import (
     CompressionRequest,
     CompressionResult,
@@ -20,6 +52,85 @@ from .types import (
     ProgressiveStage,
 )
 
+_R = TypeVar("_R", CompressionResult, list[CompressionResult])
+
+# Characters of the input sent along for task classification
+PREVIEW_CHARS = 500
+
+
+async def _discard(task: asyncio.Future[Any]) -> None:
+    """Cancel a task that is no longer needed and wait for it to finish."""
+    if not task.done():
+        task.cancel()
+        await asyncio.wait({task})
+    if not task.cancelled():
+        # Retrieve any failure so it is not reported as never retrieved
+        task.exception()
+
+
+def _succeeded(task: asyncio.Future[Any]) -> bool:
+    return task.done() and not task.cancelled() and task.exception() is None
+
+
+def _recorded(
+    tool: str,
+    content: Callable[[dict[str, Any]], str],
+    style: Callable[[dict[str, Any]], str],
+    target_tokens: Optional[Callable[[dict[str, Any]], Optional[int]]] = None,
+) -> Callable[[Callable[..., Awaitable[_R]]], Callable[..., Awaitable[_R]]]:
+    """Record calls of an engine method to the history store, if enabled.
+
+    Args:
+        tool: Tool name to record
+        content: Extracts the input text from the bound arguments
+        style: Extracts the compression style from the bound arguments
+        target_tokens: Extracts the requested output size, if the method has one
+    """
+
+    def decorator(method: Callable[..., Awaitable[_R]]) -> Callable[..., Awaitable[_R]]:
+        signature = inspect.signature(method)
+
+        @functools.wraps(method)
+        async def wrapper(self: CompressionEngine, *args: Any, **kwargs: Any) -> _R:
+            if self._history is None:
+                return await method(self, *args, **kwargs)
+
+            bound = signature.bind(self, *args, **kwargs)
+            bound.apply_defaults()
+            started = time.perf_counter()
+            with collect_timings() as timings:
+                result = await method(self, *args, **kwargs)
+            total_ms = (time.perf_counter() - started) * 1000
+            if not result:
+                return result
+
+            first = result[0] if isinstance(result, list) else result
+            last = result[-1] if isinstance(result, list) else result
+            text = content(bound.arguments)
+            self._history.record(
+                HistoryRecord(
+                    tool=tool,
+                    style=style(bound.arguments),
+                    model=last.metadata.get("selected_model") or last.metadata.get("model"),
+                    selection_method=last.metadata.get("selection_method"),
+                    input_tokens=first.original_tokens,
+                    output_tokens=last.compressed_tokens,
+                    target_tokens=target_tokens(bound.arguments) if target_tokens else None,
+                    total_ms=total_ms,
+                    selection_ms=timings.get("selection", 0.0),
+                    generate_ms=timings.get("generate", 0.0),
+                    count_ms=timings.get("count", 0.0),
+                    quality_score=last.quality_score,
+                    content_hash=content_hash(text),
+                    content=text,
+                )
+            )
+            return result
+
+        return wrapper
+
+    return decorator
+
 
 class CompressionEngine:
     """Main compression engine coordinating strategies and LLM."""
@@ -28,33 +139,64 @@ class CompressionEngine:
         self,
         llm_client: Optional[LLMClient] = None,
         model_selector: Optional[ModelSelector] = None,
+        history_store: Optional[HistoryStore] = None,
+        chunk_cache: Optional[ChunkSummaryCache] = None,
+        summary_trees: Optional[SummaryTreeStore] = None,
     ) -> None:
         settings = get_settings()
 
         if llm_client:
             self.llm = llm_client
         else:
-            self.llm = create_llm_client(settings.llm)
+            self.llm = get_llm_client()
+
+        # Record calls to the history store; time LLM calls for its breakdown
+        self._history = history_store or get_history_store()
+        if self._history is not None:
+            self.llm = TimedLLMClient(self.llm)
+
+        # Account backend tokens per tool, model and session; enforce budgets
+        usage_tracker = get_usage_tracker()
+        if usage_tracker is not None:
+            self.llm = MeteredLLMClient(self.llm, usage_tracker)
 
         # Initialize model selector if smart selection is enabled
         self._model_selector = model_selector
+        base_client = unwrap_client(self.llm)
         if (
             self._model_selector is None
             and settings.llm.smart_selection.enabled
-            and isinstance(self.llm, LexoraClient)
+            and isinstance(base_client, LexoraClient)
         ):
-            self._model_selector = ModelSelector(self.llm, settings.llm)
+            self._model_selector = ModelSelector(base_client, settings.llm)
+
+        self._default_model = settings.llm.model
+        self._speculative_delay = settings.llm.smart_selection.speculative_start_seconds
+        self._budget = PromptBudget(self.llm)
+        self._compression_config = settings.compression
+        self._patch_config = settings.compression.patch
+        self._chunk_config = settings.summarization.chunk_cache
+        self._chunk_cache = chunk_cache if chunk_cache is not None else get_chunk_summary_cache()
+        self._tree_config = settings.summarization.tree
+        self._tree_store = summary_trees if summary_trees is not None else get_summary_tree_store()
+
+    @property
+    def _selection_enabled(self) -> bool:
+        return self._model_selector is not None and self._model_selector.is_enabled
 
     async def _select_model(
         self,
         style: CompressionStyle,
         content_preview: Optional[str] = None,
+        required_tokens: Optional[Awaitable[Optional[int]]] = None,
     ) -> Optional[ModelSelection]:
         """Select optimal model for the compression task.
 
         Args:
             style: Compression style being used
             content_preview: Optional content preview for classification
+            required_tokens: Task estimating prompt plus output tokens, awaited
+                before the selector is asked
 
         Returns:
             ModelSelection if smart selection is enabled, None otherwise
@@ -62,8 +204,330 @@ class CompressionEngine:
         if self._model_selector is None or not self._model_selector.is_enabled:
             return None
 
-        return await self._model_selector.select_model(style, content_preview)
+        with timed("selection"):
+            tokens = await required_tokens if required_tokens is not None else None
+            return await self._model_selector.select_model(style, content_preview, tokens)
+
+    async def _required_tokens(
+        self,
+        text: str,
+        output_tokens: int,
+        overhead_tokens: Awaitable[int],
+    ) -> Optional[int]:
+        """Estimate prompt plus output tokens for context-fit routing.
+
+        Only computed when smart selection is enabled, since counting may
+        require a tokenizer round-trip.
+        """
+        if not self._selection_enabled:
+            return None
+        return await self.llm.count_tokens(text) + await overhead_tokens + output_tokens
+
+    async def _overhead_tokens(self, template: str, values: dict[str, str | float]) -> int:
+        """Prompt tokens besides the content slot, from pre-counted templates."""
+        if not self._selection_enabled:
+            return 0
+        return await self._budget.overhead_tokens(template, values)
+
+    async def _run_selected(
+        self,
+        selection: asyncio.Task[Optional[ModelSelection]],
+        proceed: Callable[[Optional[ModelSelection]], Awaitable[CompressionResult]],
+    ) -> CompressionResult:
+        """Run ``proceed`` with the selected model, starting early if selection is slow.
+
+        When selection takes longer than ``speculative_start_seconds``,
+        ``proceed`` starts on the default model in the meantime. Its result
+        is kept (marked ``speculative``) if it finishes first or selection
+        settles on the default model anyway; otherwise it is cancelled and
+        ``proceed`` runs again with the selected model.
 
+        Args:
+            selection: Running model selection
+            proceed: Produces the result for a selection
+
+        Returns:
+            Result of ``proceed``
+        """
+        delay = self._speculative_delay
+        if delay is None or not self._selection_enabled:
+            return await proceed(await selection)
+
+        done, _ = await asyncio.wait({selection}, timeout=delay)
+        if done:
+            return await proceed(selection.result())
+
+        default = ModelSelection(model_id=self._default_model, method=SelectionMethod.DEFAULT)
+        speculative = asyncio.ensure_future(proceed(default))
+        try:
+            await asyncio.wait({selection, speculative}, return_when=asyncio.FIRST_COMPLETED)
+            if not _succeeded(speculative):
+                chosen = await selection
+                agrees = chosen is None or (chosen.model_id == default.model_id and chosen.fits)
+                if not agrees or speculative.done():
+                    return await proceed(chosen)
+            selection.cancel()
+            result = await speculative
+            result.metadata["speculative"] = True
+            return result
+        finally:
+            await _discard(speculative)
+
+    async def _map_reduce(
+        self,
+        text: str,
+        output_tokens: int,
+        context_length: int,
+        overhead_tokens: int,
+        run: Callable[[str, int], Awaitable[CompressionResult]],
+    ) -> CompressionResult:
+        """Process text that does not fit the context window in chunks.
+
+        Each chunk is compressed concurrently with ``run``, then the partial
+        results are merged with a final ``run`` over their concatenation
+        (recursively, if the concatenation still does not fit).
+
+        Args:
+            text: Text to process
+            output_tokens: Output budget for the final result
+            context_length: Context window of the model to fit
+            overhead_tokens: Prompt tokens besides the content
+            run: Compresses a text to a target token count
+
+        Returns:
+            Final result with ``chunked`` metadata
+        """
+        original_tokens = await self.llm.count_tokens(text)
+        chunk_output = max(min(output_tokens, context_length // 4), 1)
+        chunk_budget = context_length - chunk_output - overhead_tokens
+        if chunk_budget <= 0:
+            raise ValueError(f"Context window of {context_length} tokens is too small to chunk")
+
+        chars_per_token = len(text) / max(original_tokens, 1)
+        chunks = split_text(text, max(int(chunk_budget * chars_per_token), 1))
+
+        partials = await asyncio.gather(*(run(chunk, chunk_output) for chunk in chunks))
+        merged = "\n\n".join(p.compressed_text for p in partials)
+
+        merged_tokens = await self.llm.count_tokens(merged)
+        if (
+            len(chunks) > 1
+            and merged_tokens < original_tokens
+            and merged_tokens + overhead_tokens + output_tokens > context_length
+        ):
+            result = await self._map_reduce(
+                merged, output_tokens, context_length, overhead_tokens, run
+            )
+        else:
+            result = await run(merged, output_tokens)
+
+        result.original_tokens = original_tokens
+        result.compression_ratio = (
+            result.compressed_tokens / original_tokens if original_tokens > 0 else 0
+        )
+        chunked = result.metadata.get("chunked", {})
+        result.metadata["chunked"] = {
+            "chunks": len(chunks) + chunked.get("chunks", 0),
+            "context_length": context_length,
+        }
+        return result
+
+    async def _repair_missing(
+        self,
+        result: CompressionResult,
+        source: str,
+        model: Optional[str] = None,
+    ) -> CompressionResult:
+        """Restore preserved elements the model dropped with one small follow-up call.
+
+        Only the missing elements and source excerpts around them are sent;
+        the addition is spliced into the compressed text. Elements that do not
+        occur in the source cannot be repaired and are only reported, as are
+        elements beyond ``repair_max_items``, which are not attempted.
+
+        Args:
+            result: Result whose ``quality`` metadata lists missing elements
+            source: Text the result was compressed from
+            model: Model to use for the repair call
+
+        Returns:
+            The result, updated in place, with ``repair`` metadata if attempted
+        """
+        config = self._compression_config
+        missing = result.metadata.get("quality", {}).get("missing_preserved", [])
+        if not config.repair_enabled or not missing:
+            return result
+
+        attempted = missing[: config.repair_max_items]
+        snippets = find_snippets(source, attempted, config.repair_snippet_chars)
+        repair: dict[str, Any] = {
+            "missing": missing,
+            "unrepairable": [item for item in attempted if item not in snippets],
+        }
+        if len(missing) > len(attempted):
+            repair["skipped"] = missing[len(attempted) :]
+        if not snippets:
+            result.metadata["repair"] = repair
+            return result
+
+        prompt = PromptBuilder.build_repair_prompt(snippets, config.repair_max_tokens)
+        async with task_group() as group:
+            prompt_tokens = group.create_task(self.llm.count_tokens(prompt))
+            response = await self.llm.generate(
+                prompt,
+                system_prompt=PromptBuilder.get_system_prompt(),
+                max_tokens=config.repair_max_tokens,
+                temperature=0.3,
+                model=model,
+            )
+
+        result.compressed_text = splice(result.compressed_text, response.content)
+        result.compressed_tokens, quality = await measure_output(
+            self.llm, source, result.compressed_text, result.preserved_elements
+        )
+        result.compression_ratio = (
+            result.compressed_tokens / result.original_tokens if result.original_tokens > 0 else 0
+        )
+        result.quality_score = quality.score
+        result.metadata["quality"] = quality.to_metadata()
+
+        repair["repaired"] = [item for item in snippets if item not in quality.missing_preserved]
+        repair["prompt_tokens"] = prompt_tokens.result()
+        repair["output_tokens"] = response.tokens_used
+        result.metadata["repair"] = repair
+        return result
+
+    async def _enforce_budget(
+        self,
+        result: CompressionResult,
+        max_tokens: int,
+        source: str,
+        preserve: Optional[list[str]] = None,
+    ) -> CompressionResult:
+        """Trim the output to the caller's token budget without another LLM call.
+
+        Args:
+            result: Result to check, updated in place
+            max_tokens: Token budget the caller asked for
+            source: Text the result was compressed from, for re-scoring quality
+            preserve: Elements the trim must keep (default: the result's
+                preserved_elements)
+
+        Returns:
+            The result, with ``output_budget`` metadata
+        """
+        if not self._compression_config.enforce_output_budget:
+            return result
+
+        if preserve is None:
+            preserve = result.preserved_elements
+        trim = await trim_to_tokens(
+            result.compressed_text,
+            max_tokens,
+            self.llm,
+            tokens=result.compressed_tokens,
+            preserve=preserve,
+        )
+        result.metadata["output_budget"] = {
+            "max_tokens": max_tokens,
+            "trimmed": trim.trimmed,
+            "trimmed_tokens": trim.trimmed_tokens,
+        }
+        if trim.trimmed:
+            result.compressed_text = trim.text
+            result.compressed_tokens = trim.tokens
+            result.compression_ratio = (
+                trim.tokens / result.original_tokens if result.original_tokens > 0 else 0
+            )
+            quality = await assess_quality(source, trim.text, preserve)
+            result.quality_score = quality.score
+            result.metadata["quality"] = quality.to_metadata()
+            # Only items that survived the trim count as repaired
+            repair = result.metadata.get("repair")
+            if repair and "repaired" in repair:
+                repair["repaired"] = [
+                    item for item in repair["repaired"] if item not in quality.missing_preserved
+                ]
+        return result
+
+    async def _summarize_cached_chunks(
+        self,
+        text: str,
+        output_tokens: int,
+        cache_key: tuple[str, str],
+        context_length: Optional[int],
+        overhead_tokens: int,
+        run: Callable[[str, int], Awaitable[CompressionResult]],
+    ) -> CompressionResult:
+        """Summarize a large document from cached per-chunk summaries.
+
+        The text is split at content-defined boundaries; chunks whose summary
+        is cached are reused and only new or edited chunks are summarized.
+        The chunk summaries are then reduced to the final result, so an edit
+        costs in proportion to the chunks it touches.
+
+        Args:
+            text: Text to summarize
+            output_tokens: Output budget for the final result
+            cache_key: Style (including preserve items) and model of the summaries
+            context_length: Context window to fit for the reduce, if known
+            overhead_tokens: Prompt tokens besides the content
+            run: Compresses a text to a target token count
+
+        Returns:
+            Final result with ``chunk_cache`` metadata
+        """
+        assert self._chunk_cache is not None
+        config = self._chunk_config
+        chunks = content_defined_chunks(
+            text, config.avg_chunk_chars, config.min_chunk_chars, config.max_chunk_chars
+        )
+        target = config.chunk_summary_tokens
+        keys = [(chunk_id(chunk), *cache_key, target) for chunk in chunks]
+        summaries = [self._chunk_cache.get(key) for key in keys]
+
+        missing = [i for i, summary in enumerate(summaries) if summary is None]
+        async with task_group() as group:
+            # The document's size is only needed for the final ratio
+            counting = group.create_task(self.llm.count_tokens(text))
+            partials = await asyncio.gather(*(run(chunks[i], target) for i in missing))
+            for i, partial in zip(missing, partials):
+                summaries[i] = partial.compressed_text
+                self._chunk_cache.put(keys[i], partial.compressed_text)
+
+            merged = "\n\n".join(s for s in summaries if s)
+            if (
+                context_length is not None
+                and await self.llm.count_tokens(merged) + overhead_tokens + output_tokens
+                > context_length
+            ):
+                result = await self._map_reduce(
+                    merged, output_tokens, context_length, overhead_tokens, run
+                )
+            else:
+                result = await run(merged, output_tokens)
+
+        result.original_tokens = counting.result()
+        result.compression_ratio = (
+            result.compressed_tokens / result.original_tokens if result.original_tokens > 0 else 0
+        )
+        result.metadata["chunk_cache"] = {
+            "chunks": len(chunks),
+            "cached": len(chunks) - len(missing),
+            "summarized": len(missing),
+        }
+        return result
+
+    @staticmethod
+    def _needs_chunking(selection: Optional[ModelSelection]) -> bool:
+        return selection is not None and not selection.fits and selection.context_length is not None
+
+    @_recorded(
+        "summarize",
+        content=lambda a: a["text"],
+        style=lambda a: a["style"],
+        target_tokens=lambda a: a["max_tokens"],
+    )
     async def summarize(
         self,
         text: str,
@@ -75,37 +539,86 @@ class CompressionEngine:
         compression_style = CompressionStyle(style)
         strategy = get_strategy(compression_style, self.llm)
 
-        # Select optimal model if smart selection is enabled
-        model_selection = await self._select_model(
-            compression_style,
-            text[:500] if len(text) > 500 else text,
-        )
+        async def proceed(model_selection: Optional[ModelSelection]) -> CompressionResult:
+            async def run(chunk: str, target_tokens: int) -> CompressionResult:
+                request = CompressionRequest(
+                    text=chunk,
+                    style=compression_style,
+                    target_tokens=target_tokens,
+                    preserve=preserve or [],
+                )
 
-        request = CompressionRequest(
-            text=text,
-            style=compression_style,
-            target_tokens=max_tokens,
-            preserve=preserve or [],
-        )
+                # Add model selection to metadata if available
+                if model_selection:
+                    request.metadata["model_selection"] = {
+                        "model_id": model_selection.model_id,
+                        "method": model_selection.method.value,
+                        "capability": model_selection.capability,
+                        "confidence": model_selection.confidence,
+                    }
 
-        # Add model selection to metadata if available
-        if model_selection:
-            request.metadata["model_selection"] = {
-                "model_id": model_selection.model_id,
-                "method": model_selection.method.value,
-                "capability": model_selection.capability,
-                "confidence": model_selection.confidence,
-            }
+                return await strategy.compress(
+                    request, model=model_selection.model_id if model_selection else None
+                )
 
-        result = await strategy.compress(request, model=model_selection.model_id if model_selection else None)
+            # Logs and structured data are digested locally as a whole, never chunked
+            chunkable = compression_style not in (CompressionStyle.LOG, CompressionStyle.STRUCTURED)
+            if (
+                chunkable
+                and self._chunk_cache is not None
+                and len(text) >= self._chunk_config.min_document_chars
+            ):
+                result = await self._summarize_cached_chunks(
+                    text,
+                    max_tokens,
+                    (
+                        "|".join([compression_style.value, *sorted(preserve or [])]),
+                        model_selection.model_id if model_selection else self._default_model,
+                    ),
+                    model_selection.context_length if model_selection else None,
+                    await overhead,
+                    run,
+                )
+            elif chunkable and self._needs_chunking(model_selection):
+                assert model_selection is not None and model_selection.context_length is not None
+                result = await self._map_reduce(
+                    text, max_tokens, model_selection.context_length, await overhead, run
+                )
+            else:
+                result = await run(text, max_tokens)
 
-        # Add selection info to result metadata
-        if model_selection:
-            result.metadata["selected_model"] = model_selection.model_id
-            result.metadata["selection_method"] = model_selection.method.value
+            # A local digest returned without the LLM stays LLM-free
+            if result.metadata.get("llm", True):
+                result = await self._repair_missing(
+                    result, text, model_selection.model_id if model_selection else None
+                )
+            result = await self._enforce_budget(result, max_tokens, text)
 
-        return result
+            # Add selection info to result metadata
+            if model_selection:
+                result.metadata["selected_model"] = model_selection.model_id
+                result.metadata["selection_method"] = model_selection.method.value
+
+            return result
+
+        values = PromptBuilder.summarize_values("", max_tokens, compression_style, preserve or [])
+        async with task_group() as group:
+            overhead = group.create_task(
+                self._overhead_tokens("summarize", {k: v for k, v in values.items() if k != "text"})
+            )
+            required = group.create_task(self._required_tokens(text, max_tokens, overhead))
+            # Select optimal model if smart selection is enabled
+            selection = group.create_task(
+                self._select_model(compression_style, text[:PREVIEW_CHARS], required)
+            )
+            return await self._run_selected(selection, proceed)
 
+    @_recorded(
+        "compress_context",
+        content=lambda a: a["full_context"],
+        style=lambda a: CompressionStyle.CONCISE.value,
+        target_tokens=lambda a: a["target_tokens"],
+    )
     async def compress_context(
         self,
         full_context: str,
@@ -113,89 +626,173 @@ class CompressionEngine:
         target_tokens: int = 500,
     ) -> CompressionResult:
         """Compress context for specific task execution."""
-        original_tokens = await self.llm.count_tokens(full_context)
 
-        prompt = PromptBuilder.build_compress_context_prompt(
-            full_context=full_context,
-            task_description=task_description,
-            target_tokens=target_tokens,
-        )
+        async def proceed(model_selection: Optional[ModelSelection]) -> CompressionResult:
+            async def run(context: str, target: int) -> CompressionResult:
+                prompt = PromptBuilder.build_compress_context_prompt(
+                    full_context=context,
+                    task_description=task_description,
+                    target_tokens=target,
+                )
 
-        # Select model for context compression (use concise style)
-        model_selection = await self._select_model(
-            CompressionStyle.CONCISE,
-            full_context[:500] if len(full_context) > 500 else full_context,
-        )
+                async with task_group() as group:
+                    counting = group.create_task(self.llm.count_tokens(context))
+                    response = await self.llm.generate(
+                        prompt,
+                        system_prompt=PromptBuilder.get_system_prompt(),
+                        max_tokens=target + 100,
+                        temperature=0.3,
+                        model=model_selection.model_id if model_selection else None,
+                    )
+                original_tokens = counting.result()
 
-        response = await self.llm.generate(
-            prompt,
-            system_prompt=PromptBuilder.get_system_prompt(),
-            max_tokens=target_tokens + 100,
-            temperature=0.3,
-            model=model_selection.model_id if model_selection else None,
-        )
+                compressed_tokens, quality = await measure_output(
+                    self.llm, context, response.content
+                )
 
-        compressed_tokens = await self.llm.count_tokens(response.content)
-
-        metadata = {"task": task_description, "model": response.model}
-        if model_selection:
-            metadata["selected_model"] = model_selection.model_id
-            metadata["selection_method"] = model_selection.method.value
-
-        return CompressionResult(
-            compressed_text=response.content,
-            original_tokens=original_tokens,
-            compressed_tokens=compressed_tokens,
-            compression_ratio=compressed_tokens / original_tokens if original_tokens > 0 else 0,
-            preserved_elements=[task_description],
-            quality_score=0.85,
-            metadata=metadata,
-        )
+                metadata = {
+                    "task": task_description,
+                    "model": response.model,
+                    "quality": quality.to_metadata(),
+                }
+                if model_selection:
+                    metadata["selected_model"] = model_selection.model_id
+                    metadata["selection_method"] = model_selection.method.value
+
+                return CompressionResult(
+                    compressed_text=response.content,
+                    original_tokens=original_tokens,
+                    compressed_tokens=compressed_tokens,
+                    compression_ratio=(
+                        compressed_tokens / original_tokens if original_tokens > 0 else 0
+                    ),
+                    preserved_elements=[task_description],
+                    quality_score=quality.score,
+                    metadata=metadata,
+                )
+
+            if self._needs_chunking(model_selection):
+                assert model_selection is not None and model_selection.context_length is not None
+                result = await self._map_reduce(
+                    full_context,
+                    target_tokens,
+                    model_selection.context_length,
+                    await overhead,
+                    run,
+                )
+            else:
+                result = await run(full_context, target_tokens)
+            # The task description guides the model; it is not text to keep
+            return await self._enforce_budget(result, target_tokens, full_context, preserve=[])
+
+        async with task_group() as group:
+            overhead = group.create_task(
+                self._overhead_tokens(
+                    "compress_context",
+                    {"task_description": task_description, "target_tokens": target_tokens},
+                )
+            )
+            required = group.create_task(
+                self._required_tokens(full_context, target_tokens + 100, overhead)
+            )
+            # Select model for context compression (use concise style)
+            selection = group.create_task(
+                self._select_model(CompressionStyle.CONCISE, full_context[:PREVIEW_CHARS], required)
+            )
+            return await self._run_selected(selection, proceed)
 
+    @_recorded(
+        "extract_essence",
+        content=lambda a: a["document"],
+        style=lambda a: CompressionStyle.DETAILED.value,
+    )
     async def extract_essence(
         self,
         document: str,
         focus_areas: list[str] | None = None,
     ) -> CompressionResult:
         """Extract essential information from document."""
-        original_tokens = await self.llm.count_tokens(document)
 
-        prompt = PromptBuilder.build_extract_essence_prompt(
-            document=document,
-            focus_areas=focus_areas or [],
-        )
+        async def proceed(model_selection: Optional[ModelSelection]) -> CompressionResult:
+            original_tokens = await counting
 
-        # Select model for essence extraction (use detailed style)
-        model_selection = await self._select_model(
-            CompressionStyle.DETAILED,
-            document[:500] if len(document) > 500 else document,
-        )
+            async def run(text: str, max_tokens: int) -> CompressionResult:
+                prompt = PromptBuilder.build_extract_essence_prompt(
+                    document=text,
+                    focus_areas=focus_areas or [],
+                )
 
-        response = await self.llm.generate(
-            prompt,
-            system_prompt=PromptBuilder.get_system_prompt(),
-            max_tokens=max(int(original_tokens * 0.4), 1),
-            temperature=0.4,
-            model=model_selection.model_id if model_selection else None,
-        )
+                async with task_group() as group:
+                    text_counting = (
+                        counting
+                        if text is document
+                        else group.create_task(self.llm.count_tokens(text))
+                    )
+                    response = await self.llm.generate(
+                        prompt,
+                        system_prompt=PromptBuilder.get_system_prompt(),
+                        max_tokens=max_tokens,
+                        temperature=0.4,
+                        model=model_selection.model_id if model_selection else None,
+                    )
+                text_tokens = text_counting.result()
 
-        compressed_tokens = await self.llm.count_tokens(response.content)
-
-        metadata = {"focus_areas": focus_areas, "model": response.model}
-        if model_selection:
-            metadata["selected_model"] = model_selection.model_id
-            metadata["selection_method"] = model_selection.method.value
-
-        return CompressionResult(
-            compressed_text=response.content,
-            original_tokens=original_tokens,
-            compressed_tokens=compressed_tokens,
-            compression_ratio=compressed_tokens / original_tokens if original_tokens > 0 else 0,
-            preserved_elements=focus_areas or [],
-            quality_score=0.8,
-            metadata=metadata,
-        )
+                compressed_tokens, quality = await measure_output(self.llm, text, response.content)
+
+                metadata = {
+                    "focus_areas": focus_areas,
+                    "model": response.model,
+                    "quality": quality.to_metadata(),
+                }
+                if model_selection:
+                    metadata["selected_model"] = model_selection.model_id
+                    metadata["selection_method"] = model_selection.method.value
+
+                return CompressionResult(
+                    compressed_text=response.content,
+                    original_tokens=text_tokens,
+                    compressed_tokens=compressed_tokens,
+                    compression_ratio=compressed_tokens / text_tokens if text_tokens > 0 else 0,
+                    preserved_elements=focus_areas or [],
+                    quality_score=quality.score,
+                    metadata=metadata,
+                )
 
+            output_tokens = max(int(original_tokens * 0.4), 1)
+            if self._needs_chunking(model_selection):
+                assert model_selection is not None and model_selection.context_length is not None
+                return await self._map_reduce(
+                    document, output_tokens, model_selection.context_length, await overhead, run
+                )
+            return await run(document, output_tokens)
+
+        async def required_tokens() -> int:
+            original_tokens = await counting
+            return original_tokens + await overhead + max(int(original_tokens * 0.4), 1)
+
+        focus_values = PromptBuilder.extract_essence_values("", focus_areas or [])
+        async with task_group() as group:
+            counting = group.create_task(self.llm.count_tokens(document))
+            overhead = group.create_task(
+                self._overhead_tokens(
+                    "extract_essence", {"focus_areas": focus_values["focus_areas"]}
+                )
+            )
+            # Select model for essence extraction (use detailed style)
+            selection = group.create_task(
+                self._select_model(
+                    CompressionStyle.DETAILED,
+                    document[:PREVIEW_CHARS],
+                    group.create_task(required_tokens()),
+                )
+            )
+            return await self._run_selected(selection, proceed)
+
+    @_recorded(
+        "unify_summaries",
+        content=lambda a: "\n".join(str(d.get("content", "")) for d in a["documents"]),
+        style=lambda a: CompressionStyle.DETAILED.value,
+    )
     async def unify_summaries(
         self,
         documents: list[dict],
@@ -204,48 +801,88 @@ class CompressionEngine:
         """Unify multiple documents into single summary."""
         docs = [Document(**d) for d in documents]
         total_content = "\n".join(d.content for d in docs)
-        original_tokens = await self.llm.count_tokens(total_content)
+        values = PromptBuilder.unify_summaries_values(documents=docs, purpose=purpose)
 
-        prompt = PromptBuilder.build_unify_summaries_prompt(
-            documents=docs,
-            purpose=purpose,
-        )
+        async def proceed(model_selection: Optional[ModelSelection]) -> CompressionResult:
+            original_tokens = await counting
+            output_tokens = max(int(original_tokens * 0.3), 1)
 
-        # Select model for unification (use detailed style for synthesis)
-        model_selection = await self._select_model(
-            CompressionStyle.DETAILED,
-            total_content[:500] if len(total_content) > 500 else total_content,
-        )
+            # Trim the documents to the model's window when it is too small
+            trimmed = False
+            if model_selection and not model_selection.fits and model_selection.context_length:
+                budgeted = await self._budget.fit(
+                    "unify_summaries",
+                    values,
+                    slot="documents",
+                    context_length=model_selection.context_length,
+                    max_tokens=min(output_tokens, model_selection.context_length // 4),
+                )
+                prompt = budgeted.prompt
+                output_tokens = min(output_tokens, model_selection.context_length // 4)
+                trimmed = budgeted.trimmed
+            else:
+                prompt = PromptBuilder.build_unify_summaries_prompt(documents=docs, purpose=purpose)
 
-        response = await self.llm.generate(
-            prompt,
-            system_prompt=PromptBuilder.get_system_prompt(),
-            max_tokens=max(int(original_tokens * 0.3), 1),
-            temperature=0.5,
-            model=model_selection.model_id if model_selection else None,
-        )
+            response = await self.llm.generate(
+                prompt,
+                system_prompt=PromptBuilder.get_system_prompt(),
+                max_tokens=output_tokens,
+                temperature=0.5,
+                model=model_selection.model_id if model_selection else None,
+            )
 
-        compressed_tokens = await self.llm.count_tokens(response.content)
+            compressed_tokens, quality = await measure_output(
+                self.llm, total_content, response.content, [d.title for d in docs if d.title]
+            )
 
-        metadata = {
-            "purpose": purpose,
-            "document_count": len(docs),
-            "model": response.model,
-        }
-        if model_selection:
-            metadata["selected_model"] = model_selection.model_id
-            metadata["selection_method"] = model_selection.method.value
-
-        return CompressionResult(
-            compressed_text=response.content,
-            original_tokens=original_tokens,
-            compressed_tokens=compressed_tokens,
-            compression_ratio=compressed_tokens / original_tokens if original_tokens > 0 else 0,
-            preserved_elements=[d.title for d in docs],
-            quality_score=0.8,
-            metadata=metadata,
-        )
+            metadata = {
+                "purpose": purpose,
+                "document_count": len(docs),
+                "model": response.model,
+                "quality": quality.to_metadata(),
+            }
+            if trimmed:
+                metadata["trimmed_to_context"] = True
+            if model_selection:
+                metadata["selected_model"] = model_selection.model_id
+                metadata["selection_method"] = model_selection.method.value
+
+            return CompressionResult(
+                compressed_text=response.content,
+                original_tokens=original_tokens,
+                compressed_tokens=compressed_tokens,
+                compression_ratio=(
+                    compressed_tokens / original_tokens if original_tokens > 0 else 0
+                ),
+                preserved_elements=[d.title for d in docs],
+                quality_score=quality.score,
+                metadata=metadata,
+            )
+
+        async def required_tokens() -> int:
+            original_tokens = await counting
+            return original_tokens + await overhead + max(int(original_tokens * 0.3), 1)
 
+        async with task_group() as group:
+            counting = group.create_task(self.llm.count_tokens(total_content))
+            overhead = group.create_task(
+                self._overhead_tokens("unify_summaries", {"purpose": purpose})
+            )
+            # Select model for unification (use detailed style for synthesis)
+            selection = group.create_task(
+                self._select_model(
+                    CompressionStyle.DETAILED,
+                    total_content[:PREVIEW_CHARS],
+                    group.create_task(required_tokens()),
+                )
+            )
+            return await self._run_selected(selection, proceed)
+
+    @_recorded(
+        "summarize_diff",
+        content=lambda a: f"{a['before']}\n{a['after']}",
+        style=lambda a: CompressionStyle.DIFF.value,
+    )
     async def summarize_diff(
         self,
         before: str,
@@ -256,33 +893,329 @@ class CompressionEngine:
         diff_input = DiffInput(before=before, after=after, focus=focus)
         strategy = get_strategy(CompressionStyle.DIFF, self.llm)
 
+        async def proceed(model_selection: Optional[ModelSelection]) -> CompressionResult:
+            request = CompressionRequest(
+                text="",  # Not used for diff
+                style=CompressionStyle.DIFF,
+                metadata={"diff_input": diff_input},
+            )
+
+            if model_selection:
+                request.metadata["model_selection"] = {
+                    "model_id": model_selection.model_id,
+                    "method": model_selection.method.value,
+                }
+
+            result = await strategy.compress(
+                request, model=model_selection.model_id if model_selection else None
+            )
+
+            if model_selection:
+                result.metadata["selected_model"] = model_selection.model_id
+                result.metadata["selection_method"] = model_selection.method.value
+
+            return result
+
         # Select model for diff (use diff style)
         combined_preview = f"Before:\n{before[:250]}\n\nAfter:\n{after[:250]}"
-        model_selection = await self._select_model(
-            CompressionStyle.DIFF,
-            combined_preview,
-        )
+        async with task_group() as group:
+            selection = group.create_task(
+                self._select_model(CompressionStyle.DIFF, combined_preview)
+            )
+            return await self._run_selected(selection, proceed)
 
-        request = CompressionRequest(
-            text="",  # Not used for diff
-            style=CompressionStyle.DIFF,
-            metadata={"diff_input": diff_input},
-        )
+    @_recorded(
+        "summarize_patch",
+        content=lambda a: a["patch"],
+        style=lambda a: CompressionStyle.DIFF.value,
+    )
+    async def summarize_patch(
+        self,
+        patch: str,
+        focus: Optional[str] = None,
+    ) -> CompressionResult:
+        """Summarize a multi-file unified diff or ``git format-patch`` series.
+
+        The patch is split per file. Lockfiles, whitespace-only changes,
+        binary files, deletions and pure renames are described locally; the
+        other files are summarized concurrently (at most
+        ``compression.patch.max_concurrent_files`` at a time), then the file
+        summaries are merged into one summary of the whole change.
+
+        Args:
+            patch: Unified diff or format-patch text
+            focus: Aspect to emphasize (e.g. "breaking changes")
 
-        if model_selection:
-            request.metadata["model_selection"] = {
-                "model_id": model_selection.model_id,
-                "method": model_selection.method.value,
+        Returns:
+            Result whose ``files`` metadata lists each file with its summary
+        """
+        patch_set = parse_patch(patch)
+        config = self._patch_config
+        slots = asyncio.Semaphore(config.max_concurrent_files)
+
+        async def summarize_file(
+            file: FilePatch, model: Optional[str]
+        ) -> tuple[str, Optional[str]]:
+            """A file's summary and the model that wrote it (None if local)."""
+            local = file.local_summary(config)
+            if local is not None:
+                return local, None
+            async with slots:
+                response = await self.llm.generate(
+                    PromptBuilder.build_patch_file_prompt(
+                        file.path,
+                        file.excerpt(config.max_file_chars),
+                        config.file_summary_tokens,
+                        focus,
+                    ),
+                    system_prompt=PromptBuilder.get_system_prompt(),
+                    max_tokens=config.file_summary_tokens,
+                    temperature=0.3,
+                    model=model,
+                )
+            return response.content.strip(), response.model
+
+        async def proceed(model_selection: Optional[ModelSelection]) -> CompressionResult:
+            model = model_selection.model_id if model_selection else None
+            summaries = await asyncio.gather(
+                *(summarize_file(file, model) for file in patch_set.files)
+            )
+            file_summaries = {
+                file.path: summary for file, (summary, _) in zip(patch_set.files, summaries)
             }
+            models = [used for _, used in summaries if used is not None]
 
-        result = await strategy.compress(request, model=model_selection.model_id if model_selection else None)
+            if len(patch_set.files) == 1 and models:
+                compressed_text = summaries[0][0]
+            elif models:
+                response = await self.llm.generate(
+                    PromptBuilder.build_patch_prompt(
+                        file_summaries, config.summary_tokens, focus, patch_set.subjects
+                    ),
+                    system_prompt=PromptBuilder.get_system_prompt(),
+                    max_tokens=config.summary_tokens,
+                    temperature=0.3,
+                    model=model,
+                )
+                compressed_text = response.content
+                models.append(response.model)
+            else:
+                compressed_text = "\n".join(
+                    f"- {path}: {summary}" for path, summary in file_summaries.items()
+                )
 
-        if model_selection:
-            result.metadata["selected_model"] = model_selection.model_id
-            result.metadata["selection_method"] = model_selection.method.value
+            original_tokens = await counting
+            compressed_tokens, quality = await measure_output(
+                self.llm, "\n".join(file_summaries.values()), compressed_text
+            )
+            metadata: dict[str, Any] = {
+                "strategy": "patch",
+                "model": models[-1] if models else None,
+                "focus": focus,
+                "files": [
+                    {
+                        "path": file.path,
+                        "old_path": file.old_path,
+                        "status": file.status,
+                        "additions": file.additions,
+                        "deletions": file.deletions,
+                        "summary": summary,
+                        "local": used is None,
+                    }
+                    for file, (summary, used) in zip(patch_set.files, summaries)
+                ],
+                "files_summarized": sum(used is not None for _, used in summaries),
+                "commits": patch_set.subjects,
+                "quality": quality.to_metadata(),
+            }
+            if model_selection:
+                metadata["selected_model"] = model_selection.model_id
+                metadata["selection_method"] = model_selection.method.value
+
+            return CompressionResult(
+                compressed_text=compressed_text,
+                original_tokens=original_tokens,
+                compressed_tokens=compressed_tokens,
+                compression_ratio=(
+                    compressed_tokens / original_tokens if original_tokens > 0 else 0
+                ),
+                preserved_elements=list(file_summaries),
+                quality_score=quality.score,
+                metadata=metadata,
+            )
+
+        async with task_group() as group:
+            counting = group.create_task(self.llm.count_tokens(patch))
+            selection = group.create_task(
+                self._select_model(CompressionStyle.DIFF, patch[:PREVIEW_CHARS])
+            )
+            return await self._run_selected(selection, proceed)
+
+    async def build_summary_tree(self, text: str) -> tuple[SummaryTree, bool]:
+        """Build the summary tree of a document, or fetch it if already built.
+
+        The text is chunked at content-defined boundaries and summarized
+        bottom-up, ``fan_out`` nodes per parent, up to a single root. Node
+        summaries are cached by the hash of the text they summarize, so a
+        revised document only re-summarizes the chunks and ancestors it changes.
+        Spans already within the node summary size are kept verbatim.
+
+        Args:
+            text: Document to build the tree for
+
+        Returns:
+            Tuple of the tree and whether it was already built
+        """
+        if not text.strip():
+            raise ValueError("Cannot build a summary tree for empty text")
+        store = self._tree_store
+        key = (content_hash(text), self._default_model)
+        tree = store.get(key)
+        if tree is not None:
+            return tree, True
+
+        config = self._tree_config
+        target = config.node_summary_tokens
+        strategy = get_strategy(CompressionStyle.CONCISE, self.llm)
+
+        async def summarize_span(source: str, source_tokens: int) -> tuple[str, int]:
+            if source_tokens <= target:
+                return source, source_tokens
+            cache_key = (chunk_id(source), "tree", self._default_model, target)
+            summary = store.nodes.get(cache_key)
+            if summary is None:
+                result = await strategy.compress(
+                    CompressionRequest(text=source, target_tokens=target)
+                )
+                summary = result.compressed_text
+                store.nodes.put(cache_key, summary)
+            return summary, await self.llm.count_tokens(summary)
+
+        chunks = content_defined_chunks(
+            text, config.avg_chunk_chars, config.min_chunk_chars, config.max_chunk_chars
+        )
+        offsets = list(itertools.accumulate((len(chunk) for chunk in chunks), initial=0))
+
+        async def leaf(index: int, chunk: str) -> SummaryNode:
+            source_tokens = await self.llm.count_tokens(chunk)
+            summary, tokens = await summarize_span(chunk, source_tokens)
+            return SummaryNode(
+                id=node_id(0, index),
+                level=0,
+                start=offsets[index],
+                end=offsets[index + 1],
+                summary=summary,
+                tokens=tokens,
+                source_tokens=source_tokens,
+            )
+
+        async def parent(level: int, index: int, group: list[SummaryNode]) -> SummaryNode:
+            if len(group) == 1:
+                summary, tokens = group[0].summary, group[0].tokens
+            else:
+                summary, tokens = await summarize_span(
+                    "\n\n".join(node.summary for node in group),
+                    sum(node.tokens for node in group),
+                )
+            return SummaryNode(
+                id=node_id(level, index),
+                level=level,
+                start=group[0].start,
+                end=group[-1].end,
+                summary=summary,
+                tokens=tokens,
+                source_tokens=sum(node.source_tokens for node in group),
+                children=[node.id for node in group],
+            )
+
+        levels = [list(await asyncio.gather(*itertools.starmap(leaf, enumerate(chunks))))]
+        while len(levels[-1]) > 1:
+            below, level = levels[-1], len(levels)
+            groups = [below[i : i + config.fan_out] for i in range(0, len(below), config.fan_out)]
+            levels.append(
+                list(await asyncio.gather(*(parent(level, i, g) for i, g in enumerate(groups))))
+            )
+
+        tree = SummaryTree(document_hash=key[0], levels=levels)
+        store.put(key, tree)
+        return tree, False
+
+    @_recorded(
+        "summarize_at_level",
+        content=lambda a: a["text"],
+        style=lambda a: CompressionStyle.CONCISE.value,
+        target_tokens=lambda a: a["max_tokens"],
+    )
+    async def summarize_at_level(
+        self,
+        text: str,
+        max_tokens: int = 500,
+        node: Optional[str] = None,
+        level: Optional[int] = None,
+    ) -> CompressionResult:
+        """Summarize a document, or one of its sections, from its summary tree.
+
+        The most detailed tree nodes whose summaries fit ``max_tokens`` are
+        combined; a span that fits as-is is returned verbatim. Only when the
+        chosen nodes are still too long is one reduce call made.
 
+        Args:
+            text: Document to summarize (its tree is built on first use)
+            max_tokens: Token budget of the answer
+            node: ID of the tree node to zoom into (default: whole document)
+            level: Answer from the nodes of exactly this tree level
+
+        Returns:
+            CompressionResult with ``tree`` metadata
+        """
+        tree, cached = await self.build_summary_tree(text)
+        scope = tree.node(node) if node else tree.root
+        source = text[scope.start : scope.end]
+
+        nodes: list[SummaryNode] = []
+        if level is None and scope.source_tokens <= max_tokens:
+            output, tokens = source, scope.source_tokens
+        else:
+            nodes = select_nodes(tree, max_tokens, scope, level)
+            output = "\n\n".join(n.summary for n in nodes)
+            tokens = sum(n.tokens for n in nodes)
+
+        reduced = tokens > max_tokens
+        if reduced:
+            strategy = get_strategy(CompressionStyle.CONCISE, self.llm)
+            reduce = await strategy.compress(
+                CompressionRequest(text=output, target_tokens=max_tokens)
+            )
+            output, tokens = reduce.compressed_text, reduce.compressed_tokens
+
+        quality = await assess_quality(source, output, [])
+        result = CompressionResult(
+            compressed_text=output,
+            original_tokens=scope.source_tokens,
+            compressed_tokens=tokens,
+            compression_ratio=tokens / scope.source_tokens if scope.source_tokens > 0 else 0,
+            preserved_elements=[],
+            quality_score=quality.score,
+            metadata={
+                "tree": {
+                    "cached": cached,
+                    "levels": len(tree.levels),
+                    "scope": scope.id,
+                    "nodes": [n.id for n in nodes],
+                    "reduced": reduced,
+                },
+                "quality": quality.to_metadata(),
+            },
+        )
+        if reduced:
+            result = await self._enforce_budget(result, max_tokens, source)
         return result
 
+    @_recorded(
+        "progressive_compress",
+        content=lambda a: a["text"],
+        style=lambda a: CompressionStyle.CONCISE.value,
+    )
     async def progressive_compress(
         self,
         text: str,
@@ -294,23 +1227,32 @@ class CompressionEngine:
         total_stages = len(stages)
 
         for i, stage_config in enumerate(stages, 1):
-            stage = ProgressiveStage(**stage_config)
-
-            prompt = PromptBuilder.build_progressive_compress_prompt(
-                text=current_text,
-                stage=stage,
-                stage_number=i,
-                total_stages=total_stages,
+            result = await self._progressive_stage(
+                current_text, ProgressiveStage(**stage_config), i, total_stages
             )
+            results.append(result)
+            current_text = result.compressed_text
 
-            original_tokens = await self.llm.count_tokens(current_text)
-            target_tokens = max(int(original_tokens * stage.target_ratio), 1)
+        return results
 
-            # Select model for this stage (use concise style)
-            model_selection = await self._select_model(
-                CompressionStyle.CONCISE,
-                current_text[:500] if len(current_text) > 500 else current_text,
-            )
+    async def _progressive_stage(
+        self,
+        text: str,
+        stage: ProgressiveStage,
+        stage_number: int,
+        total_stages: int,
+    ) -> CompressionResult:
+        """Run one stage of progressive compression."""
+        prompt = PromptBuilder.build_progressive_compress_prompt(
+            text=text,
+            stage=stage,
+            stage_number=stage_number,
+            total_stages=total_stages,
+        )
+
+        async def proceed(model_selection: Optional[ModelSelection]) -> CompressionResult:
+            original_tokens = await counting
+            target_tokens = max(int(original_tokens * stage.target_ratio), 1)
 
             response = await self.llm.generate(
                 prompt,
@@ -320,12 +1262,15 @@ class CompressionEngine:
                 model=model_selection.model_id if model_selection else None,
             )
 
-            compressed_tokens = await self.llm.count_tokens(response.content)
+            compressed_tokens, quality = await measure_output(
+                self.llm, text, response.content, stage.preserve
+            )
 
             metadata = {
-                "stage": i,
+                "stage": stage_number,
                 "target_ratio": stage.target_ratio,
                 "model": response.model,
+                "quality": quality.to_metadata(),
             }
             if model_selection:
                 metadata["selected_model"] = model_selection.model_id
@@ -337,10 +1282,32 @@ class CompressionEngine:
                 compressed_tokens=compressed_tokens,
                 compression_ratio=compressed_tokens / original_tokens if original_tokens > 0 else 0,
                 preserved_elements=stage.preserve,
-                quality_score=0.8,
+                quality_score=quality.score,
                 metadata=metadata,
             )
-            results.append(result)
-            current_text = response.content
+            return await self._repair_missing(
+                result, text, model_selection.model_id if model_selection else None
+            )
 
-        return results
+        async def required_tokens() -> int:
+            original_tokens = await counting
+            target_tokens = max(int(original_tokens * stage.target_ratio), 1)
+            return original_tokens + await overhead + target_tokens + 100
+
+        values = PromptBuilder.progressive_compress_values("", stage, stage_number, total_stages)
+        async with task_group() as group:
+            counting = group.create_task(self.llm.count_tokens(text))
+            overhead = group.create_task(
+                self._overhead_tokens(
+                    "progressive_compress", {k: v for k, v in values.items() if k != "text"}
+                )
+            )
+            # Select model for this stage (use concise style)
+            selection = group.create_task(
+                self._select_model(
+                    CompressionStyle.CONCISE,
+                    text[:PREVIEW_CHARS],
+                    group.create_task(required_tokens()),
+                )
+            )
+            return await self._run_selected(selection, proceed)
@@ -0,0 +1,388 @@
+"""Local digests of logs and stack traces by template mining.
+
+Lines are grouped into templates with a Drain-style fixed-depth parse tree:
+a line is routed by its token count and its first few tokens to a small set
+of clusters, and joins the most similar one, turning the tokens that differ
+into ``<*>`` wildcards. Stack frames are folded (recursive runs collapse,
+repeated traces are listed once) and error lines are kept verbatim, so the
+digest of a long build or test log is a few kilobytes.
+"""
+
+from __future__ import annotations
+
+import bisect
+import operator
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+from itertools import accumulate
+from typing import Optional
+
+from cognilens.config import LogDigestConfig
+
+WILDCARD = "<*>"
+
+_DIGIT = re.compile(r"\d")
+_DIGIT_RUN = re.compile(r"0+")
+_ZERO_DIGITS = str.maketrans("123456789", "000000000")
+_ERROR = re.compile(
+    r"(?i:\b(?:error|errors|exception|fatal|fail|failed|failure|panic|critical|traceback)\b)"
+    r"|\w(?:Error|Exception)\b|^E\s"
+)
+_ERROR_HINTS = ("rror", "xception", "fatal", "fail", "panic", "critical", "traceback")
+# Python ("File ..., line N"), JVM/JavaScript ("at ..."), "... N more", and
+# numbered native frames ("#3 0x...")
+_FRAME = re.compile(
+    r'^[ \t]*(?:File "[^"\n]*", line \d+|at[ \t]+\S|\.\.\. \d+ more|#\d+[ \t]+0x[0-9a-f]+)',
+    re.MULTILINE,
+)
+
+
+@dataclass
+class LogTemplate:
+    """Lines sharing a template, with where they first and last occurred."""
+
+    tokens: list[str]
+    count: int = 0
+    first_line: int = 0
+    last_line: int = 0
+    first: str = ""
+    last: str = ""
+    samples: list[str] = field(default_factory=list)
+
+    @property
+    def text(self) -> str:
+        return " ".join(self.tokens)
+
+    def variables(self) -> list[list[str]]:
+        """Distinct example values of each wildcard, from the sampled lines."""
+        values: list[list[str]] = [[] for t in self.tokens if t == WILDCARD]
+        for line in [self.first, *self.samples, self.last]:
+            tokens = line.split()
+            if len(tokens) != len(self.tokens):
+                continue
+            wildcards = (tok for tok, t in zip(tokens, self.tokens) if t == WILDCARD)
+            for examples, value in zip(values, wildcards):
+                if value not in examples:
+                    examples.append(value)
+        return values
+
+
+@dataclass
+class StackTrace:
+    """A distinct stack (consecutive frame lines) and how often it occurred."""
+
+    frames: list[str]
+    count: int = 1
+    first_line: int = 0
+    folded_frames: int = 0
+
+
+@dataclass
+class ErrorLine:
+    """An error line, and how often it occurred with any numbers in it."""
+
+    text: str
+    count: int = 1
+    first_line: int = 0
+
+
+@dataclass
+class LogDigest:
+    """Templates, stack traces and error lines of a log."""
+
+    lines: int
+    templates: list[LogTemplate]
+    traces: list[StackTrace]
+    errors: list[ErrorLine]
+    first: str = ""
+    last: str = ""
+
+    @property
+    def error_count(self) -> int:
+        return sum(error.count for error in self.errors)
+
+    def render(self, config: Optional[LogDigestConfig] = None) -> str:
+        """Format the digest as text, keeping the most frequent templates."""
+        config = config or LogDigestConfig()
+        header = (
+            f"Log digest: {self.lines} lines, {len(self.templates)} templates, "
+            f"{len(self.traces)} distinct stack traces, "
+            f"{self.error_count} error lines ({len(self.errors)} distinct)"
+        )
+        out = [
+            header,
+            f"First line: {self.first}",
+            f"Last line (L{self.lines}): {self.last}",
+        ]
+
+        if self.errors:
+            out += ["", "Errors:"]
+            for error in self.errors[: config.max_error_lines]:
+                out.append(f"  L{error.first_line} x{error.count} {error.text}")
+            omitted = len(self.errors) - config.max_error_lines
+            if omitted > 0:
+                out.append(f"  ... {omitted} more distinct error lines")
+
+        if self.traces:
+            out += ["", "Stack traces:"]
+            for i, trace in enumerate(self.traces[: config.max_traces], 1):
+                folded = ""
+                if trace.folded_frames:
+                    folded = f", {trace.folded_frames} repeated frames folded"
+                out.append(
+                    f"  #{i} x{trace.count} first at L{trace.first_line}, "
+                    f"{len(trace.frames)} frames{folded}:"
+                )
+                out += [f"    {frame}" for frame in trace.frames]
+            omitted = len(self.traces) - config.max_traces
+            if omitted > 0:
+                out.append(f"  ... {omitted} more distinct stack traces")
+
+        kept = sorted(self.templates, key=lambda t: t.count, reverse=True)[: config.max_templates]
+        if kept:
+            out += ["", "Templates (by first occurrence):"]
+            for template in sorted(kept, key=lambda t: t.first_line):
+                if template.count == 1:
+                    out.append(f"  L{template.first_line} {template.first}")
+                    continue
+                out.append(
+                    f"  x{template.count} L{template.first_line}-L{template.last_line} "
+                    f"{template.text}"
+                )
+                examples = [
+                    ", ".join(values[: config.max_examples])
+                    for values in template.variables()
+                    if values
+                ]
+                if examples:
+                    out.append(f"    vars: {' | '.join(examples)}")
+                out.append(f"    first: {template.first}")
+                if template.last != template.first:
+                    out.append(f"    last: {template.last}")
+            omitted = len(self.templates) - len(kept)
+            if omitted > 0:
+                lines = sum(t.count for t in self.templates) - sum(t.count for t in kept)
+                out.append(f"  ... {omitted} rarer templates covering {lines} lines")
+        return "\n".join(out)
+
+
+class _Node:
+    __slots__ = ("children", "clusters")
+
+    def __init__(self) -> None:
+        self.children: dict[str, _Node] = {}
+        self.clusters: list[LogTemplate] = []
+
+
+class TemplateMiner:
+    """Drain-style online template miner."""
+
+    def __init__(self, config: Optional[LogDigestConfig] = None) -> None:
+        self.config = config or LogDigestConfig()
+        self.templates: list[LogTemplate] = []
+        self._root = _Node()
+        # Lines differing only in digits always reach the same template
+        self._seen: dict[str, LogTemplate] = {}
+
+    def add(
+        self,
+        line: str,
+        line_number: int,
+        key: Optional[str] = None,
+        count: int = 1,
+        last: Optional[tuple[int, str]] = None,
+    ) -> LogTemplate:
+        """Add a line to its template, creating one if no template is similar enough.
+
+        Args:
+            line: Log line
+            line_number: 1-based line number in the log
+            key: The line with its digits zeroed, if already computed
+            count: Occurrences of the line being added at once
+            last: Line number and text of the last of those occurrences
+        """
+        key = key if key is not None else line.translate(_ZERO_DIGITS)
+        template = self._seen.get(key)
+        if template is None:
+            template = self._match(
+                tuple(WILDCARD if _DIGIT.search(tok) else tok for tok in line.split())
+            )
+            self._seen[key] = template
+
+        if not template.count:
+            template.first = line
+            template.first_line = line_number
+        elif len(template.samples) < self.config.max_examples:
+            template.samples.append(line)
+        template.count += count
+        last_line, last_text = last or (line_number, line)
+        if last_line >= template.last_line:
+            template.last = last_text
+            template.last_line = last_line
+        return template
+
+    def _match(self, tokens: tuple[str, ...]) -> LogTemplate:
+        node = self._root.children.setdefault(str(len(tokens)), _Node())
+        for token in tokens[: self.config.depth - 2]:
+            child = node.children.get(token)
+            if child is None:
+                if len(node.children) >= self.config.max_children or token == WILDCARD:
+                    token = WILDCARD
+                child = node.children.setdefault(token, _Node())
+            node = child
+
+        best: Optional[LogTemplate] = None
+        best_similarity = -1.0
+        for cluster in node.clusters:
+            # A masked token matches a wildcard, as a variable filling its slot
+            same = sum(1 for a, b in zip(cluster.tokens, tokens) if a == b)
+            similarity = same / len(tokens) if tokens else 1.0
+            if similarity > best_similarity:
+                best, best_similarity = cluster, similarity
+
+        if best is not None and best_similarity >= self.config.similarity_threshold:
+            best.tokens = [a if a == b else WILDCARD for a, b in zip(best.tokens, tokens)]
+            return best
+
+        template = LogTemplate(tokens=list(tokens))
+        node.clusters.append(template)
+        self.templates.append(template)
+        return template
+
+
+def _fold_frames(frames: list[str]) -> tuple[list[str], int]:
+    """Collapse runs of a repeating frame group (e.g. deep recursion)."""
+    folded: list[str] = []
+    removed = 0
+    i = 0
+    while i < len(frames):
+        for size in (1, 2):
+            group = frames[i : i + size]
+            repeats = 1
+            while frames[i + repeats * size : i + (repeats + 1) * size] == group:
+                repeats += 1
+            if repeats > 2:
+                folded += group
+                folded.append(f"... previous {size} frame(s) repeated {repeats - 1} more times")
+                removed += (repeats - 1) * size
+                i += repeats * size
+                break
+        else:
+            folded.append(frames[i])
+            i += 1
+    return folded, removed
+
+
+def _stack_lines(text: str, lines: list[str], newlines: list[int]) -> list[list[int]]:
+    """Indices of the frame lines of each stack, in order.
+
+    The indented source line Python prints under each frame joins the stack.
+    """
+    stacks: list[list[int]] = []
+    for match in _FRAME.finditer(text):
+        index = bisect.bisect_left(newlines, match.start())
+        block = [index]
+        if lines[index].lstrip().startswith("File ") and index + 1 < len(lines):
+            following = lines[index + 1]
+            if following.startswith("    ") and not _FRAME.match(following):
+                block.append(index + 1)
+        if stacks and stacks[-1][-1] == index - 1:
+            stacks[-1] += block
+        else:
+            stacks.append(block)
+    return stacks
+
+
+def _error_candidates(text: str, newlines: list[int]) -> set[int]:
+    """Indices of lines containing an error hint, found with whole-text searches."""
+    lowered = text.lower()
+    if len(lowered) != len(text):
+        # Some characters lowercase to several, so offsets shift
+        newlines = [m.start() for m in re.finditer("\n", lowered)]
+    candidates: set[int] = set()
+    for hint in _ERROR_HINTS:
+        pos = lowered.find(hint)
+        while pos != -1:
+            index = bisect.bisect_left(newlines, pos)
+            candidates.add(index)
+            if index == len(newlines):
+                break
+            pos = lowered.find(hint, newlines[index] + 1)
+    return candidates
+
+
+def digest_log(text: str, config: Optional[LogDigestConfig] = None) -> LogDigest:
+    """Mine templates, fold stack traces and collect error lines of a log.
+
+    Identical lines (up to their digits) are counted with whole-text and
+    dictionary operations first, so the miner sees each distinct line once.
+
+    Args:
+        text: Log, build or test output
+        config: Parse tree and digest limits
+
+    Returns:
+        Digest whose ``render()`` replaces the log
+    """
+    config = config or LogDigestConfig()
+    lines = text.split("\n")
+    keys = text.translate(_ZERO_DIGITS).split("\n")
+    # Offset of the newline ending each line
+    newlines = list(map(operator.add, accumulate(map(len, lines)), range(len(lines))))
+    if lines[-1] == "":
+        lines.pop()
+        keys.pop()
+
+    traces: dict[tuple[str, ...], StackTrace] = {}
+    stack_lines: list[int] = []
+    for stack in _stack_lines(text, lines, newlines):
+        stack_lines += stack
+        frames = tuple(lines[i].strip() for i in stack)
+        trace = traces.get(frames)
+        if trace is None:
+            folded, removed = _fold_frames(list(frames))
+            traces[frames] = StackTrace(folded, first_line=stack[0] + 1, folded_frames=removed)
+        else:
+            trace.count += 1
+
+    counts = Counter(keys)
+    first = dict(zip(reversed(keys), range(len(keys) - 1, -1, -1)))
+    last = dict(zip(keys, range(len(keys))))
+    for i in stack_lines:
+        counts[keys[i]] -= 1
+    # Keys also occurring outside stacks need their positions recounted
+    shared = {keys[i] for i in stack_lines if counts[keys[i]] > 0}
+    if shared:
+        in_stack = set(stack_lines)
+        outside = [(i, key) for i, key in enumerate(keys) if key in shared and i not in in_stack]
+        first.update((key, i) for i, key in reversed(outside))
+        last.update((key, i) for i, key in outside)
+
+    candidates = _error_candidates(text, newlines)
+    miner = TemplateMiner(config)
+    errors: dict[str, ErrorLine] = {}
+    for key, count in counts.items():
+        if count <= 0 or not key.strip():
+            continue
+        index = first[key]
+        line = lines[index].strip()
+        if (index in candidates or line.startswith("E ")) and _ERROR.search(line):
+            error_key = _DIGIT_RUN.sub("0", key.strip())
+            error = errors.get(error_key)
+            if error is None:
+                errors[error_key] = ErrorLine(line, count, first_line=index + 1)
+            else:
+                error.count += count
+            continue
+        end = last[key]
+        miner.add(line, index + 1, key, count, (end + 1, lines[end].strip()))
+
+    return LogDigest(
+        lines=len(lines),
+        templates=miner.templates,
+        traces=list(traces.values()),
+        errors=list(errors.values()),
+        first=lines[0].strip() if lines else "",
+        last=lines[-1].strip() if lines else "",
+    )
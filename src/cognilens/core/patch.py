@@ -0,0 +1,204 @@
+"""Splitting unified diffs and ``git format-patch`` text into per-file patches.
+
+Hunks are consumed by the line counts in their ``@@`` headers, so a removed
+line that happens to start with ``---`` is never mistaken for the header of
+the next file. Plain ``diff -u`` output, ``git diff`` output and a series of
+format-patch emails are all accepted; in a series, the sections touching the
+same file are joined, so each file is summarized once.
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass, field
+from pathlib import PurePosixPath
+from typing import Optional
+
+from cognilens.config import PatchConfig
+
+_HUNK = re.compile(r"^@@ -\d+(?:,(\d+))? \+\d+(?:,(\d+))? @@")
+_DIFF_GIT = re.compile(r"^diff --git a/(.+) b/(.+)$")
+
+
+def _header_path(line: str) -> Optional[str]:
+    """Path of a ``---``/``+++`` header line (None for /dev/null)."""
+    path = line[4:].split("\t", 1)[0].strip()
+    if path.startswith('"') and path.endswith('"'):
+        path = path[1:-1]
+    if path == "/dev/null":
+        return None
+    if path.startswith(("a/", "b/")):
+        path = path[2:]
+    return path
+
+
+@dataclass
+class FilePatch:
+    """The diff of one file."""
+
+    path: str
+    old_path: Optional[str] = None  # Previous path of a renamed file
+    status: str = "modified"  # added / deleted / modified / renamed / binary
+    lines: list[str] = field(default_factory=list)
+    additions: int = 0
+    deletions: int = 0
+    hunks: int = 0
+
+    @property
+    def text(self) -> str:
+        return "\n".join(self.lines)
+
+    def excerpt(self, max_chars: int) -> str:
+        """The diff, cut at a line boundary after ``max_chars``."""
+        text = self.text
+        if len(text) <= max_chars:
+            return text
+        cut = text.rfind("\n", 0, max_chars)
+        cut = cut if cut > 0 else max_chars
+        omitted = text.count("\n", cut)
+        return f"{text[:cut]}\n... ({omitted} more lines)"
+
+    def whitespace_only(self) -> bool:
+        """True if the added and removed lines differ only in whitespace.
+
+        The changed lines are compared with all whitespace removed, so
+        re-indented, re-wrapped and joined lines count as whitespace changes.
+        """
+        removed: list[str] = []
+        added: list[str] = []
+        in_hunk = False
+        for line in self.lines:
+            if line.startswith("@@"):
+                in_hunk = True
+            elif in_hunk and line[:1] in ("-", "+"):
+                (removed if line[0] == "-" else added).append(line[1:])
+        return self.hunks > 0 and "".join("".join(removed).split()) == "".join(
+            "".join(added).split()
+        )
+
+    def local_summary(self, config: Optional[PatchConfig] = None) -> Optional[str]:
+        """A summary that needs no LLM, or None if the diff has to be read.
+
+        Lockfiles, whitespace-only changes, binary files, deletions and
+        renames without content changes are described from the headers.
+        """
+        config = config or PatchConfig()
+        counts = f"(+{self.additions} -{self.deletions})"
+        if config.local_lockfiles and PurePosixPath(self.path).name in config.lockfiles:
+            return f"Dependency lockfile updated {counts}"
+        if self.status == "binary":
+            return "Binary file changed"
+        if self.status == "deleted":
+            return f"File deleted ({self.deletions} lines)"
+        if self.hunks == 0:
+            if self.status == "renamed":
+                return f"Renamed from {self.old_path} without content changes"
+            return "Only file metadata changed" if self.status != "added" else "Empty file added"
+        if config.local_whitespace and self.whitespace_only():
+            return f"Whitespace-only changes {counts}"
+        return None
+
+
+@dataclass
+class PatchSet:
+    """The files of a patch, and the commit subjects of a format-patch series."""
+
+    files: list[FilePatch] = field(default_factory=list)
+    subjects: list[str] = field(default_factory=list)
+
+
+def parse_patch(text: str) -> PatchSet:
+    """Split unified diff or ``git format-patch`` text into per-file patches.
+
+    Args:
+        text: Output of ``diff -u``, ``git diff``/``git diff-tree -p`` or
+            ``git format-patch`` (one or several emails)
+
+    Returns:
+        PatchSet with one FilePatch per file, in order of first appearance
+
+    Raises:
+        ValueError: If the text contains no file diffs
+    """
+    files: dict[str, FilePatch] = {}
+    subjects: list[str] = []
+    current: Optional[FilePatch] = None
+    has_old_header = False
+    old_left = new_left = 0
+    lines = text.splitlines()
+
+    def start(path: str) -> FilePatch:
+        nonlocal has_old_header
+        has_old_header = False
+        patch = files.get(path)
+        if patch is None:
+            patch = files[path] = FilePatch(path)
+        return patch
+
+    for i, line in enumerate(lines):
+        if current is not None and (old_left > 0 or new_left > 0):
+            # Inside a hunk
+            current.lines.append(line)
+            tag = line[:1]
+            if tag == "-":
+                old_left -= 1
+                current.deletions += 1
+            elif tag == "+":
+                new_left -= 1
+                current.additions += 1
+            elif tag == "\\":
+                pass
+            else:
+                old_left -= 1
+                new_left -= 1
+            continue
+
+        match = _DIFF_GIT.match(line)
+        if match:
+            current = start(match.group(2))
+            current.lines.append(line)
+            continue
+        if line.startswith("Subject: "):
+            subjects.append(re.sub(r"^\[PATCH[^\]]*\]\s*", "", line[9:]).strip())
+            continue
+
+        if line.startswith("--- ") and i + 1 < len(lines) and lines[i + 1].startswith("+++ "):
+            old_path = _header_path(line)
+            new_path = _header_path(lines[i + 1])
+            if current is None or has_old_header or current.hunks:
+                # A plain unified diff has no "diff --git" line per file
+                current = start(new_path or old_path or "")
+            has_old_header = True
+            if new_path is None:
+                current.status = "deleted"
+            elif old_path is None:
+                current.status = "added"
+            current.lines.append(line)
+            continue
+        if current is None:
+            continue
+
+        hunk = _HUNK.match(line)
+        if hunk:
+            current.hunks += 1
+            current.lines.append(line)
+            old_left = int(hunk.group(1) or 1)
+            new_left = int(hunk.group(2) or 1)
+        elif line.startswith(("new file mode", "deleted file mode")):
+            current.status = "added" if line.startswith("new") else "deleted"
+            current.lines.append(line)
+        elif line.startswith("rename from "):
+            current.old_path = line[12:]
+            current.status = "renamed"
+            current.lines.append(line)
+        elif line.startswith(("Binary files ", "GIT binary patch")):
+            current.status = "binary"
+            current.lines.append(line)
+        elif line.startswith(("+++ ", "index ", "old mode", "new mode", "similarity", "rename to")):
+            current.lines.append(line)
+        # Anything else is a commit message, diffstat or signature between patches
+
+    patches = [patch for patch in files.values() if patch.path]
+    if not patches:
+        raise ValueError("No file diffs found in the patch")
+    return PatchSet(patches, subjects)
@@ -0,0 +1,328 @@
+"""Local, LLM-free evaluation of compression quality.
+
+The score combines:
+
+- Explicit preservation: items the caller asked to keep.
+- Salient-item retention: numbers, identifiers, code symbols and named
+  entities from the source, limited to the most frequent per category.
+- N-gram overlap: ROUGE-1/2 style precision (is the output grounded in the
+  source?) and recall normalized by the length ratio (how much of the source
+  could a text of this length have covered?). Counted with NumPy over token
+  ids when it is installed, with collections.Counter otherwise.
+- Structural checks: balanced code fences and brackets, non-empty output no
+  longer than the source, and no sentence cut off mid-way.
+
+Evaluation is CPU-bound and synchronous; use :func:`assess_quality` from async
+code to run it in a worker thread, or :func:`measure_output` to count the
+output's tokens at the same time.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import difflib
+import re
+from collections import Counter
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Optional
+
+from cognilens.taskgraph import task_group
+
+if TYPE_CHECKING:
+    from cognilens.llm.base import LLMClient
+
+# Most frequent items per category that are checked for retention
+MAX_ITEMS_PER_CATEGORY = 15
+
+_CJK = "぀-ヿ㐀-䶿一-鿿豈-﫿"
+_WORD_PATTERN = re.compile(rf"[{_CJK}]|[^\W{_CJK}]+")
+
+SALIENT_PATTERNS: dict[str, re.Pattern[str]] = {
+    # Multi-digit numbers, decimals, percentages, versions and times
+    "numbers": re.compile(r"(?<![\w.])\d+(?:[.,:]\d+)+%?|(?<![\w.])\d{2,}%?|\d%"),
+    # snake_case, camelCase and dotted names (module.attr, config.yaml)
+    "identifiers": re.compile(
+        r"\b[A-Za-z_][A-Za-z0-9]*(?:_[A-Za-z0-9]+)+\b"
+        r"|\b[a-z]+(?:[A-Z][a-z0-9]+)+\b"
+        r"|\b[A-Za-z_]\w+(?:\.[A-Za-z_]\w+)+\b"
+    ),
+    # Inline code, calls and definitions
+    "code_symbols": re.compile(
+        r"`([^`\n]+)`|\b([A-Za-z_]\w*)\(|\b(?:def|class|function|fn|func)\s+([A-Za-z_]\w*)"
+    ),
+    # Capitalized phrases and katakana words
+    "entities": re.compile(r"\b[A-Z][a-zA-Z0-9]+(?:\s+[A-Z][a-zA-Z0-9]+)*\b|[ァ-ヶー]{3,}"),
+}
+
+WEIGHTS = {
+    "preservation": 0.3,
+    "retention": 0.25,
+    "overlap": 0.25,
+    "structure": 0.2,
+}
+
+# Checks in _structural_checks besides non_empty
+STRUCTURAL_CHECK_COUNT = 5
+
+_SENTENCE_ENDINGS = tuple(".。!！?？:：)）]」』`*|") + ("```",)
+
+
+@dataclass
+class QualityReport:
+    """Quality evaluation of a compressed text."""
+
+    score: float
+    preservation: float = 1.0
+    retention: float = 1.0
+    overlap: float = 1.0
+    structure: float = 1.0
+    rouge1_precision: float = 0.0
+    rouge2_precision: float = 0.0
+    rouge1_recall: float = 0.0
+    rouge2_recall: float = 0.0
+    missing_preserved: list[str] = field(default_factory=list)
+    missing_items: dict[str, list[str]] = field(default_factory=dict)
+    failed_checks: list[str] = field(default_factory=list)
+
+    def to_metadata(self) -> dict[str, Any]:
+        """Summary suitable for CompressionResult.metadata."""
+        metadata: dict[str, Any] = {
+            "preservation": round(self.preservation, 3),
+            "retention": round(self.retention, 3),
+            "overlap": round(self.overlap, 3),
+            "structure": round(self.structure, 3),
+        }
+        if self.missing_preserved:
+            metadata["missing_preserved"] = self.missing_preserved
+        if self.failed_checks:
+            metadata["failed_checks"] = self.failed_checks
+        return metadata
+
+
+def tokenize(text: str) -> list[str]:
+    """Split text into lower-cased words, with CJK characters as single tokens."""
+    return _WORD_PATTERN.findall(text.lower())
+
+
+def extract_salient_items(text: str) -> dict[str, list[str]]:
+    """Find salient items per category, most frequent first.
+
+    Returns:
+        Mapping of category to at most MAX_ITEMS_PER_CATEGORY distinct items
+    """
+    items: dict[str, list[str]] = {}
+    for category, pattern in SALIENT_PATTERNS.items():
+        found: list[str] = []
+        for match in pattern.finditer(text):
+            groups = [g for g in match.groups() if g] if pattern.groups else []
+            value = (groups[0] if groups else match.group(0)).strip()
+            if category == "numbers":
+                value = value.replace(",", "")
+            if value:
+                found.append(value)
+        counts = Counter(found)
+        items[category] = [item for item, _ in counts.most_common(MAX_ITEMS_PER_CATEGORY)]
+    return items
+
+
+def _ngram_overlap(
+    source: list[int], summary: list[int], n: int, vocab_size: int
+) -> tuple[int, int, int]:
+    """Clipped n-gram overlap count and the n-gram totals of both sides."""
+    source_total = max(len(source) - n + 1, 0)
+    summary_total = max(len(summary) - n + 1, 0)
+    if not source_total or not summary_total:
+        return 0, source_total, summary_total
+
+    try:
+        import numpy as np
+    except ImportError:
+        source_grams = Counter(zip(*(source[i:] for i in range(n))))
+        summary_grams = Counter(zip(*(summary[i:] for i in range(n))))
+        overlap = sum((source_grams & summary_grams).values())
+        return overlap, source_total, summary_total
+
+    def encode(ids: list[int]) -> Any:
+        array = np.asarray(ids, dtype=np.int64)
+        codes = array[: len(array) - n + 1].copy()
+        for i in range(1, n):
+            codes = codes * vocab_size + array[i : len(array) - n + 1 + i]
+        return np.unique(codes, return_counts=True)
+
+    source_codes, source_counts = encode(source)
+    summary_codes, summary_counts = encode(summary)
+    _, source_idx, summary_idx = np.intersect1d(
+        source_codes, summary_codes, assume_unique=True, return_indices=True
+    )
+    overlap = int(np.minimum(source_counts[source_idx], summary_counts[summary_idx]).sum())
+    return overlap, source_total, summary_total
+
+
+def _structural_checks(original: str, compressed: str) -> list[str]:
+    """Return the names of failed structural checks."""
+    failed = []
+    stripped = compressed.strip()
+    if not stripped:
+        return ["non_empty"]
+    if len(stripped) > len(original.strip()) and len(original.strip()) > 0:
+        failed.append("shorter_than_source")
+    if compressed.count("```") % 2:
+        failed.append("balanced_code_fences")
+    if "```" in original and "```" not in compressed and "`" not in compressed:
+        failed.append("code_kept")
+    for opening, closing in ("()", "[]", "{}"):
+        if compressed.count(opening) != compressed.count(closing):
+            failed.append("balanced_brackets")
+            break
+    last_line = stripped.splitlines()[-1].lstrip()
+    if not stripped.endswith(_SENTENCE_ENDINGS) and not last_line.startswith(("-", "*", "•", "#")):
+        failed.append("complete_last_sentence")
+    return failed
+
+
+def evaluate_quality(
+    original: str,
+    compressed: str,
+    preserve: Iterable[str] = (),
+) -> QualityReport:
+    """Score a compressed text against its source (0.0-1.0).
+
+    Args:
+        original: Source text
+        compressed: Compressed text
+        preserve: Items the caller asked to keep
+
+    Returns:
+        QualityReport with the overall score and its components
+    """
+    compressed_lower = compressed.lower()
+
+    # Explicit preservation (case-insensitive)
+    preserve = [p for p in preserve if p]
+    missing_preserved = [p for p in preserve if p.lower() not in compressed_lower]
+    preservation = 1 - len(missing_preserved) / len(preserve) if preserve else 1.0
+
+    # Salient item retention (numbers compared without thousands separators)
+    compressed_numbers = compressed.replace(",", "")
+    missing_items: dict[str, list[str]] = {}
+    found = total = 0
+    for category, items in extract_salient_items(original).items():
+        haystack = compressed_numbers if category == "numbers" else compressed
+        missing = [item for item in items if item not in haystack]
+        if missing:
+            missing_items[category] = missing
+        found += len(items) - len(missing)
+        total += len(items)
+    retention = found / total if total else 1.0
+
+    # ROUGE-like n-gram overlap over shared token ids
+    vocab: dict[str, int] = {}
+    source_ids = [vocab.setdefault(t, len(vocab)) for t in tokenize(original)]
+    summary_ids = [vocab.setdefault(t, len(vocab)) for t in tokenize(compressed)]
+    precisions, recalls = [], []
+    length_ratio = min(len(summary_ids) / len(source_ids), 1.0) if source_ids else 1.0
+    for n in (1, 2):
+        overlap, source_total, summary_total = _ngram_overlap(
+            source_ids, summary_ids, n, len(vocab) + 1
+        )
+        precisions.append(overlap / summary_total if summary_total else 0.0)
+        recalls.append(overlap / source_total if source_total else 0.0)
+    # A text of this length can recall at most ~length_ratio of the source
+    normalized_recall = min(sum(recalls) / 2 / length_ratio, 1.0) if length_ratio else 0.0
+    overlap_score = 0.6 * (sum(precisions) / 2) + 0.4 * normalized_recall
+
+    failed_checks = _structural_checks(original, compressed)
+    structure = (
+        0.0 if "non_empty" in failed_checks else 1 - len(failed_checks) / STRUCTURAL_CHECK_COUNT
+    )
+
+    components = {
+        "preservation": preservation,
+        "retention": retention,
+        "overlap": overlap_score,
+        "structure": structure,
+    }
+    weights = dict(WEIGHTS)
+    if not preserve:
+        weights.pop("preservation")
+    score = sum(components[k] * w for k, w in weights.items()) / sum(weights.values())
+
+    return QualityReport(
+        score=round(max(0.0, min(1.0, score)), 3),
+        preservation=preservation,
+        retention=retention,
+        overlap=overlap_score,
+        structure=structure,
+        rouge1_precision=precisions[0],
+        rouge2_precision=precisions[1],
+        rouge1_recall=recalls[0],
+        rouge2_recall=recalls[1],
+        missing_preserved=missing_preserved,
+        missing_items=missing_items,
+        failed_checks=failed_checks,
+    )
+
+
+def changed_text(before: str, after: str) -> str:
+    """Lines added or removed between two texts, for scoring diff summaries."""
+    return "\n".join(
+        line[1:]
+        for line in difflib.unified_diff(before.splitlines(), after.splitlines(), lineterm="", n=0)
+        if line[:1] in "+-" and not line.startswith(("+++", "---"))
+    )
+
+
+async def assess_quality(
+    original: str,
+    compressed: str,
+    preserve: Iterable[str] = (),
+    *,
+    diff_before: Optional[str] = None,
+) -> QualityReport:
+    """Evaluate quality in a worker thread.
+
+    Args:
+        original: Source text (ignored when ``diff_before`` is given)
+        compressed: Compressed text
+        preserve: Items the caller asked to keep
+        diff_before: For diff summaries, the "before" text; ``original`` is
+            then the "after" text and only the changed lines are scored
+
+    Returns:
+        QualityReport
+    """
+
+    def run() -> QualityReport:
+        source = changed_text(diff_before, original) if diff_before is not None else original
+        return evaluate_quality(source, compressed, list(preserve))
+
+    return await asyncio.to_thread(run)
+
+
+async def measure_output(
+    llm: LLMClient,
+    original: str,
+    compressed: str,
+    preserve: Iterable[str] = (),
+    *,
+    diff_before: Optional[str] = None,
+) -> tuple[int, QualityReport]:
+    """Count the output's tokens and assess its quality concurrently.
+
+    Args:
+        llm: Client whose tokenizer counts the output
+        original: Source text
+        compressed: Compressed text
+        preserve: Items the caller asked to keep
+        diff_before: See :func:`assess_quality`
+
+    Returns:
+        Tuple of the output token count and its QualityReport
+    """
+    async with task_group() as group:
+        tokens = group.create_task(llm.count_tokens(compressed))
+        quality = group.create_task(
+            assess_quality(original, compressed, preserve, diff_before=diff_before)
+        )
+    return tokens.result(), quality.result()
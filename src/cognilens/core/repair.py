@@ -0,0 +1,58 @@
+"""Helpers for restoring preserved elements a summary dropped."""
+
+from __future__ import annotations
+
+import re
+
+_BULLET_PATTERN = re.compile(r"^\s*(?:[-*•・]|\d+[.)])\s+")
+_WHITESPACE = re.compile(r"\s")
+
+
+def find_snippets(source: str, items: list[str], snippet_chars: int) -> dict[str, str]:
+    """Find a source excerpt around the first occurrence of each item.
+
+    Args:
+        source: Original text
+        items: Elements to locate (matched case-insensitively)
+        snippet_chars: Approximate excerpt length
+
+    Returns:
+        Mapping of item to excerpt, for items that occur in the source
+    """
+    lowered = source.lower()
+    snippets: dict[str, str] = {}
+    for item in items:
+        index = lowered.find(item.lower())
+        if index < 0:
+            continue
+        margin = max((snippet_chars - len(item)) // 2, 0)
+        start = max(index - margin, 0)
+        end = min(index + len(item) + margin, len(source))
+        # Snap to whitespace so the excerpt does not start or end mid-word
+        if start > 0:
+            head = _WHITESPACE.search(source, start, index)
+            if head:
+                start = head.end()
+        item_end = index + len(item)
+        if end < len(source):
+            tail = max(source.rfind(" ", item_end, end), source.rfind("\n", item_end, end))
+            if tail > item_end:
+                end = tail
+        snippets[item] = source[start:end].strip()
+    return snippets
+
+
+def splice(summary: str, addition: str) -> str:
+    """Append a repair addition to a summary, matching bullet formatting."""
+    addition = addition.strip()
+    if not addition:
+        return summary
+    lines = [line for line in summary.splitlines() if line.strip()]
+    if lines and sum(bool(_BULLET_PATTERN.match(line)) for line in lines) * 2 > len(lines):
+        addition = "\n".join(
+            line if _BULLET_PATTERN.match(line) else f"- {line.strip()}"
+            for line in addition.splitlines()
+            if line.strip()
+        )
+        return f"{summary.rstrip()}\n{addition}"
+    return f"{summary.rstrip()}\n\n{addition}"
@@ -0,0 +1,350 @@
+"""Local digests of JSON and YAML by schema inference.
+
+A document is walked once while a schema is accumulated: the types seen at
+each path, how often object fields are present, numeric ranges, lengths and
+enum-like value sets. JSON is streamed: objects and arrays near the root are
+scanned member by member and each array element is decoded on its own and
+dropped, so a multi-megabyte array of records never becomes one object tree.
+JSON Lines are read as a stream of records; YAML is loaded one document at a
+time.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+import yaml
+
+from cognilens.config import StructuredDigestConfig
+
+_DECODER = json.JSONDecoder()
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+
+
+def _type_name(value: Any) -> str:
+    if value is None:
+        return "null"
+    if isinstance(value, bool):
+        return "bool"
+    if isinstance(value, int):
+        return "int"
+    if isinstance(value, float):
+        return "float"
+    if isinstance(value, str):
+        return "str"
+    if isinstance(value, dict):
+        return "object"
+    if isinstance(value, list):
+        return "array"
+    # YAML dates and timestamps
+    return type(value).__name__
+
+
+@dataclass
+class SchemaNode:
+    """Types and statistics of the values seen at one path."""
+
+    seen: int = 0
+    types: Counter[str] = field(default_factory=Counter)
+    fields: dict[str, SchemaNode] = field(default_factory=dict)
+    items: Optional[SchemaNode] = None
+    minimum: Optional[float] = None
+    maximum: Optional[float] = None
+    total: float = 0.0
+    min_length: Optional[int] = None
+    max_length: Optional[int] = None
+    # Distinct scalar values, until there are too many to be enum-like
+    values: Optional[Counter[Any]] = field(default_factory=Counter)
+
+    def enter(self, kind: str, length: Optional[int] = None) -> None:
+        """Count one value of ``kind``, optionally with its length."""
+        self.seen += 1
+        self.types[kind] += 1
+        if length is not None:
+            self.min_length = length if self.min_length is None else min(self.min_length, length)
+            self.max_length = length if self.max_length is None else max(self.max_length, length)
+
+    def child(self, key: str) -> SchemaNode:
+        node = self.fields.get(key)
+        if node is None:
+            node = self.fields[key] = SchemaNode()
+        return node
+
+    def element(self) -> SchemaNode:
+        if self.items is None:
+            self.items = SchemaNode()
+        return self.items
+
+    def observe(self, value: Any, max_enum_values: int) -> None:
+        """Add a decoded value (and everything nested in it) to the schema."""
+        if isinstance(value, dict):
+            self.enter("object")
+            for key, item in value.items():
+                self.child(str(key)).observe(item, max_enum_values)
+        elif isinstance(value, list):
+            self.enter("array", len(value))
+            if value:
+                element = self.element()
+                for item in value:
+                    element.observe(item, max_enum_values)
+        else:
+            kind = _type_name(value)
+            self.enter(kind, len(value) if isinstance(value, str) else None)
+            if kind in ("int", "float"):
+                self.minimum = value if self.minimum is None else min(self.minimum, value)
+                self.maximum = value if self.maximum is None else max(self.maximum, value)
+                self.total += value
+            if self.values is not None:
+                self.values[value if kind != "float" else float(value)] += 1
+                if len(self.values) > max_enum_values:
+                    self.values = None
+
+
+@dataclass
+class StructuredDigest:
+    """Schema, statistics and samples of a JSON or YAML document."""
+
+    format: str
+    documents: int
+    chars: int
+    schema: SchemaNode
+    samples: dict[str, list[str]] = field(default_factory=dict)
+
+    def render(self, config: Optional[StructuredDigestConfig] = None) -> str:
+        """Format the digest as text: schema with statistics, then samples."""
+        config = config or StructuredDigestConfig()
+        documents = f", {self.documents} documents" if self.documents > 1 else ""
+        out = [f"Structured digest: {self.format}, {self.chars} chars{documents}", "", "Schema:"]
+        _render_node(out, "$", self.schema, self.schema.seen, 0, config)
+        if any(self.samples.values()):
+            out += ["", "Samples:"]
+            for path, samples in self.samples.items():
+                out += [f"  {path}: {sample}" for sample in samples]
+        return "\n".join(out)
+
+
+def _describe(node: SchemaNode, config: StructuredDigestConfig) -> str:
+    kinds = "|".join(kind for kind, _ in node.types.most_common())
+    parts = [kinds]
+    scalars = sum(n for kind, n in node.types.items() if kind not in ("object", "array"))
+    if node.values is not None and scalars and (len(node.values) < scalars or scalars == 1):
+        if len(node.values) == 1:
+            parts.append(f"always {json.dumps(next(iter(node.values)), default=str)}")
+        else:
+            values = ", ".join(
+                f"{json.dumps(value, ensure_ascii=False, default=str)}: {count}"
+                for value, count in node.values.most_common(config.max_enum_values)
+            )
+            parts.append(f"enum {{{values}}}")
+    elif node.minimum is not None:
+        numbers = node.types["int"] + node.types["float"]
+        parts.append(f"range {node.minimum}..{node.maximum}, mean {node.total / numbers:.6g}")
+    if node.min_length is not None:
+        label = "items" if "array" in node.types else "chars"
+        parts.append(f"{label} {node.min_length}..{node.max_length}")
+    if node.types["null"] and len(node.types) > 1:
+        parts.append(f"null {node.types['null'] / node.seen:.0%}")
+    return ", ".join(parts)
+
+
+def _render_node(
+    out: list[str],
+    name: str,
+    node: SchemaNode,
+    parent_seen: int,
+    depth: int,
+    config: StructuredDigestConfig,
+) -> None:
+    indent = "  " * (depth + 1)
+    optional = ""
+    if parent_seen and node.seen < parent_seen:
+        optional = f"? ({node.seen / parent_seen:.0%})"
+    out.append(f"{indent}{name}{optional}: {_describe(node, config)}")
+
+    children: list[tuple[str, SchemaNode, int]] = []
+    if node.fields:
+        objects = node.types["object"]
+        children += [(f".{key}", child, objects) for key, child in node.fields.items()]
+    if node.items is not None:
+        children.append(("[]", node.items, node.items.seen))
+    if not children:
+        return
+    if depth + 1 >= config.max_depth:
+        out.append(f"{indent}  ... {len(children)} nested fields")
+        return
+    for child_name, child, seen in children[: config.max_fields]:
+        _render_node(out, child_name, child, seen, depth + 1, config)
+    if len(children) > config.max_fields:
+        out.append(f"{indent}  ... {len(children) - config.max_fields} more fields")
+
+
+class _Builder:
+    """Accumulates the schema and representative samples of one document stream."""
+
+    def __init__(self, config: StructuredDigestConfig) -> None:
+        self.config = config
+        self.schema = SchemaNode()
+        self.samples: dict[str, list[str]] = {}
+        self._sample_shapes: dict[str, set[frozenset[str]]] = {}
+
+    def element(self, path: str, node: SchemaNode, value: Any) -> None:
+        """Add one element of a streamed array, keeping it if it has a new shape."""
+        node.observe(value, self.config.max_enum_values)
+        # Scalars are described by the schema already
+        if not isinstance(value, (dict, list)):
+            return
+        samples = self.samples.setdefault(path, [])
+        if len(samples) >= self.config.max_samples:
+            return
+        shape = frozenset(value) if isinstance(value, dict) else frozenset()
+        shapes = self._sample_shapes.setdefault(path, set())
+        if shape in shapes:
+            return
+        shapes.add(shape)
+        sample = json.dumps(value, ensure_ascii=False, default=str)
+        if len(sample) > self.config.sample_chars:
+            sample = sample[: self.config.sample_chars] + "..."
+        samples.append(sample)
+
+    def walk(self, value: Any, node: SchemaNode, path: str, depth: int) -> None:
+        """Add an already decoded value, streaming its arrays like the JSON reader."""
+        if depth >= self.config.stream_depth or not isinstance(value, (dict, list)):
+            node.observe(value, self.config.max_enum_values)
+        elif isinstance(value, dict):
+            node.enter("object")
+            for key, item in value.items():
+                self.walk(item, node.child(str(key)), f"{path}.{key}", depth + 1)
+        else:
+            node.enter("array", len(value))
+            for item in value:
+                self.element(f"{path}[]", node.element(), item)
+
+
+class _JSONStream:
+    """Scans JSON text, decoding array elements and deep values one at a time."""
+
+    def __init__(self, text: str, builder: _Builder) -> None:
+        self.text = text
+        self.builder = builder
+
+    def _skip(self, pos: int) -> int:
+        match = _WHITESPACE.match(self.text, pos)
+        return match.end() if match else pos
+
+    def _expect(self, pos: int, char: str) -> int:
+        pos = self._skip(pos)
+        if self.text[pos : pos + 1] != char:
+            raise json.JSONDecodeError(f"Expecting {char!r}", self.text, pos)
+        return pos + 1
+
+    def value(self, pos: int, node: SchemaNode, path: str, depth: int) -> int:
+        """Read the value at ``pos`` into ``node``; returns the position after it."""
+        pos = self._skip(pos)
+        char = self.text[pos : pos + 1]
+        if depth < self.builder.config.stream_depth and char == "{":
+            return self._object(pos + 1, node, path, depth)
+        if depth < self.builder.config.stream_depth and char == "[":
+            return self._array(pos + 1, node, path)
+        value, end = _DECODER.raw_decode(self.text, pos)
+        node.observe(value, self.builder.config.max_enum_values)
+        return end
+
+    def _object(self, pos: int, node: SchemaNode, path: str, depth: int) -> int:
+        node.enter("object")
+        pos = self._skip(pos)
+        if self.text[pos : pos + 1] == "}":
+            return pos + 1
+        while True:
+            key, pos = _DECODER.raw_decode(self.text, self._skip(pos))
+            if not isinstance(key, str):
+                raise json.JSONDecodeError("Expecting property name", self.text, pos)
+            pos = self._expect(pos, ":")
+            pos = self.value(pos, node.child(key), f"{path}.{key}", depth + 1)
+            pos = self._skip(pos)
+            if self.text[pos : pos + 1] == "}":
+                return pos + 1
+            pos = self._expect(pos, ",")
+
+    def _array(self, pos: int, node: SchemaNode, path: str) -> int:
+        start = self._skip(pos)
+        length = 0
+        pos = start
+        if self.text[pos : pos + 1] != "]":
+            element = node.element()
+            while True:
+                value, pos = _DECODER.raw_decode(self.text, self._skip(pos))
+                self.builder.element(f"{path}[]", element, value)
+                length += 1
+                pos = self._skip(pos)
+                if self.text[pos : pos + 1] == "]":
+                    break
+                pos = self._expect(pos, ",")
+        node.enter("array", length)
+        return pos + 1
+
+
+def _digest_json(text: str, config: StructuredDigestConfig) -> StructuredDigest:
+    builder = _Builder(config)
+    stream = _JSONStream(text, builder)
+    pos = stream.value(0, builder.schema, "$", 0)
+    pos = stream._skip(pos)
+    if pos >= len(text):
+        return StructuredDigest("JSON", 1, len(text), builder.schema, builder.samples)
+
+    # JSON Lines: every line is a record of one implicit array
+    records = _Builder(config)
+    root = records.schema
+    root.enter("array")
+    records.element("$[]", root.element(), _DECODER.raw_decode(text, stream._skip(0))[0])
+    count = 1
+    while pos < len(text):
+        value, pos = _DECODER.raw_decode(text, pos)
+        records.element("$[]", root.element(), value)
+        count += 1
+        pos = stream._skip(pos)
+    root.min_length = root.max_length = count
+    return StructuredDigest("JSON Lines", count, len(text), root, records.samples)
+
+
+def _digest_yaml(text: str, config: StructuredDigestConfig) -> StructuredDigest:
+    builder = _Builder(config)
+    documents = 0
+    for document in yaml.safe_load_all(text):
+        builder.walk(document, builder.schema, "$", 0)
+        documents += 1
+    # Plain prose is valid YAML too: a single string
+    if not builder.schema.types["object"] and not builder.schema.types["array"]:
+        raise ValueError("Text is neither JSON nor a YAML mapping or sequence")
+    return StructuredDigest("YAML", documents, len(text), builder.schema, builder.samples)
+
+
+def digest_structured(
+    text: str, config: Optional[StructuredDigestConfig] = None
+) -> StructuredDigest:
+    """Infer the schema of a JSON, JSON Lines or YAML document.
+
+    Args:
+        text: Document text
+        config: Streaming, enum and rendering limits
+
+    Returns:
+        Digest whose ``render()`` replaces the document
+
+    Raises:
+        ValueError: If the text is not JSON, JSON Lines or YAML structured data
+    """
+    config = config or StructuredDigestConfig()
+    if text.lstrip()[:1] in ("{", "["):
+        try:
+            return _digest_json(text, config)
+        except json.JSONDecodeError:
+            # Flow-style YAML also starts with a bracket
+            pass
+    try:
+        return _digest_yaml(text, config)
+    except yaml.YAMLError as e:
+        raise ValueError(f"Text is neither JSON nor YAML: {e}") from e
@@ -0,0 +1,181 @@
+"""Hierarchical summary trees for multi-resolution views of large documents.
+
+A document is chunked once at content-defined boundaries and summarized
+bottom-up: chunk summaries (level 0), summaries of groups of those (level 1),
+and so on up to a single document summary. Any target length or sub-section
+can then be answered by picking nodes from the tree.
+"""
+
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+from cognilens.config import SummaryTreeConfig, get_settings
+
+from .chunk_cache import ChunkSummaryCache
+
+# (document hash, model)
+TreeKey = tuple[str, str]
+
+
+@dataclass
+class SummaryNode:
+    """One node of a summary tree, covering ``text[start:end]`` of the document."""
+
+    id: str
+    level: int
+    start: int
+    end: int
+    summary: str
+    tokens: int
+    source_tokens: int
+    children: list[str] = field(default_factory=list)
+
+    def to_outline(self, preview_chars: int = 120) -> dict[str, Any]:
+        """Describe the node without its full summary."""
+        return {
+            "id": self.id,
+            "level": self.level,
+            "start": self.start,
+            "end": self.end,
+            "tokens": self.tokens,
+            "source_tokens": self.source_tokens,
+            "children": self.children,
+            "preview": self.summary[:preview_chars],
+        }
+
+
+@dataclass
+class SummaryTree:
+    """Summary nodes of a document, by level from chunks (0) to the root."""
+
+    document_hash: str
+    levels: list[list[SummaryNode]]
+    _index: dict[str, SummaryNode] = field(default_factory=dict, repr=False)
+
+    def __post_init__(self) -> None:
+        self._index = {node.id: node for level in self.levels for node in level}
+
+    @property
+    def root(self) -> SummaryNode:
+        return self.levels[-1][0]
+
+    def node(self, node_id: str) -> SummaryNode:
+        """Look up a node by ID; raises KeyError for unknown IDs."""
+        try:
+            return self._index[node_id]
+        except KeyError:
+            raise KeyError(f"Unknown summary tree node: {node_id}") from None
+
+    def children(self, node: SummaryNode) -> list[SummaryNode]:
+        return [self._index[child] for child in node.children]
+
+    def descendants_at(self, node: SummaryNode, level: int) -> list[SummaryNode]:
+        """Nodes at ``level`` covering the same span as ``node``."""
+        if not 0 <= level <= node.level:
+            raise ValueError(f"Level must be between 0 and {node.level} for node {node.id}")
+        return [n for n in self.levels[level] if node.start <= n.start and n.end <= node.end]
+
+
+def node_id(level: int, index: int) -> str:
+    """Positional ID of a node, e.g. ``L1.3`` for the fourth node of level 1."""
+    return f"L{level}.{index}"
+
+
+def select_nodes(
+    tree: SummaryTree,
+    max_tokens: int,
+    scope: Optional[SummaryNode] = None,
+    level: Optional[int] = None,
+) -> list[SummaryNode]:
+    """Choose the most detailed set of nodes covering ``scope`` within ``max_tokens``.
+
+    Starting from the scope node, whole levels are expanded while their
+    summaries fit; then individual nodes are expanded, largest source span
+    first, while the total still fits. If even the scope's own summary is too
+    long, it is returned alone and needs a reduce.
+
+    Args:
+        tree: Summary tree of the document
+        max_tokens: Token budget for the combined summaries
+        scope: Node whose span to cover (default: the whole document)
+        level: Return exactly the nodes of this level instead
+
+    Returns:
+        Nodes in document order
+    """
+    scope = scope or tree.root
+    if level is not None:
+        return tree.descendants_at(scope, level)
+
+    frontier = [scope]
+    while True:
+        expanded = [child for node in frontier for child in tree.children(node) or [node]]
+        if expanded == frontier:
+            return frontier
+        if sum(node.tokens for node in expanded) <= max_tokens:
+            frontier = expanded
+            continue
+        break
+
+    total = sum(node.tokens for node in frontier)
+    for node in sorted(frontier, key=lambda n: n.source_tokens, reverse=True):
+        children = tree.children(node)
+        extra = sum(child.tokens for child in children) - node.tokens
+        if children and total + extra <= max_tokens:
+            i = frontier.index(node)
+            frontier[i : i + 1] = children
+            total += extra
+    return frontier
+
+
+class SummaryTreeStore:
+    """LRU store of built trees, and of node summaries by content hash."""
+
+    def __init__(self, max_trees: int = 64, max_node_summaries: int = 16384) -> None:
+        self.max_trees = max_trees
+        self.nodes = ChunkSummaryCache(max_node_summaries)
+        self._trees: OrderedDict[TreeKey, SummaryTree] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: TreeKey) -> Optional[SummaryTree]:
+        with self._lock:
+            tree = self._trees.get(key)
+            if tree is not None:
+                self._trees.move_to_end(key)
+            return tree
+
+    def put(self, key: TreeKey, tree: SummaryTree) -> None:
+        with self._lock:
+            self._trees[key] = tree
+            self._trees.move_to_end(key)
+            while len(self._trees) > self.max_trees:
+                self._trees.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._trees)
+
+
+# Global store instance
+_store: Optional[SummaryTreeStore] = None
+_store_config: Optional[SummaryTreeConfig] = None
+
+
+def get_summary_tree_store() -> SummaryTreeStore:
+    """Get the shared summary tree store."""
+    global _store, _store_config
+    config = get_settings().summarization.tree
+    if _store is None or _store_config is not config:
+        _store = SummaryTreeStore(config.max_trees, config.max_node_summaries)
+        _store_config = config
+    return _store
+
+
+def reset_summary_tree_store() -> None:
+    """Reset the shared store (useful for testing)."""
+    global _store, _store_config
+    _store = None
+    _store_config = None
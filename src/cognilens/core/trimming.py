@@ -0,0 +1,118 @@
+"""Local enforcement of output token budgets."""
+
+from __future__ import annotations
+
+import re
+from collections.abc import Sequence
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:
+    from cognilens.llm.base import LLMClient
+
+_FENCE = "```"
+_BULLET_PATTERN = re.compile(r"^\s*(?:[-*•・]|\d+[.)])\s+")
+# Split after sentence-ending punctuation (the split is zero-width)
+_SENTENCE_SPLIT = re.compile(r"(?<=[。！？!?])|(?<=\.)(?=\s)")
+
+
+@dataclass
+class TrimResult:
+    """Outcome of fitting a text to a token budget."""
+
+    text: str
+    tokens: int
+    original_tokens: int
+
+    @property
+    def trimmed(self) -> bool:
+        return self.tokens < self.original_tokens
+
+    @property
+    def trimmed_tokens(self) -> int:
+        return self.original_tokens - self.tokens
+
+
+def split_units(text: str) -> list[str]:
+    """Split text into units that may be dropped from the end.
+
+    Code-block lines and bullet items are one unit each; other lines are
+    split into sentences. The units concatenate back to ``text``.
+    """
+    units: list[str] = []
+    in_code = False
+    for line in text.splitlines(keepends=True):
+        is_fence = line.lstrip().startswith(_FENCE)
+        if in_code or is_fence or _BULLET_PATTERN.match(line):
+            units.append(line)
+        else:
+            units.extend(piece for piece in _SENTENCE_SPLIT.split(line) if piece)
+        if is_fence:
+            in_code = not in_code
+    return units
+
+
+def _render(units: list[str]) -> str:
+    text = "".join(units).rstrip()
+    if text.count(_FENCE) % 2:
+        # Close a code block cut short
+        text += "\n" + _FENCE
+    return text
+
+
+async def trim_to_tokens(
+    text: str,
+    max_tokens: int,
+    llm: LLMClient,
+    tokens: Optional[int] = None,
+    preserve: Sequence[str] = (),
+) -> TrimResult:
+    """Trim text to at most ``max_tokens`` tokens at a natural boundary.
+
+    Whole sentences, bullet items or code lines are dropped from the end
+    (closing an open code block), using the client's tokenizer to find the
+    longest prefix that fits. Units mentioning a ``preserve`` item are kept
+    while other units are dropped around them. Only if not even the first
+    unit (or the preserved units alone) fits is the text cut mid-sentence.
+
+    Args:
+        text: Generated text
+        max_tokens: Token budget
+        llm: Client whose tokenizer measures the text
+        tokens: Token count of ``text``, if already known
+        preserve: Items whose units are dropped last (matched case-insensitively)
+
+    Returns:
+        TrimResult with the fitted text and token counts
+    """
+    original_tokens = tokens if tokens is not None else await llm.count_tokens(text)
+    if original_tokens <= max_tokens:
+        return TrimResult(text, original_tokens, original_tokens)
+
+    units = split_units(text)
+    items = [item.lower() for item in preserve if item]
+    protected = [any(item in unit.lower() for item in items) for unit in units]
+    droppable = [i for i, kept in enumerate(protected) if not kept]
+
+    def keep(count: int) -> list[str]:
+        """The protected units plus the first ``count`` droppable ones."""
+        cut = droppable[count] if count < len(droppable) else len(units)
+        return [unit for i, unit in enumerate(units) if protected[i] or i < cut]
+
+    # Binary search for the most droppable units that fit
+    low, high = (0 if any(protected) else 1), len(droppable) - 1
+    best, best_tokens = "", 0
+    while low <= high:
+        middle = (low + high) // 2
+        candidate = _render(keep(middle))
+        tokens = await llm.count_tokens(candidate)
+        if tokens <= max_tokens:
+            best, best_tokens = candidate, tokens
+            low = middle + 1
+        else:
+            high = middle - 1
+
+    if not best:
+        best = (await llm.truncate_to_tokens(text, max_tokens)).rstrip()
+        best_tokens = await llm.count_tokens(best)
+    return TrimResult(best, best_tokens, original_tokens)
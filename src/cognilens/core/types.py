@@ -15,6 +15,8 @@ class CompressionStyle(str, Enum):
     BULLET = "bullet"
     CODE_AWARE = "code_aware"
     DIFF = "diff"
+    LOG = "log"
+    STRUCTURED = "structured"
 
 
 @dataclass
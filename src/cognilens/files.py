@@ -0,0 +1,259 @@
+"""Reading tool input from local files under allowed roots.
+
+Each file is read whole, within per-file and per-pattern size limits.
+Decoded contents are cached by (path, mtime, size): an unchanged file is not
+read again, and a modified one is.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import glob
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional
+
+from cognilens.config import FilesConfig, get_settings
+
+GLOB_CHARS = frozenset("*?[")
+
+# Bytes inspected to tell binary files from text
+BINARY_SNIFF_BYTES = 8192
+
+
+@dataclass
+class LoadedFiles:
+    """Text read from one or more files."""
+
+    text: str
+    paths: list[str] = field(default_factory=list)
+    total_bytes: int = 0
+    skipped: list[str] = field(default_factory=list)
+
+
+def _allowed_roots(config: FilesConfig) -> list[Path]:
+    if not config.allowed_roots:
+        raise PermissionError("Reading files is disabled; set files.allowed_roots to enable it")
+    return [Path(root).expanduser().resolve() for root in config.allowed_roots]
+
+
+def resolve_paths(pattern: str, config: FilesConfig) -> list[Path]:
+    """Expand a path or glob into files under the allowed roots.
+
+    Relative patterns are resolved against each allowed root. Symlinks are
+    resolved before the root check, so they cannot escape the roots.
+
+    Args:
+        pattern: File path or glob (``**`` matches recursively)
+        config: File input settings
+
+    Returns:
+        Sorted, de-duplicated list of files
+
+    Raises:
+        PermissionError: If file input is disabled or a path is outside the roots
+        FileNotFoundError: If nothing matches
+        ValueError: If the matches exceed the file count or total size limit
+    """
+    roots = _allowed_roots(config)
+    expanded = Path(pattern).expanduser()
+    candidates = [expanded] if expanded.is_absolute() else [root / expanded for root in roots]
+
+    matches: list[Path] = []
+    for candidate in candidates:
+        if GLOB_CHARS & set(str(candidate)):
+            matches.extend(Path(p) for p in glob.glob(str(candidate), recursive=True))
+        elif candidate.exists():
+            matches.append(candidate)
+
+    files: dict[Path, None] = {}
+    for match in matches:
+        resolved = match.resolve()
+        if not any(resolved.is_relative_to(root) for root in roots):
+            raise PermissionError(f"Path is outside the allowed roots: {match}")
+        if resolved.is_file():
+            files[resolved] = None
+
+    if not files:
+        raise FileNotFoundError(f"No files match: {pattern}")
+    if len(files) > config.max_files:
+        raise ValueError(f"{pattern} matches {len(files)} files (limit: {config.max_files})")
+    total_bytes = sum(path.stat().st_size for path in files)
+    if total_bytes > config.max_total_bytes:
+        raise ValueError(f"{pattern} matches {total_bytes} bytes (limit: {config.max_total_bytes})")
+    return sorted(files)
+
+
+def _is_binary(path: Path) -> bool:
+    with open(path, "rb") as f:
+        return b"\0" in f.read(BINARY_SNIFF_BYTES)
+
+
+class FileCache:
+    """LRU cache of decoded file contents, bounded by total characters."""
+
+    def __init__(self, max_chars: int) -> None:
+        self.max_chars = max_chars
+        self._entries: OrderedDict[tuple[str, int, int], str] = OrderedDict()
+        self._chars = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple[str, int, int]) -> Optional[str]:
+        with self._lock:
+            text = self._entries.get(key)
+            if text is not None:
+                self._entries.move_to_end(key)
+            return text
+
+    def put(self, key: tuple[str, int, int], text: str) -> None:
+        if len(text) > self.max_chars:
+            return
+        with self._lock:
+            # Drop stale versions of the same file
+            for stale in [k for k in self._entries if k[0] == key[0]]:
+                self._chars -= len(self._entries.pop(stale))
+            self._entries[key] = text
+            self._chars += len(text)
+            while self._chars > self.max_chars:
+                _, evicted = self._entries.popitem(last=False)
+                self._chars -= len(evicted)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._chars = 0
+
+
+_cache: Optional[FileCache] = None
+
+
+def _get_cache(config: FilesConfig) -> FileCache:
+    global _cache
+    if _cache is None or _cache.max_chars != config.cache_max_bytes:
+        _cache = FileCache(config.cache_max_bytes)
+    return _cache
+
+
+def read_file(path: Path, config: FilesConfig) -> str:
+    """Read and decode a file, using the (path, mtime, size) cache."""
+    stat = path.stat()
+    if stat.st_size > config.max_file_bytes:
+        raise ValueError(f"{path} is {stat.st_size} bytes (limit: {config.max_file_bytes})")
+    key = (str(path), stat.st_mtime_ns, stat.st_size)
+    cache = _get_cache(config)
+    text = cache.get(key)
+    if text is None:
+        text = path.read_bytes().decode("utf-8-sig", errors="replace")
+        cache.put(key, text)
+    return text
+
+
+def load_files(pattern: str, config: Optional[FilesConfig] = None) -> LoadedFiles:
+    """Read every text file matching a path or glob.
+
+    Binary files are skipped. With several files, each is preceded by a
+    ``--- path ---`` header line.
+
+    Args:
+        pattern: File path or glob under the allowed roots
+        config: File input settings (defaults to the global settings)
+
+    Returns:
+        LoadedFiles with the combined text
+    """
+    config = config or get_settings().files
+    paths = resolve_paths(pattern, config)
+
+    texts: list[str] = []
+    loaded = LoadedFiles(text="")
+    for path in paths:
+        if _is_binary(path):
+            loaded.skipped.append(str(path))
+            continue
+        text = read_file(path, config)
+        texts.append(f"--- {path} ---\n{text}" if len(paths) > 1 else text)
+        loaded.paths.append(str(path))
+        loaded.total_bytes += path.stat().st_size
+
+    if not loaded.paths:
+        raise ValueError(f"No text files match: {pattern}")
+    loaded.text = "\n\n".join(texts)
+    return loaded
+
+
+async def load_files_async(pattern: str, config: Optional[FilesConfig] = None) -> LoadedFiles:
+    """Read files in a worker thread; see :func:`load_files`."""
+    return await asyncio.to_thread(load_files, pattern, config)
+
+
+def resolve_directory(path: str, config: FilesConfig) -> Path:
+    """Resolve a directory under the allowed roots (relative paths against each root).
+
+    Raises:
+        PermissionError: If file input is disabled or the directory is outside the roots
+        FileNotFoundError: If the directory does not exist
+    """
+    roots = _allowed_roots(config)
+    expanded = Path(path).expanduser()
+    candidates = [expanded] if expanded.is_absolute() else [root / expanded for root in roots]
+    for candidate in candidates:
+        if candidate.is_dir():
+            resolved = candidate.resolve()
+            if not any(resolved.is_relative_to(root) for root in roots):
+                raise PermissionError(f"Path is outside the allowed roots: {path}")
+            return resolved
+    raise FileNotFoundError(f"No directory: {path}")
+
+
+async def read_git_diff(
+    repo: str,
+    base: str,
+    head: str = "HEAD",
+    config: Optional[FilesConfig] = None,
+) -> str:
+    """Read the patch between two refs of a local repository with ``git diff-tree``.
+
+    Args:
+        repo: Repository directory under the allowed roots
+        base: Ref the change starts from
+        head: Ref the change ends at
+        config: File input settings (defaults to the global settings)
+
+    Returns:
+        Unified diff text with rename detection
+
+    Raises:
+        PermissionError: If the repository is outside the allowed roots
+        ValueError: If a ref is invalid, git fails, or the patch is too large
+    """
+    config = config or get_settings().files
+    root = resolve_directory(repo, config)
+    for ref in (base, head):
+        if not ref or ref.startswith("-"):
+            raise ValueError(f"Invalid git ref: {ref!r}")
+
+    command = ["git", "-C", str(root), "diff-tree", "-r", "-p", "-M", "--no-color"]
+    command += ["--no-ext-diff", "--no-textconv", "--end-of-options", base, head]
+    process = await asyncio.create_subprocess_exec(
+        *command, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+    )
+    try:
+        async with asyncio.timeout(config.git_timeout_seconds):
+            stdout, stderr = await process.communicate()
+    except TimeoutError:
+        process.kill()
+        await process.wait()
+        raise
+    if process.returncode != 0:
+        raise ValueError(f"git diff-tree failed: {stderr.decode(errors='replace').strip()}")
+    if len(stdout) > config.max_file_bytes:
+        raise ValueError(f"Patch is {len(stdout)} bytes (limit: {config.max_file_bytes})")
+    return stdout.decode("utf-8", errors="replace")
+
+
+def clear_file_cache() -> None:
+    """Drop all cached file contents (useful for testing)."""
+    if _cache is not None:
+        _cache.clear()
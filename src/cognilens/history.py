@@ -0,0 +1,381 @@
+"""Persistent compression history for analytics and tuning.
+
+Each compression call can be recorded to a SQLite database (WAL mode). Writes
+are queued and committed in batches by a background thread, off the request
+path. Content is stored only as a hash unless ``store_content`` is enabled.
+"""
+
+from __future__ import annotations
+
+import atexit
+import hashlib
+import logging
+import queue
+import sqlite3
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Optional
+
+from cognilens.config import HistoryConfig, get_settings
+from cognilens.llm.base import LLMClientWrapper, LLMResponse
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS compression_history (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    created_at REAL NOT NULL,
+    tool TEXT NOT NULL,
+    style TEXT,
+    model TEXT,
+    selection_method TEXT,
+    input_tokens INTEGER,
+    output_tokens INTEGER,
+    target_tokens INTEGER,
+    total_ms REAL,
+    selection_ms REAL,
+    generate_ms REAL,
+    count_ms REAL,
+    quality_score REAL,
+    content_hash TEXT,
+    content TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_history_model_style ON compression_history (model, style);
+CREATE INDEX IF NOT EXISTS idx_history_created_at ON compression_history (created_at);
+"""
+
+_COLUMNS = (
+    "created_at",
+    "tool",
+    "style",
+    "model",
+    "selection_method",
+    "input_tokens",
+    "output_tokens",
+    "target_tokens",
+    "total_ms",
+    "selection_ms",
+    "generate_ms",
+    "count_ms",
+    "quality_score",
+    "content_hash",
+    "content",
+)
+
+# Columns that queries may group by
+GROUP_COLUMNS = frozenset({"tool", "style", "model", "selection_method"})
+
+
+def content_hash(text: str) -> str:
+    """Stable hash identifying an input without storing it."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+# Per-call latency breakdown in milliseconds, keyed by phase. Tasks spawned
+# during a call share the same dict, so concurrent phases are summed.
+_current_timings: ContextVar[Optional[dict[str, float]]] = ContextVar(
+    "cognilens_history_timings", default=None
+)
+
+
+@contextmanager
+def collect_timings() -> Iterator[dict[str, float]]:
+    """Collect phase timings for the duration of a call."""
+    timings: dict[str, float] = {}
+    token = _current_timings.set(timings)
+    try:
+        yield timings
+    finally:
+        _current_timings.reset(token)
+
+
+@contextmanager
+def timed(phase: str) -> Iterator[None]:
+    """Add the elapsed time of the block to the current call's ``phase``."""
+    timings = _current_timings.get()
+    if timings is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[phase] = timings.get(phase, 0.0) + (time.perf_counter() - started) * 1000
+
+
+class TimedLLMClient(LLMClientWrapper):
+    """Client wrapper attributing generation and counting time to the current call."""
+
+    async def generate(
+        self,
+        prompt: str,
+        *,
+        system_prompt: Optional[str] = None,
+        max_tokens: Optional[int] = None,
+        temperature: float = 0.7,
+        model: Optional[str] = None,
+    ) -> LLMResponse:
+        with timed("generate"):
+            return await self.inner.generate(
+                prompt,
+                system_prompt=system_prompt,
+                max_tokens=max_tokens,
+                temperature=temperature,
+                model=model,
+            )
+
+    async def count_tokens(self, text: str) -> int:
+        with timed("count"):
+            return await self.inner.count_tokens(text)
+
+
+@dataclass
+class HistoryRecord:
+    """A single recorded compression call."""
+
+    tool: str
+    style: Optional[str] = None
+    model: Optional[str] = None
+    selection_method: Optional[str] = None
+    input_tokens: int = 0
+    output_tokens: int = 0
+    target_tokens: Optional[int] = None
+    total_ms: float = 0.0
+    selection_ms: float = 0.0
+    generate_ms: float = 0.0
+    count_ms: float = 0.0
+    quality_score: Optional[float] = None
+    content_hash: Optional[str] = None
+    content: Optional[str] = None
+    created_at: float = field(default_factory=time.time)
+
+
+class HistoryStore:
+    """SQLite-backed compression history with batched asynchronous writes."""
+
+    def __init__(
+        self,
+        path: str | Path,
+        *,
+        store_content: bool = False,
+        batch_size: int = 50,
+        flush_interval_seconds: float = 1.0,
+        max_queue: int = 10000,
+    ) -> None:
+        self.path = Path(path).expanduser()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.store_content = store_content
+        self.batch_size = batch_size
+        self.flush_interval_seconds = flush_interval_seconds
+        self.dropped = 0
+        self.failed = 0
+
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+
+        self._queue: queue.Queue[Optional[HistoryRecord]] = queue.Queue(maxsize=max_queue)
+        self._writer = threading.Thread(
+            target=self._write_loop, name="cognilens-history", daemon=True
+        )
+        self._writer.start()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def record(self, record: HistoryRecord) -> None:
+        """Queue a record for writing; never blocks the caller.
+
+        Records are dropped (and counted in ``dropped``) if the queue is full;
+        records of a batch that fails to commit are counted in ``failed``.
+        """
+        if not self.store_content:
+            record.content = None
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def flush(self) -> None:
+        """Block until every queued record has been written."""
+        self._queue.join()
+
+    def close(self) -> None:
+        """Write remaining records and stop the writer thread."""
+        if self._writer.is_alive():
+            self._queue.put(None)
+            self._writer.join()
+
+    def _write_loop(self) -> None:
+        conn = self._connect()
+        placeholders = ", ".join("?" for _ in _COLUMNS)
+        sql = f"INSERT INTO compression_history ({', '.join(_COLUMNS)}) VALUES ({placeholders})"
+        try:
+            while True:
+                batch: list[HistoryRecord] = []
+                stop = False
+                try:
+                    item = self._queue.get(timeout=self.flush_interval_seconds)
+                except queue.Empty:
+                    continue
+                deadline = time.monotonic() + self.flush_interval_seconds
+                while True:
+                    if item is None:
+                        stop = True
+                        break
+                    batch.append(item)
+                    if len(batch) >= self.batch_size:
+                        break
+                    remaining = deadline - time.monotonic()
+                    try:
+                        if remaining > 0:
+                            item = self._queue.get(timeout=remaining)
+                        else:
+                            item = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+
+                try:
+                    if batch:
+                        rows = [tuple(asdict(r)[c] for c in _COLUMNS) for r in batch]
+                        with conn:
+                            conn.executemany(sql, rows)
+                except sqlite3.Error:
+                    self.failed += len(batch)
+                    logger.exception("Failed to write %d history records", len(batch))
+                finally:
+                    for _ in range(len(batch) + (1 if stop else 0)):
+                        self._queue.task_done()
+                if stop:
+                    return
+        finally:
+            conn.close()
+
+    def query(self, sql: str, params: tuple[Any, ...] = ()) -> list[sqlite3.Row]:
+        """Run a read-only query against the history table."""
+        conn = self._connect()
+        conn.row_factory = sqlite3.Row
+        try:
+            return conn.execute(sql, params).fetchall()
+        finally:
+            conn.close()
+
+    def latency_percentiles(
+        self,
+        percentile: float = 0.95,
+        group_by: tuple[str, ...] = ("model", "style"),
+        since: Optional[float] = None,
+    ) -> list[dict[str, Any]]:
+        """Total latency percentile per group, e.g. p95 by model and style.
+
+        Args:
+            percentile: Quantile between 0 and 1
+            group_by: Columns to group by (tool, style, model, selection_method)
+            since: Only include records created after this UNIX timestamp
+
+        Returns:
+            One dict per group with the group columns, ``count`` and ``latency_ms``
+        """
+        unknown = set(group_by) - GROUP_COLUMNS
+        if unknown:
+            raise ValueError(f"Cannot group by: {', '.join(sorted(unknown))}")
+
+        columns = ", ".join(group_by)
+        rows = self.query(
+            f"SELECT {columns}, total_ms FROM compression_history "
+            "WHERE created_at >= ? "
+            f"ORDER BY {columns}, total_ms",
+            (since or 0.0,),
+        )
+
+        groups: dict[tuple[Any, ...], list[float]] = {}
+        for row in rows:
+            groups.setdefault(tuple(row[c] for c in group_by), []).append(row["total_ms"])
+
+        results = []
+        for key, latencies in groups.items():
+            index = min(len(latencies) - 1, int(percentile * len(latencies)))
+            results.append(
+                {
+                    **dict(zip(group_by, key)),
+                    "count": len(latencies),
+                    "latency_ms": latencies[index],
+                }
+            )
+        return results
+
+    def ratio_accuracy(
+        self,
+        group_by: tuple[str, ...] = ("tool", "style"),
+    ) -> list[dict[str, Any]]:
+        """Actual versus target compression ratio per group.
+
+        Only records with a target token count are included.
+
+        Returns:
+            One dict per group with ``count``, ``target_ratio``, ``actual_ratio``
+            (averages) and ``overshoot`` (mean actual/target output tokens)
+        """
+        unknown = set(group_by) - GROUP_COLUMNS
+        if unknown:
+            raise ValueError(f"Cannot group by: {', '.join(sorted(unknown))}")
+
+        columns = ", ".join(group_by)
+        rows = self.query(
+            f"SELECT {columns}, COUNT(*) AS count, "
+            "AVG(CAST(target_tokens AS REAL) / input_tokens) AS target_ratio, "
+            "AVG(CAST(output_tokens AS REAL) / input_tokens) AS actual_ratio, "
+            "AVG(CAST(output_tokens AS REAL) / target_tokens) AS overshoot "
+            "FROM compression_history "
+            "WHERE target_tokens > 0 AND input_tokens > 0 "
+            f"GROUP BY {columns}"
+        )
+        return [dict(row) for row in rows]
+
+
+# Global store instance
+_store: Optional[HistoryStore] = None
+_store_config: Optional[HistoryConfig] = None
+
+
+def create_history_store(config: HistoryConfig) -> HistoryStore:
+    """Create a history store from configuration."""
+    return HistoryStore(
+        config.path,
+        store_content=config.store_content,
+        batch_size=config.batch_size,
+        flush_interval_seconds=config.flush_interval_seconds,
+        max_queue=config.max_queue,
+    )
+
+
+def get_history_store() -> Optional[HistoryStore]:
+    """Get the shared history store, or None if history is disabled."""
+    global _store, _store_config
+    config = get_settings().history
+    if not config.enabled:
+        return None
+    if _store is None or _store_config is not config:
+        if _store is not None:
+            _store.close()
+        else:
+            atexit.register(reset_history_store)
+        _store = create_history_store(config)
+        _store_config = config
+    return _store
+
+
+def reset_history_store() -> None:
+    """Close and reset the shared store (useful for testing)."""
+    global _store, _store_config
+    if _store is not None:
+        _store.close()
+    _store = None
+    _store_config = None
@@ -4,32 +4,76 @@ from __future__ import annotations
 
 from typing import Optional
 
-from cognilens.config import LLMConfig, LLMProvider
+from cognilens.config import LLMConfig, LLMProvider, get_settings
 
-from .base import LLMClient, LLMResponse
+from .base import LLMClient, LLMClientWrapper, LLMResponse, unwrap_client
+from .concurrency import (
+    AIMDLimiter,
+    ConcurrencyLimitedClient,
+    ConcurrencyLimits,
+    concurrency_snapshot,
+)
 from .lexora_client import (
     ClassificationResult,
     LexoraClient,
     ModelCapabilitiesCache,
     ModelCapability,
 )
-from .mock import MockLLMClient
+from .mock import MockLLMClient, MockServerError
 from .model_selector import ModelSelection, ModelSelector, SelectionMethod
 from .openai_client import OpenAIClient
+from .resilience import LatencyTracker, ResilientLLMClient, RetryBudget
+from .token_estimator import TokenEstimator, estimate_tokens
 
 
 def create_llm_client(config: LLMConfig) -> LLMClient:
     """Factory function to create appropriate LLM client."""
+    client: LLMClient
     match config.provider:
         case LLMProvider.MOCK:
-            return MockLLMClient()
+            client = MockLLMClient(config.mock, timeout=config.timeout)
         case LLMProvider.OPENAI:
-            return OpenAIClient(config)
+            client = OpenAIClient(config)
         case LLMProvider.LEXORA:
-            return LexoraClient(config)
+            client = LexoraClient(config)
         case _:
             raise ValueError(f"Unknown LLM provider: {config.provider}")
 
+    if config.concurrency.enabled and not isinstance(client, (OpenAIClient, LexoraClient)):
+        # Pooled clients limit each endpoint in EndpointPool.acquire
+        client = ConcurrencyLimitedClient(
+            client, config.concurrency, config.provider.value, config.model
+        )
+    if config.resilience.enabled:
+        client = ResilientLLMClient(client, config.resilience, max_retries=config.max_retries)
+    return client
+
+
+# Shared client instance, so retry budgets, latency windows and caches
+# persist across tool calls
+_client: Optional[LLMClient] = None
+_client_config: Optional[LLMConfig] = None
+
+
+def get_llm_client() -> LLMClient:
+    """Get the shared LLM client for the current settings.
+
+    The client is rebuilt whenever the active LLM configuration object changes.
+    """
+    global _client, _client_config
+    config = get_settings().llm
+    if _client is None or _client_config is not config:
+        _client = create_llm_client(config)
+        _client_config = config
+    return _client
+
+
+def reset_llm_client() -> None:
+    """Reset the shared client (useful for testing)."""
+    global _client, _client_config
+    _client = None
+    _client_config = None
+
 
 def create_model_selector(
     llm_client: LLMClient,
@@ -48,20 +92,36 @@ def create_model_selector(
     if not config.smart_selection.enabled:
         return None
 
-    if not isinstance(llm_client, LexoraClient):
+    lexora_client = unwrap_client(llm_client)
+    if not isinstance(lexora_client, LexoraClient):
         return None
 
-    return ModelSelector(llm_client, config)
+    return ModelSelector(lexora_client, config)
 
 
 __all__ = [
     # Base classes
     "LLMClient",
     "LLMResponse",
+    "LLMClientWrapper",
+    "unwrap_client",
     # Client implementations
     "MockLLMClient",
+    "MockServerError",
     "OpenAIClient",
     "LexoraClient",
+    # Resilience
+    "ResilientLLMClient",
+    "RetryBudget",
+    "LatencyTracker",
+    # Adaptive concurrency
+    "AIMDLimiter",
+    "ConcurrencyLimitedClient",
+    "ConcurrencyLimits",
+    "concurrency_snapshot",
+    # Token estimates
+    "TokenEstimator",
+    "estimate_tokens",
     # Lexora data classes
     "ModelCapability",
     "ModelCapabilitiesCache",
@@ -73,4 +133,6 @@ __all__ = [
     # Factory functions
     "create_llm_client",
     "create_model_selector",
+    "get_llm_client",
+    "reset_llm_client",
 ]
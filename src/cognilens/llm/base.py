@@ -50,3 +50,71 @@ class LLMClient(ABC):
     async def health_check(self) -> bool:
         """Check if the LLM service is available."""
         ...
+
+    @property
+    def tokenizer_name(self) -> str:
+        """Identifier of the tokenizer behind count_tokens, used to key cached counts."""
+        return type(self).__name__
+
+    async def truncate_to_tokens(self, text: str, max_tokens: int) -> str:
+        """Truncate text to at most ``max_tokens`` tokens.
+
+        The default implementation cuts proportionally by characters and
+        re-counts; clients with a local tokenizer override it with an exact cut.
+        """
+        if max_tokens <= 0:
+            return ""
+        tokens = await self.count_tokens(text)
+        while tokens > max_tokens and text:
+            length = min(int(len(text) * max_tokens / tokens), len(text) - 1)
+            text = text[:length]
+            tokens = await self.count_tokens(text)
+        return text
+
+
+class LLMClientWrapper(LLMClient):
+    """Base class for clients that add behaviour around another client.
+
+    Token counting and health checks are delegated to the wrapped client;
+    subclasses override ``generate`` to add their behaviour.
+    """
+
+    def __init__(self, inner: LLMClient) -> None:
+        self.inner = inner
+
+    async def generate(
+        self,
+        prompt: str,
+        *,
+        system_prompt: Optional[str] = None,
+        max_tokens: Optional[int] = None,
+        temperature: float = 0.7,
+        model: Optional[str] = None,
+    ) -> LLMResponse:
+        return await self.inner.generate(
+            prompt,
+            system_prompt=system_prompt,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            model=model,
+        )
+
+    async def count_tokens(self, text: str) -> int:
+        return await self.inner.count_tokens(text)
+
+    async def health_check(self) -> bool:
+        return await self.inner.health_check()
+
+    @property
+    def tokenizer_name(self) -> str:
+        return self.inner.tokenizer_name
+
+    async def truncate_to_tokens(self, text: str, max_tokens: int) -> str:
+        return await self.inner.truncate_to_tokens(text, max_tokens)
+
+
+def unwrap_client(client: LLMClient) -> LLMClient:
+    """Return the innermost client behind any wrapper layers."""
+    while isinstance(client, LLMClientWrapper):
+        client = client.inner
+    return client
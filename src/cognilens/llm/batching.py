@@ -0,0 +1,106 @@
+"""Micro-batching of concurrent generate calls."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable, Hashable
+from dataclasses import dataclass, field
+from typing import Generic, Optional, TypeVar
+
+_K = TypeVar("_K", bound=Hashable)
+_R = TypeVar("_R")
+
+
+@dataclass
+class _Batch(Generic[_R]):
+    prompts: list[str] = field(default_factory=list)
+    futures: list[asyncio.Future[_R]] = field(default_factory=list)
+    timer: Optional[asyncio.TimerHandle] = None
+
+
+class MicroBatcher(Generic[_K, _R]):
+    """Collects concurrent calls with the same key into batched requests.
+
+    A batch is sent when it reaches ``max_batch_size`` prompts or
+    ``window_seconds`` after its first prompt arrived, whichever comes first.
+    Each caller gets its own result back; if the batched request fails,
+    every caller in the batch sees the error.
+    """
+
+    def __init__(
+        self,
+        send: Callable[[_K, list[str]], Awaitable[list[_R]]],
+        window_seconds: float,
+        max_batch_size: int,
+    ) -> None:
+        """Initialize the batcher.
+
+        Args:
+            send: Sends the prompts of one batch, returning results in order
+            window_seconds: How long the first call of a batch waits for others
+            max_batch_size: Prompts per batch at most
+        """
+        self._send = send
+        self.window_seconds = window_seconds
+        self.max_batch_size = max_batch_size
+        self._pending: dict[_K, _Batch[_R]] = {}
+        self._tasks: set[asyncio.Task[None]] = set()
+        # Running totals, so a long-running server keeps constant memory
+        self.batches = 0
+        self.batched_prompts = 0
+        self.largest_batch = 0
+
+    @property
+    def mean_batch_size(self) -> float:
+        """Average prompts per sent batch (0 before the first batch)."""
+        return self.batched_prompts / self.batches if self.batches else 0.0
+
+    async def submit(self, key: _K, prompt: str) -> _R:
+        """Add a prompt to the open batch for ``key`` and wait for its result."""
+        loop = asyncio.get_running_loop()
+        batch = self._pending.get(key)
+        if batch is None:
+            batch = self._pending[key] = _Batch()
+            batch.timer = loop.call_later(self.window_seconds, self._flush, key, batch)
+
+        future: asyncio.Future[_R] = loop.create_future()
+        batch.prompts.append(prompt)
+        batch.futures.append(future)
+        if len(batch.prompts) >= self.max_batch_size:
+            self._flush(key, batch)
+        return await future
+
+    def _flush(self, key: _K, batch: _Batch[_R]) -> None:
+        if self._pending.get(key) is not batch:
+            return  # Already sent
+        del self._pending[key]
+        if batch.timer is not None:
+            batch.timer.cancel()
+        task = asyncio.get_running_loop().create_task(self._dispatch(key, batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._finished)
+
+    def _finished(self, task: asyncio.Task[None]) -> None:
+        self._tasks.discard(task)
+        if not task.cancelled():
+            # A failure was already delivered to every caller of the batch
+            task.exception()
+
+    async def _dispatch(self, key: _K, batch: _Batch[_R]) -> None:
+        self.batches += 1
+        self.batched_prompts += len(batch.prompts)
+        self.largest_batch = max(self.largest_batch, len(batch.prompts))
+        try:
+            results = await self._send(key, batch.prompts)
+            if len(results) != len(batch.prompts):
+                raise ValueError(
+                    f"Batch of {len(batch.prompts)} prompts returned {len(results)} results"
+                )
+        except Exception as exc:
+            for future in batch.futures:
+                if not future.done():
+                    future.set_exception(exc)
+            raise
+        for future, result in zip(batch.futures, results):
+            if not future.done():
+                future.set_result(result)
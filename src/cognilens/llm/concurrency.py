@@ -0,0 +1,232 @@
+"""Adaptive (AIMD) concurrency limits for LLM clients."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import deque
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from typing import Any, Optional
+
+from cognilens.config import AdaptiveConcurrencyConfig
+
+from .base import LLMClient, LLMClientWrapper, LLMResponse
+from .resilience import _status_code
+
+# Status codes signalling that the backend is saturated
+OVERLOAD_STATUS_CODES = frozenset({429, 503, 504})
+
+# Timeout error classes from httpx / openai, matched by name
+_TIMEOUT_ERROR_NAMES = frozenset({"TimeoutException", "APITimeoutError"})
+
+# Successful calls needed before latency is compared to the baseline
+_MIN_LATENCY_SAMPLES = 5
+
+
+def is_overload(exc: BaseException) -> bool:
+    """Check whether a failed call indicates backend overload (throttling or timeout)."""
+    if isinstance(exc, TimeoutError):
+        return True
+    status = _status_code(exc)
+    if status is not None:
+        return status in OVERLOAD_STATUS_CODES
+    return any(cls.__name__ in _TIMEOUT_ERROR_NAMES for cls in type(exc).__mro__)
+
+
+class AIMDLimiter:
+    """Concurrency limit with additive increase and multiplicative decrease.
+
+    Each successful call while the limiter is at least half busy raises the
+    limit by ``1 / limit``, i.e. by one per round of calls. Throttling,
+    timeouts and latencies above ``latency_tolerance`` times the recent
+    minimum cut it by ``backoff_ratio``, at most once per round: calls started
+    before the last cut do not cut it again.
+    """
+
+    def __init__(
+        self,
+        initial_limit: int = 8,
+        min_limit: int = 1,
+        max_limit: int = 64,
+        backoff_ratio: float = 0.5,
+        latency_tolerance: float = 2.0,
+        latency_window: int = 100,
+    ) -> None:
+        self.min_limit = min_limit
+        self.max_limit = max(max_limit, min_limit)
+        self.backoff_ratio = backoff_ratio
+        self.latency_tolerance = latency_tolerance
+        self._limit = float(min(max(initial_limit, self.min_limit), self.max_limit))
+        self._latencies: deque[float] = deque(maxlen=latency_window)
+        self._last_decrease = float("-inf")
+        self._condition: Optional[asyncio.Condition] = None
+        self._condition_loop: Optional[asyncio.AbstractEventLoop] = None
+        self.in_flight = 0
+        self.waiting = 0
+
+    @classmethod
+    def from_config(cls, config: AdaptiveConcurrencyConfig) -> AIMDLimiter:
+        return cls(
+            initial_limit=config.initial_limit,
+            min_limit=config.min_limit,
+            max_limit=config.max_limit,
+            backoff_ratio=config.backoff_ratio,
+            latency_tolerance=config.latency_tolerance,
+            latency_window=config.latency_window,
+        )
+
+    @property
+    def limit(self) -> int:
+        """Current number of calls allowed in flight."""
+        return int(self._limit)
+
+    @property
+    def min_latency(self) -> Optional[float]:
+        """Lowest recent latency in seconds, the no-queueing baseline."""
+        return min(self._latencies) if self._latencies else None
+
+    def _cond(self) -> asyncio.Condition:
+        loop = asyncio.get_running_loop()
+        if self._condition is None or self._condition_loop is not loop:
+            self._condition = asyncio.Condition()
+            self._condition_loop = loop
+        return self._condition
+
+    @asynccontextmanager
+    async def acquire(self) -> AsyncIterator[None]:
+        """Wait for a free slot, then record the outcome of the call made in it."""
+        condition = self._cond()
+        async with condition:
+            self.waiting += 1
+            try:
+                await condition.wait_for(lambda: self.in_flight < self.limit)
+            finally:
+                self.waiting -= 1
+            self.in_flight += 1
+
+        started = time.monotonic()
+        try:
+            yield
+        except Exception as exc:
+            if is_overload(exc):
+                self._decrease(started)
+            raise
+        else:
+            self._on_success(time.monotonic() - started, started)
+        finally:
+            async with condition:
+                self.in_flight -= 1
+                condition.notify_all()
+
+    def _on_success(self, latency: float, started: float) -> None:
+        baseline = self.min_latency
+        self._latencies.append(latency)
+        if (
+            baseline is not None
+            and len(self._latencies) >= _MIN_LATENCY_SAMPLES
+            and latency > baseline * self.latency_tolerance
+        ):
+            self._decrease(started)
+        elif self.in_flight * 2 >= self._limit:
+            self._limit = min(self.max_limit, self._limit + 1 / self._limit)
+
+    def _decrease(self, started: float) -> None:
+        if started < self._last_decrease:
+            return  # Already reacted to this round
+        self._limit = max(self.min_limit, self._limit * self.backoff_ratio)
+        self._last_decrease = time.monotonic()
+
+
+class ConcurrencyLimits:
+    """AIMD limiters keyed by endpoint and model, created on first use.
+
+    Each endpoint gets its own limits, so a slow or throttling node only
+    lowers the concurrency sent to that node.
+    """
+
+    def __init__(self, config: AdaptiveConcurrencyConfig) -> None:
+        self.config = config
+        self.limiters: dict[tuple[str, str], AIMDLimiter] = {}
+
+    def limiter(self, endpoint: str, model: str) -> AIMDLimiter:
+        """Get the limiter for a model on an endpoint."""
+        key = (endpoint, model)
+        if key not in self.limiters:
+            self.limiters[key] = AIMDLimiter.from_config(self.config)
+        return self.limiters[key]
+
+    def snapshot(self) -> list[dict[str, Any]]:
+        """Return the current limit and load of every limiter."""
+        return [
+            {
+                "endpoint": endpoint,
+                "model": model,
+                "limit": limiter.limit,
+                "in_flight": limiter.in_flight,
+                "waiting": limiter.waiting,
+                "min_latency_ms": (
+                    round(limiter.min_latency * 1000, 1)
+                    if limiter.min_latency is not None
+                    else None
+                ),
+            }
+            for (endpoint, model), limiter in self.limiters.items()
+        ]
+
+
+class ConcurrencyLimitedClient(LLMClientWrapper):
+    """Limits concurrent ``generate`` calls with an AIMD limiter per model.
+
+    Used for clients without an endpoint pool; pooled clients take the
+    limiter of the chosen endpoint in ``EndpointPool.acquire`` instead. The
+    limits follow backend capacity: they grow while calls succeed at steady
+    latency and shrink when the backend throttles, times out or starts
+    queueing.
+    """
+
+    def __init__(
+        self,
+        inner: LLMClient,
+        config: AdaptiveConcurrencyConfig,
+        endpoint: str,
+        default_model: str,
+    ) -> None:
+        super().__init__(inner)
+        self.config = config
+        self.endpoint = endpoint
+        self.default_model = default_model
+        self.limits = ConcurrencyLimits(config)
+
+    def limiter(self, model: Optional[str] = None) -> AIMDLimiter:
+        """Get the limiter for a model on this client's endpoint."""
+        return self.limits.limiter(self.endpoint, model or self.default_model)
+
+    async def generate(
+        self,
+        prompt: str,
+        *,
+        system_prompt: Optional[str] = None,
+        max_tokens: Optional[int] = None,
+        temperature: float = 0.7,
+        model: Optional[str] = None,
+    ) -> LLMResponse:
+        async with self.limiter(model).acquire():
+            return await self.inner.generate(
+                prompt,
+                system_prompt=system_prompt,
+                max_tokens=max_tokens,
+                temperature=temperature,
+                model=model,
+            )
+
+
+def concurrency_snapshot(client: LLMClient) -> list[dict[str, Any]]:
+    """Current concurrency limits of a client stack (empty if not limited)."""
+    while isinstance(client, LLMClientWrapper):
+        if isinstance(client, ConcurrencyLimitedClient):
+            return client.limits.snapshot()
+        client = client.inner
+    pool = getattr(client, "pool", None)
+    limits = getattr(pool, "limits", None)
+    return limits.snapshot() if isinstance(limits, ConcurrencyLimits) else []
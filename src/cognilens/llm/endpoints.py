@@ -0,0 +1,276 @@
+"""Endpoint pool with load balancing, health probing and circuit breaking."""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import random
+import time
+from collections.abc import AsyncIterator, Awaitable, Callable
+from contextlib import AsyncExitStack, asynccontextmanager, suppress
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Any, Optional
+
+from cognilens.config import LoadBalancingConfig, LoadBalancingStrategy
+
+from .concurrency import ConcurrencyLimits
+from .resilience import is_retryable
+
+
+class CircuitState(str, Enum):
+    """Circuit breaker states."""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker with half-open probing.
+
+    After ``failure_threshold`` consecutive failures the circuit opens and the
+    endpoint receives no traffic for ``open_seconds``. It then goes half-open,
+    admitting up to ``half_open_max_requests`` trial requests: a success closes
+    the circuit, a failure opens it again.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        open_seconds: float = 30.0,
+        half_open_max_requests: int = 1,
+    ) -> None:
+        self.failure_threshold = failure_threshold
+        self.open_seconds = open_seconds
+        self.half_open_max_requests = half_open_max_requests
+        self._state = CircuitState.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._half_open_in_flight = 0
+
+    @property
+    def state(self) -> CircuitState:
+        """Current state, moving from open to half-open once the cool-down passes."""
+        if (
+            self._state == CircuitState.OPEN
+            and time.monotonic() - self._opened_at >= self.open_seconds
+        ):
+            self._state = CircuitState.HALF_OPEN
+            self._half_open_in_flight = 0
+        return self._state
+
+    def can_accept(self) -> bool:
+        """Check whether the breaker admits another request right now."""
+        state = self.state
+        if state == CircuitState.CLOSED:
+            return True
+        if state == CircuitState.HALF_OPEN:
+            return self._half_open_in_flight < self.half_open_max_requests
+        return False
+
+    def on_request(self) -> None:
+        """Record that a request was admitted."""
+        if self.state == CircuitState.HALF_OPEN:
+            self._half_open_in_flight += 1
+
+    def record_success(self) -> None:
+        """Record a successful request."""
+        self._failures = 0
+        if self._state != CircuitState.CLOSED:
+            self._state = CircuitState.CLOSED
+            self._half_open_in_flight = 0
+
+    def record_failure(self) -> None:
+        """Record a failed request, opening the circuit if needed."""
+        self._failures += 1
+        if self.state == CircuitState.HALF_OPEN or self._failures >= self.failure_threshold:
+            self._state = CircuitState.OPEN
+            self._opened_at = time.monotonic()
+            self._half_open_in_flight = 0
+
+    def release(self) -> None:
+        """Record that an admitted request finished without an outcome (e.g. cancelled)."""
+        if self._state == CircuitState.HALF_OPEN and self._half_open_in_flight > 0:
+            self._half_open_in_flight -= 1
+
+
+@dataclass
+class Endpoint:
+    """A single backend endpoint and its live state."""
+
+    url: str
+    breaker: CircuitBreaker
+    outstanding: int = 0
+    healthy: bool = True
+    metadata: dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def available(self) -> bool:
+        """Check whether the endpoint should receive new requests."""
+        return self.healthy and self.breaker.can_accept()
+
+
+def affinity_key(prompt: str, system_prompt: Optional[str], prefix_chars: int) -> Optional[str]:
+    """Build a session affinity key from the leading characters of a prompt."""
+    if prefix_chars <= 0:
+        return None
+    return ((system_prompt or "") + "\0" + prompt)[:prefix_chars]
+
+
+class EndpointPool:
+    """Balances requests over endpoints, ejecting failing ones.
+
+    - Selection is power-of-two-choices or least-outstanding-requests among
+      endpoints that are healthy and whose circuit admits traffic.
+    - Requests with an affinity key are pinned to one endpoint by rendezvous
+      hashing, so prompts sharing a prefix reuse the same node's KV cache,
+      unless that endpoint is overloaded relative to the others.
+    - An optional probe is run in the background to mark endpoints healthy or
+      unhealthy, only when there is more than one endpoint to choose from.
+    - If no endpoint is available, every endpoint is considered, so a single
+      endpoint deployment degrades to plain pass-through.
+    - With ``limits``, a model's requests wait for the AIMD limiter of the
+      chosen endpoint, so each node's concurrency adapts to that node alone.
+    """
+
+    def __init__(
+        self,
+        urls: list[str],
+        config: Optional[LoadBalancingConfig] = None,
+        probe: Optional[Callable[[str], Awaitable[bool]]] = None,
+        rng: Optional[random.Random] = None,
+        limits: Optional[ConcurrencyLimits] = None,
+    ) -> None:
+        if not urls:
+            raise ValueError("EndpointPool requires at least one endpoint")
+        self.config = config or LoadBalancingConfig()
+        self.endpoints = [
+            Endpoint(
+                url=url,
+                breaker=CircuitBreaker(
+                    failure_threshold=self.config.failure_threshold,
+                    open_seconds=self.config.open_seconds,
+                    half_open_max_requests=self.config.half_open_max_requests,
+                ),
+            )
+            for url in dict.fromkeys(urls)
+        ]
+        self._probe = probe
+        self._rng = rng or random.Random()
+        self.limits = limits
+        self._health_task: Optional[asyncio.Task[None]] = None
+
+    def select(self, affinity: Optional[str] = None) -> Endpoint:
+        """Choose an endpoint for the next request."""
+        candidates = [e for e in self.endpoints if e.available] or self.endpoints
+        if len(candidates) == 1:
+            return candidates[0]
+
+        least = min(candidates, key=lambda e: e.outstanding)
+        if affinity is not None:
+            pinned = max(candidates, key=lambda e: self._rendezvous_score(affinity, e.url))
+            if pinned.outstanding - least.outstanding <= self.config.affinity_max_imbalance:
+                return pinned
+
+        if self.config.strategy == LoadBalancingStrategy.LEAST_OUTSTANDING:
+            return least
+        first, second = self._rng.sample(candidates, 2)
+        return first if first.outstanding <= second.outstanding else second
+
+    @staticmethod
+    def _rendezvous_score(key: str, url: str) -> int:
+        digest = hashlib.blake2b(f"{url}|{key}".encode(), digest_size=8).digest()
+        return int.from_bytes(digest, "big")
+
+    @asynccontextmanager
+    async def acquire(
+        self, affinity: Optional[str] = None, model: Optional[str] = None
+    ) -> AsyncIterator[Endpoint]:
+        """Select an endpoint and track the request's outcome on it.
+
+        Only retryable errors (timeouts, throttling, server errors) count as
+        endpoint failures; client errors such as bad requests do not.
+
+        Args:
+            affinity: Session affinity key (see :func:`affinity_key`)
+            model: Model of a generate request, limited per endpoint if
+                ``limits`` is set; other requests are not limited
+        """
+        self.start_health_checks()
+        endpoint = self.select(affinity)
+        endpoint.outstanding += 1
+        endpoint.breaker.on_request()
+        outcome_recorded = False
+        try:
+            async with AsyncExitStack() as stack:
+                if self.limits is not None and model is not None:
+                    await stack.enter_async_context(
+                        self.limits.limiter(endpoint.url, model).acquire()
+                    )
+                yield endpoint
+        except Exception as exc:
+            if is_retryable(exc):
+                endpoint.breaker.record_failure()
+                outcome_recorded = True
+            raise
+        else:
+            endpoint.breaker.record_success()
+            outcome_recorded = True
+        finally:
+            endpoint.outstanding -= 1
+            if not outcome_recorded:
+                endpoint.breaker.release()
+
+    def start_health_checks(self) -> None:
+        """Start background health probing if a probe is configured.
+
+        A single endpoint is never probed in the background: with nothing to
+        fail over to, the probes would only add traffic (and quota use).
+        """
+        if self._probe is None or len(self.endpoints) < 2:
+            return
+        if self._health_task and not self._health_task.done():
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self._health_task = loop.create_task(self._health_loop())
+
+    async def check_health(self) -> bool:
+        """Probe every endpoint once; returns True if any endpoint is healthy."""
+        if self._probe is None:
+            return True
+        results = await asyncio.gather(
+            *(self._probe(e.url) for e in self.endpoints), return_exceptions=True
+        )
+        for endpoint, result in zip(self.endpoints, results):
+            endpoint.healthy = result is True
+        return any(e.healthy for e in self.endpoints)
+
+    async def _health_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.config.health_check_interval_seconds)
+            with suppress(Exception):
+                await self.check_health()
+
+    async def close(self) -> None:
+        """Stop background health probing."""
+        if self._health_task is not None:
+            self._health_task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._health_task
+            self._health_task = None
+
+    def snapshot(self) -> list[dict[str, Any]]:
+        """Return the current state of every endpoint."""
+        return [
+            {
+                "url": e.url,
+                "healthy": e.healthy,
+                "circuit": e.breaker.state.value,
+                "outstanding": e.outstanding,
+            }
+            for e in self.endpoints
+        ]
@@ -2,15 +2,27 @@
 
 from __future__ import annotations
 
+import asyncio
+import random
 import time
 from dataclasses import dataclass, field
-from typing import Optional
-
-import httpx
+from typing import TYPE_CHECKING, Optional
 
 from cognilens.config import LLMConfig
 
 from .base import LLMClient, LLMResponse
+from .batching import MicroBatcher
+from .concurrency import ConcurrencyLimits
+from .endpoints import EndpointPool, affinity_key
+from .token_estimator import estimate_tokens
+
+if TYPE_CHECKING:
+    import httpx
+
+DEFAULT_LEXORA_URL = "http://localhost:8001"
+
+# Calls batched together share model, system prompt, max_tokens and temperature
+_BatchKey = tuple[str, Optional[str], Optional[int], float]
 
 
 @dataclass
@@ -25,16 +37,27 @@ class ModelCapability:
 
 @dataclass
 class ModelCapabilitiesCache:
-    """Cached model capabilities with TTL."""
+    """Cached model capabilities with TTL.
+
+    After ``ttl_seconds`` the entry is stale: it is still served while a
+    refresh runs in the background. After ``max_age_seconds`` it is unusable.
+    """
 
     models: list[ModelCapability]
     fetched_at: float
-    ttl_seconds: int
+    ttl_seconds: float
+    max_age_seconds: Optional[float] = None
 
     def is_expired(self) -> bool:
         """Check if cache has expired."""
         return time.time() - self.fetched_at > self.ttl_seconds
 
+    def is_too_old(self) -> bool:
+        """Check if cache is past its hard maximum age."""
+        if self.max_age_seconds is None:
+            return False
+        return time.time() - self.fetched_at > self.max_age_seconds
+
     def find_by_capability(self, capability: str) -> Optional[str]:
         """Find first model with the specified capability."""
         for model in self.models:
@@ -42,6 +65,47 @@ class ModelCapabilitiesCache:
                 return model.model_id
         return None
 
+    def get(self, model_id: str) -> Optional[ModelCapability]:
+        """Look up a model by ID."""
+        for model in self.models:
+            if model.model_id == model_id:
+                return model
+        return None
+
+    def find_best_fit(self, capability: str, required_tokens: int) -> Optional[ModelCapability]:
+        """Find the smallest-window model with the capability that fits the request.
+
+        Among models with equal windows, the fastest (by the optional
+        ``tokens_per_second`` metadata) is preferred.
+
+        Args:
+            capability: Required capability
+            required_tokens: Estimated prompt plus output tokens
+
+        Returns:
+            The best fitting model, or None if no capable model is large enough
+        """
+        fitting = [
+            model
+            for model in self.models
+            if capability in model.capabilities and model.context_length >= required_tokens
+        ]
+        if not fitting:
+            return None
+        return min(
+            fitting,
+            key=lambda m: (m.context_length, -float(m.metadata.get("tokens_per_second", 0))),
+        )
+
+    def largest_context(self, capability: Optional[str] = None) -> Optional[ModelCapability]:
+        """Find the model with the largest context window, optionally by capability."""
+        candidates = [
+            model for model in self.models if capability is None or capability in model.capabilities
+        ]
+        if not candidates:
+            return None
+        return max(candidates, key=lambda m: m.context_length)
+
 
 @dataclass
 class ClassificationResult:
@@ -59,13 +123,63 @@ class LexoraClient(LLMClient):
     Supports the new Lexora APIs:
     - GET /v1/models/capabilities - Get model capabilities
     - POST /v1/classify-task - Classify a task to determine optimal model
+
+    When several endpoints are configured, requests are balanced across them
+    through an EndpointPool with circuit breaking and background health checks.
+
+    With ``llm.batching`` enabled, concurrent generate calls that share model
+    and parameters are sent together as one multi-prompt completion request.
     """
 
     def __init__(self, config: LLMConfig) -> None:
         self.config = config
-        self._base_url = config.base_url or "http://localhost:8001"
+        self._pool = EndpointPool(
+            config.endpoint_urls(default=DEFAULT_LEXORA_URL),
+            config.load_balancing,
+            probe=self._probe,
+            limits=ConcurrencyLimits(config.concurrency) if config.concurrency.enabled else None,
+        )
+        self._base_url = self._pool.endpoints[0].url
+        self._http: Optional[httpx.AsyncClient] = None
         self._capabilities_cache: Optional[ModelCapabilitiesCache] = None
         self._cache_ttl = config.smart_selection.cache_ttl_seconds
+        self._cache_ttl_jitter = config.smart_selection.cache_ttl_jitter
+        self._cache_max_age = max(config.smart_selection.cache_max_age_seconds, self._cache_ttl)
+        self._refresh_lock = asyncio.Lock()
+        self._refresh_task: Optional[asyncio.Task[Optional[ModelCapabilitiesCache]]] = None
+        self._batcher: Optional[MicroBatcher[_BatchKey, LLMResponse]] = None
+        if config.batching.enabled:
+            self._batcher = MicroBatcher(
+                self._generate_batch,
+                window_seconds=config.batching.window_ms / 1000,
+                max_batch_size=config.batching.max_batch_size,
+            )
+
+    @property
+    def batcher(self) -> Optional[MicroBatcher[_BatchKey, LLMResponse]]:
+        """Micro-batcher for generate calls, or None if batching is disabled."""
+        return self._batcher
+
+    @property
+    def pool(self) -> EndpointPool:
+        """Endpoint pool used to route requests."""
+        return self._pool
+
+    def _client(self) -> httpx.AsyncClient:
+        """Get the shared HTTP client, reusing connections across requests."""
+        if self._http is None or self._http.is_closed:
+            # Imported on first use to keep server start-up fast
+            import httpx
+
+            self._http = httpx.AsyncClient(timeout=self.config.timeout)
+        return self._http
+
+    async def aclose(self) -> None:
+        """Close the HTTP client and stop health checks."""
+        await self._pool.close()
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
 
     async def generate(
         self,
@@ -86,12 +200,30 @@ class LexoraClient(LLMClient):
             model: Override model to use (for smart selection)
         """
         use_model = model or self.config.model
+        if self._batcher is not None:
+            return await self._batcher.submit(
+                (use_model, system_prompt, max_tokens, temperature), prompt
+            )
+        return await self._complete(use_model, prompt, system_prompt, max_tokens, temperature)
 
-        async with httpx.AsyncClient(timeout=self.config.timeout) as client:
-            response = await client.post(
-                f"{self._base_url}/v1/completions",
+    async def _complete(
+        self,
+        model: str,
+        prompt: str,
+        system_prompt: Optional[str],
+        max_tokens: Optional[int],
+        temperature: float,
+    ) -> LLMResponse:
+        """Send a single-prompt completion request."""
+        affinity = affinity_key(
+            prompt, system_prompt, self.config.load_balancing.affinity_prefix_chars
+        )
+
+        async with self._pool.acquire(affinity, model) as endpoint:
+            response = await self._client().post(
+                f"{endpoint.url}/v1/completions",
                 json={
-                    "model": use_model,
+                    "model": model,
                     "prompt": prompt,
                     "system_prompt": system_prompt,
                     "max_tokens": max_tokens,
@@ -99,35 +231,76 @@ class LexoraClient(LLMClient):
                 },
             )
             response.raise_for_status()
-            data = response.json()
+            return self._parse_completion(response.json(), model)
+
+    async def _generate_batch(self, key: _BatchKey, prompts: list[str]) -> list[LLMResponse]:
+        """Send one multi-prompt completion request for a micro-batch.
 
-            return LLMResponse(
-                content=data.get("content", ""),
-                model=data.get("model", use_model),
-                tokens_used=data.get("tokens_used", 0),
-                finish_reason=data.get("finish_reason"),
+        The batch form takes a list of prompts and answers with a
+        ``results`` list holding one completion per prompt, in order.
+        """
+        model, system_prompt, max_tokens, temperature = key
+        if len(prompts) == 1:
+            return [await self._complete(model, prompts[0], system_prompt, max_tokens, temperature)]
+
+        affinity = affinity_key(
+            prompts[0], system_prompt, self.config.load_balancing.affinity_prefix_chars
+        )
+        async with self._pool.acquire(affinity, model) as endpoint:
+            response = await self._client().post(
+                f"{endpoint.url}/v1/completions",
+                json={
+                    "model": model,
+                    "prompt": prompts,
+                    "system_prompt": system_prompt,
+                    "max_tokens": max_tokens,
+                    "temperature": temperature,
+                },
             )
+            response.raise_for_status()
+            data = response.json()
+            return [
+                self._parse_completion(result, data.get("model", model))
+                for result in data.get("results", [])
+            ]
+
+    @staticmethod
+    def _parse_completion(data: dict, model: str) -> LLMResponse:
+        return LLMResponse(
+            content=data.get("content", ""),
+            model=data.get("model", model),
+            tokens_used=data.get("tokens_used", 0),
+            finish_reason=data.get("finish_reason"),
+        )
 
     async def count_tokens(self, text: str) -> int:
-        """Count tokens using Lexora API or fallback to approximation."""
+        """Count tokens using Lexora API or fall back to a per-script estimate."""
         try:
-            async with httpx.AsyncClient(timeout=5) as client:
-                response = await client.post(
-                    f"{self._base_url}/v1/tokenize",
+            async with self._pool.acquire() as endpoint:
+                response = await self._client().post(
+                    f"{endpoint.url}/v1/tokenize",
                     json={"text": text},
+                    timeout=5,
                 )
                 if response.status_code == 200:
-                    return response.json().get("count", len(text) // 4)
+                    return response.json().get("count", estimate_tokens(text))
         except Exception:
             pass
-        return len(text) // 4
+        return estimate_tokens(text)
+
+    @property
+    def tokenizer_name(self) -> str:
+        return f"lexora:{self.config.model}"
 
     async def health_check(self) -> bool:
-        """Check if Lexora service is available."""
+        """Check if any Lexora endpoint is available."""
+        return await self._pool.check_health()
+
+    async def _probe(self, url: str) -> bool:
+        """Probe a single endpoint's health route."""
         try:
-            async with httpx.AsyncClient(timeout=5) as client:
-                response = await client.get(f"{self._base_url}/health")
-                return response.status_code == 200
+            response = await self._client().get(f"{url}/health", timeout=5)
+            return response.status_code == 200
         except Exception:
             return False
 
@@ -136,23 +309,50 @@ class LexoraClient(LLMClient):
     ) -> Optional[ModelCapabilitiesCache]:
         """Fetch model capabilities from Lexora API.
 
+        Uses stale-while-revalidate: an expired entry is returned immediately
+        while a single background task refreshes it. Callers only wait for the
+        API when there is no entry, or it is past the hard maximum age.
+        Concurrent fetches are coalesced into one request.
+
         Args:
             force_refresh: Force refresh even if cache is valid
 
         Returns:
             ModelCapabilitiesCache if successful, None on failure
         """
-        # Return cached data if valid
-        if (
-            not force_refresh
-            and self._capabilities_cache is not None
-            and not self._capabilities_cache.is_expired()
+        cache = self._capabilities_cache
+        if not force_refresh and cache is not None:
+            if not cache.is_expired():
+                return cache
+            if not cache.is_too_old():
+                self._schedule_refresh()
+                return cache
+
+        return await self._refresh_capabilities()
+
+    def _schedule_refresh(self) -> None:
+        """Start a background refresh unless one is already running."""
+        if self._refresh_lock.locked() or (
+            self._refresh_task is not None and not self._refresh_task.done()
         ):
-            return self._capabilities_cache
-
+            return
+        self._refresh_task = asyncio.create_task(self._refresh_capabilities())
+
+    async def _refresh_capabilities(self) -> Optional[ModelCapabilitiesCache]:
+        """Fetch capabilities, coalescing with any fetch already in progress."""
+        requested_at = time.time()
+        async with self._refresh_lock:
+            cache = self._capabilities_cache
+            if cache is not None and cache.fetched_at >= requested_at:
+                # Another caller refreshed while we were waiting
+                return cache
+            return await self._fetch_capabilities()
+
+    async def _fetch_capabilities(self) -> Optional[ModelCapabilitiesCache]:
+        """Request capabilities from the API and store them in the cache."""
         try:
-            async with httpx.AsyncClient(timeout=self.config.timeout) as client:
-                response = await client.get(f"{self._base_url}/v1/models/capabilities")
+            async with self._pool.acquire() as endpoint:
+                response = await self._client().get(f"{endpoint.url}/v1/models/capabilities")
                 response.raise_for_status()
                 data = response.json()
 
@@ -167,20 +367,23 @@ class LexoraClient(LLMClient):
                         )
                     )
 
+                jitter = random.uniform(-self._cache_ttl_jitter, self._cache_ttl_jitter)
                 self._capabilities_cache = ModelCapabilitiesCache(
                     models=models,
                     fetched_at=time.time(),
-                    ttl_seconds=self._cache_ttl,
+                    ttl_seconds=self._cache_ttl * (1 + jitter),
+                    max_age_seconds=self._cache_max_age,
                 )
                 return self._capabilities_cache
 
         except Exception:
-            # Return stale cache if available, otherwise None
-            return self._capabilities_cache
+            # Return stale cache if still within its maximum age, otherwise None
+            cache = self._capabilities_cache
+            if cache is None or cache.is_too_old():
+                return None
+            return cache
 
-    async def classify_task(
-        self, task_description: str
-    ) -> Optional[ClassificationResult]:
+    async def classify_task(self, task_description: str) -> Optional[ClassificationResult]:
         """Classify a task to determine optimal model capability.
 
         Args:
@@ -190,9 +393,9 @@ class LexoraClient(LLMClient):
             ClassificationResult if successful, None on failure
         """
         try:
-            async with httpx.AsyncClient(timeout=self.config.timeout) as client:
-                response = await client.post(
-                    f"{self._base_url}/v1/classify-task",
+            async with self._pool.acquire() as endpoint:
+                response = await self._client().post(
+                    f"{endpoint.url}/v1/classify-task",
                     json={"task_description": task_description},
                 )
                 response.raise_for_status()
@@ -217,9 +420,10 @@ class LexoraClient(LLMClient):
         Returns:
             Model ID if found, None otherwise
         """
-        if self._capabilities_cache is None:
+        cache = self._capabilities_cache
+        if cache is None or cache.is_too_old():
             return None
-        return self._capabilities_cache.find_by_capability(capability)
+        return cache.find_by_capability(capability)
 
     def clear_cache(self) -> None:
         """Clear the capabilities cache."""
@@ -1,18 +1,107 @@
-"""Mock LLM client for testing and development."""
+"""Mock LLM client for testing and development.
+
+Without configuration the client answers instantly. A MockLLMConfig adds a
+performance model so concurrency, queueing and timeouts can be exercised in
+process: per-model time to first token and decode speed with jitter, a batch
+capacity beyond which requests queue, and injected failures and timeouts.
+Random draws come from one generator seeded by the config and are taken when
+a request arrives, so a run is reproducible for a given seed and call order.
+"""
 
 from __future__ import annotations
 
+import asyncio
+import contextlib
+import random
 import re
+from collections import deque
+from collections.abc import AsyncIterator
+from functools import lru_cache
 from typing import Optional
 
+from cognilens.config import JitterDistribution, MockLLMConfig, MockModelProfile
+
 from .base import LLMClient, LLMResponse
+from .token_estimator import estimate_tokens
+
+# Model name reported when no model is requested
+DEFAULT_MOCK_MODEL = "mock-model"
+
+
+@lru_cache(maxsize=1)
+def _instruction_pattern() -> re.Pattern[str]:
+    """Pattern matching the instruction lines of the prompt templates."""
+    # Imported lazily: the prompts package depends on the core package
+    from cognilens.prompts import templates
+
+    lines = {
+        line.strip()
+        for value in vars(templates).values()
+        if isinstance(value, str)
+        for line in value.splitlines()
+    }
+    patterns = [
+        re.sub(r"\\\{\w+\\\}", ".*", re.escape(line))
+        for line in lines
+        if line and not re.fullmatch(r"\{\w+\}", line)
+    ]
+    return re.compile("|".join(f"(?:{p})" for p in sorted(patterns)))
+
+
+def _is_instruction(line: str) -> bool:
+    return bool(line) and _instruction_pattern().fullmatch(line) is not None
+
+
+class MockServerError(Exception):
+    """Simulated server error, carrying a status code like SDK exceptions do."""
+
+    def __init__(self, status_code: int = 503, message: str = "Simulated server error") -> None:
+        super().__init__(f"{message} ({status_code})")
+        self.status_code = status_code
+
+
+class _Timeout:
+    """Marker for an injected timeout."""
 
 
 class MockLLMClient(LLMClient):
-    """Mock LLM client for testing and development."""
+    """Mock LLM client for testing and development.
+
+    Attributes:
+        queued: Requests currently waiting for a batch slot
+        max_queued: Largest number of requests seen waiting at once
+    """
 
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        config: Optional[MockLLMConfig] = None,
+        timeout: Optional[float] = None,
+    ) -> None:
+        """Initialize the mock client.
+
+        Args:
+            config: Performance model; answers instantly when omitted
+            timeout: Client-side timeout in seconds for generate calls
+        """
         self._call_count = 0
+        self.config = config or MockLLMConfig()
+        self.timeout = timeout
+        self._rng = random.Random(self.config.seed)
+        self._injected: deque[BaseException | _Timeout] = deque()
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._slots_loop: Optional[asyncio.AbstractEventLoop] = None
+        self.queued = 0
+        self.max_queued = 0
+
+    def fail_next(self, times: int = 1, error: Optional[BaseException] = None) -> None:
+        """Make the next ``times`` generate calls raise ``error`` (a 503 by default)."""
+        for _ in range(times):
+            self._injected.append(error or MockServerError())
+
+    def timeout_next(self, times: int = 1) -> None:
+        """Make the next ``times`` generate calls hang until the client timeout."""
+        for _ in range(times):
+            self._injected.append(_Timeout())
 
     async def generate(
         self,
@@ -26,27 +115,111 @@ class MockLLMClient(LLMClient):
         """Generate mock response by extracting key sentences."""
         self._call_count += 1
 
-        # Simple mock: extract key sentences and return truncated version
-        sentences = re.split(r"[.!?]+", prompt)
+        # Simple mock: extract key sentences of the content and return truncated version
+        content = "\n".join(
+            line for line in prompt.splitlines() if not _is_instruction(line.strip())
+        )
+        sentences = re.split(r"[.!?]+", content)
         key_sentences = [s.strip() for s in sentences if len(s.strip()) > 20][:3]
         mock_summary = (
             ". ".join(key_sentences) + "." if key_sentences else "Summary of the provided text."
         )
 
         if max_tokens:
-            words = mock_summary.split()[: max_tokens // 2]
-            mock_summary = " ".join(words)
+            mock_summary = await self.truncate_to_tokens(mock_summary, max(max_tokens // 2, 1))
+
+        model = model or DEFAULT_MOCK_MODEL
+        await self._simulate(model, (system_prompt or "") + prompt, mock_summary)
 
         return LLMResponse(
             content=mock_summary,
-            model=model or "mock-model",
-            tokens_used=len(mock_summary.split()),
+            model=model,
+            tokens_used=estimate_tokens(mock_summary),
             finish_reason="stop",
         )
 
+    async def _simulate(self, model: str, prompt: str, output: str) -> None:
+        """Wait as long as the performance model says the request takes.
+
+        Raises:
+            MockServerError: For a simulated or injected server failure
+            TimeoutError: When the request outlasts the client timeout
+        """
+        config = self.config
+        profile = config.models.get(model, config.default_profile)
+        # Draw everything on arrival so the sequence does not depend on timing
+        ttft_factor = self._jitter(profile)
+        decode_factor = self._jitter(profile)
+        fails = self._rng.random() < config.failure_rate
+        hangs = self._rng.random() < config.timeout_rate
+        outcome = self._injected.popleft() if self._injected else None
+        if outcome is None and (fails or hangs):
+            outcome = MockServerError() if fails else _Timeout()
+
+        async with asyncio.timeout(self.timeout), self._batch_slot():
+            if isinstance(outcome, _Timeout):
+                if self.timeout is None:
+                    raise TimeoutError("Simulated timeout")
+                await asyncio.Event().wait()
+            if isinstance(outcome, BaseException):
+                raise outcome
+
+            delay = profile.ttft_seconds * ttft_factor
+            if profile.prefill_tokens_per_second:
+                delay += (
+                    await self.count_tokens(prompt)
+                    / profile.prefill_tokens_per_second
+                    * ttft_factor
+                )
+            if profile.tokens_per_second:
+                delay += await self.count_tokens(output) / profile.tokens_per_second * decode_factor
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+    def _jitter(self, profile: MockModelProfile) -> float:
+        """Random latency factor with mean 1 from the profile's distribution."""
+        spread = profile.jitter_spread
+        match profile.jitter:
+            case JitterDistribution.UNIFORM:
+                return max(self._rng.uniform(1 - spread, 1 + spread), 0.0)
+            case JitterDistribution.NORMAL:
+                return max(self._rng.gauss(1.0, spread), 0.0)
+            case JitterDistribution.LOGNORMAL:
+                return self._rng.lognormvariate(-(spread**2) / 2, spread)
+            case _:
+                return 1.0
+
+    @contextlib.asynccontextmanager
+    async def _batch_slot(self) -> AsyncIterator[None]:
+        """Hold one of the simulated server's batch slots, queueing if all are busy."""
+        capacity = self.config.batch_capacity
+        if capacity is None:
+            yield
+            return
+
+        loop = asyncio.get_running_loop()
+        if self._slots is None or self._slots_loop is not loop:
+            self._slots = asyncio.Semaphore(capacity)
+            self._slots_loop = loop
+        slots = self._slots
+
+        if slots.locked():
+            self.queued += 1
+            self.max_queued = max(self.max_queued, self.queued)
+            try:
+                await slots.acquire()
+            finally:
+                self.queued -= 1
+        else:
+            await slots.acquire()
+        try:
+            yield
+        finally:
+            slots.release()
+
     async def count_tokens(self, text: str) -> int:
-        """Approximate token count (~4 chars per token)."""
-        return len(text) // 4
+        """Estimate the token count from per-script character ratios."""
+        return estimate_tokens(text)
 
     async def health_check(self) -> bool:
         """Mock is always healthy."""
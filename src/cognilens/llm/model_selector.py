@@ -7,9 +7,12 @@ from enum import Enum
 from typing import TYPE_CHECKING, Optional
 
 from cognilens.config import LLMConfig
-from cognilens.core.types import CompressionStyle
+from cognilens.taskgraph import task_group
 
 if TYPE_CHECKING:
+    # Type-only import: importing cognilens.core here would be circular
+    from cognilens.core.types import CompressionStyle
+
     from .lexora_client import LexoraClient
 
 
@@ -19,6 +22,7 @@ class SelectionMethod(str, Enum):
     CLASSIFICATION = "classification"
     CAPABILITY_MATCH = "capability_match"
     HEURISTIC = "heuristic"
+    CONTEXT_FIT = "context_fit"
     DEFAULT = "default"
 
 
@@ -30,6 +34,11 @@ class ModelSelection:
     method: SelectionMethod
     capability: Optional[str] = None
     confidence: float = 1.0
+    # Context window of the selected model, when known
+    context_length: Optional[int] = None
+    # False when no capable model's window fits the request; callers should
+    # fall back to chunked processing within context_length
+    fits: bool = True
 
 
 # Heuristic patterns for task classification
@@ -72,6 +81,9 @@ class ModelSelector:
     2. Capability matching from cached model data
     3. Content-based heuristics
     4. Default model fallback
+
+    When the request size is known, the result is then checked against the
+    model's context window and re-routed to a capable model that fits.
     """
 
     def __init__(self, lexora_client: LexoraClient, config: LLMConfig) -> None:
@@ -94,12 +106,18 @@ class ModelSelector:
         self,
         style: CompressionStyle,
         content_preview: Optional[str] = None,
+        required_tokens: Optional[int] = None,
     ) -> ModelSelection:
         """Select the optimal model for a compression task.
 
+        Classification, the capabilities fetch and the token estimate are
+        independent, so they run concurrently; only the context-fit check
+        waits for all of them.
+
         Args:
             style: The compression style being used
             content_preview: Optional preview of content for classification
+            required_tokens: Optional estimate of prompt plus output tokens
 
         Returns:
             ModelSelection with selected model and metadata
@@ -113,6 +131,31 @@ class ModelSelector:
         # Get capability needed for this style
         capability = self._get_capability_for_style(style)
 
+        async with task_group() as group:
+            by_task = group.create_task(self._select_by_task(capability, content_preview))
+            if self._smart_config.classify_tasks and content_preview:
+                # Warm the capabilities cache while the classify call is in flight
+                group.create_task(self.client.get_model_capabilities())
+
+        selection = by_task.result()
+        if required_tokens is not None:
+            selection = await self._ensure_context_fit(selection, capability, required_tokens)
+        return selection
+
+    async def _select_by_task(
+        self,
+        capability: str,
+        content_preview: Optional[str],
+    ) -> ModelSelection:
+        """Run the fallback chain to pick a model for the task type.
+
+        Args:
+            capability: Capability required by the compression style
+            content_preview: Optional preview of content for classification
+
+        Returns:
+            ModelSelection with selected model and metadata
+        """
         # 1. Try classification API if enabled and we have content
         if self._smart_config.classify_tasks and content_preview:
             selection = await self._try_classification(content_preview)
@@ -145,6 +188,58 @@ class ModelSelector:
             confidence=0.0,
         )
 
+    async def _ensure_context_fit(
+        self,
+        selection: ModelSelection,
+        capability: str,
+        required_tokens: int,
+    ) -> ModelSelection:
+        """Re-route a selection to a model whose context window fits the request.
+
+        Args:
+            selection: Selection from the task-based fallback chain
+            capability: Capability required by the compression style
+            required_tokens: Estimated prompt plus output tokens
+
+        Returns:
+            The original selection if it fits (or windows are unknown), the
+            smallest capable model that fits, or the largest capable model
+            marked ``fits=False`` when nothing fits
+        """
+        cache = await self.client.get_model_capabilities()
+        if cache is None:
+            return selection
+
+        wanted = selection.capability or capability
+        current = cache.get(selection.model_id)
+        if current is not None and current.context_length >= required_tokens:
+            selection.context_length = current.context_length
+            return selection
+
+        best = cache.find_best_fit(wanted, required_tokens)
+        if best is None and wanted != capability:
+            best = cache.find_best_fit(capability, required_tokens)
+        if best is not None:
+            return ModelSelection(
+                model_id=best.model_id,
+                method=SelectionMethod.CONTEXT_FIT,
+                capability=wanted,
+                confidence=selection.confidence,
+                context_length=best.context_length,
+            )
+
+        largest = cache.largest_context(wanted) or cache.largest_context(capability) or current
+        if largest is None:
+            return selection
+        return ModelSelection(
+            model_id=largest.model_id,
+            method=SelectionMethod.CONTEXT_FIT,
+            capability=wanted,
+            confidence=selection.confidence,
+            context_length=largest.context_length,
+            fits=False,
+        )
+
     def _get_capability_for_style(self, style: CompressionStyle) -> str:
         """Map compression style to required capability.
 
@@ -157,9 +252,7 @@ class ModelSelector:
         style_key = style.value
         return self._smart_config.strategy_capability_map.get(style_key, "general")
 
-    async def _try_classification(
-        self, content_preview: str
-    ) -> Optional[ModelSelection]:
+    async def _try_classification(self, content_preview: str) -> Optional[ModelSelection]:
         """Try to classify task using Lexora API.
 
         Args:
@@ -193,9 +286,7 @@ class ModelSelector:
 
         return None
 
-    async def _try_capability_match(
-        self, capability: str
-    ) -> Optional[ModelSelection]:
+    async def _try_capability_match(self, capability: str) -> Optional[ModelSelection]:
         """Try to find model with required capability from cache.
 
         Args:
@@ -2,33 +2,98 @@
 
 from __future__ import annotations
 
-from typing import Optional
-
-import tiktoken
-from openai import AsyncOpenAI
+import os
+from typing import TYPE_CHECKING, Any, Optional
 
 from cognilens.config import LLMConfig
 
 from .base import LLMClient, LLMResponse
+from .concurrency import ConcurrencyLimits
+from .endpoints import EndpointPool, affinity_key
+from .rate_limit import RateLimiter
+
+if TYPE_CHECKING:
+    import tiktoken
+
+DEFAULT_OPENAI_URL = "https://api.openai.com/v1"
+
+# Tokens the chat format adds per message and per reply
+_TOKENS_PER_MESSAGE = 3
+_TOKENS_PER_REPLY = 3
 
 
 class OpenAIClient(LLMClient):
-    """OpenAI API client implementation."""
+    """OpenAI API client implementation.
+
+    When several endpoints are configured, requests are balanced across them
+    through an EndpointPool with circuit breaking and background health checks.
+
+    With ``llm.rate_limit`` enabled, each call is charged one request and its
+    prompt tokens plus ``max_tokens`` against per-model token buckets before
+    it is sent, waiting until it fits. The buckets are resynced from the
+    x-ratelimit-* headers of every response.
+
+    The openai SDK is imported when the client is created and the tiktoken
+    encoding is loaded on the first token count, so neither slows down server
+    start-up for other providers.
+    """
 
     def __init__(self, config: LLMConfig) -> None:
+        from openai import AsyncOpenAI
+
         self.config = config
-        self._client = AsyncOpenAI(
-            api_key=config.api_key,
-            base_url=config.base_url,
-            timeout=config.timeout,
-            max_retries=config.max_retries,
+        self._pool = EndpointPool(
+            config.endpoint_urls(default=os.environ.get("OPENAI_BASE_URL", DEFAULT_OPENAI_URL)),
+            config.load_balancing,
+            probe=self._probe,
+            limits=ConcurrencyLimits(config.concurrency) if config.concurrency.enabled else None,
         )
+        self._clients = {
+            endpoint.url: AsyncOpenAI(
+                api_key=config.api_key,
+                base_url=endpoint.url,
+                timeout=config.timeout,
+                # Retries are handled by ResilientLLMClient when resilience is enabled
+                max_retries=0 if config.resilience.enabled else config.max_retries,
+            )
+            for endpoint in self._pool.endpoints
+        }
+        self._client = self._clients[self._pool.endpoints[0].url]
         self._model = config.model
-        try:
-            self._encoding = tiktoken.encoding_for_model(config.model)
-        except KeyError:
-            # Fallback for unknown models
-            self._encoding = tiktoken.get_encoding("cl100k_base")
+        self._tiktoken_encoding: Optional[tiktoken.Encoding] = None
+        self._rate_limiters: dict[str, RateLimiter] = {}
+
+    def rate_limiter(self, model: Optional[str] = None) -> Optional[RateLimiter]:
+        """Rate limiter for a model, or None if rate limiting is disabled."""
+        config = self.config.rate_limit
+        if not config.enabled:
+            return None
+        model = model or self._model
+        if model not in self._rate_limiters:
+            self._rate_limiters[model] = RateLimiter(
+                config.requests_per_minute, config.tokens_per_minute
+            )
+        return self._rate_limiters[model]
+
+    async def _prompt_tokens(self, messages: list[dict[str, str]]) -> int:
+        """Tokens the messages use as a chat prompt."""
+        total = _TOKENS_PER_REPLY
+        for message in messages:
+            total += _TOKENS_PER_MESSAGE + await self.count_tokens(message["content"])
+        return total
+
+    @property
+    def _encoding(self) -> tiktoken.Encoding:
+        """Tokenizer for the configured model, loaded on first use."""
+        if self._tiktoken_encoding is None:
+            import tiktoken
+
+            try:
+                self._tiktoken_encoding = tiktoken.encoding_for_model(self._model)
+            except KeyError:
+                # Fallback for unknown models
+                self._tiktoken_encoding = tiktoken.get_encoding("cl100k_base")
+        return self._tiktoken_encoding
 
     async def generate(
         self,
@@ -46,12 +111,34 @@ class OpenAIClient(LLMClient):
             messages.append({"role": "system", "content": system_prompt})
         messages.append({"role": "user", "content": prompt})
 
-        response = await self._client.chat.completions.create(
-            model=use_model,
-            messages=messages,  # type: ignore
-            max_tokens=max_tokens,
-            temperature=temperature,
+        limiter = self.rate_limiter(use_model)
+        if limiter is not None:
+            await limiter.acquire(await self._prompt_tokens(messages) + (max_tokens or 0))
+
+        affinity = affinity_key(
+            prompt, system_prompt, self.config.load_balancing.affinity_prefix_chars
         )
+        request: dict[str, Any] = {
+            "model": use_model,
+            "messages": messages,
+            "max_tokens": max_tokens,
+            "temperature": temperature,
+        }
+        async with self._pool.acquire(affinity, use_model) as endpoint:
+            completions = self._clients[endpoint.url].chat.completions
+            if limiter is None or not self.config.rate_limit.sync_from_headers:
+                response = await completions.create(**request)
+            else:
+                try:
+                    raw = await completions.with_raw_response.create(**request)
+                except Exception as exc:
+                    # Throttling responses carry the headers too
+                    headers = getattr(getattr(exc, "response", None), "headers", None)
+                    if headers is not None:
+                        limiter.sync(headers)
+                    raise
+                limiter.sync(raw.headers)
+                response = raw.parse()
 
         choice = response.choices[0]
         return LLMResponse(
@@ -65,10 +152,32 @@ class OpenAIClient(LLMClient):
         """Count tokens using tiktoken."""
         return len(self._encoding.encode(text))
 
+    @property
+    def tokenizer_name(self) -> str:
+        return f"tiktoken:{self._encoding.name}"
+
+    async def truncate_to_tokens(self, text: str, max_tokens: int) -> str:
+        """Truncate text to exactly ``max_tokens`` tokens using tiktoken."""
+        if max_tokens <= 0:
+            return ""
+        token_ids = self._encoding.encode(text)
+        if len(token_ids) <= max_tokens:
+            return text
+        return self._encoding.decode(token_ids[:max_tokens])
+
+    @property
+    def pool(self) -> EndpointPool:
+        """Endpoint pool used to route requests."""
+        return self._pool
+
     async def health_check(self) -> bool:
-        """Check if OpenAI API is accessible."""
+        """Check if any OpenAI-compatible endpoint is accessible."""
+        return await self._pool.check_health()
+
+    async def _probe(self, url: str) -> bool:
+        """Probe a single endpoint by listing its models."""
         try:
-            await self._client.models.list()
+            await self._clients[url].models.list()
             return True
         except Exception:
             return False
@@ -0,0 +1,156 @@
+"""Client-side token-bucket rate limiting for request and token quotas."""
+
+from __future__ import annotations
+
+import asyncio
+import re
+import time
+from collections.abc import Mapping
+from typing import Optional
+
+# One component of a reset duration such as "6m0s", "1.5s" or "20ms"
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+_DURATION_UNITS = {"h": 3600.0, "m": 60.0, "s": 1.0, "ms": 0.001}
+
+
+def parse_reset(value: Optional[str]) -> Optional[float]:
+    """Parse an x-ratelimit-reset-* header value into seconds.
+
+    Accepts durations such as ``"1s"``, ``"6m0s"`` or ``"20ms"`` and plain
+    numbers of seconds. Returns None if the value cannot be parsed.
+    """
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    parts = _DURATION_PART.findall(value)
+    if not parts or "".join(n + u for n, u in parts) != value:
+        return None
+    return sum(float(number) * _DURATION_UNITS[unit] for number, unit in parts)
+
+
+class TokenBucket:
+    """A bucket of ``capacity`` units refilled continuously at ``rate`` units per second."""
+
+    def __init__(self, capacity: float, rate: float) -> None:
+        self.capacity = capacity
+        self.rate = rate
+        self._tokens = capacity
+        self._updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    @property
+    def tokens(self) -> float:
+        """Units currently available."""
+        self._refill()
+        return self._tokens
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until ``amount`` units are available.
+
+        Amounts above the capacity wait for a full bucket.
+        """
+        missing = min(amount, self.capacity) - self.tokens
+        return max(missing, 0.0) / self.rate if self.rate > 0 else 0.0
+
+    def take(self, amount: float) -> None:
+        """Withdraw ``amount`` units (the balance may go negative for oversized amounts)."""
+        self._refill()
+        self._tokens -= amount
+
+    def sync(self, limit: Optional[float], remaining: float, reset: Optional[float]) -> None:
+        """Align the bucket with the server's view of the quota.
+
+        Args:
+            limit: Quota per minute, becoming the capacity
+            remaining: Units the server reports as left
+            reset: Seconds until the server's quota is full again
+        """
+        if limit is not None and limit > 0:
+            self.capacity = limit
+            self.rate = limit / 60
+            if reset and remaining < limit:
+                self.rate = (limit - remaining) / reset
+        self._tokens = min(remaining, self.capacity)
+        self._updated = time.monotonic()
+
+
+class RateLimiter:
+    """Request and token buckets for one model's rate limits.
+
+    Callers wait in arrival order until both buckets hold their charge, so a
+    large request is not starved by a stream of smaller ones. A bucket whose
+    limit is unknown admits everything until rate-limit headers reveal it.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: Optional[int] = None,
+        tokens_per_minute: Optional[int] = None,
+    ) -> None:
+        self.buckets: dict[str, Optional[TokenBucket]] = {
+            "requests": self._bucket(requests_per_minute),
+            "tokens": self._bucket(tokens_per_minute),
+        }
+        self._lock: Optional[asyncio.Lock] = None
+        self._lock_loop: Optional[asyncio.AbstractEventLoop] = None
+        self.waiting = 0
+
+    @staticmethod
+    def _bucket(per_minute: Optional[int]) -> Optional[TokenBucket]:
+        return TokenBucket(per_minute, per_minute / 60) if per_minute else None
+
+    def _queue(self) -> asyncio.Lock:
+        loop = asyncio.get_running_loop()
+        if self._lock is None or self._lock_loop is not loop:
+            self._lock = asyncio.Lock()
+            self._lock_loop = loop
+        return self._lock
+
+    async def acquire(self, tokens: int) -> None:
+        """Wait until one request and ``tokens`` tokens fit, then charge them."""
+        charges = {"requests": 1, "tokens": tokens}
+        self.waiting += 1
+        try:
+            async with self._queue():
+                while True:
+                    delay = max(
+                        bucket.wait_time(charges[kind]) if bucket is not None else 0.0
+                        for kind, bucket in self.buckets.items()
+                    )
+                    if delay <= 0:
+                        break
+                    await asyncio.sleep(delay)
+                for kind, bucket in self.buckets.items():
+                    if bucket is not None:
+                        bucket.take(charges[kind])
+        finally:
+            self.waiting -= 1
+
+    def sync(self, headers: Mapping[str, str]) -> None:
+        """Resync the buckets from x-ratelimit-* response headers."""
+        for kind, bucket in self.buckets.items():
+            remaining = _number(headers.get(f"x-ratelimit-remaining-{kind}"))
+            if remaining is None:
+                continue
+            limit = _number(headers.get(f"x-ratelimit-limit-{kind}"))
+            reset = parse_reset(headers.get(f"x-ratelimit-reset-{kind}"))
+            if bucket is None:
+                if limit is None:
+                    continue
+                bucket = self.buckets[kind] = TokenBucket(limit, limit / 60)
+            bucket.sync(limit, remaining, reset)
+
+
+def _number(value: Optional[str]) -> Optional[float]:
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
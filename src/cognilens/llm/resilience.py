@@ -0,0 +1,240 @@
+"""Retries with backoff, retry budgets and request hedging for LLM clients."""
+
+from __future__ import annotations
+
+import asyncio
+import random
+import time
+from collections import deque
+from typing import Any, Optional
+
+from cognilens.config import ResilienceConfig
+
+from .base import LLMClient, LLMClientWrapper, LLMResponse
+
+# HTTP status codes worth retrying (timeouts, throttling, transient server errors)
+RETRYABLE_STATUS_CODES = frozenset({408, 409, 425, 429, 500, 502, 503, 504})
+
+# Transport-level error classes from httpx / openai, matched by name so that
+# neither SDK has to be imported here
+_RETRYABLE_ERROR_NAMES = frozenset({"TransportError", "APIConnectionError", "APITimeoutError"})
+
+# Jitter source when the caller does not pass its own generator
+_DEFAULT_RNG = random.Random()
+
+
+def _status_code(exc: BaseException) -> Optional[int]:
+    """Extract an HTTP status code from an SDK exception, if it carries one."""
+    status = getattr(exc, "status_code", None)
+    if status is None:
+        status = getattr(getattr(exc, "response", None), "status_code", None)
+    return status if isinstance(status, int) else None
+
+
+def is_retryable(exc: BaseException) -> bool:
+    """Check whether a failed generate call may succeed if repeated."""
+    if isinstance(exc, (TimeoutError, ConnectionError)):
+        return True
+    status = _status_code(exc)
+    if status is not None:
+        return status in RETRYABLE_STATUS_CODES
+    return any(cls.__name__ in _RETRYABLE_ERROR_NAMES for cls in type(exc).__mro__)
+
+
+def retry_after_seconds(exc: BaseException) -> Optional[float]:
+    """Read a numeric Retry-After header from an SDK exception, if present."""
+    headers = getattr(getattr(exc, "response", None), "headers", None)
+    if not headers:
+        return None
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff_delay(
+    attempt: int,
+    base: float,
+    cap: float,
+    rng: Optional[random.Random] = None,
+) -> float:
+    """Exponential backoff with full jitter for the given (0-based) retry attempt."""
+    return (rng or _DEFAULT_RNG).uniform(0.0, min(cap, base * (2**attempt)))
+
+
+class RetryBudget:
+    """Caps retries to a fraction of recent request traffic.
+
+    Every request deposits ``ratio`` retry credits and every retry (or hedge)
+    withdraws one, over a sliding window. A small per-second allowance lets
+    low-traffic clients still retry occasionally.
+    """
+
+    def __init__(
+        self,
+        ratio: float = 0.1,
+        min_per_second: float = 1.0,
+        window_seconds: float = 10.0,
+    ) -> None:
+        self.ratio = ratio
+        self.min_per_second = min_per_second
+        self.window_seconds = window_seconds
+        self._requests: deque[float] = deque()
+        self._retries: deque[float] = deque()
+
+    def _prune(self, now: float) -> None:
+        cutoff = now - self.window_seconds
+        for events in (self._requests, self._retries):
+            while events and events[0] < cutoff:
+                events.popleft()
+
+    def record_request(self) -> None:
+        """Record an original (non-retry) request."""
+        now = time.monotonic()
+        self._prune(now)
+        self._requests.append(now)
+
+    def try_withdraw(self) -> bool:
+        """Reserve budget for one retry; returns False if the budget is exhausted."""
+        now = time.monotonic()
+        self._prune(now)
+        allowed = self.min_per_second * self.window_seconds + self.ratio * len(self._requests)
+        if len(self._retries) + 1 > allowed:
+            return False
+        self._retries.append(now)
+        return True
+
+
+class LatencyTracker:
+    """Rolling window of observed generate latencies."""
+
+    def __init__(self, size: int = 256) -> None:
+        self._samples: deque[float] = deque(maxlen=size)
+
+    def record(self, seconds: float) -> None:
+        self._samples.append(seconds)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def percentile(self, q: float) -> Optional[float]:
+        """Return the q-quantile (0.0-1.0) of recorded latencies, or None if empty."""
+        if not self._samples:
+            return None
+        ordered = sorted(self._samples)
+        index = min(len(ordered) - 1, int(q * len(ordered)))
+        return ordered[index]
+
+
+class ResilientLLMClient(LLMClientWrapper):
+    """Adds retries, a retry budget and optional hedging around ``generate``.
+
+    - Retryable failures are repeated up to ``max_retries`` times with
+      exponential backoff and full jitter, as long as the retry budget allows.
+    - With hedging enabled, a duplicate request is fired once the primary has
+      been outstanding longer than the configured latency percentile; the first
+      successful answer wins and the other request is cancelled.
+    """
+
+    def __init__(
+        self,
+        inner: LLMClient,
+        config: ResilienceConfig,
+        max_retries: int = 3,
+        rng: Optional[random.Random] = None,
+    ) -> None:
+        super().__init__(inner)
+        self.config = config
+        self.max_retries = max_retries
+        self.budget = RetryBudget(
+            ratio=config.retry_budget_ratio,
+            min_per_second=config.retry_budget_min_per_second,
+            window_seconds=config.retry_budget_window_seconds,
+        )
+        self.latencies = LatencyTracker()
+        self._rng = rng or random.Random()
+
+    async def generate(
+        self,
+        prompt: str,
+        *,
+        system_prompt: Optional[str] = None,
+        max_tokens: Optional[int] = None,
+        temperature: float = 0.7,
+        model: Optional[str] = None,
+    ) -> LLMResponse:
+        """Generate text, retrying and hedging according to the configuration."""
+        kwargs: dict[str, Any] = {
+            "system_prompt": system_prompt,
+            "max_tokens": max_tokens,
+            "temperature": temperature,
+            "model": model,
+        }
+        self.budget.record_request()
+
+        attempt = 0
+        while True:
+            try:
+                return await self._attempt(prompt, kwargs)
+            except Exception as exc:
+                if (
+                    attempt >= self.max_retries
+                    or not is_retryable(exc)
+                    or not self.budget.try_withdraw()
+                ):
+                    raise
+                delay = backoff_delay(
+                    attempt,
+                    self.config.backoff_base_seconds,
+                    self.config.backoff_max_seconds,
+                    self._rng,
+                )
+                server_delay = retry_after_seconds(exc)
+                if server_delay is not None:
+                    delay = max(delay, min(server_delay, self.config.backoff_max_seconds))
+                await asyncio.sleep(delay)
+                attempt += 1
+
+    def hedge_delay(self) -> float:
+        """Seconds to wait on the primary request before firing a hedge."""
+        if len(self.latencies) < self.config.hedge_min_samples:
+            return self.config.hedge_initial_delay_seconds
+        observed = self.latencies.percentile(self.config.hedge_percentile)
+        return observed if observed is not None else self.config.hedge_initial_delay_seconds
+
+    async def _attempt(self, prompt: str, kwargs: dict[str, Any]) -> LLMResponse:
+        """Run a single (possibly hedged) attempt and record its latency."""
+        started = time.monotonic()
+        if self.config.hedging_enabled:
+            response = await self._hedged(prompt, kwargs)
+        else:
+            response = await self.inner.generate(prompt, **kwargs)
+        self.latencies.record(time.monotonic() - started)
+        return response
+
+    async def _hedged(self, prompt: str, kwargs: dict[str, Any]) -> LLMResponse:
+        """Race the primary request against a delayed duplicate."""
+        primary = asyncio.ensure_future(self.inner.generate(prompt, **kwargs))
+        pending: set[asyncio.Future[LLMResponse]] = {primary}
+        try:
+            done, _ = await asyncio.wait(pending, timeout=self.hedge_delay())
+            if done or not self.budget.try_withdraw():
+                return await primary
+
+            hedge_kwargs = dict(kwargs)
+            if self.config.hedge_model:
+                hedge_kwargs["model"] = self.config.hedge_model
+            pending.add(asyncio.ensure_future(self.inner.generate(prompt, **hedge_kwargs)))
+
+            error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+            assert error is not None
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
@@ -0,0 +1,181 @@
+"""Fast token estimates for text without running a tokenizer.
+
+Characters are classified by script (Latin letters, digits, whitespace, ASCII
+punctuation, kana, Han, Hangul, CJK punctuation, everything else) and each
+class is weighted by its tokens-per-character ratio. The ratios are fitted
+against a real tokenizer (``cognilens-bench calibrate-tokens``) and shipped
+as ``token_ratios.json``. Unlike a flat ``len(text) // 4``, the estimate does
+not undercount Japanese, Chinese or Korean text several times over.
+"""
+
+from __future__ import annotations
+
+import bisect
+import json
+import re
+from collections.abc import Iterable
+from functools import cache
+from importlib import resources
+from typing import Optional, cast
+
+SCRIPTS = (
+    "latin",
+    "digit",
+    "space",
+    "punct",
+    "kana",
+    "han",
+    "hangul",
+    "cjk_punct",
+    "other",
+)
+_INDEX = {script: i for i, script in enumerate(SCRIPTS)}
+_OTHER = _INDEX["other"]
+
+# Non-ASCII code point ranges, as (first, last, script)
+_RANGES = sorted(
+    [
+        (0x1100, 0x11FF, "hangul"),
+        (0x3000, 0x303F, "cjk_punct"),
+        (0x3040, 0x30FF, "kana"),
+        (0x3130, 0x318F, "hangul"),
+        (0x31F0, 0x31FF, "kana"),
+        (0x3400, 0x4DBF, "han"),
+        (0x4E00, 0x9FFF, "han"),
+        (0xAC00, 0xD7AF, "hangul"),
+        (0xF900, 0xFAFF, "han"),
+        (0xFF00, 0xFF65, "cjk_punct"),
+        (0xFF66, 0xFF9F, "kana"),
+        (0xFFE0, 0xFFEF, "cjk_punct"),
+        (0x20000, 0x2FA1F, "han"),
+    ]
+)
+_RANGE_STARTS = [first for first, _, _ in _RANGES]
+
+
+def _ascii_script(code: int) -> int:
+    char = chr(code)
+    if char.isalpha():
+        return _INDEX["latin"]
+    if char.isdigit():
+        return _INDEX["digit"]
+    if char in " \t\n\r\f\v":
+        return _INDEX["space"]
+    if 33 <= code <= 126:
+        return _INDEX["punct"]
+    return _OTHER
+
+
+_ASCII = [_ascii_script(code) for code in range(128)]
+
+# Whole-string counting for long texts: one C-level regex pass per script
+# instead of a Python-level step per character
+_PATTERNS: dict[str, re.Pattern[str]] = {
+    "latin": re.compile(r"[A-Za-z]"),
+    "digit": re.compile(r"[0-9]"),
+    "space": re.compile(r"[ \t\n\r\f\v]"),
+    "punct": re.compile(r"[!-/:-@\[-`{-~]"),
+}
+for _script in ("kana", "han", "hangul", "cjk_punct"):
+    _PATTERNS[_script] = re.compile(
+        "[" + "".join(f"{chr(a)}-{chr(b)}" for a, b, s in _RANGES if s == _script) + "]"
+    )
+
+# Below this length a single classifying pass is cheaper than the regex passes
+_VECTORIZE_CHARS = 512
+
+
+def script_counts(text: str) -> list[int]:
+    """Count the characters of each script in ``text``, in ``SCRIPTS`` order."""
+    counts = [0] * len(SCRIPTS)
+    if len(text) >= _VECTORIZE_CHARS:
+        scripts = SCRIPTS[:4] if text.isascii() else SCRIPTS[:-1]
+        for script in scripts:
+            counts[_INDEX[script]] = _PATTERNS[script].subn("", text)[1]
+        counts[_OTHER] = len(text) - sum(counts)
+        return counts
+
+    for char in text:
+        code = ord(char)
+        if code < 128:
+            counts[_ASCII[code]] += 1
+            continue
+        i = bisect.bisect_right(_RANGE_STARTS, code) - 1
+        if i >= 0 and code <= _RANGES[i][1]:
+            counts[_INDEX[_RANGES[i][2]]] += 1
+        else:
+            counts[_OTHER] += 1
+    return counts
+
+
+class TokenEstimator:
+    """Estimates token counts from per-script tokens-per-character ratios."""
+
+    def __init__(self, ratios: dict[str, float]) -> None:
+        missing = set(SCRIPTS) - set(ratios)
+        if missing:
+            raise ValueError(f"Token ratios missing for scripts: {sorted(missing)}")
+        self.ratios = dict(ratios)
+        self._weights = [ratios[script] for script in SCRIPTS]
+
+    def estimate(self, text: str) -> int:
+        """Estimated token count of ``text`` (at least 1 for non-empty text)."""
+        if not text:
+            return 0
+        counts = script_counts(text)
+        return max(round(sum(c * w for c, w in zip(counts, self._weights))), 1)
+
+
+def load_token_ratios(tokenizer: Optional[str] = None) -> dict[str, float]:
+    """Load the shipped ratio table for a tokenizer (default: the calibrated default)."""
+    data = json.loads(resources.files(__package__).joinpath("token_ratios.json").read_text())
+    name = tokenizer or data["default"]
+    try:
+        return cast(dict[str, float], data["tables"][name])
+    except KeyError:
+        raise ValueError(f"No token ratios calibrated for {name}") from None
+
+
+@cache
+def get_token_estimator(tokenizer: Optional[str] = None) -> TokenEstimator:
+    """Shared estimator for a tokenizer's calibrated ratios."""
+    return TokenEstimator(load_token_ratios(tokenizer))
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the token count of ``text`` with the default calibration."""
+    return get_token_estimator().estimate(text)
+
+
+def fit_token_ratios(
+    samples: Iterable[tuple[str, int]],
+    initial: Optional[dict[str, float]] = None,
+    iterations: int = 500,
+) -> dict[str, float]:
+    """Fit per-script ratios to exact token counts by non-negative least squares.
+
+    Args:
+        samples: Texts with their exact token counts
+        initial: Starting ratios; scripts absent from the samples keep these
+        iterations: Coordinate descent sweeps
+
+    Returns:
+        Ratios by script, rounded to four decimals
+    """
+    rows = [(script_counts(text), tokens) for text, tokens in samples]
+    weights = [(initial or load_token_ratios())[script] for script in SCRIPTS]
+    residuals = [tokens - sum(c * w for c, w in zip(counts, weights)) for counts, tokens in rows]
+
+    for _ in range(iterations):
+        for j in range(len(SCRIPTS)):
+            norm = sum(counts[j] ** 2 for counts, _ in rows)
+            if not norm:
+                continue
+            step = sum(counts[j] * r for (counts, _), r in zip(rows, residuals)) / norm
+            updated = max(weights[j] + step, 0.0)
+            delta = updated - weights[j]
+            if delta:
+                weights[j] = updated
+                residuals = [r - counts[j] * delta for (counts, _), r in zip(rows, residuals)]
+
+    return {script: round(weight, 4) for script, weight in zip(SCRIPTS, weights)}
@@ -1,10 +1,12 @@
 """Prompt templates and builders."""
 
+from .budget import COMPILED_TEMPLATES, BudgetedPrompt, CompiledTemplate, PromptBudget
 from .builder import PromptBuilder
 from .templates import (
     COMPRESS_CONTEXT_TEMPLATE,
     EXTRACT_ESSENCE_TEMPLATE,
     PROGRESSIVE_COMPRESS_TEMPLATE,
+    REPAIR_TEMPLATE,
     STYLE_INSTRUCTIONS,
     SUMMARIZE_DIFF_TEMPLATE,
     SUMMARIZE_TEMPLATE,
@@ -14,6 +16,10 @@ from .templates import (
 
 __all__ = [
     "PromptBuilder",
+    "PromptBudget",
+    "BudgetedPrompt",
+    "CompiledTemplate",
+    "COMPILED_TEMPLATES",
     "SYSTEM_PROMPT",
     "SUMMARIZE_TEMPLATE",
     "COMPRESS_CONTEXT_TEMPLATE",
@@ -21,5 +27,6 @@ __all__ = [
     "UNIFY_SUMMARIES_TEMPLATE",
     "SUMMARIZE_DIFF_TEMPLATE",
     "PROGRESSIVE_COMPRESS_TEMPLATE",
+    "REPAIR_TEMPLATE",
     "STYLE_INSTRUCTIONS",
 ]
@@ -0,0 +1,167 @@
+"""Token-budget-aware prompt assembly with pre-counted template tokens."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from string import Formatter
+from typing import TYPE_CHECKING, Optional
+
+from .templates import (
+    COMPRESS_CONTEXT_TEMPLATE,
+    EXTRACT_ESSENCE_TEMPLATE,
+    PROGRESSIVE_COMPRESS_TEMPLATE,
+    REPAIR_TEMPLATE,
+    SUMMARIZE_DIFF_TEMPLATE,
+    SUMMARIZE_PATCH_FILE_TEMPLATE,
+    SUMMARIZE_PATCH_TEMPLATE,
+    SUMMARIZE_TEMPLATE,
+    SYSTEM_PROMPT,
+    UNIFY_SUMMARIES_TEMPLATE,
+)
+
+if TYPE_CHECKING:
+    from cognilens.llm.base import LLMClient
+
+
+class CompiledTemplate:
+    """A prompt template parsed once into static text and slots.
+
+    The token count of the static text is cached per tokenizer, so the size of
+    a rendered prompt is the static count plus the counts of its slot values.
+    Because BPE merges rarely span a slot boundary, the sum is a close (and
+    usually slightly high) estimate of the rendered prompt's token count.
+    """
+
+    def __init__(self, name: str, template: str) -> None:
+        self.name = name
+        self.template = template
+        parsed = list(Formatter().parse(template))
+        self.static_text = "".join(literal for literal, _, _, _ in parsed)
+        self.slots = tuple(field for _, field, _, _ in parsed if field is not None)
+        self._static_tokens: dict[str, int] = {}
+
+    def render(self, **values: str | float) -> str:
+        """Fill the template slots."""
+        return self.template.format(**values)
+
+    async def static_tokens(self, llm: LLMClient) -> int:
+        """Token count of the static text for the client's tokenizer (cached)."""
+        key = llm.tokenizer_name
+        if key not in self._static_tokens:
+            self._static_tokens[key] = await llm.count_tokens(self.static_text)
+        return self._static_tokens[key]
+
+
+# Templates are compiled once at import time
+COMPILED_TEMPLATES: dict[str, CompiledTemplate] = {
+    name: CompiledTemplate(name, template)
+    for name, template in {
+        "system": SYSTEM_PROMPT,
+        "summarize": SUMMARIZE_TEMPLATE,
+        "compress_context": COMPRESS_CONTEXT_TEMPLATE,
+        "extract_essence": EXTRACT_ESSENCE_TEMPLATE,
+        "unify_summaries": UNIFY_SUMMARIES_TEMPLATE,
+        "summarize_diff": SUMMARIZE_DIFF_TEMPLATE,
+        "summarize_patch_file": SUMMARIZE_PATCH_FILE_TEMPLATE,
+        "summarize_patch": SUMMARIZE_PATCH_TEMPLATE,
+        "progressive_compress": PROGRESSIVE_COMPRESS_TEMPLATE,
+        "repair": REPAIR_TEMPLATE,
+    }.items()
+}
+
+
+@dataclass
+class BudgetedPrompt:
+    """A rendered prompt with its token accounting."""
+
+    prompt: str
+    prompt_tokens: int  # Template + slot tokens, including the system prompt
+    content_tokens: int  # Tokens of the budgeted slot's value
+    trimmed: bool = False
+
+
+class PromptBudget:
+    """Assembles prompts that fit a model's context window.
+
+    The content slot (``text``, ``documents``, ...) is trimmed so that
+    system prompt + template + content + ``max_tokens`` fits ``context_length``.
+    """
+
+    # Slot values up to this length have their token counts memoized
+    SMALL_VALUE_CHARS = 256
+
+    def __init__(self, llm: LLMClient) -> None:
+        self.llm = llm
+        self._small_counts: dict[tuple[str, str], int] = {}
+
+    async def _count_small(self, text: str) -> int:
+        """Count tokens of short slot values (instructions, titles), memoized."""
+        if len(text) > self.SMALL_VALUE_CHARS:
+            return await self.llm.count_tokens(text)
+        key = (self.llm.tokenizer_name, text)
+        if key not in self._small_counts:
+            self._small_counts[key] = await self.llm.count_tokens(text)
+        return self._small_counts[key]
+
+    async def overhead_tokens(self, template: str, values: dict[str, str | float]) -> int:
+        """Tokens of the system prompt, static template text and non-content slots.
+
+        Args:
+            template: Name in COMPILED_TEMPLATES
+            values: Slot values excluding the content slot
+        """
+        compiled = COMPILED_TEMPLATES[template]
+        total = await compiled.static_tokens(self.llm)
+        total += await COMPILED_TEMPLATES["system"].static_tokens(self.llm)
+        for value in values.values():
+            text = str(value)
+            if text:
+                total += await self._count_small(text)
+        return total
+
+    async def fit(
+        self,
+        template: str,
+        values: dict[str, str | float],
+        *,
+        slot: str,
+        context_length: int,
+        max_tokens: int,
+        content_tokens: Optional[int] = None,
+    ) -> BudgetedPrompt:
+        """Render a prompt, trimming the content slot to fit the window.
+
+        Args:
+            template: Name in COMPILED_TEMPLATES
+            values: Slot values, including the content slot
+            slot: Name of the slot that may be trimmed
+            context_length: Context window of the target model
+            max_tokens: Output tokens to reserve
+            content_tokens: Token count of the content, if already known
+
+        Returns:
+            BudgetedPrompt whose prompt_tokens + max_tokens <= context_length
+        """
+        content = str(values[slot])
+        other = {k: v for k, v in values.items() if k != slot}
+        overhead = await self.overhead_tokens(template, other)
+        budget = context_length - max_tokens - overhead
+        if budget <= 0:
+            raise ValueError(
+                f"Prompt overhead ({overhead}) plus max_tokens ({max_tokens}) "
+                f"exceeds context length ({context_length})"
+            )
+
+        if content_tokens is None:
+            content_tokens = await self.llm.count_tokens(content)
+        trimmed = content_tokens > budget
+        if trimmed:
+            content = await self.llm.truncate_to_tokens(content, budget)
+            content_tokens = await self.llm.count_tokens(content)
+
+        return BudgetedPrompt(
+            prompt=COMPILED_TEMPLATES[template].render(**other, **{slot: content}),
+            prompt_tokens=overhead + content_tokens,
+            content_tokens=content_tokens,
+            trimmed=trimmed,
+        )
@@ -2,6 +2,8 @@
 
 from __future__ import annotations
 
+from typing import Optional
+
 from cognilens.core.types import (
     CompressionStyle,
     DiffInput,
@@ -9,20 +11,16 @@ from cognilens.core.types import (
     ProgressiveStage,
 )
 
-from .templates import (
-    COMPRESS_CONTEXT_TEMPLATE,
-    EXTRACT_ESSENCE_TEMPLATE,
-    PROGRESSIVE_COMPRESS_TEMPLATE,
-    STYLE_INSTRUCTIONS,
-    SUMMARIZE_DIFF_TEMPLATE,
-    SUMMARIZE_TEMPLATE,
-    SYSTEM_PROMPT,
-    UNIFY_SUMMARIES_TEMPLATE,
-)
+from .budget import COMPILED_TEMPLATES
+from .templates import STYLE_INSTRUCTIONS, SYSTEM_PROMPT
 
 
 class PromptBuilder:
-    """Builds prompts from templates."""
+    """Builds prompts from templates.
+
+    Each ``build_*`` method has a matching ``*_values`` method returning the
+    template slot values, for use with PromptBudget.
+    """
 
     @staticmethod
     def get_system_prompt() -> str:
@@ -30,26 +28,51 @@ class PromptBuilder:
         return SYSTEM_PROMPT
 
     @staticmethod
-    def build_summarize_prompt(
+    def summarize_values(
         text: str,
         max_tokens: int,
         style: CompressionStyle,
         preserve: list[str],
-    ) -> str:
-        """Build a summarization prompt."""
+    ) -> dict[str, str | float]:
+        """Slot values for the summarization template."""
         style_instruction = STYLE_INSTRUCTIONS.get(style.value, STYLE_INSTRUCTIONS["concise"])
 
         preserve_instruction = ""
         if preserve:
             preserve_instruction = f"- 以下の要素は必ず保持: {', '.join(preserve)}"
 
-        return SUMMARIZE_TEMPLATE.format(
-            style=style_instruction,
-            max_tokens=max_tokens,
-            preserve_instruction=preserve_instruction,
-            text=text,
+        return {
+            "style": style_instruction,
+            "max_tokens": max_tokens,
+            "preserve_instruction": preserve_instruction,
+            "text": text,
+        }
+
+    @staticmethod
+    def build_summarize_prompt(
+        text: str,
+        max_tokens: int,
+        style: CompressionStyle,
+        preserve: list[str],
+    ) -> str:
+        """Build a summarization prompt."""
+        return COMPILED_TEMPLATES["summarize"].render(
+            **PromptBuilder.summarize_values(text, max_tokens, style, preserve)
         )
 
+    @staticmethod
+    def compress_context_values(
+        full_context: str,
+        task_description: str,
+        target_tokens: int,
+    ) -> dict[str, str | float]:
+        """Slot values for the context compression template."""
+        return {
+            "task_description": task_description,
+            "target_tokens": target_tokens,
+            "full_context": full_context,
+        }
+
     @staticmethod
     def build_compress_context_prompt(
         full_context: str,
@@ -57,73 +80,204 @@ class PromptBuilder:
         target_tokens: int,
     ) -> str:
         """Build a context compression prompt."""
-        return COMPRESS_CONTEXT_TEMPLATE.format(
-            task_description=task_description,
-            target_tokens=target_tokens,
-            full_context=full_context,
+        return COMPILED_TEMPLATES["compress_context"].render(
+            **PromptBuilder.compress_context_values(full_context, task_description, target_tokens)
         )
 
     @staticmethod
-    def build_extract_essence_prompt(
+    def extract_essence_values(
         document: str,
         focus_areas: list[str],
-    ) -> str:
-        """Build an essence extraction prompt."""
+    ) -> dict[str, str | float]:
+        """Slot values for the essence extraction template."""
         focus_text = (
             "\n".join(f"- {area}" for area in focus_areas)
             if focus_areas
             else "- 全般的な本質を抽出"
         )
 
-        return EXTRACT_ESSENCE_TEMPLATE.format(
-            focus_areas=focus_text,
-            document=document,
+        return {
+            "focus_areas": focus_text,
+            "document": document,
+        }
+
+    @staticmethod
+    def build_extract_essence_prompt(
+        document: str,
+        focus_areas: list[str],
+    ) -> str:
+        """Build an essence extraction prompt."""
+        return COMPILED_TEMPLATES["extract_essence"].render(
+            **PromptBuilder.extract_essence_values(document, focus_areas)
         )
 
+    @staticmethod
+    def unify_summaries_values(
+        documents: list[Document],
+        purpose: str,
+    ) -> dict[str, str | float]:
+        """Slot values for the document unification template."""
+        docs_text = "\n\n".join(f"### {doc.title}\n{doc.content}" for doc in documents)
+
+        return {
+            "purpose": purpose,
+            "documents": docs_text,
+        }
+
     @staticmethod
     def build_unify_summaries_prompt(
         documents: list[Document],
         purpose: str,
     ) -> str:
         """Build a document unification prompt."""
-        docs_text = "\n\n".join(f"### {doc.title}\n{doc.content}" for doc in documents)
-
-        return UNIFY_SUMMARIES_TEMPLATE.format(
-            purpose=purpose,
-            documents=docs_text,
+        return COMPILED_TEMPLATES["unify_summaries"].render(
+            **PromptBuilder.unify_summaries_values(documents, purpose)
         )
 
     @staticmethod
-    def build_diff_prompt(
+    def diff_values(
         diff_input: DiffInput,
-    ) -> str:
-        """Build a diff summarization prompt."""
+    ) -> dict[str, str | float]:
+        """Slot values for the diff summarization template."""
         focus_instruction = ""
         if diff_input.focus:
             focus_instruction = f"特に注目: {diff_input.focus}"
 
-        return SUMMARIZE_DIFF_TEMPLATE.format(
-            focus_instruction=focus_instruction,
-            before=diff_input.before,
-            after=diff_input.after,
+        return {
+            "focus_instruction": focus_instruction,
+            "before": diff_input.before,
+            "after": diff_input.after,
+        }
+
+    @staticmethod
+    def build_diff_prompt(
+        diff_input: DiffInput,
+    ) -> str:
+        """Build a diff summarization prompt."""
+        return COMPILED_TEMPLATES["summarize_diff"].render(**PromptBuilder.diff_values(diff_input))
+
+    @staticmethod
+    def patch_file_values(
+        path: str,
+        diff: str,
+        max_tokens: int,
+        focus: Optional[str] = None,
+    ) -> dict[str, str | float]:
+        """Slot values for the per-file patch summarization template."""
+        return {
+            "path": path,
+            "focus_instruction": f"特に注目: {focus}" if focus else "",
+            "max_tokens": max_tokens,
+            "diff": diff,
+        }
+
+    @staticmethod
+    def build_patch_file_prompt(
+        path: str,
+        diff: str,
+        max_tokens: int,
+        focus: Optional[str] = None,
+    ) -> str:
+        """Build a prompt summarizing the diff of one file."""
+        return COMPILED_TEMPLATES["summarize_patch_file"].render(
+            **PromptBuilder.patch_file_values(path, diff, max_tokens, focus)
         )
 
     @staticmethod
-    def build_progressive_compress_prompt(
+    def patch_values(
+        file_summaries: dict[str, str],
+        max_tokens: int,
+        focus: Optional[str] = None,
+        subjects: Optional[list[str]] = None,
+    ) -> dict[str, str | float]:
+        """Slot values for the patch summary template."""
+        commit_subjects = ""
+        if subjects:
+            commit_subjects = "コミット:\n" + "\n".join(f"- {subject}" for subject in subjects)
+
+        return {
+            "focus_instruction": f"特に注目: {focus}" if focus else "",
+            "commit_subjects": commit_subjects,
+            "file_summaries": "\n".join(
+                f"- {path}: {summary}" for path, summary in file_summaries.items()
+            ),
+            "max_tokens": max_tokens,
+        }
+
+    @staticmethod
+    def build_patch_prompt(
+        file_summaries: dict[str, str],
+        max_tokens: int,
+        focus: Optional[str] = None,
+        subjects: Optional[list[str]] = None,
+    ) -> str:
+        """Build a prompt merging per-file summaries into the summary of a patch.
+
+        Args:
+            file_summaries: Summary of each changed file, by path
+            max_tokens: Output budget of the merged summary
+            focus: Aspect to emphasize
+            subjects: Commit subjects of a format-patch series
+        """
+        return COMPILED_TEMPLATES["summarize_patch"].render(
+            **PromptBuilder.patch_values(file_summaries, max_tokens, focus, subjects)
+        )
+
+    @staticmethod
+    def progressive_compress_values(
         text: str,
         stage: ProgressiveStage,
         stage_number: int,
         total_stages: int,
-    ) -> str:
-        """Build a progressive compression prompt."""
+    ) -> dict[str, str | float]:
+        """Slot values for the progressive compression template."""
         preserve_instruction = ""
         if stage.preserve:
             preserve_instruction = f"保持する要素: {', '.join(stage.preserve)}"
 
-        return PROGRESSIVE_COMPRESS_TEMPLATE.format(
-            stage_number=stage_number,
-            total_stages=total_stages,
-            target_ratio=stage.target_ratio,
-            preserve_instruction=preserve_instruction,
-            text=text,
+        return {
+            "stage_number": stage_number,
+            "total_stages": total_stages,
+            "target_ratio": stage.target_ratio,
+            "preserve_instruction": preserve_instruction,
+            "text": text,
+        }
+
+    @staticmethod
+    def build_progressive_compress_prompt(
+        text: str,
+        stage: ProgressiveStage,
+        stage_number: int,
+        total_stages: int,
+    ) -> str:
+        """Build a progressive compression prompt."""
+        return COMPILED_TEMPLATES["progressive_compress"].render(
+            **PromptBuilder.progressive_compress_values(text, stage, stage_number, total_stages)
+        )
+
+    @staticmethod
+    def repair_values(
+        snippets: dict[str, str],
+        max_tokens: int,
+    ) -> dict[str, str | float]:
+        """Slot values for the repair template."""
+        return {
+            "missing_items": "\n".join(f"- {item}" for item in snippets),
+            "snippets": "\n\n".join(f"[{item}]\n{snippet}" for item, snippet in snippets.items()),
+            "max_tokens": max_tokens,
+        }
+
+    @staticmethod
+    def build_repair_prompt(
+        snippets: dict[str, str],
+        max_tokens: int,
+    ) -> str:
+        """Build a prompt restoring elements missing from a summary.
+
+        Args:
+            snippets: Source excerpt for each missing element
+            max_tokens: Output budget for the addition
+        """
+        return COMPILED_TEMPLATES["repair"].render(
+            **PromptBuilder.repair_values(snippets, max_tokens)
         )
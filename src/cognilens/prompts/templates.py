@@ -85,6 +85,38 @@ SUMMARIZE_DIFF_TEMPLATE = """以下の変更前後のテキストを比較し、
 
 変更要約:"""
 
+# Template for summarizing one file of a multi-file patch
+SUMMARIZE_PATCH_FILE_TEMPLATE = """以下のファイルの差分（unified diff）を要約してください。
+
+ファイル: {path}
+{focus_instruction}
+
+制約:
+- 最大{max_tokens}トークン程度
+- 何がどう変わったかを具体的に（関数名・設定名は原文のまま）
+
+差分:
+{diff}
+
+変更要約:"""
+
+# Template for merging per-file summaries into the summary of a whole patch
+SUMMARIZE_PATCH_TEMPLATE = """以下のファイルごとの変更要約をもとに、変更全体を要約してください。
+
+{focus_instruction}
+{commit_subjects}
+
+ファイル別の変更:
+{file_summaries}
+
+変更要約の形式:
+- 変更の目的と全体像
+- 主要な変更点（関連するファイルはまとめて）
+- 影響範囲（破壊的変更があれば明記）
+- 最大{max_tokens}トークン程度
+
+変更要約:"""
+
 # Template for progressive compression
 PROGRESSIVE_COMPRESS_TEMPLATE = """以下のテキストを段階的に圧縮してください。
 
@@ -102,6 +134,22 @@ PROGRESSIVE_COMPRESS_TEMPLATE = """以下のテキストを段階的に圧縮し
 
 圧縮結果:"""
 
+# Template for restoring elements missing from a summary
+REPAIR_TEMPLATE = """要約で次の要素が抜け落ちました。原文の抜粋をもとに、要約に追記する短い文を作成してください。
+
+欠落した要素:
+{missing_items}
+
+原文の抜粋:
+{snippets}
+
+制約:
+- 最大{max_tokens}トークン程度
+- 各要素の名称をそのまま含める
+- 追記する文のみを出力
+
+追記:"""
+
 # Style-specific instructions
 STYLE_INSTRUCTIONS: dict[str, str] = {
     "concise": "簡潔に（1-3文で）",
@@ -109,4 +157,6 @@ STYLE_INSTRUCTIONS: dict[str, str] = {
     "bullet": "箇条書き形式で",
     "code_aware": "コード構造を保持しながら説明を圧縮",
     "diff": "変更点に焦点を当てて",
+    "log": "エラーと頻出パターンに焦点を当てて",
+    "structured": "スキーマ、統計と代表例をもとに",
 }
@@ -0,0 +1,280 @@
+"""Recording of tool calls to JSONL traces for load-test replay.
+
+Each line holds one call: the tool, its arguments, when it started and how
+long it took. Text arguments are stored as-is (raw), replaced by
+deterministic synthetic text of the same length and script mix (redacted),
+or reduced to their SHA-256 and shape (hashed), in which case replay
+synthesizes the text. Redaction and writing happen on a background thread,
+so recording never blocks a tool call.
+"""
+
+from __future__ import annotations
+
+import atexit
+import hashlib
+import json
+import queue
+import random
+import threading
+import time
+from collections.abc import Callable, Collection
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Optional
+
+from cognilens.blobs import get_blob_store, is_handle
+from cognilens.config import RecorderConfig, TraceArguments, get_settings
+
+# Key of the placeholder object that stands in for a hashed text
+TEXT_PLACEHOLDER = "$text"
+
+# fmt: off
+_LATIN_WORDS = (
+    "the", "system", "request", "model", "context", "token", "summary", "change", "value",
+    "result", "data", "service", "update", "config", "input", "output", "error", "cache",
+    "stage", "report", "build", "test", "review", "client", "server", "module", "function",
+    "class", "field", "index", "query", "batch",
+)
+# fmt: on
+_CJK_CHARS = "のにはをたがでてとしれさあるいうかもなこ要約圧縮文書変更設定処理結果入力出力"
+
+
+def _is_cjk(char: str) -> bool:
+    return "぀" <= char <= "ヿ" or "一" <= char <= "鿿"
+
+
+@dataclass
+class TextShape:
+    """Size and composition of a text, enough to synthesize a stand-in."""
+
+    chars: int
+    cjk_ratio: float = 0.0
+    newline_ratio: float = 0.0
+
+    @classmethod
+    def of(cls, text: str) -> TextShape:
+        if not text:
+            return cls(0)
+        return cls(
+            chars=len(text),
+            cjk_ratio=round(sum(map(_is_cjk, text)) / len(text), 3),
+            newline_ratio=round(text.count("\n") / len(text), 4),
+        )
+
+
+def synthetic_text(shape: TextShape, seed: str) -> str:
+    """Deterministic filler text with the given shape.
+
+    Args:
+        shape: Length in characters and share of CJK characters and newlines
+        seed: Seed for the generator, e.g. the original text's digest
+
+    Returns:
+        Text of exactly ``shape.chars`` characters
+    """
+    rng = random.Random(seed)
+    pieces: list[str] = []
+    length = 0
+    while length < shape.chars:
+        if rng.random() < shape.cjk_ratio:
+            piece = "".join(rng.choice(_CJK_CHARS) for _ in range(rng.randint(2, 6)))
+        else:
+            piece = rng.choice(_LATIN_WORDS)
+        # Separators are drawn so newlines appear at the original rate
+        piece += "\n" if rng.random() < shape.newline_ratio * (len(piece) + 1) else " "
+        pieces.append(piece)
+        length += len(piece)
+    return "".join(pieces)[: shape.chars]
+
+
+def redact_arguments(
+    arguments: Any,
+    mode: TraceArguments,
+    keep_fields: Collection[str] = (),
+    resolve: Optional[Callable[[str], str]] = None,
+) -> Any:
+    """Replace the text in tool arguments according to ``mode``.
+
+    Args:
+        arguments: Tool arguments (nested dicts and lists are walked)
+        mode: How to store text
+        keep_fields: Keys whose string values are kept verbatim
+        resolve: Maps a string to the text it stands for (e.g. a handle to
+            the stored text), so the stand-in has the real text's size
+
+    Returns:
+        Arguments safe to write to the trace
+    """
+    if mode == TraceArguments.RAW:
+        return arguments
+    if isinstance(arguments, dict):
+        return {
+            key: value
+            if key in keep_fields
+            else redact_arguments(value, mode, keep_fields, resolve)
+            for key, value in arguments.items()
+        }
+    if isinstance(arguments, list):
+        return [redact_arguments(item, mode, keep_fields, resolve) for item in arguments]
+    if not isinstance(arguments, str):
+        return arguments
+
+    text = resolve(arguments) if resolve else arguments
+    digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+    shape = TextShape.of(text)
+    if mode == TraceArguments.HASHED:
+        return {TEXT_PLACEHOLDER: {"sha256": digest, **asdict(shape)}}
+    return synthetic_text(shape, digest)
+
+
+def materialize_arguments(arguments: Any) -> Any:
+    """Replace hashed-text placeholders with synthetic text of the same shape."""
+    if isinstance(arguments, dict):
+        placeholder = arguments.get(TEXT_PLACEHOLDER)
+        if len(arguments) == 1 and isinstance(placeholder, dict):
+            seed = placeholder.pop("sha256", "")
+            return synthetic_text(TextShape(**placeholder), seed)
+        return {key: materialize_arguments(value) for key, value in arguments.items()}
+    if isinstance(arguments, list):
+        return [materialize_arguments(item) for item in arguments]
+    return arguments
+
+
+@dataclass
+class TraceEntry:
+    """One recorded tool call."""
+
+    tool: str
+    arguments: dict[str, Any]
+    duration_ms: float
+    error: Optional[str] = None
+    # Wall-clock start time (epoch seconds)
+    ts: float = field(default_factory=time.time)
+    # How the arguments were stored (a TraceArguments value)
+    arguments_mode: str = TraceArguments.RAW.value
+
+
+def load_trace(path: str | Path, limit: Optional[int] = None) -> list[TraceEntry]:
+    """Read a JSONL trace, ordered by start time."""
+    entries: list[TraceEntry] = []
+    with open(Path(path).expanduser(), encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                entries.append(TraceEntry(**json.loads(line)))
+    entries.sort(key=lambda entry: entry.ts)
+    return entries[:limit] if limit is not None else entries
+
+
+class TraceRecorder:
+    """Appends tool calls to a JSONL trace from a background thread."""
+
+    def __init__(
+        self,
+        path: str | Path,
+        *,
+        arguments: TraceArguments = TraceArguments.REDACTED,
+        keep_fields: Collection[str] = ("style", "mode", "base", "head", "node"),
+        resolve: Optional[Callable[[str], str]] = None,
+        max_queue: int = 10000,
+    ) -> None:
+        self.path = Path(path).expanduser()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.arguments = arguments
+        self.keep_fields = frozenset(keep_fields)
+        self.resolve = resolve
+        self.dropped = 0
+
+        self._queue: queue.Queue[Optional[TraceEntry]] = queue.Queue(maxsize=max_queue)
+        self._writer = threading.Thread(
+            target=self._write_loop, name="cognilens-recorder", daemon=True
+        )
+        self._writer.start()
+
+    def record(self, entry: TraceEntry) -> None:
+        """Queue a call for writing; never blocks the caller.
+
+        Calls are dropped (and counted in ``dropped``) if the queue is full.
+        """
+        try:
+            self._queue.put_nowait(entry)
+        except queue.Full:
+            self.dropped += 1
+
+    def flush(self) -> None:
+        """Block until every queued call has been written."""
+        self._queue.join()
+
+    def close(self) -> None:
+        """Write remaining calls and stop the writer thread."""
+        if self._writer.is_alive():
+            self._queue.put(None)
+            self._writer.join()
+
+    def _write_loop(self) -> None:
+        with open(self.path, "a", encoding="utf-8") as f:
+            while True:
+                entry = self._queue.get()
+                try:
+                    if entry is None:
+                        return
+                    entry.arguments = redact_arguments(
+                        entry.arguments, self.arguments, self.keep_fields, self.resolve
+                    )
+                    entry.arguments_mode = self.arguments.value
+                    f.write(json.dumps(asdict(entry), ensure_ascii=False) + "\n")
+                    if self._queue.empty():
+                        f.flush()
+                finally:
+                    self._queue.task_done()
+
+
+def _resolve_handle(value: str) -> str:
+    """Return the stored text for a known handle, or the value itself."""
+    store = get_blob_store()
+    if store is None or not is_handle(value):
+        return value
+    try:
+        return store.get(value)
+    except (KeyError, ValueError):
+        return value
+
+
+# Global recorder instance
+_recorder: Optional[TraceRecorder] = None
+_recorder_config: Optional[RecorderConfig] = None
+
+
+def create_trace_recorder(config: RecorderConfig) -> TraceRecorder:
+    """Create a trace recorder from configuration."""
+    return TraceRecorder(
+        config.path,
+        arguments=config.arguments,
+        keep_fields=config.keep_fields,
+        resolve=_resolve_handle,
+        max_queue=config.max_queue,
+    )
+
+
+def get_trace_recorder() -> Optional[TraceRecorder]:
+    """Get the shared recorder, or None if recording is disabled."""
+    global _recorder, _recorder_config
+    config = get_settings().recorder
+    if not config.enabled:
+        return None
+    if _recorder is None or _recorder_config is not config:
+        if _recorder is not None:
+            _recorder.close()
+        else:
+            atexit.register(reset_trace_recorder)
+        _recorder = create_trace_recorder(config)
+        _recorder_config = config
+    return _recorder
+
+
+def reset_trace_recorder() -> None:
+    """Close and reset the shared recorder (useful for testing)."""
+    global _recorder, _recorder_config
+    if _recorder is not None:
+        _recorder.close()
+    _recorder = None
+    _recorder_config = None
@@ -2,35 +2,110 @@
 
 from __future__ import annotations
 
-from typing import Literal
+import json
+import time
+from typing import Any, Literal, Optional
 
-from fastmcp import FastMCP
+from fastmcp import Context, FastMCP
+from fastmcp.server.middleware import CallNext, Middleware, MiddlewareContext
 
+from cognilens.blobs import RESOURCE_URI_TEMPLATE, get_blob_store, parse_handle
 from cognilens.config import get_settings
+from cognilens.llm import concurrency_snapshot, get_llm_client
+from cognilens.recorder import TraceEntry, get_trace_recorder
 from cognilens.tools.compress import compress_context as _compress_context
 from cognilens.tools.diff import summarize_diff as _summarize_diff
 from cognilens.tools.extract import extract_essence as _extract_essence
+from cognilens.tools.inputs import store_text as _store_text
 from cognilens.tools.progressive import progressive_compress as _progressive_compress
 from cognilens.tools.summarize import summarize as _summarize
+from cognilens.tools.tree import build_summary_tree as _build_summary_tree
+from cognilens.tools.tree import summarize_at_level as _summarize_at_level
 from cognilens.tools.unify import unify_summaries as _unify_summaries
+from cognilens.usage import LOCAL_SESSION, get_usage_tracker, usage_scope
 
 settings = get_settings()
 mcp = FastMCP(settings.server.name)
 
 
+class RecordingMiddleware(Middleware):
+    """Record tool calls to the trace recorder, when recording is enabled."""
+
+    async def on_call_tool(self, context: MiddlewareContext[Any], call_next: CallNext) -> Any:
+        recorder = get_trace_recorder()
+        if recorder is None:
+            return await call_next(context)
+
+        started_at = time.time()
+        started = time.perf_counter()
+        error = None
+        try:
+            return await call_next(context)
+        except Exception as exc:
+            error = type(exc).__name__
+            raise
+        finally:
+            recorder.record(
+                TraceEntry(
+                    tool=context.message.name,
+                    arguments=dict(context.message.arguments or {}),
+                    duration_ms=(time.perf_counter() - started) * 1000,
+                    error=error,
+                    ts=started_at,
+                )
+            )
+
+
+# Transports whose session IDs stay the same across the requests of a client
+_SESSION_TRANSPORTS = frozenset({"sse", "streamable-http"})
+
+
+def _session_id(context: Optional[Context]) -> Optional[str]:
+    """Stable identity of the calling client for usage accounting.
+
+    HTTP transports carry a session ID. A stdio server serves one client per
+    process, so calls are attributed to the client ID it sends, if any, or
+    to the process (the local session).
+    """
+    if context is None:
+        return None
+    if context.transport in _SESSION_TRANSPORTS:
+        try:
+            return context.session_id
+        except RuntimeError:
+            return None
+    return context.client_id
+
+
+class UsageMiddleware(Middleware):
+    """Attribute backend token usage during a tool call to the tool and session."""
+
+    async def on_call_tool(self, context: MiddlewareContext[Any], call_next: CallNext) -> Any:
+        with usage_scope(context.message.name, _session_id(context.fastmcp_context)):
+            return await call_next(context)
+
+
+mcp.add_middleware(RecordingMiddleware())
+mcp.add_middleware(UsageMiddleware())
+
+
 @mcp.tool
 async def summarize(
-    text: str,
+    text: str = "",
     max_tokens: int = 500,
-    style: Literal["concise", "detailed", "bullet"] = "concise",
+    style: Literal["concise", "detailed", "bullet", "log", "structured"] = "concise",
     preserve: list[str] | None = None,
+    path: str | None = None,
 ) -> dict:
     """Summarize text with specified style.
 
     Use this to reduce large text to key points while preserving essential information.
-    Styles: concise (80% compression), detailed (50%), bullet (list format).
+    Styles: concise (80% compression), detailed (50%), bullet (list format),
+    log (build/test output, stack traces), structured (JSON/JSON Lines/YAML data).
+    'text' may be a "handle:<sha256>" reference returned by an earlier call.
+    Pass 'path' (a file path or glob on the server) instead of 'text' for local files.
     """
-    return await _summarize(text, max_tokens, style, preserve)
+    return await _summarize(text, max_tokens, style, preserve, path)
 
 
 @mcp.tool
@@ -38,13 +113,15 @@ async def compress_context(
     full_context: str,
     task_description: str,
     target_tokens: int = 500,
+    path: str | None = None,
 ) -> dict:
     """Compress context for specific task execution.
 
     Optimizes context window usage by keeping only task-relevant information.
     Ideal for preparing focused context before complex coding tasks.
+    For local files, pass an empty 'full_context' and 'path' (a file path or glob on the server).
     """
-    return await _compress_context(full_context, task_description, target_tokens)
+    return await _compress_context(full_context, task_description, target_tokens, path)
 
 
 @mcp.tool
@@ -56,6 +133,7 @@ async def extract_essence(
 
     Identifies core concepts, key relationships, and critical specifications.
     Use focus_areas to prioritize specific aspects (e.g., ["API changes", "breaking changes"]).
+    'document' may be a "handle:<sha256>" reference.
     """
     return await _extract_essence(document, focus_areas)
 
@@ -68,36 +146,127 @@ async def unify_summaries(
     """Unify multiple documents into a single coherent summary.
 
     Combines multiple sources, removes redundancy, and highlights conflicts.
-    Each document needs 'title' and 'content' keys.
+    Each document needs 'title' and 'content' keys; 'content' may be a "handle:<sha256>" reference.
     """
     return await _unify_summaries(documents, purpose)
 
 
 @mcp.tool
 async def summarize_diff(
-    before: str,
-    after: str,
+    before: str = "",
+    after: str = "",
     focus: str | None = None,
+    patch: str | None = None,
+    repo: str | None = None,
+    base: str | None = None,
+    head: str = "HEAD",
 ) -> dict:
-    """Summarize differences between two versions of text.
+    """Summarize differences between two versions of text, or a multi-file patch.
 
     Highlights additions, deletions, and modifications.
     Use 'focus' to emphasize specific aspects like "breaking changes" or "API updates".
+    'before' and 'after' may be "handle:<sha256>" references.
+    For many files, pass 'patch' (unified diff or git format-patch text) instead, or
+    'repo' (a git repository on the server) with 'base' and 'head' refs: each file is
+    summarized concurrently, then merged into one summary with per-file 'files'.
     """
-    return await _summarize_diff(before, after, focus)
+    return await _summarize_diff(before, after, focus, patch, repo, base, head)
 
 
 @mcp.tool
 async def progressive_compress(
     text: str,
     stages: list[dict],
+    include_stage_text: bool = True,
 ) -> dict:
     """Apply progressive compression through multiple stages.
 
     For very large documents, compress in stages to maintain quality.
     Each stage: {"target_ratio": 0.5, "preserve": ["code", "api"]}.
+    Set include_stage_text=false to get intermediate stages as handles only.
     """
-    return await _progressive_compress(text, stages)
+    return await _progressive_compress(text, stages, include_stage_text)
+
+
+@mcp.tool
+async def build_summary_tree(text: str = "", path: str | None = None) -> dict:
+    """Build a multi-resolution summary tree of a large document.
+
+    Chunks the document once and summarizes it bottom-up (chunks, sections,
+    whole document). Returns the document summary and an outline of node IDs
+    to zoom into with summarize_at_level. 'text' may be a "handle:<sha256>" reference.
+    """
+    return await _build_summary_tree(text, path)
+
+
+@mcp.tool
+async def summarize_at_level(
+    text: str = "",
+    max_tokens: int = 500,
+    node: str | None = None,
+    level: int | None = None,
+    path: str | None = None,
+) -> dict:
+    """Zoom into a document at any length or section using its summary tree.
+
+    Repeat requests for the same document at different max_tokens reuse the
+    tree and need at most one small LLM call. Pass 'node' (an ID from
+    build_summary_tree, e.g. "L1.2") to summarize one section only.
+    """
+    return await _summarize_at_level(text, max_tokens, node, level, path)
+
+
+@mcp.tool
+async def check_handles(hashes: list[str]) -> dict:
+    """Check which texts the server already holds, before uploading them.
+
+    Pass SHA-256 hex digests of the UTF-8 encoded texts. For every known
+    digest, send "handle:<digest>" instead of the text.
+    """
+    store = get_blob_store()
+    if store is None:
+        return {"known": [], "missing": hashes, "enabled": False}
+    known = [h for h in hashes if store.contains(h)]
+    return {
+        "known": [f"handle:{parse_handle(h)}" for h in known],
+        "missing": [h for h in hashes if h not in known],
+        "enabled": True,
+    }
+
+
+@mcp.tool
+async def store_text(text: str) -> dict:
+    """Upload a text once and get a handle to pass to other tools instead."""
+    if get_blob_store() is None:
+        raise ValueError("Handles are disabled; set blobs.enabled to use them")
+    handle = _store_text(text)
+    if handle is None:
+        raise ValueError("Text exceeds blobs.max_bytes and cannot be stored")
+    return {"handle": handle}
+
+
+@mcp.tool
+async def get_usage(ctx: Context) -> dict:
+    """Report backend tokens used per tool, model and session, and budget headroom."""
+    tracker = get_usage_tracker()
+    if tracker is None:
+        raise ValueError("Usage accounting is disabled; set usage.enabled to use it")
+    return tracker.report(session=_session_id(ctx) or LOCAL_SESSION)
+
+
+@mcp.resource(RESOURCE_URI_TEMPLATE, mime_type="text/plain")
+async def blob(digest: str) -> str:
+    """Text of a stored input or result, by SHA-256 digest."""
+    store = get_blob_store()
+    if store is None:
+        raise ValueError("Handles are disabled")
+    return store.get(digest)
+
+
+@mcp.resource("cognilens://metrics/concurrency", mime_type="application/json")
+async def concurrency_metrics() -> str:
+    """Current adaptive concurrency limit per endpoint and model."""
+    return json.dumps(concurrency_snapshot(get_llm_client()))
 
 
 def main() -> None:
@@ -13,6 +13,8 @@ from .code_aware import CodeAwareStrategy
 from .concise import ConciseStrategy
 from .detailed import DetailedStrategy
 from .diff import DiffStrategy
+from .log import LogStrategy
+from .structured import StructuredStrategy
 
 STRATEGY_REGISTRY: dict[CompressionStyle, Type[CompressionStrategy]] = {
     CompressionStyle.CONCISE: ConciseStrategy,
@@ -20,6 +22,8 @@ STRATEGY_REGISTRY: dict[CompressionStyle, Type[CompressionStrategy]] = {
     CompressionStyle.BULLET: BulletStrategy,
     CompressionStyle.CODE_AWARE: CodeAwareStrategy,
     CompressionStyle.DIFF: DiffStrategy,
+    CompressionStyle.LOG: LogStrategy,
+    CompressionStyle.STRUCTURED: StructuredStrategy,
 }
 
 
@@ -38,6 +42,8 @@ __all__ = [
     "BulletStrategy",
     "CodeAwareStrategy",
     "DiffStrategy",
+    "LogStrategy",
+    "StructuredStrategy",
     "get_strategy",
     "STRATEGY_REGISTRY",
 ]
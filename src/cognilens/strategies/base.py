@@ -2,11 +2,16 @@
 
 from __future__ import annotations
 
+import asyncio
 from abc import ABC, abstractmethod
-from typing import Optional
+from collections.abc import Callable
+from typing import Any, Optional
 
-from cognilens.core.types import CompressionRequest, CompressionResult
+from cognilens.core.quality import QualityReport, measure_output
+from cognilens.core.types import CompressionRequest, CompressionResult, CompressionStyle
 from cognilens.llm.base import LLMClient
+from cognilens.prompts.builder import PromptBuilder
+from cognilens.taskgraph import task_group
 
 
 class CompressionStrategy(ABC):
@@ -39,30 +44,148 @@ class CompressionStrategy(ABC):
         """
         ...
 
-    async def _calculate_quality_score(
+    async def _measure_output(
         self,
         original: str,
         compressed: str,
         preserved_elements: list[str],
-    ) -> float:
-        """Calculate compression quality score (0.0-1.0)."""
-        # Check if preserved elements are present
-        preserved_count = sum(
-            1 for elem in preserved_elements if elem.lower() in compressed.lower()
+    ) -> tuple[int, QualityReport]:
+        """Count the output's tokens while evaluating its quality locally."""
+        return await measure_output(self.llm, original, compressed, preserved_elements)
+
+    async def _summarize(
+        self,
+        request: CompressionRequest,
+        *,
+        model: Optional[str],
+        style: CompressionStyle,
+        ratio: float,
+        output_buffer: int,
+        temperature: float,
+        preserve: Optional[list[str]] = None,
+        prompt_suffix: str = "",
+        metadata: Optional[dict[str, Any]] = None,
+    ) -> CompressionResult:
+        """Summarize the request's text with one summarize-template call.
+
+        Counting the input only gates generation when the request has no
+        target; otherwise it overlaps the generate call.
+
+        Args:
+            request: Compression request
+            model: Optional model override
+            style: Style instruction of the prompt
+            ratio: Target size relative to the input when no target is given
+            output_buffer: Tokens granted beyond the target
+            temperature: Sampling temperature
+            preserve: Elements to keep (default: the request's)
+            prompt_suffix: Extra instructions appended to the prompt
+            metadata: Extra result metadata
+        """
+        preserve = request.preserve if preserve is None else preserve
+        async with task_group() as group:
+            counting = group.create_task(self.llm.count_tokens(request.text))
+            target_tokens = request.target_tokens or int(await counting * ratio)
+
+            prompt = PromptBuilder.build_summarize_prompt(
+                text=request.text,
+                max_tokens=target_tokens,
+                style=style,
+                preserve=preserve,
+            )
+            response = await self.llm.generate(
+                prompt + prompt_suffix,
+                system_prompt=PromptBuilder.get_system_prompt(),
+                max_tokens=target_tokens + output_buffer,
+                temperature=temperature,
+                model=model,
+            )
+        original_tokens = counting.result()
+
+        compressed_tokens, quality = await self._measure_output(
+            request.text, response.content, preserve
         )
-        preservation_ratio = (
-            preserved_count / len(preserved_elements) if preserved_elements else 1.0
+
+        return CompressionResult(
+            compressed_text=response.content,
+            original_tokens=original_tokens,
+            compressed_tokens=compressed_tokens,
+            compression_ratio=compressed_tokens / original_tokens if original_tokens > 0 else 0,
+            preserved_elements=preserve,
+            quality_score=quality.score,
+            metadata={
+                "strategy": self.name,
+                "model": response.model,
+                **(metadata or {}),
+                "quality": quality.to_metadata(),
+            },
         )
 
-        # Basic coherence check (has content, not too short)
-        original_tokens = await self.llm.count_tokens(original)
-        compressed_tokens = await self.llm.count_tokens(compressed)
+    async def _summarize_digest(
+        self,
+        request: CompressionRequest,
+        digest: Callable[[], tuple[str, dict[str, Any]]],
+        *,
+        model: Optional[str],
+        style: CompressionStyle,
+        prompt_suffix: str,
+        use_llm: bool,
+    ) -> CompressionResult:
+        """Reduce the request's text locally, then summarize only the digest.
+
+        The digest is built and rendered in a worker thread while the input
+        is counted. Without ``use_llm`` the digest itself is the result.
 
-        # Penalize if too aggressively compressed or barely compressed
-        compression_ratio = compressed_tokens / original_tokens if original_tokens > 0 else 0
-        ratio_score = 1.0 - abs(0.3 - compression_ratio)  # Optimal around 30%
-        ratio_score = max(0.0, min(1.0, ratio_score))
+        Args:
+            request: Compression request
+            digest: Builds the digest; returns its text and result metadata
+            model: Optional model override
+            style: Style instruction of the prompt
+            prompt_suffix: Explains the digest format to the model
+            use_llm: Whether to summarize the digest with the LLM
+        """
+        async with task_group() as group:
+            counting = group.create_task(self.llm.count_tokens(request.text))
+            digest_text, digest_metadata = await asyncio.to_thread(digest)
 
-        # Weighted combination
-        quality = (preservation_ratio * 0.6) + (ratio_score * 0.4)
-        return round(quality, 3)
+            response = None
+            if use_llm:
+                target_tokens = request.target_tokens or int(
+                    await self.llm.count_tokens(digest_text) * 0.5
+                )
+                prompt = PromptBuilder.build_summarize_prompt(
+                    text=digest_text,
+                    max_tokens=target_tokens,
+                    style=style,
+                    preserve=request.preserve,
+                )
+                response = await self.llm.generate(
+                    prompt + prompt_suffix,
+                    system_prompt=PromptBuilder.get_system_prompt(),
+                    max_tokens=target_tokens + 200,
+                    temperature=0.3,
+                    model=model,
+                )
+        original_tokens = counting.result()
+        compressed_text = response.content if response is not None else digest_text
+
+        # The digest is all the output can draw on, so quality is judged against it
+        compressed_tokens, quality = await self._measure_output(
+            digest_text, compressed_text, request.preserve
+        )
+
+        return CompressionResult(
+            compressed_text=compressed_text,
+            original_tokens=original_tokens,
+            compressed_tokens=compressed_tokens,
+            compression_ratio=compressed_tokens / original_tokens if original_tokens > 0 else 0,
+            preserved_elements=request.preserve,
+            quality_score=quality.score,
+            metadata={
+                "strategy": self.name,
+                "model": response.model if response is not None else None,
+                "llm": use_llm,
+                "digest": digest_metadata,
+                "quality": quality.to_metadata(),
+            },
+        )
@@ -6,7 +6,6 @@ import re
 from typing import Optional
 
 from cognilens.core.types import CompressionRequest, CompressionResult, CompressionStyle
-from cognilens.prompts.builder import PromptBuilder
 
 from .base import CompressionStrategy
 
@@ -34,44 +33,20 @@ class CodeAwareStrategy(CompressionStrategy):
         self, request: CompressionRequest, *, model: Optional[str] = None
     ) -> CompressionResult:
         """Compress text while preserving code structure."""
-        original_tokens = await self.llm.count_tokens(request.text)
-        target_tokens = request.target_tokens or int(original_tokens * 0.4)
-
         # Detect code blocks and add them to preserve list
         code_elements = self._extract_code_signatures(request.text)
         preserve = list(set(request.preserve + code_elements[:5]))  # Top 5 signatures
 
-        base_prompt = PromptBuilder.build_summarize_prompt(
-            text=request.text,
-            max_tokens=target_tokens,
+        return await self._summarize(
+            request,
+            model=model,
             style=CompressionStyle.CODE_AWARE,
-            preserve=preserve,
-        )
-        prompt = base_prompt + CODE_AWARE_PROMPT_SUFFIX
-
-        response = await self.llm.generate(
-            prompt,
-            system_prompt=PromptBuilder.get_system_prompt(),
-            max_tokens=target_tokens + 200,
+            ratio=0.4,
+            output_buffer=200,
             temperature=0.3,
-            model=model,
-        )
-
-        compressed_tokens = await self.llm.count_tokens(response.content)
-        quality = await self._calculate_quality_score(request.text, response.content, preserve)
-
-        return CompressionResult(
-            compressed_text=response.content,
-            original_tokens=original_tokens,
-            compressed_tokens=compressed_tokens,
-            compression_ratio=compressed_tokens / original_tokens if original_tokens > 0 else 0,
-            preserved_elements=preserve,
-            quality_score=quality,
-            metadata={
-                "strategy": self.name,
-                "model": response.model,
-                "detected_signatures": code_elements,
-            },
+            preserve=preserve,
+            prompt_suffix=CODE_AWARE_PROMPT_SUFFIX,
+            metadata={"detected_signatures": code_elements},
         )
 
     def _extract_code_signatures(self, text: str) -> list[str]:
@@ -5,7 +5,6 @@ from __future__ import annotations
 from typing import Optional
 
 from cognilens.core.types import CompressionRequest, CompressionResult, CompressionStyle
-from cognilens.prompts.builder import PromptBuilder
 
 from .base import CompressionStrategy
 
@@ -25,35 +24,11 @@ class DetailedStrategy(CompressionStrategy):
         self, request: CompressionRequest, *, model: Optional[str] = None
     ) -> CompressionResult:
         """Compress text while preserving detailed information."""
-        original_tokens = await self.llm.count_tokens(request.text)
-        target_tokens = request.target_tokens or int(original_tokens * 0.5)
-
-        prompt = PromptBuilder.build_summarize_prompt(
-            text=request.text,
-            max_tokens=target_tokens,
+        return await self._summarize(
+            request,
+            model=model,
             style=CompressionStyle.DETAILED,
-            preserve=request.preserve,
-        )
-
-        response = await self.llm.generate(
-            prompt,
-            system_prompt=PromptBuilder.get_system_prompt(),
-            max_tokens=target_tokens + 200,
+            ratio=0.5,
+            output_buffer=200,
             temperature=0.5,
-            model=model,
-        )
-
-        compressed_tokens = await self.llm.count_tokens(response.content)
-        quality = await self._calculate_quality_score(
-            request.text, response.content, request.preserve
-        )
-
-        return CompressionResult(
-            compressed_text=response.content,
-            original_tokens=original_tokens,
-            compressed_tokens=compressed_tokens,
-            compression_ratio=compressed_tokens / original_tokens if original_tokens > 0 else 0,
-            preserved_elements=request.preserve,
-            quality_score=quality,
-            metadata={"strategy": self.name, "model": response.model},
         )
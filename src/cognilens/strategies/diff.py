@@ -4,8 +4,10 @@ from __future__ import annotations
 
 from typing import Optional
 
+from cognilens.core.quality import measure_output
 from cognilens.core.types import CompressionRequest, CompressionResult, DiffInput
 from cognilens.prompts.builder import PromptBuilder
+from cognilens.taskgraph import task_group
 
 from .base import CompressionStrategy
 
@@ -33,19 +35,25 @@ class DiffStrategy(CompressionStrategy):
         if isinstance(diff_input, dict):
             diff_input = DiffInput(**diff_input)
 
-        original_tokens = await self.llm.count_tokens(diff_input.before + diff_input.after)
-
         prompt = PromptBuilder.build_diff_prompt(diff_input)
 
-        response = await self.llm.generate(
-            prompt,
-            system_prompt=PromptBuilder.get_system_prompt(),
-            max_tokens=request.target_tokens or 500,
-            temperature=0.3,
-            model=model,
-        )
+        async with task_group() as group:
+            counting = group.create_task(
+                self.llm.count_tokens(diff_input.before + diff_input.after)
+            )
+            response = await self.llm.generate(
+                prompt,
+                system_prompt=PromptBuilder.get_system_prompt(),
+                max_tokens=request.target_tokens or 500,
+                temperature=0.3,
+                model=model,
+            )
+        original_tokens = counting.result()
 
-        compressed_tokens = await self.llm.count_tokens(response.content)
+        # Only the changed lines are expected to be reflected in the summary
+        compressed_tokens, quality = await measure_output(
+            self.llm, diff_input.after, response.content, diff_before=diff_input.before
+        )
 
         return CompressionResult(
             compressed_text=response.content,
@@ -53,10 +61,11 @@ class DiffStrategy(CompressionStrategy):
             compressed_tokens=compressed_tokens,
             compression_ratio=compressed_tokens / original_tokens if original_tokens > 0 else 0,
             preserved_elements=["additions", "deletions", "changes"],
-            quality_score=0.8,  # Diff quality is harder to measure
+            quality_score=quality.score,
             metadata={
                 "strategy": self.name,
                 "model": response.model,
                 "focus": diff_input.focus,
+                "quality": quality.to_metadata(),
             },
         )
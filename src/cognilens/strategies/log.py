@@ -0,0 +1,65 @@
+"""Log compression strategy - mines templates locally before summarizing."""
+
+from __future__ import annotations
+
+from typing import Any, Optional
+
+from cognilens.config import get_settings
+from cognilens.core.log_digest import digest_log
+from cognilens.core.types import CompressionRequest, CompressionResult, CompressionStyle
+
+from .base import CompressionStrategy
+
+LOG_PROMPT_SUFFIX = """
+
+ログダイジェストの読み方:
+- "xN" は出現回数、"L12-L98" は最初と最後の出現行
+- "<*>" は可変部分、"vars:" はその値の例
+- エラー行とスタックトレースは原文のまま
+
+ログ要約の追加指示:
+- エラーとその原因（スタックトレース）を最優先
+- 頻出パターンは件数とともに簡潔に
+- 開始から終了までの流れを残す"""
+
+
+class LogStrategy(CompressionStrategy):
+    """Log compression strategy - mines templates locally before summarizing.
+
+    Repeated lines collapse into templates with counts, duplicate stack traces
+    and recursive frames fold, and error lines are kept. Only that digest is
+    sent to the LLM, or it is returned as is when ``compression.log.use_llm``
+    is off (or the request's ``use_llm`` metadata says so).
+    """
+
+    @property
+    def name(self) -> str:
+        return "log"
+
+    @property
+    def description(self) -> str:
+        return "Log digest - templates with counts, folded stack traces, all error lines"
+
+    async def compress(
+        self, request: CompressionRequest, *, model: Optional[str] = None
+    ) -> CompressionResult:
+        """Digest the log locally, then summarize the digest."""
+        config = get_settings().compression.log
+
+        def digest() -> tuple[str, dict[str, Any]]:
+            log = digest_log(request.text, config)
+            return log.render(config), {
+                "lines": log.lines,
+                "templates": len(log.templates),
+                "stack_traces": len(log.traces),
+                "error_lines": log.error_count,
+            }
+
+        return await self._summarize_digest(
+            request,
+            digest,
+            model=model,
+            style=CompressionStyle.LOG,
+            prompt_suffix=LOG_PROMPT_SUFFIX,
+            use_llm=request.metadata.get("use_llm", config.use_llm),
+        )
@@ -0,0 +1,65 @@
+"""Structured data compression strategy - infers the schema before summarizing."""
+
+from __future__ import annotations
+
+from typing import Any, Optional
+
+from cognilens.config import get_settings
+from cognilens.core.structured_digest import digest_structured
+from cognilens.core.types import CompressionRequest, CompressionResult, CompressionStyle
+
+from .base import CompressionStrategy
+
+STRUCTURED_PROMPT_SUFFIX = """
+
+構造化データダイジェストの読み方:
+- "$" はルート、"[]" は配列の要素、"?" は一部のレコードにしかないフィールド
+- "(N%)" はそのフィールドを持つ割合、"values:" は列挙値と件数
+- "Samples:" はキー構成の異なる代表レコード（原文のまま）
+
+構造化データ要約の追加指示:
+- データの構造（フィールド、型、必須/任意）を最優先
+- 値の範囲や列挙値など、データの特徴を数値とともに
+- 個々のレコードの羅列は避ける"""
+
+
+class StructuredStrategy(CompressionStrategy):
+    """Structured data compression strategy - infers the schema before summarizing.
+
+    JSON, JSON Lines and YAML documents are reduced to an inferred schema with
+    per-field statistics (optionality, nulls, ranges, enum values) and a few
+    representative records. Only that digest is sent to the LLM, or it is
+    returned as is when ``compression.structured.use_llm`` is off (or the
+    request's ``use_llm`` metadata says so).
+    """
+
+    @property
+    def name(self) -> str:
+        return "structured"
+
+    @property
+    def description(self) -> str:
+        return "Structured data digest - inferred schema, field statistics, sample records"
+
+    async def compress(
+        self, request: CompressionRequest, *, model: Optional[str] = None
+    ) -> CompressionResult:
+        """Digest the document locally, then summarize the digest."""
+        config = get_settings().compression.structured
+
+        def digest() -> tuple[str, dict[str, Any]]:
+            structured = digest_structured(request.text, config)
+            return structured.render(config), {
+                "format": structured.format,
+                "documents": structured.documents,
+                "chars": structured.chars,
+            }
+
+        return await self._summarize_digest(
+            request,
+            digest,
+            model=model,
+            style=CompressionStyle.STRUCTURED,
+            prompt_suffix=STRUCTURED_PROMPT_SUFFIX,
+            use_llm=request.metadata.get("use_llm", config.use_llm),
+        )
@@ -0,0 +1,29 @@
+"""Helpers for running independent steps of a request concurrently."""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+from collections.abc import AsyncIterator
+
+
+def _first_error(group: BaseExceptionGroup) -> BaseException:
+    error: BaseException = group
+    while isinstance(error, BaseExceptionGroup):
+        error = error.exceptions[0]
+    return error
+
+
+@contextlib.asynccontextmanager
+async def task_group() -> AsyncIterator[asyncio.TaskGroup]:
+    """An ``asyncio.TaskGroup`` that raises the first failure as itself.
+
+    A failing step cancels its siblings as usual, but callers see the
+    original exception (LLMError, ValueError, ...) instead of an
+    ExceptionGroup, so existing error handling keeps working.
+    """
+    try:
+        async with asyncio.TaskGroup() as group:
+            yield group
+    except BaseExceptionGroup as errors:
+        raise _first_error(errors) from None
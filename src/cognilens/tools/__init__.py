@@ -5,6 +5,7 @@ from .diff import summarize_diff
 from .extract import extract_essence
 from .progressive import progressive_compress
 from .summarize import summarize
+from .tree import build_summary_tree, summarize_at_level
 from .unify import unify_summaries
 
 __all__ = [
@@ -14,4 +15,6 @@ __all__ = [
     "unify_summaries",
     "summarize_diff",
     "progressive_compress",
+    "build_summary_tree",
+    "summarize_at_level",
 ]
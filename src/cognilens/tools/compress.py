@@ -4,22 +4,27 @@ from __future__ import annotations
 
 from cognilens.core.compressor import CompressionEngine
 
+from .inputs import handle_fields, resolve_text
+
 
 async def compress_context(
     full_context: str,
     task_description: str,
     target_tokens: int = 500,
+    path: str | None = None,
 ) -> dict:
     """Compress context for specific task execution.
 
     Args:
-        full_context: Full context to compress
+        full_context: Full context to compress, or a handle: reference
         task_description: Description of the task being executed
         target_tokens: Target token count (default: 500)
+        path: File path or glob to read instead of full_context (under allowed roots)
 
     Returns:
         Dictionary with compressed context and metadata
     """
+    full_context, extra = await resolve_text(full_context, path)
     engine = CompressionEngine()
     result = await engine.compress_context(
         full_context=full_context,
@@ -33,4 +38,6 @@ async def compress_context(
         "compressed_tokens": result.compressed_tokens,
         "compression_ratio": result.compression_ratio,
         "task": task_description,
+        **extra,
+        **handle_fields(input=full_context, compressed_context=result.compressed_text),
     }
@@ -3,33 +3,77 @@
 from __future__ import annotations
 
 from cognilens.core.compressor import CompressionEngine
+from cognilens.files import read_git_diff
+from cognilens.usage import current_scope, usage_scope
+
+from .inputs import handle_fields, resolve_value
 
 
 async def summarize_diff(
-    before: str,
-    after: str,
+    before: str = "",
+    after: str = "",
     focus: str | None = None,
+    patch: str | None = None,
+    repo: str | None = None,
+    base: str | None = None,
+    head: str = "HEAD",
 ) -> dict:
-    """Summarize differences between two versions of text.
+    """Summarize differences between two versions of text, or a multi-file patch.
 
     Args:
-        before: Original version
-        after: Modified version
+        before: Original version, or a handle: reference
+        after: Modified version, or a handle: reference
         focus: Specific aspect to focus on (e.g., "breaking changes")
+        patch: Unified diff or git format-patch text (or a handle:), instead
+            of before/after; each file is summarized separately
+        repo: Local repository under the allowed roots to read the patch from
+        base: Ref the change starts from (required with repo)
+        head: Ref the change ends at (default: HEAD)
 
     Returns:
-        Dictionary with diff summary and metadata
+        Dictionary with diff summary and metadata; for patches, also the
+        per-file summaries in ``files``
+
+    Raises:
+        ValueError: If the inputs of more than one mode (or none) are given
     """
+    modes = [bool(before or after), bool(patch), bool(repo)]
+    if sum(modes) != 1:
+        raise ValueError("Pass before/after, patch, or repo with base")
+
     engine = CompressionEngine()
-    result = await engine.summarize_diff(
-        before=before,
-        after=after,
-        focus=focus,
-    )
+    if not patch and not repo:
+        before = resolve_value(before)
+        after = resolve_value(after)
+        result = await engine.summarize_diff(
+            before=before,
+            after=after,
+            focus=focus,
+        )
+
+        return {
+            "diff_summary": result.compressed_text,
+            "original_tokens": result.original_tokens,
+            "compressed_tokens": result.compressed_tokens,
+            "focus": focus,
+            **handle_fields(before=before, after=after, diff_summary=result.compressed_text),
+        }
+
+    if repo:
+        if not base:
+            raise ValueError("base is required with repo")
+        patch = await read_git_diff(repo, base, head)
+    else:
+        patch = resolve_value(patch or "")
+    # Patch mode is accounted separately from before/after comparisons
+    with usage_scope("summarize_patch", current_scope().session):
+        result = await engine.summarize_patch(patch=patch, focus=focus)
 
     return {
         "diff_summary": result.compressed_text,
         "original_tokens": result.original_tokens,
         "compressed_tokens": result.compressed_tokens,
         "focus": focus,
+        "files": result.metadata["files"],
+        **handle_fields(patch=patch, diff_summary=result.compressed_text),
     }
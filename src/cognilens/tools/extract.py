@@ -4,6 +4,8 @@ from __future__ import annotations
 
 from cognilens.core.compressor import CompressionEngine
 
+from .inputs import handle_fields, resolve_value
+
 
 async def extract_essence(
     document: str,
@@ -12,12 +14,13 @@ async def extract_essence(
     """Extract essential information from a document.
 
     Args:
-        document: Document to analyze
+        document: Document to analyze, or a handle: reference
         focus_areas: Areas to focus on during extraction
 
     Returns:
         Dictionary with extracted essence and metadata
     """
+    document = resolve_value(document)
     engine = CompressionEngine()
     result = await engine.extract_essence(
         document=document,
@@ -29,4 +32,5 @@ async def extract_essence(
         "original_tokens": result.original_tokens,
         "compressed_tokens": result.compressed_tokens,
         "focus_areas": focus_areas,
+        **handle_fields(input=document, essence=result.compressed_text),
     }
@@ -0,0 +1,68 @@
+"""Resolution of tool text inputs and handles for tool outputs."""
+
+from __future__ import annotations
+
+from typing import Any, Optional
+
+from cognilens.blobs import get_blob_store, is_handle
+from cognilens.files import load_files_async
+
+
+def resolve_value(value: str) -> str:
+    """Return the text for a ``handle:`` reference, or the value itself.
+
+    Raises:
+        ValueError: If a handle is given while the blob store is disabled
+        KeyError: If the handle is unknown or expired
+    """
+    if not is_handle(value):
+        return value
+    store = get_blob_store()
+    if store is None:
+        raise ValueError("Handles are disabled; set blobs.enabled to use them")
+    return store.get(value)
+
+
+async def resolve_text(text: str, path: Optional[str] = None) -> tuple[str, dict[str, Any]]:
+    """Return the text a tool should process.
+
+    Args:
+        text: Inline text or a ``handle:`` reference
+        path: File path or glob under the allowed roots, read instead of ``text``
+
+    Returns:
+        Tuple of the text and extra fields for the tool response
+
+    Raises:
+        ValueError: If both or neither of ``text`` and ``path`` are given
+    """
+    if path and text:
+        raise ValueError("Pass either text or path, not both")
+    if not path:
+        if not text:
+            raise ValueError("Either text or path is required")
+        return resolve_value(text), {}
+
+    loaded = await load_files_async(path)
+    extra: dict[str, Any] = {"files": loaded.paths}
+    if loaded.skipped:
+        extra["skipped_files"] = loaded.skipped
+    return loaded.text, extra
+
+
+def store_text(text: str) -> Optional[str]:
+    """Store a text in the blob store and return its handle (None if disabled or too large)."""
+    store = get_blob_store()
+    return store.put(text) if store is not None else None
+
+
+def handle_fields(**texts: str) -> dict[str, str]:
+    """Store texts and return ``<name>_handle`` response fields for them.
+
+    Texts too large for the store get no field.
+    """
+    store = get_blob_store()
+    if store is None:
+        return {}
+    handles = {name: store.put(text) for name, text in texts.items()}
+    return {f"{name}_handle": handle for name, handle in handles.items() if handle is not None}
@@ -4,20 +4,26 @@ from __future__ import annotations
 
 from cognilens.core.compressor import CompressionEngine
 
+from .inputs import handle_fields, resolve_value
+
 
 async def progressive_compress(
     text: str,
     stages: list[dict],
+    include_stage_text: bool = True,
 ) -> dict:
     """Apply progressive compression through multiple stages.
 
     Args:
-        text: Text to compress progressively
+        text: Text to compress progressively, or a handle: reference
         stages: List of stage configs with 'target_ratio' and optional 'preserve'
+        include_stage_text: Return each stage's text; when False, intermediate
+            stages are returned as handles only
 
     Returns:
         Dictionary with all stage results and final compressed text
     """
+    text = resolve_value(text)
     engine = CompressionEngine()
     results = await engine.progressive_compress(
         text=text,
@@ -29,9 +35,10 @@ async def progressive_compress(
         "stages": [
             {
                 "stage": i + 1,
-                "compressed_text": r.compressed_text,
+                **({"compressed_text": r.compressed_text} if include_stage_text else {}),
                 "compression_ratio": r.compression_ratio,
                 "tokens": r.compressed_tokens,
+                **handle_fields(compressed_text=r.compressed_text),
             }
             for i, r in enumerate(results)
         ],
@@ -39,4 +46,5 @@ async def progressive_compress(
         "overall_compression": (
             results[-1].compressed_tokens / results[0].original_tokens if results else 1.0
         ),
+        **handle_fields(input=text),
     }
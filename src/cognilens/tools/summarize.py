@@ -6,24 +6,30 @@ from typing import Literal
 
 from cognilens.core.compressor import CompressionEngine
 
+from .inputs import handle_fields, resolve_text
+
 
 async def summarize(
-    text: str,
+    text: str = "",
     max_tokens: int = 500,
-    style: Literal["concise", "detailed", "bullet"] = "concise",
+    style: Literal["concise", "detailed", "bullet", "log", "structured"] = "concise",
     preserve: list[str] | None = None,
+    path: str | None = None,
 ) -> dict:
     """Summarize text with specified style.
 
     Args:
-        text: Text to summarize
+        text: Text to summarize, or a handle: reference
         max_tokens: Maximum tokens in summary (default: 500)
-        style: Summarization style - concise/detailed/bullet
+        style: Summarization style - concise/detailed/bullet, log for build/test
+            output and stack traces, or structured for JSON/YAML data
         preserve: Elements to preserve in summary
+        path: File path or glob to read instead of text (under allowed roots)
 
     Returns:
         Dictionary with compressed_text, compression_ratio, and metadata
     """
+    text, extra = await resolve_text(text, path)
     engine = CompressionEngine()
     result = await engine.summarize(
         text=text,
@@ -39,4 +45,6 @@ async def summarize(
         "compression_ratio": result.compression_ratio,
         "savings_percent": result.savings_percent,
         "quality_score": result.quality_score,
+        **extra,
+        **handle_fields(input=text, summary=result.compressed_text),
     }
@@ -0,0 +1,76 @@
+"""Summary tree tool implementations."""
+
+from __future__ import annotations
+
+from cognilens.core.compressor import CompressionEngine
+
+from .inputs import handle_fields, resolve_text
+
+
+async def build_summary_tree(
+    text: str = "",
+    path: str | None = None,
+) -> dict:
+    """Build the hierarchical summary tree of a document.
+
+    Args:
+        text: Document to summarize, or a handle: reference
+        path: File path or glob to read instead of text (under allowed roots)
+
+    Returns:
+        Dictionary with the document summary and an outline of the tree nodes,
+        from the root down to the chunks
+    """
+    text, extra = await resolve_text(text, path)
+    engine = CompressionEngine()
+    tree, cached = await engine.build_summary_tree(text)
+
+    return {
+        "summary": tree.root.summary,
+        "original_tokens": tree.root.source_tokens,
+        "levels": len(tree.levels),
+        "nodes": [node.to_outline() for level in reversed(tree.levels) for node in level],
+        "cached": cached,
+        **extra,
+        **handle_fields(input=text),
+    }
+
+
+async def summarize_at_level(
+    text: str = "",
+    max_tokens: int = 500,
+    node: str | None = None,
+    level: int | None = None,
+    path: str | None = None,
+) -> dict:
+    """Summarize a document or one of its sections at any length from its summary tree.
+
+    Args:
+        text: Document to summarize, or a handle: reference
+        max_tokens: Maximum tokens in the summary (default: 500)
+        node: Tree node ID (e.g. "L1.2") to zoom into; default is the whole document
+        level: Answer from exactly this tree level (0 = chunk summaries)
+        path: File path or glob to read instead of text (under allowed roots)
+
+    Returns:
+        Dictionary with the summary, its size and the tree nodes it was built from
+    """
+    text, extra = await resolve_text(text, path)
+    engine = CompressionEngine()
+    result = await engine.summarize_at_level(
+        text=text,
+        max_tokens=max_tokens,
+        node=node,
+        level=level,
+    )
+
+    return {
+        "summary": result.compressed_text,
+        "original_tokens": result.original_tokens,
+        "compressed_tokens": result.compressed_tokens,
+        "compression_ratio": result.compression_ratio,
+        "quality_score": result.quality_score,
+        **result.metadata["tree"],
+        **extra,
+        **handle_fields(input=text, summary=result.compressed_text),
+    }
@@ -4,6 +4,8 @@ from __future__ import annotations
 
 from cognilens.core.compressor import CompressionEngine
 
+from .inputs import handle_fields, resolve_value
+
 
 async def unify_summaries(
     documents: list[dict],
@@ -13,11 +15,13 @@ async def unify_summaries(
 
     Args:
         documents: List of documents with 'title' and 'content' keys
+            (content may be a handle: reference)
         purpose: Purpose of the unified summary
 
     Returns:
         Dictionary with unified summary and metadata
     """
+    documents = [{**d, "content": resolve_value(str(d.get("content", "")))} for d in documents]
     engine = CompressionEngine()
     result = await engine.unify_summaries(
         documents=documents,
@@ -30,4 +34,5 @@ async def unify_summaries(
         "compressed_tokens": result.compressed_tokens,
         "document_count": len(documents),
         "purpose": purpose,
+        **handle_fields(unified_summary=result.compressed_text),
     }
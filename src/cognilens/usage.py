@@ -0,0 +1,261 @@
+"""Backend token accounting per tool, model and session, with budgets.
+
+Every generate call made while serving a tool is attributed to the tool and
+the MCP session that called it. Per-session and global budgets, counted over
+a fixed window, reject further calls or move them to a cheaper model once
+they are used up, so a single runaway client cannot exhaust shared capacity.
+"""
+
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass
+from typing import Any, Optional
+
+from cognilens.config import BudgetAction, UsageConfig, get_settings
+from cognilens.llm.base import LLMClient, LLMClientWrapper, LLMResponse
+
+# Attribution of calls made outside an MCP tool call (e.g. library use)
+LOCAL_SESSION = "local"
+UNKNOWN_TOOL = "unknown"
+# Session the usage of sessions evicted from tracking is reported under
+EVICTED_SESSION = "evicted"
+
+
+@dataclass(frozen=True)
+class UsageScope:
+    """Who a generate call is made for."""
+
+    tool: str = UNKNOWN_TOOL
+    session: str = LOCAL_SESSION
+
+
+_current_scope: ContextVar[Optional[UsageScope]] = ContextVar("cognilens_usage_scope", default=None)
+
+
+@contextmanager
+def usage_scope(tool: str, session: Optional[str] = None) -> Iterator[UsageScope]:
+    """Attribute generate calls in the block (and tasks it starts) to a tool and session."""
+    scope = UsageScope(tool=tool, session=session or LOCAL_SESSION)
+    token = _current_scope.set(scope)
+    try:
+        yield scope
+    finally:
+        _current_scope.reset(token)
+
+
+def current_scope() -> UsageScope:
+    """Scope of the generate call being made."""
+    return _current_scope.get() or UsageScope()
+
+
+class BudgetExceededError(RuntimeError):
+    """Raised when a session or the server has used up its token budget."""
+
+    def __init__(self, scope: str, used: int, budget: int) -> None:
+        super().__init__(f"{scope} token budget exhausted ({used}/{budget} tokens)")
+        self.scope = scope
+        self.used = used
+        self.budget = budget
+
+
+@dataclass
+class UsageTotals:
+    """Calls and backend tokens of one tool, model and session."""
+
+    calls: int = 0
+    tokens: int = 0
+    downgraded: int = 0
+
+    def add(self, other: UsageTotals) -> None:
+        self.calls += other.calls
+        self.tokens += other.tokens
+        self.downgraded += other.downgraded
+
+
+class UsageTracker:
+    """Accumulates token usage and tracks budget consumption.
+
+    At most ``max_sessions`` sessions are tracked individually. When a new
+    session would exceed that, the least recently active one is folded into
+    the ``evicted`` aggregate and its budget window usage is forgotten, so
+    totals stay exact while memory stays bounded.
+    """
+
+    def __init__(self, config: UsageConfig) -> None:
+        self.config = config
+        # Session -> (tool, model) -> totals, least recently active first
+        self._totals: OrderedDict[str, dict[tuple[str, str], UsageTotals]] = OrderedDict()
+        self._evicted: dict[tuple[str, str], UsageTotals] = {}
+        self._window_started = time.monotonic()
+        self._window_sessions: dict[str, int] = {}
+        self._window_total = 0
+
+    def _roll_window(self) -> None:
+        window = self.config.budget_window_seconds
+        if window is not None and time.monotonic() - self._window_started >= window:
+            self._window_started = time.monotonic()
+            self._window_sessions.clear()
+            self._window_total = 0
+
+    def _session_totals(self, session: str) -> dict[tuple[str, str], UsageTotals]:
+        """Totals of a session, evicting the least recently active beyond the limit."""
+        totals = self._totals.get(session)
+        if totals is not None:
+            self._totals.move_to_end(session)
+            return totals
+        totals = self._totals[session] = {}
+        while len(self._totals) > self.config.max_sessions:
+            evicted, old = self._totals.popitem(last=False)
+            self._window_sessions.pop(evicted, None)
+            for key, value in old.items():
+                self._evicted.setdefault(key, UsageTotals()).add(value)
+        return totals
+
+    def _rows(self) -> Iterator[tuple[tuple[str, str, str], UsageTotals]]:
+        """(session, tool, model) and totals of every tracked and evicted session."""
+        for session, totals in self._totals.items():
+            for (tool, model), value in totals.items():
+                yield (session, tool, model), value
+        for (tool, model), value in self._evicted.items():
+            yield (EVICTED_SESSION, tool, model), value
+
+    def record(self, scope: UsageScope, model: str, tokens: int, downgraded: bool = False) -> None:
+        """Add a finished generate call to the totals and budgets."""
+        self._roll_window()
+        totals = self._session_totals(scope.session).setdefault((scope.tool, model), UsageTotals())
+        totals.calls += 1
+        totals.tokens += tokens
+        totals.downgraded += int(downgraded)
+        self._window_sessions[scope.session] = self._window_sessions.get(scope.session, 0) + tokens
+        self._window_total += tokens
+
+    def exceeded(self, session: str) -> Optional[BudgetExceededError]:
+        """Return the budget error for a session's next call, or None if within budget."""
+        self._roll_window()
+        budget = self.config.session_token_budget
+        used = self._window_sessions.get(session, 0)
+        if budget is not None and used >= budget:
+            return BudgetExceededError("Session", used, budget)
+        budget = self.config.global_token_budget
+        if budget is not None and self._window_total >= budget:
+            return BudgetExceededError("Global", self._window_total, budget)
+        return None
+
+    def report(self, session: Optional[str] = None) -> dict[str, Any]:
+        """Summarize usage overall, by tool, model and session, and budget headroom.
+
+        Args:
+            session: Session to report budget headroom and usage for
+
+        Returns:
+            Dictionary of totals and budget state
+        """
+        self._roll_window()
+
+        def grouped(index: int) -> dict[str, dict[str, int]]:
+            groups: dict[str, UsageTotals] = {}
+            for key, totals in self._rows():
+                groups.setdefault(key[index], UsageTotals()).add(totals)
+            return {name: asdict(totals) for name, totals in sorted(groups.items())}
+
+        by_session = grouped(0)
+        report: dict[str, Any] = {
+            "total": {
+                "calls": sum(t["calls"] for t in by_session.values()),
+                "tokens": sum(t["tokens"] for t in by_session.values()),
+            },
+            "by_tool": grouped(1),
+            "by_model": grouped(2),
+            "by_session": by_session,
+            "budgets": {
+                "session_token_budget": self.config.session_token_budget,
+                "global_token_budget": self.config.global_token_budget,
+                "global_used": self._window_total,
+                "on_exceeded": self.config.on_exceeded.value,
+            },
+        }
+        window = self.config.budget_window_seconds
+        if window is not None:
+            elapsed = time.monotonic() - self._window_started
+            report["budgets"]["window_resets_in_seconds"] = round(window - elapsed, 1)
+        if session is not None:
+            report["session"] = {
+                "id": session,
+                **by_session.get(session, asdict(UsageTotals())),
+            }
+            report["budgets"]["session_used"] = self._window_sessions.get(session, 0)
+        return report
+
+
+class MeteredLLMClient(LLMClientWrapper):
+    """Client wrapper recording token usage and enforcing budgets.
+
+    Usage comes from ``LLMResponse.tokens_used``; when a backend does not
+    report it, the prompt and output are counted instead.
+    """
+
+    def __init__(self, inner: LLMClient, tracker: UsageTracker) -> None:
+        super().__init__(inner)
+        self.tracker = tracker
+
+    async def generate(
+        self,
+        prompt: str,
+        *,
+        system_prompt: Optional[str] = None,
+        max_tokens: Optional[int] = None,
+        temperature: float = 0.7,
+        model: Optional[str] = None,
+    ) -> LLMResponse:
+        scope = current_scope()
+        config = self.tracker.config
+        error = self.tracker.exceeded(scope.session)
+        downgraded = error is not None
+        if error is not None:
+            if config.on_exceeded != BudgetAction.DOWNGRADE or not config.downgrade_model:
+                raise error
+            model = config.downgrade_model
+
+        response = await self.inner.generate(
+            prompt,
+            system_prompt=system_prompt,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            model=model,
+        )
+        tokens = response.tokens_used
+        if not tokens:
+            tokens = await self.inner.count_tokens(
+                "\n".join(filter(None, (system_prompt, prompt, response.content)))
+            )
+        self.tracker.record(scope, response.model or model or "", tokens, downgraded)
+        return response
+
+
+# Global tracker instance
+_tracker: Optional[UsageTracker] = None
+_tracker_config: Optional[UsageConfig] = None
+
+
+def get_usage_tracker() -> Optional[UsageTracker]:
+    """Get the shared usage tracker, or None if accounting is disabled."""
+    global _tracker, _tracker_config
+    config = get_settings().usage
+    if not config.enabled:
+        return None
+    if _tracker is None or _tracker_config is not config:
+        _tracker = UsageTracker(config)
+        _tracker_config = config
+    return _tracker
+
+
+def reset_usage_tracker() -> None:
+    """Reset the shared tracker (useful for testing)."""
+    global _tracker, _tracker_config
+    _tracker = None
+    _tracker_config = None
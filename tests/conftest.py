@@ -1,5 +1,7 @@
 """Pytest fixtures for Spirrow-Cognilens tests."""
 
+import random
+
 import pytest
 
 from cognilens.core.compressor import CompressionEngine
@@ -53,3 +55,61 @@ def sample_diff_texts():
         "before": "def calculate(x, y): return x + y",
         "after": "def calculate(x, y, z=0): return x + y + z",
     }
+
+
+@pytest.fixture
+def make_log():
+    """Factory for a build log with repeated requests, errors and deep tracebacks."""
+
+    def make(requests: int = 1000) -> str:
+        lines = ["build started"]
+        for i in range(requests):
+            lines.append(f"INFO request {i} served in {i % 97}ms by worker-{i % 4}")
+            if i % 250 == 0:
+                lines.append(f"ERROR worker-{i % 4} timed out after {i}ms")
+                lines.append("Traceback (most recent call last):")
+                lines.append('  File "app.py", line 10, in handle')
+                lines.append("    return process(req)")
+                for _ in range(40):
+                    lines.append('  File "app.py", line 20, in process')
+                    lines.append("    return process(req.next)")
+                lines.append("RecursionError: maximum recursion depth exceeded")
+        lines.append("build finished")
+        return "\n".join(lines)
+
+    return make
+
+
+@pytest.fixture
+def make_users():
+    """Factory for user records with enum, numeric, optional and null fields."""
+
+    def make(count: int = 100) -> list[dict]:
+        return [
+            {
+                "id": i,
+                "status": ["active", "banned", "pending"][i % 3],
+                "score": i * 1.5,
+                "tags": ["a"] * (i % 3),
+                **({"email": f"u{i}@example.com"} if i % 5 == 0 else {}),
+                "note": None if i % 4 == 0 else "ok",
+            }
+            for i in range(count)
+        ]
+
+    return make
+
+
+@pytest.fixture
+def make_document():
+    """Factory for a long document of seeded random paragraphs."""
+
+    def make(paragraphs: int = 400, seed: int = 7) -> list[str]:
+        rng = random.Random(seed)
+        words = ["design", "cache", "token", "model", "context", "window", "latency", "summary"]
+        return [
+            " ".join(rng.choice(words) for _ in range(rng.randint(15, 60))).capitalize() + "."
+            for _ in range(paragraphs)
+        ]
+
+    return make
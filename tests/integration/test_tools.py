@@ -1,13 +1,39 @@
 """Integration tests for MCP tools."""
 
+import json
+import shutil
+import subprocess
+
 import pytest
+from fastmcp import Client
+from fastmcp.exceptions import ToolError
 
-from cognilens.config import LLMConfig, LLMProvider, Settings, reset_settings
+import cognilens.config
+from cognilens.bench.replay import replay
+from cognilens.blobs import reset_blob_store
+from cognilens.config import (
+    AdaptiveConcurrencyConfig,
+    BlobStoreConfig,
+    CompressionConfig,
+    FilesConfig,
+    LLMConfig,
+    LLMProvider,
+    LogDigestConfig,
+    RecorderConfig,
+    Settings,
+    StructuredDigestConfig,
+    UsageConfig,
+    reset_settings,
+)
+from cognilens.files import clear_file_cache
+from cognilens.recorder import get_trace_recorder, load_trace, reset_trace_recorder
+from cognilens.server import mcp
 from cognilens.tools.compress import compress_context
 from cognilens.tools.diff import summarize_diff
 from cognilens.tools.extract import extract_essence
 from cognilens.tools.progressive import progressive_compress
 from cognilens.tools.summarize import summarize
+from cognilens.tools.tree import build_summary_tree, summarize_at_level
 from cognilens.tools.unify import unify_summaries
 
 
@@ -20,8 +46,6 @@ def setup_mock_config(monkeypatch):
     # Patch get_settings to return mock configuration
     mock_settings = Settings.for_testing()
 
-    import cognilens.config
-
     monkeypatch.setattr(cognilens.config, "_settings", mock_settings)
 
 
@@ -120,3 +144,253 @@ async def test_progressive_compress_tool(sample_text):
     assert "overall_compression" in result
     assert result["total_stages"] == 2
     assert len(result["stages"]) == 2
+
+
+@pytest.fixture
+def files_root(tmp_path, monkeypatch):
+    """Allow tools to read files under a temporary directory."""
+    clear_file_cache()
+    monkeypatch.setattr(
+        cognilens.config,
+        "_settings",
+        Settings.for_testing(files=FilesConfig(allowed_roots=[str(tmp_path)])),
+    )
+    return tmp_path
+
+
+@pytest.mark.asyncio
+async def test_summarize_tool_reads_globs(files_root, sample_text):
+    """Test summarize reads matching files under the allowed roots."""
+    (files_root / "docs").mkdir()
+    (files_root / "docs" / "a.md").write_text(sample_text, encoding="utf-8")
+    (files_root / "docs" / "b.md").write_text(sample_text, encoding="utf-8")
+    (files_root / "docs" / "image.bin").write_bytes(b"\0\1\2")
+
+    result = await summarize(path="docs/*", max_tokens=100)
+
+    assert [p.rsplit("/", 1)[-1] for p in result["files"]] == ["a.md", "b.md"]
+    assert result["skipped_files"][0].endswith("image.bin")
+    assert result["original_tokens"] > 0
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(shutil.which("git") is None, reason="git is not installed")
+async def test_summarize_diff_tool_reads_repository_refs(files_root):
+    """Test a patch between two refs is read with git and summarized per file."""
+    repo = files_root / "repo"
+    repo.mkdir()
+
+    def git(*args):
+        subprocess.run(["git", "-C", str(repo), *args], check=True, capture_output=True)
+
+    git("init", "-q")
+    git("config", "user.email", "dev@example.com")
+    git("config", "user.name", "Dev")
+    (repo / "app.py").write_text("def main():\n    return 1\n")
+    (repo / "yarn.lock").write_text("a@1:\n  version 1\n")
+    git("add", ".")
+    git("commit", "-qm", "Initial")
+    (repo / "app.py").write_text("def main(argv):\n    return len(argv)\n")
+    (repo / "yarn.lock").write_text("a@2:\n  version 2\n")
+    git("commit", "-qam", "Take arguments")
+
+    result = await summarize_diff(repo="repo", base="HEAD~1", focus="API changes")
+
+    assert [f["path"] for f in result["files"]] == ["app.py", "yarn.lock"]
+    assert [f["local"] for f in result["files"]] == [False, True]
+    assert result["diff_summary"]
+
+    with pytest.raises(ValueError):
+        await summarize_diff(repo="repo", base="--output=/tmp/x")
+    with pytest.raises(ValueError):
+        await summarize_diff(before="a", after="b", patch=result["files"][0]["summary"])
+
+
+@pytest.mark.asyncio
+async def test_compress_context_tool_rejects_paths_outside_roots(files_root, tmp_path_factory):
+    """Test paths outside the allowed roots are refused."""
+    outside = tmp_path_factory.mktemp("outside") / "secret.txt"
+    outside.write_text("secret", encoding="utf-8")
+
+    with pytest.raises(PermissionError):
+        await compress_context("", "task", path=str(outside))
+
+
+@pytest.mark.asyncio
+async def test_summarize_tool_log_style_without_llm(monkeypatch):
+    """Test the log style returns the local digest when the LLM is turned off."""
+    settings = Settings.for_testing(
+        compression=CompressionConfig(log=LogDigestConfig(use_llm=False))
+    )
+    monkeypatch.setattr(cognilens.config, "_settings", settings)
+    log = "\n".join(f"GET /items/{i} 200 in {i % 50}ms" for i in range(5000))
+    log += "\nFATAL out of memory"
+
+    result = await summarize(text=log, max_tokens=300, style="log")
+
+    assert "x5000 L1-L5000 GET <*> <*> in <*>" in result["summary"]
+    assert "FATAL out of memory" in result["summary"]
+    assert result["compression_ratio"] < 0.05
+
+
+@pytest.mark.asyncio
+async def test_summarize_tool_structured_style_without_llm(monkeypatch):
+    """Test the structured style returns the schema digest when the LLM is turned off."""
+    settings = Settings.for_testing(
+        compression=CompressionConfig(structured=StructuredDigestConfig(use_llm=False))
+    )
+    monkeypatch.setattr(cognilens.config, "_settings", settings)
+    rows = "\n".join(
+        f'{{"order": {i}, "state": "{"paid" if i % 2 else "open"}", "total": {i * 10}}}'
+        for i in range(3000)
+    )
+
+    result = await summarize(text=rows, max_tokens=300, style="structured")
+
+    assert '.state: str, enum {"open": 1500, "paid": 1500}' in result["summary"]
+    assert ".total: int, range 0..29990" in result["summary"]
+    assert result["compression_ratio"] < 0.05
+
+
+@pytest.fixture
+def blobs_enabled(monkeypatch):
+    """Enable the blob store, which is off by default."""
+    reset_blob_store()
+    monkeypatch.setattr(
+        cognilens.config, "_settings", Settings.for_testing(blobs=BlobStoreConfig(enabled=True))
+    )
+    yield
+    reset_blob_store()
+
+
+@pytest.mark.asyncio
+async def test_handles_are_off_by_default(sample_text):
+    """Test tools return no handles and reject handle input unless the store is enabled."""
+    result = await summarize(text=sample_text, max_tokens=100)
+    assert not any(key.endswith("_handle") for key in result)
+
+    with pytest.raises(ValueError, match="blobs.enabled"):
+        await summarize(text="handle:" + "0" * 64)
+
+
+@pytest.mark.asyncio
+async def test_tools_accept_handles_from_earlier_results(blobs_enabled, sample_text):
+    """Test stage handles from progressive_compress can be passed to other tools."""
+    progressive = await progressive_compress(
+        text=sample_text,
+        stages=[{"target_ratio": 0.6}, {"target_ratio": 0.3}],
+        include_stage_text=False,
+    )
+
+    stage_handles = [s["compressed_text_handle"] for s in progressive["stages"]]
+    assert all("compressed_text" not in s for s in progressive["stages"])
+
+    result = await summarize_diff(before=stage_handles[0], after=stage_handles[1])
+    assert result["diff_summary"]
+    assert result["before_handle"] == stage_handles[0]
+
+    summary = await summarize(text=progressive["input_handle"], max_tokens=100)
+    assert summary["input_handle"] == progressive["input_handle"]
+
+
+@pytest.mark.asyncio
+async def test_unknown_handle_is_rejected(blobs_enabled):
+    """Test an unknown handle raises instead of being summarized as text."""
+    with pytest.raises(KeyError):
+        await extract_essence(document="handle:" + "0" * 64)
+
+
+@pytest.mark.asyncio
+async def test_text_starting_with_handle_prefix_is_literal(blobs_enabled, sample_text):
+    """Test ordinary text beginning with "handle:" is summarized, not resolved."""
+    result = await summarize(text=f"handle: the request must be retried.\n{sample_text}")
+
+    assert result["summary"]
+    assert result["original_tokens"] > 0
+
+
+@pytest.mark.asyncio
+async def test_summary_tree_tools(blobs_enabled, sample_text):
+    """Test a built tree answers zoom requests on the document and its nodes."""
+    document = "\n\n".join(f"Section {i}. {sample_text}" for i in range(40))
+
+    tree = await build_summary_tree(text=document)
+    assert tree["summary"]
+    assert tree["levels"] >= 2
+    assert tree["nodes"][0]["id"] == f"L{tree['levels'] - 1}.0"
+
+    brief = await summarize_at_level(text=tree["input_handle"], max_tokens=100)
+    assert brief["cached"]
+    assert brief["summary"]
+
+    section = await summarize_at_level(text=document, max_tokens=300, node="L0.0")
+    assert section["scope"] == "L0.0"
+
+    with pytest.raises(KeyError):
+        await summarize_at_level(text=document, node="L9.9")
+
+
+@pytest.mark.asyncio
+async def test_server_records_tool_calls_for_replay(monkeypatch, tmp_path, sample_text):
+    """Test recorded server traffic replays against the configured backend."""
+    trace = tmp_path / "trace.jsonl"
+    monkeypatch.setattr(
+        cognilens.config,
+        "_settings",
+        Settings.for_testing(recorder=RecorderConfig(enabled=True, path=str(trace))),
+    )
+    try:
+        async with Client(mcp) as client:
+            await client.call_tool("summarize", {"text": sample_text, "style": "bullet"})
+        get_trace_recorder().flush()
+    finally:
+        reset_trace_recorder()
+
+    entries = load_trace(trace)
+    assert [e.tool for e in entries] == ["summarize"]
+    assert entries[0].arguments["style"] == "bullet"
+    assert len(entries[0].arguments["text"]) == len(sample_text)
+
+    report = await replay(entries, speed=100.0)
+    assert len(report.results) == 1
+    assert report.errors == 0
+
+
+@pytest.mark.asyncio
+async def test_server_exposes_concurrency_limits(monkeypatch, sample_text):
+    """Test the current adaptive limits are readable as a server resource."""
+    llm = LLMConfig(
+        provider=LLMProvider.MOCK,
+        model="mock-model",
+        concurrency=AdaptiveConcurrencyConfig(enabled=True, initial_limit=4),
+    )
+    monkeypatch.setattr(cognilens.config, "_settings", Settings.for_testing(llm=llm))
+
+    async with Client(mcp) as client:
+        await client.call_tool("summarize", {"text": sample_text})
+        contents = await client.read_resource("cognilens://metrics/concurrency")
+
+    rows = json.loads(contents[0].text)
+    assert rows[0]["endpoint"] == "mock"
+    assert rows[0]["limit"] >= 4
+    assert rows[0]["in_flight"] == 0
+
+
+@pytest.mark.asyncio
+async def test_server_reports_usage_and_enforces_session_budget(monkeypatch, sample_text):
+    """Test usage is reported per session and a session over budget is stopped."""
+    monkeypatch.setattr(
+        cognilens.config,
+        "_settings",
+        Settings.for_testing(usage=UsageConfig(session_token_budget=1)),
+    )
+
+    async with Client(mcp) as client:
+        await client.call_tool("summarize", {"text": sample_text})
+        with pytest.raises(ToolError, match="budget"):
+            await client.call_tool("summarize", {"text": sample_text})
+        report = (await client.call_tool("get_usage", {})).data
+
+    assert report["session"]["id"] == "local"
+    assert report["session"]["calls"] == 1
+    assert report["by_tool"]["summarize"]["tokens"] == report["budgets"]["session_used"]
@@ -0,0 +1,83 @@
+"""Unit tests for micro-batching of Lexora generate calls."""
+
+import asyncio
+
+import httpx
+import pytest
+
+from cognilens.bench.lexora_stub import LexoraStub
+from cognilens.config import LLMConfig, LLMProvider, MicroBatchConfig
+from cognilens.llm.batching import MicroBatcher
+from cognilens.llm.lexora_client import LexoraClient
+
+
+def _client(stub: LexoraStub, **batching) -> LexoraClient:
+    config = LLMConfig(
+        provider=LLMProvider.LEXORA,
+        base_url="http://lexora",
+        batching=MicroBatchConfig(**batching),
+    )
+    client = LexoraClient(config)
+    client._http = httpx.AsyncClient(transport=stub.transport())
+    return client
+
+
+@pytest.mark.asyncio
+async def test_concurrent_calls_share_one_request():
+    """Test concurrent calls with the same parameters go out as one batch."""
+    stub = LexoraStub()
+    client = _client(stub, enabled=True, window_ms=20)
+
+    responses = await asyncio.gather(
+        *(client.generate(f"Summarize:\ntext {i}", max_tokens=50) for i in range(5))
+    )
+
+    assert [r.content for r in responses] == [f"text {i}" for i in range(5)]
+    assert stub.batch_sizes == [5]
+    await client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_batches_split_by_parameters_and_size():
+    """Test differing parameters never share a batch and size is capped."""
+    stub = LexoraStub()
+    client = _client(stub, enabled=True, window_ms=20, max_batch_size=3)
+
+    await asyncio.gather(
+        *(client.generate(f"a {i}") for i in range(4)),
+        client.generate("b", temperature=0.0),
+    )
+
+    assert sorted(stub.batch_sizes) == [1, 1, 3]
+    await client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_batching_is_opt_in():
+    """Test calls are sent one by one unless batching is enabled."""
+    stub = LexoraStub()
+    client = _client(stub)
+
+    await asyncio.gather(*(client.generate(f"p {i}") for i in range(3)))
+
+    assert client.batcher is None
+    assert stub.batch_sizes == [1, 1, 1]
+    await client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_failed_batch_fails_every_caller():
+    """Test an error from the batched request reaches each caller."""
+
+    async def send(key, prompts):
+        raise RuntimeError("server down")
+
+    batcher = MicroBatcher(send, window_seconds=0.01, max_batch_size=8)
+
+    results = await asyncio.gather(
+        batcher.submit("k", "a"), batcher.submit("k", "b"), return_exceptions=True
+    )
+
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert (batcher.batches, batcher.batched_prompts, batcher.largest_batch) == (1, 2, 2)
+    assert batcher.mean_batch_size == 2.0
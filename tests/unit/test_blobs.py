@@ -0,0 +1,69 @@
+"""Unit tests for the content-addressed blob store."""
+
+import time
+
+import pytest
+
+from cognilens.blobs import BlobStore, digest_text, is_handle, parse_handle
+
+
+def test_put_returns_content_addressed_handle():
+    """Test handles are derived from the SHA-256 of the text."""
+    store = BlobStore(max_bytes=1024, ttl_seconds=60)
+
+    handle = store.put("hello")
+
+    assert handle == f"handle:{digest_text('hello')}"
+    assert store.put("hello") == handle
+    assert store.get(handle) == "hello"
+    assert store.contains(digest_text("hello"))
+    assert store.resolve("plain text") == "plain text"
+    assert store.stats() == {"entries": 1, "bytes": 5}
+
+
+def test_entries_expire_after_ttl():
+    """Test expired handles can no longer be resolved."""
+    store = BlobStore(max_bytes=1024, ttl_seconds=0.01)
+    handle = store.put("short-lived")
+
+    time.sleep(0.02)
+
+    with pytest.raises(KeyError):
+        store.get(handle)
+    assert store.stats()["bytes"] == 0
+
+
+def test_least_recently_used_entries_are_evicted_beyond_size_cap():
+    """Test the size cap evicts the least recently used entries."""
+    store = BlobStore(max_bytes=10, ttl_seconds=60)
+    first = store.put("aaaa")
+    second = store.put("bbbb")
+    store.get(first)
+
+    store.put("cccc")
+
+    assert store.contains(first)
+    assert not store.contains(second)
+    assert store.put("x" * 11) is None
+    assert not store.contains(digest_text("x" * 11))
+
+
+def test_parse_handle_rejects_malformed_values():
+    """Test handles must carry a SHA-256 hex digest."""
+    digest = digest_text("a")
+
+    assert parse_handle(f"handle:{digest.upper()}") == digest
+    with pytest.raises(ValueError):
+        parse_handle("handle:not-a-digest")
+
+
+def test_only_exact_handles_are_resolved():
+    """Test text that merely starts with "handle:" is passed through literally."""
+    store = BlobStore(max_bytes=1024, ttl_seconds=60)
+    handle = store.put("hello")
+    prose = "handle: the request must be retried"
+
+    assert is_handle(handle)
+    assert not is_handle(prose)
+    assert not is_handle(f"{handle} and more")
+    assert store.resolve(prose) == prose
@@ -0,0 +1,48 @@
+"""Unit tests for content-defined chunking and the chunk summary cache."""
+
+import pytest
+
+from cognilens.core.chunk_cache import ChunkSummaryCache
+from cognilens.core.chunking import chunk_id, content_defined_chunks
+from cognilens.core.compressor import CompressionEngine
+
+
+def test_content_defined_chunks_round_trip_and_bounds(make_document):
+    """Test chunks concatenate to the input and respect the size limits."""
+    text = "\n\n".join(make_document())
+    chunks = content_defined_chunks(text, avg_chars=2000, min_chars=500, max_chars=6000)
+
+    assert "".join(chunks) == text
+    assert len(chunks) > 5
+    assert all(len(chunk) <= 6000 for chunk in chunks)
+    assert all(len(chunk) >= 500 for chunk in chunks[:-1])
+
+
+def test_edit_only_changes_nearby_chunks(make_document):
+    """Test a local edit leaves the other chunk IDs unchanged."""
+    paragraphs = make_document()
+    before = content_defined_chunks("\n\n".join(paragraphs), 2000, 500, 6000)
+    paragraphs[200] = "An inserted remark. " + paragraphs[200]
+    after = content_defined_chunks("\n\n".join(paragraphs), 2000, 500, 6000)
+
+    changed = {chunk_id(c) for c in after} - {chunk_id(c) for c in before}
+    assert 1 <= len(changed) <= 2
+
+
+@pytest.mark.asyncio
+async def test_engine_reuses_cached_chunk_summaries(mock_llm_client, make_document):
+    """Test re-summarizing an edited document only summarizes changed chunks."""
+    engine = CompressionEngine(llm_client=mock_llm_client, chunk_cache=ChunkSummaryCache())
+    paragraphs = make_document(paragraphs=600)
+
+    first = await engine.summarize("\n\n".join(paragraphs), max_tokens=200)
+    chunks = first.metadata["chunk_cache"]["chunks"]
+    assert first.metadata["chunk_cache"]["summarized"] == chunks
+    assert mock_llm_client.call_count == chunks + 1
+
+    paragraphs[300] = "An inserted remark. " + paragraphs[300]
+    second = await engine.summarize("\n\n".join(paragraphs), max_tokens=200)
+
+    assert second.metadata["chunk_cache"]["summarized"] <= 2
+    assert mock_llm_client.call_count <= chunks + 1 + 3
+    assert second.original_tokens > first.original_tokens
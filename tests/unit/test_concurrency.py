@@ -0,0 +1,134 @@
+"""Unit tests for adaptive concurrency limits."""
+
+import asyncio
+from typing import Optional
+
+import pytest
+
+from cognilens.config import (
+    AdaptiveConcurrencyConfig,
+    LLMConfig,
+    MockLLMConfig,
+    MockModelProfile,
+)
+from cognilens.llm import (
+    AIMDLimiter,
+    ConcurrencyLimitedClient,
+    ConcurrencyLimits,
+    MockServerError,
+    concurrency_snapshot,
+    create_llm_client,
+)
+from cognilens.llm.concurrency import is_overload
+from cognilens.llm.endpoints import EndpointPool
+
+
+async def _call(limiter: AIMDLimiter, seconds: float, error: Optional[Exception] = None) -> None:
+    async with limiter.acquire():
+        await asyncio.sleep(seconds)
+        if error is not None:
+            raise error
+
+
+@pytest.mark.asyncio
+async def test_limit_grows_while_calls_succeed():
+    """Test a saturated limiter raises its limit by about one per round."""
+    limiter = AIMDLimiter(initial_limit=2, max_limit=10)
+
+    await asyncio.gather(*(_call(limiter, 0.005) for _ in range(40)))
+
+    assert limiter.limit > 2
+    assert limiter.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_throttling_cuts_limit_once_per_round():
+    """Test concurrent 429s halve the limit once rather than once per call."""
+    limiter = AIMDLimiter(initial_limit=8)
+
+    results = await asyncio.gather(
+        *(_call(limiter, 0.005, MockServerError(429)) for _ in range(8)),
+        return_exceptions=True,
+    )
+
+    assert all(isinstance(r, MockServerError) for r in results)
+    assert limiter.limit == 4
+
+
+@pytest.mark.asyncio
+async def test_latency_increase_cuts_limit():
+    """Test a call much slower than the recent minimum counts as queueing."""
+    limiter = AIMDLimiter(initial_limit=4, latency_tolerance=2.0)
+    for _ in range(5):
+        await _call(limiter, 0.005)
+
+    await _call(limiter, 0.05)
+
+    assert limiter.limit == 2
+
+
+def test_overload_signals():
+    """Test throttling and timeouts are overload; client errors are not."""
+    assert is_overload(MockServerError(429))
+    assert is_overload(MockServerError(503))
+    assert is_overload(TimeoutError())
+    assert not is_overload(MockServerError(400))
+    assert not is_overload(ValueError("bad"))
+
+
+@pytest.mark.asyncio
+async def test_client_caps_concurrency_per_model():
+    """Test generate calls wait for a slot and limits are tracked per model."""
+    config = LLMConfig(
+        model="main",
+        concurrency=AdaptiveConcurrencyConfig(
+            enabled=True, initial_limit=2, min_limit=2, max_limit=2
+        ),
+        mock=MockLLMConfig(default_profile=MockModelProfile(ttft_seconds=0.02)),
+    )
+    client = create_llm_client(config)
+    inner = client.inner.inner
+    peak = 0
+    original = inner.generate
+
+    async def tracked(*args, **kwargs):
+        nonlocal peak
+        peak = max(peak, client.inner.limiter().in_flight)
+        return await original(*args, **kwargs)
+
+    inner.generate = tracked
+
+    await asyncio.gather(
+        *(client.generate("text") for _ in range(6)),
+        client.generate("text", model="other"),
+    )
+
+    assert isinstance(client.inner, ConcurrencyLimitedClient)
+    assert peak == 2
+    snapshot = concurrency_snapshot(client)
+    assert {(row["endpoint"], row["model"]) for row in snapshot} == {
+        ("mock", "main"),
+        ("mock", "other"),
+    }
+    assert all(row["limit"] == 2 and row["in_flight"] == 0 for row in snapshot)
+
+
+@pytest.mark.asyncio
+async def test_pool_limits_each_endpoint_separately():
+    """Test a throttling endpoint lowers only its own limit."""
+    config = AdaptiveConcurrencyConfig(enabled=True, initial_limit=8)
+    pool = EndpointPool(["http://a", "http://b"], limits=ConcurrencyLimits(config))
+    a, b = pool.endpoints
+
+    b.healthy = False
+    with pytest.raises(MockServerError):
+        async with pool.acquire(model="main"):
+            raise MockServerError(429)
+    b.healthy, a.healthy = True, False
+    async with pool.acquire(model="main"):
+        pass
+    async with pool.acquire():
+        pass  # Requests without a model (probes, classification) are not limited
+
+    limits = {(row["endpoint"], row["model"]): row["limit"] for row in pool.limits.snapshot()}
+    assert limits == {("http://a", "main"): 4, ("http://b", "main"): 8}
@@ -0,0 +1,175 @@
+"""Unit tests for endpoint load balancing and circuit breaking."""
+
+import random
+
+import httpx
+import pytest
+
+from cognilens.config import LLMConfig, LLMProvider, LoadBalancingConfig
+from cognilens.llm.endpoints import CircuitBreaker, CircuitState, EndpointPool
+from cognilens.llm.lexora_client import LexoraClient
+
+
+class StatusError(Exception):
+    """Exception carrying an HTTP status code, like SDK API errors."""
+
+    def __init__(self, status_code: int) -> None:
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+
+def test_circuit_breaker_opens_and_half_opens(monkeypatch):
+    """Test breaker opens after failures and admits a probe after cool-down."""
+    now = [100.0]
+    monkeypatch.setattr("cognilens.llm.endpoints.time.monotonic", lambda: now[0])
+    breaker = CircuitBreaker(failure_threshold=2, open_seconds=10)
+
+    breaker.record_failure()
+    assert breaker.state == CircuitState.CLOSED
+    breaker.record_failure()
+    assert breaker.state == CircuitState.OPEN
+    assert not breaker.can_accept()
+
+    now[0] += 10
+    assert breaker.state == CircuitState.HALF_OPEN
+    assert breaker.can_accept()
+    breaker.on_request()
+    assert not breaker.can_accept()
+
+    breaker.record_success()
+    assert breaker.state == CircuitState.CLOSED
+
+
+def test_half_open_failure_reopens(monkeypatch):
+    """Test a failed half-open probe opens the circuit again."""
+    now = [0.0]
+    monkeypatch.setattr("cognilens.llm.endpoints.time.monotonic", lambda: now[0])
+    breaker = CircuitBreaker(failure_threshold=1, open_seconds=5)
+    breaker.record_failure()
+    now[0] += 5
+    breaker.on_request()
+
+    breaker.record_failure()
+    assert breaker.state == CircuitState.OPEN
+
+
+def test_pool_prefers_less_loaded_endpoint():
+    """Test balancing avoids the endpoint with more requests in flight."""
+    pool = EndpointPool(["http://a", "http://b"], rng=random.Random(0))
+    pool.endpoints[0].outstanding = 5
+
+    assert all(pool.select().url == "http://b" for _ in range(10))
+
+
+def test_pool_session_affinity_is_stable():
+    """Test prompts with the same prefix land on the same endpoint."""
+    pool = EndpointPool(["http://a", "http://b", "http://c"])
+
+    chosen = {pool.select("shared prefix").url for _ in range(20)}
+    assert len(chosen) == 1
+
+
+def test_pool_affinity_yields_to_imbalance():
+    """Test affinity is dropped when the pinned endpoint is overloaded."""
+    config = LoadBalancingConfig(affinity_max_imbalance=1)
+    pool = EndpointPool(["http://a", "http://b"], config)
+    pinned = pool.select("shared prefix")
+    pinned.outstanding = 3
+
+    assert pool.select("shared prefix") is not pinned
+
+
+@pytest.mark.asyncio
+async def test_pool_ejects_failing_endpoint():
+    """Test an endpoint with an open circuit stops receiving traffic."""
+    config = LoadBalancingConfig(failure_threshold=1)
+    pool = EndpointPool(["http://a", "http://b"], config)
+
+    with pytest.raises(StatusError):
+        async with pool.acquire() as endpoint:
+            failed = endpoint
+            raise StatusError(503)
+
+    assert failed.breaker.state == CircuitState.OPEN
+    for _ in range(10):
+        async with pool.acquire() as endpoint:
+            assert endpoint is not failed
+
+
+@pytest.mark.asyncio
+async def test_client_errors_do_not_trip_breaker():
+    """Test non-retryable errors are not counted against the endpoint."""
+    config = LoadBalancingConfig(failure_threshold=1)
+    pool = EndpointPool(["http://a"], config)
+
+    with pytest.raises(StatusError):
+        async with pool.acquire():
+            raise StatusError(400)
+
+    assert pool.endpoints[0].breaker.state == CircuitState.CLOSED
+
+
+@pytest.mark.asyncio
+async def test_health_check_marks_unhealthy_endpoints():
+    """Test probing excludes unhealthy endpoints from selection."""
+
+    async def probe(url: str) -> bool:
+        return url == "http://b"
+
+    pool = EndpointPool(["http://a", "http://b"], probe=probe)
+    assert await pool.check_health()
+
+    assert [e.healthy for e in pool.endpoints] == [False, True]
+    assert all(pool.select().url == "http://b" for _ in range(10))
+
+
+@pytest.mark.asyncio
+async def test_single_endpoint_is_not_probed_in_background():
+    """Test background health checks only run when there is an endpoint to fail over to."""
+    probed: list[str] = []
+
+    async def probe(url: str) -> bool:
+        probed.append(url)
+        return True
+
+    single = EndpointPool(["http://a"], probe=probe)
+    async with single.acquire():
+        pass
+    assert single._health_task is None
+
+    pair = EndpointPool(["http://a", "http://b"], probe=probe)
+    async with pair.acquire():
+        pass
+    assert pair._health_task is not None
+    await pair.close()
+
+
+@pytest.mark.asyncio
+async def test_lexora_client_fails_over_between_endpoints():
+    """Test LexoraClient routes around an endpoint returning server errors."""
+    seen: list[str] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(request.url.host)
+        if request.url.host == "bad":
+            return httpx.Response(503)
+        return httpx.Response(200, json={"content": "ok", "model": "m", "tokens_used": 1})
+
+    config = LLMConfig(
+        provider=LLMProvider.LEXORA,
+        endpoints=["http://bad", "http://good"],
+        load_balancing=LoadBalancingConfig(failure_threshold=1, affinity_prefix_chars=0),
+    )
+    client = LexoraClient(config)
+    client._http = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+    results = []
+    for _ in range(6):
+        try:
+            results.append((await client.generate("prompt")).content)
+        except httpx.HTTPStatusError:
+            results.append("error")
+
+    assert results.count("error") <= 1
+    assert seen.count("bad") <= 1
+    await client.aclose()
@@ -0,0 +1,65 @@
+"""Unit tests for file input."""
+
+import os
+
+import pytest
+
+from cognilens.config import FilesConfig
+from cognilens.files import clear_file_cache, load_files, resolve_paths
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    """Start every test with an empty file cache."""
+    clear_file_cache()
+
+
+def test_resolve_paths_requires_allowed_roots(tmp_path):
+    """Test file input is disabled without roots and confined to them."""
+    root = tmp_path / "root"
+    root.mkdir()
+    (root / "a.txt").write_text("a", encoding="utf-8")
+    (tmp_path / "outside.txt").write_text("secret", encoding="utf-8")
+    (root / "link.txt").symlink_to(tmp_path / "outside.txt")
+
+    with pytest.raises(PermissionError):
+        resolve_paths(str(root / "a.txt"), FilesConfig())
+
+    config = FilesConfig(allowed_roots=[str(root)])
+    assert resolve_paths("a.txt", config) == [(root / "a.txt").resolve()]
+    with pytest.raises(PermissionError):
+        resolve_paths("link.txt", config)
+    with pytest.raises(FileNotFoundError):
+        resolve_paths("missing/*.txt", config)
+
+
+def test_load_files_cache_is_keyed_on_mtime_and_size(tmp_path):
+    """Test a modified file is re-read while an unchanged one is cached."""
+    path = tmp_path / "notes.txt"
+    path.write_text("first version", encoding="utf-8")
+    config = FilesConfig(allowed_roots=[str(tmp_path)])
+
+    assert load_files("notes.txt", config).text == "first version"
+
+    path.write_text("second version, longer", encoding="utf-8")
+    os.utime(path, ns=(1, 1))
+    assert load_files("notes.txt", config).text == "second version, longer"
+
+
+def test_glob_over_total_size_limit_is_rejected(tmp_path):
+    """Test a glob whose matches exceed max_total_bytes is rejected before reading."""
+    for name in ("a.txt", "b.txt", "c.txt"):
+        (tmp_path / name).write_text("x" * 100, encoding="utf-8")
+    config = FilesConfig(allowed_roots=[str(tmp_path)], max_total_bytes=250)
+
+    assert len(resolve_paths("[ab].txt", config)) == 2
+    with pytest.raises(ValueError, match="250"):
+        load_files("*.txt", config)
+
+
+def test_load_files_strips_bom_and_keeps_line_endings(tmp_path):
+    """Test files are decoded as UTF-8 without the BOM and with their own newlines."""
+    (tmp_path / "ja.txt").write_bytes("\ufeff情報圧縮\r\n".encode())
+    config = FilesConfig(allowed_roots=[str(tmp_path)])
+
+    assert load_files("ja.txt", config).text == "情報圧縮\r\n"
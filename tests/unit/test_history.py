@@ -0,0 +1,108 @@
+"""Unit tests for the compression history store."""
+
+import sqlite3
+
+import pytest
+
+from cognilens.core.compressor import CompressionEngine
+from cognilens.history import HistoryRecord, HistoryStore, content_hash
+
+
+@pytest.fixture
+def history_store(tmp_path):
+    """Create a history store in a temporary directory."""
+    store = HistoryStore(tmp_path / "history.db", batch_size=10, flush_interval_seconds=0.05)
+    yield store
+    store.close()
+
+
+def test_store_uses_wal_and_batches_writes(history_store):
+    """Test records are written in WAL mode without storing content by default."""
+    for i in range(25):
+        history_store.record(HistoryRecord(tool="summarize", total_ms=i, content="secret"))
+    history_store.flush()
+
+    conn = sqlite3.connect(history_store.path)
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    assert conn.execute("SELECT COUNT(*) FROM compression_history").fetchone()[0] == 25
+    assert conn.execute("SELECT COUNT(content) FROM compression_history").fetchone()[0] == 0
+    conn.close()
+
+
+def test_failed_batch_does_not_stop_the_writer(history_store):
+    """Test a batch that fails to commit is counted and later batches are written."""
+    with sqlite3.connect(history_store.path) as conn:
+        conn.execute("ALTER TABLE compression_history RENAME TO renamed")
+    history_store.record(HistoryRecord(tool="summarize", total_ms=1))
+    history_store.flush()
+    assert history_store.failed == 1
+
+    with sqlite3.connect(history_store.path) as conn:
+        conn.execute("ALTER TABLE renamed RENAME TO compression_history")
+    history_store.record(HistoryRecord(tool="summarize", total_ms=2))
+    history_store.flush()
+
+    conn = sqlite3.connect(history_store.path)
+    assert conn.execute("SELECT total_ms FROM compression_history").fetchall() == [(2,)]
+    conn.close()
+
+
+def test_latency_percentiles_by_model_and_style(history_store):
+    """Test p95 latency is reported per (model, style) group."""
+    for ms in range(1, 101):
+        history_store.record(
+            HistoryRecord(tool="summarize", model="a", style="concise", total_ms=float(ms))
+        )
+    history_store.record(HistoryRecord(tool="summarize", model="b", style="concise", total_ms=7.0))
+    history_store.flush()
+
+    results = {r["model"]: r for r in history_store.latency_percentiles(0.95)}
+
+    assert results["a"]["count"] == 100
+    assert results["a"]["latency_ms"] == 96.0
+    assert results["b"]["latency_ms"] == 7.0
+    with pytest.raises(ValueError):
+        history_store.latency_percentiles(group_by=("content",))
+
+
+def test_ratio_accuracy(history_store):
+    """Test actual versus target ratios are averaged per group."""
+    history_store.record(
+        HistoryRecord(
+            tool="summarize",
+            style="concise",
+            input_tokens=1000,
+            output_tokens=150,
+            target_tokens=100,
+        )
+    )
+    history_store.record(
+        HistoryRecord(tool="extract_essence", input_tokens=1000, output_tokens=400)
+    )
+    history_store.flush()
+
+    (row,) = history_store.ratio_accuracy()
+
+    assert row["tool"] == "summarize"
+    assert row["target_ratio"] == pytest.approx(0.1)
+    assert row["actual_ratio"] == pytest.approx(0.15)
+    assert row["overshoot"] == pytest.approx(1.5)
+
+
+@pytest.mark.asyncio
+async def test_engine_records_calls(mock_llm_client, history_store, sample_text):
+    """Test engine calls are recorded with a latency breakdown."""
+    engine = CompressionEngine(llm_client=mock_llm_client, history_store=history_store)
+
+    result = await engine.summarize(sample_text, max_tokens=50, style="bullet")
+    history_store.flush()
+
+    (row,) = history_store.query("SELECT * FROM compression_history")
+    assert row["tool"] == "summarize"
+    assert row["style"] == "bullet"
+    assert row["target_tokens"] == 50
+    assert row["input_tokens"] == result.original_tokens
+    assert row["output_tokens"] == result.compressed_tokens
+    assert row["content_hash"] == content_hash(sample_text)
+    assert row["total_ms"] >= row["generate_ms"] > 0
+    assert mock_llm_client.call_count == 1
@@ -1,8 +1,14 @@
 """Unit tests for LLM clients."""
 
+import asyncio
+
+import httpx
 import pytest
 
+from cognilens.config import LLMConfig, LLMProvider
+from cognilens.llm.lexora_client import LexoraClient
 from cognilens.llm.mock import MockLLMClient
+from cognilens.llm.token_estimator import estimate_tokens
 
 
 @pytest.mark.asyncio
@@ -23,8 +29,7 @@ async def test_mock_llm_count_tokens():
     count = await client.count_tokens("Hello world, this is a test.")
 
     assert count > 0
-    # Approximately 4 chars per token
-    assert count == len("Hello world, this is a test.") // 4
+    assert count == estimate_tokens("Hello world, this is a test.")
 
 
 @pytest.mark.asyncio
@@ -59,3 +64,69 @@ async def test_mock_llm_respects_max_tokens():
 
     # Response should be truncated
     assert len(response.content.split()) <= 25  # max_tokens // 2
+
+
+def _capabilities_client(handler):
+    """Create a LexoraClient whose HTTP traffic goes to ``handler``."""
+    client = LexoraClient(LLMConfig(provider=LLMProvider.LEXORA))
+    client._http = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return client
+
+
+def _capabilities_handler(calls, version="v1"):
+    def handler(request):
+        calls.append(request.url.path)
+        return httpx.Response(
+            200,
+            json={"models": [{"model_id": version, "capabilities": ["summarization"]}]},
+        )
+
+    return handler
+
+
+@pytest.mark.asyncio
+async def test_capabilities_served_stale_while_revalidating():
+    """Test expired capabilities are served at once and refreshed in the background."""
+    calls: list[str] = []
+    client = _capabilities_client(_capabilities_handler(calls))
+    cache = await client.get_model_capabilities()
+    cache.fetched_at -= cache.ttl_seconds + 1
+
+    results = await asyncio.gather(*(client.get_model_capabilities() for _ in range(10)))
+
+    # Every caller got the stale entry without waiting for the API
+    assert all(result is cache for result in results)
+    await client._refresh_task
+    assert len(calls) == 2
+    assert client._capabilities_cache is not cache
+
+
+@pytest.mark.asyncio
+async def test_capabilities_past_max_age_are_refetched():
+    """Test entries past the hard maximum age are not served."""
+    calls: list[str] = []
+    client = _capabilities_client(_capabilities_handler(calls))
+    cache = await client.get_model_capabilities()
+    cache.fetched_at -= cache.max_age_seconds + 1
+
+    results = await asyncio.gather(*(client.get_model_capabilities() for _ in range(5)))
+
+    assert all(result is not cache for result in results)
+    # Concurrent fetches were coalesced into a single request
+    assert len(calls) == 2
+    assert client.find_model_for_capability("summarization") == "v1"
+
+
+@pytest.mark.asyncio
+async def test_capabilities_ttl_is_jittered():
+    """Test cached TTLs are spread around the configured value."""
+    calls: list[str] = []
+    client = _capabilities_client(_capabilities_handler(calls))
+
+    ttls = set()
+    for _ in range(5):
+        cache = await client.get_model_capabilities(force_refresh=True)
+        ttls.add(cache.ttl_seconds)
+
+    assert len(ttls) > 1
+    assert all(270 <= ttl <= 330 for ttl in ttls)
@@ -0,0 +1,48 @@
+"""Unit tests for log template mining."""
+
+from cognilens.config import LogDigestConfig
+from cognilens.core.log_digest import WILDCARD, TemplateMiner, digest_log
+
+
+def test_miner_merges_lines_into_templates():
+    """Test lines differing in variables share a template."""
+    miner = TemplateMiner()
+    miner.add("connected to db-1 as admin", 1)
+    miner.add("connected to db-2 as admin", 2)
+    template = miner.add("connected to cache as guest", 3)
+
+    assert len(miner.templates) == 1
+    assert template.text == f"connected to {WILDCARD} as {WILDCARD}"
+    assert template.count == 3
+    assert template.variables() == [["db-1", "db-2", "cache"], ["admin", "guest"]]
+
+
+def test_digest_collapses_lines_and_keeps_errors(make_log):
+    """Test repeated lines, traces and errors are reduced to one entry each."""
+    text = make_log()
+    digest = digest_log(text)
+
+    served = max(digest.templates, key=lambda t: t.count)
+    assert served.count == 1000
+    assert served.first_line == 2 and served.last == "INFO request 999 served in 29ms by worker-3"
+    assert [error.count for error in digest.errors] == [4, 4, 4]
+    assert digest.errors[0].text == "ERROR worker-0 timed out after 0ms"
+
+    (trace,) = digest.traces
+    assert trace.count == 4
+    assert trace.folded_frames == 78
+    assert trace.frames[-1] == "... previous 2 frame(s) repeated 39 more times"
+
+    rendered = digest.render()
+    assert len(rendered) < len(text) // 20
+    assert "build started" in rendered and "build finished" in rendered
+
+
+def test_digest_limits_templates():
+    """Test rare templates beyond the limit are summarized in one line."""
+    words = ["alpha", "bravo", "charlie", "delta", "echo", "foxtrot", "golf", "hotel", "india"]
+    text = "\n".join(f"{word} started" for word in [*words, "juliet"]) + "\n" + "tick 1\n" * 5
+    rendered = digest_log(text).render(LogDigestConfig(max_templates=2))
+
+    assert "x5 L11-L15 tick <*>" in rendered
+    assert "9 rarer templates covering 9 lines" in rendered
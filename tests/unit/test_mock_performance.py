@@ -0,0 +1,101 @@
+"""Unit tests for the mock client's performance model."""
+
+import asyncio
+import time
+
+import pytest
+
+from cognilens.config import JitterDistribution, MockLLMConfig, MockModelProfile
+from cognilens.llm.mock import MockLLMClient, MockServerError
+from cognilens.llm.resilience import is_retryable
+
+PROMPT = "Summarize the release notes for the new deployment pipeline."
+
+
+@pytest.mark.asyncio
+async def test_latency_follows_model_profile():
+    """Test time to first token and decode speed apply per model."""
+    config = MockLLMConfig(
+        models={"slow": MockModelProfile(ttft_seconds=0.05, tokens_per_second=1000)}
+    )
+    client = MockLLMClient(config)
+
+    started = time.perf_counter()
+    await client.generate(PROMPT, model="slow")
+    slow = time.perf_counter() - started
+
+    started = time.perf_counter()
+    await client.generate(PROMPT, model="fast")
+    fast = time.perf_counter() - started
+
+    assert slow >= 0.05
+    assert fast < 0.01
+
+
+@pytest.mark.asyncio
+async def test_requests_queue_beyond_batch_capacity():
+    """Test requests beyond the batch capacity wait for a free slot."""
+    config = MockLLMConfig(batch_capacity=2, default_profile=MockModelProfile(ttft_seconds=0.05))
+    client = MockLLMClient(config)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client.generate(PROMPT) for _ in range(5)))
+    elapsed = time.perf_counter() - started
+
+    # Three waves of at most two requests
+    assert elapsed >= 0.15
+    assert client.max_queued == 3
+    assert client.queued == 0
+
+
+async def _outcomes(seed: int) -> list[str]:
+    config = MockLLMConfig(
+        failure_rate=0.3,
+        seed=seed,
+        default_profile=MockModelProfile(jitter=JitterDistribution.LOGNORMAL, jitter_spread=0.5),
+    )
+    client = MockLLMClient(config)
+    outcomes = []
+    for _ in range(30):
+        try:
+            await client.generate(PROMPT)
+            outcomes.append("ok")
+        except MockServerError:
+            outcomes.append("error")
+    return outcomes
+
+
+@pytest.mark.asyncio
+async def test_failures_are_deterministic_under_seed():
+    """Test the same seed reproduces the same failures."""
+    first = await _outcomes(seed=7)
+
+    assert first == await _outcomes(seed=7)
+    assert "error" in first and "ok" in first
+
+
+@pytest.mark.asyncio
+async def test_injected_failure_is_retryable():
+    """Test injected failures look like transient server errors."""
+    client = MockLLMClient()
+    client.fail_next()
+
+    with pytest.raises(MockServerError) as excinfo:
+        await client.generate(PROMPT)
+
+    assert excinfo.value.status_code == 503
+    assert is_retryable(excinfo.value)
+    assert (await client.generate(PROMPT)).content
+
+
+@pytest.mark.asyncio
+async def test_injected_timeout_waits_for_client_timeout():
+    """Test an injected timeout hangs until the client timeout expires."""
+    client = MockLLMClient(timeout=0.05)
+    client.timeout_next()
+
+    started = time.perf_counter()
+    with pytest.raises(TimeoutError):
+        await client.generate(PROMPT)
+
+    assert time.perf_counter() - started >= 0.05
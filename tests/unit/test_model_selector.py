@@ -0,0 +1,122 @@
+"""Unit tests for model selection and context-fit routing."""
+
+import time
+
+import pytest
+
+from cognilens.config import LLMConfig, LLMProvider, SmartModelSelectionConfig
+from cognilens.core.chunking import split_text
+from cognilens.core.compressor import CompressionEngine
+from cognilens.core.types import CompressionStyle
+from cognilens.llm.lexora_client import (
+    LexoraClient,
+    ModelCapabilitiesCache,
+    ModelCapability,
+)
+from cognilens.llm.model_selector import ModelSelection, ModelSelector, SelectionMethod
+
+MODELS = [
+    ModelCapability("small", ["summarization"], context_length=4096),
+    ModelCapability("medium", ["summarization"], context_length=32768),
+    ModelCapability(
+        "medium-fast",
+        ["summarization"],
+        context_length=32768,
+        metadata={"tokens_per_second": 120},
+    ),
+    ModelCapability("large-code", ["code"], context_length=131072),
+]
+
+
+def make_selector() -> ModelSelector:
+    config = LLMConfig(
+        provider=LLMProvider.LEXORA,
+        model="small",
+        smart_selection=SmartModelSelectionConfig(enabled=True, classify_tasks=False),
+    )
+    client = LexoraClient(config)
+    client._capabilities_cache = ModelCapabilitiesCache(
+        models=MODELS, fetched_at=time.time(), ttl_seconds=300
+    )
+    return ModelSelector(client, config)
+
+
+def test_find_best_fit_prefers_smallest_then_fastest():
+    """Test the smallest fitting window wins, ties broken by speed."""
+    cache = ModelCapabilitiesCache(models=MODELS, fetched_at=time.time(), ttl_seconds=300)
+
+    assert cache.find_best_fit("summarization", 2000).model_id == "small"
+    assert cache.find_best_fit("summarization", 8000).model_id == "medium-fast"
+    assert cache.find_best_fit("summarization", 60000) is None
+
+
+@pytest.mark.asyncio
+async def test_selector_keeps_model_that_fits():
+    """Test a selected model whose window fits is kept."""
+    selection = await make_selector().select_model(CompressionStyle.CONCISE, required_tokens=1000)
+
+    assert selection.model_id == "small"
+    assert selection.method == SelectionMethod.CAPABILITY_MATCH
+    assert selection.context_length == 4096
+
+
+@pytest.mark.asyncio
+async def test_selector_routes_large_prompts_to_bigger_window():
+    """Test a prompt too large for the matched model is re-routed."""
+    selection = await make_selector().select_model(CompressionStyle.CONCISE, required_tokens=20000)
+
+    assert selection.model_id == "medium-fast"
+    assert selection.method == SelectionMethod.CONTEXT_FIT
+    assert selection.fits
+
+
+@pytest.mark.asyncio
+async def test_selector_reports_when_nothing_fits():
+    """Test the selector flags oversized requests for chunked processing."""
+    selection = await make_selector().select_model(CompressionStyle.CONCISE, required_tokens=60000)
+
+    assert not selection.fits
+    assert selection.context_length == 32768
+    assert selection.method == SelectionMethod.CONTEXT_FIT
+
+
+def test_split_text_respects_limit_and_round_trips():
+    """Test chunks stay within the limit and concatenate to the input."""
+    text = "\n\n".join(f"Paragraph {i}. " + "word " * 40 for i in range(20))
+    chunks = split_text(text, 300)
+
+    assert len(chunks) > 1
+    assert all(len(chunk) <= 300 for chunk in chunks)
+    assert "".join(chunks) == text
+
+
+class FixedSelector:
+    """Model selector stub returning a fixed selection."""
+
+    is_enabled = True
+
+    def __init__(self, selection: ModelSelection) -> None:
+        self.selection = selection
+
+    async def select_model(self, style, content_preview=None, required_tokens=None):
+        return self.selection
+
+
+@pytest.mark.asyncio
+async def test_engine_chunks_when_no_model_fits(mock_llm_client):
+    """Test the engine switches to map-reduce when nothing fits."""
+    selection = ModelSelection(
+        model_id="small",
+        method=SelectionMethod.CONTEXT_FIT,
+        context_length=1000,
+        fits=False,
+    )
+    engine = CompressionEngine(llm_client=mock_llm_client, model_selector=FixedSelector(selection))
+    text = "\n\n".join(f"Section {i} describes an important design decision." for i in range(400))
+
+    result = await engine.summarize(text, max_tokens=100)
+
+    assert result.metadata["chunked"]["chunks"] > 1
+    assert result.metadata["chunked"]["context_length"] == 1000
+    assert result.original_tokens == await mock_llm_client.count_tokens(text)
+    assert mock_llm_client.call_count > 2
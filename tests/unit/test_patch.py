@@ -0,0 +1,195 @@
+"""Unit tests for multi-file patch splitting and summarization."""
+
+import asyncio
+
+import pytest
+
+import cognilens.config
+from cognilens.config import CompressionConfig, PatchConfig, Settings
+from cognilens.core.compressor import CompressionEngine
+from cognilens.core.patch import parse_patch
+from cognilens.llm.mock import MockLLMClient
+
+SERIES = """From 1111111111111111111111111111111111111111 Mon Sep 17 00:00:00 2001
+From: Dev <dev@example.com>
+Subject: [PATCH 1/2] Add retry to the client
+
+---
+ client.py | 3 ++-
+ 1 file changed, 2 insertions(+), 1 deletion(-)
+
+diff --git a/client.py b/client.py
+index 1234567..89abcde 100644
+--- a/client.py
++++ b/client.py
+@@ -1,3 +1,4 @@
+ def fetch(url):
+---- separator that looks like a header
++++++ and its partner
++    retry(3)
+     return get(url)
+--
+2.39.5
+
+From 2222222222222222222222222222222222222222 Mon Sep 17 00:00:00 2001
+From: Dev <dev@example.com>
+Subject: [PATCH 2/2] Update dependencies
+
+---
+diff --git a/client.py b/client.py
+--- a/client.py
++++ b/client.py
+@@ -4 +4 @@
+-    return get(url)
++    return get(url, timeout=5)
+diff --git a/web/package-lock.json b/web/package-lock.json
+--- a/web/package-lock.json
++++ b/web/package-lock.json
+@@ -1 +1 @@
+-{"version": 1}
++{"version": 2}
+diff --git a/logo.png b/logo.png
+new file mode 100644
+index 0000000..1234567
+Binary files /dev/null and b/logo.png differ
+--
+2.39.5
+"""
+
+PLAIN = """--- old/app.py\t2026-01-01 00:00:00
++++ new/app.py\t2026-01-02 00:00:00
+@@ -1 +1,2 @@
+-def main():  return 1
++def main():
++    return 1
+--- old/notes.txt
++++ new/notes.txt
+@@ -1 +1 @@
+-hello
++hello world
+"""
+
+
+def make_patch(files: int) -> str:
+    return "\n".join(
+        f"diff --git a/src/mod{i}.py b/src/mod{i}.py\n--- a/src/mod{i}.py\n+++ b/src/mod{i}.py\n"
+        f"@@ -1 +1 @@\n-def handler{i}(): return {i}\n+def handler{i}(request): return {i + 1}"
+        for i in range(files)
+    )
+
+
+def test_format_patch_series_is_split_and_joined_per_file():
+    """Test hunks are consumed by count and a file touched twice is one patch."""
+    patch_set = parse_patch(SERIES)
+
+    assert patch_set.subjects == ["Add retry to the client", "Update dependencies"]
+    assert [f.path for f in patch_set.files] == ["client.py", "web/package-lock.json", "logo.png"]
+    client = patch_set.files[0]
+    assert (client.hunks, client.additions, client.deletions) == (2, 3, 2)
+    assert "---- separator that looks like a header" in client.text
+    assert patch_set.files[2].status == "binary"
+
+
+def test_plain_unified_diff_without_git_headers():
+    """Test ``diff -u`` output is split at each ---/+++ header pair."""
+    patch_set = parse_patch(PLAIN)
+
+    assert [f.path for f in patch_set.files] == ["new/app.py", "new/notes.txt"]
+    assert patch_set.files[0].whitespace_only()
+    assert not patch_set.files[1].whitespace_only()
+
+
+def test_local_summaries_skip_the_llm():
+    """Test lockfiles, binaries, whitespace, deletions and renames are described locally."""
+    files = {f.path: f for f in parse_patch(SERIES).files + parse_patch(PLAIN).files}
+    rename = parse_patch(
+        "diff --git a/a.py b/b.py\nsimilarity index 100%\nrename from a.py\nrename to b.py\n"
+    ).files[0]
+    deleted = parse_patch("--- a/gone.py\n+++ /dev/null\n@@ -1,2 +0,0 @@\n-a\n-b\n").files[0]
+
+    assert files["web/package-lock.json"].local_summary().startswith("Dependency lockfile")
+    assert files["logo.png"].local_summary() == "Binary file changed"
+    assert files["new/app.py"].local_summary() == "Whitespace-only changes (+2 -1)"
+    assert files["client.py"].local_summary() is None
+    assert rename.local_summary() == "Renamed from a.py without content changes"
+    assert deleted.local_summary() == "File deleted (2 lines)"
+    assert files["new/app.py"].local_summary(PatchConfig(local_whitespace=False)) is None
+
+
+def test_excerpt_cuts_long_diffs_at_a_line():
+    """Test long per-file diffs are cut with a count of omitted lines."""
+    added = "\n".join(f"+line {i}" for i in range(500))
+    patch = parse_patch(f"--- a/big.txt\n+++ b/big.txt\n@@ -0,0 +1,500 @@\n{added}\n").files[0]
+    excerpt = patch.excerpt(200)
+
+    assert len(excerpt) < 260
+    assert excerpt.endswith("more lines)")
+
+
+def test_text_without_diffs_is_rejected():
+    """Test text without any file diff raises ValueError."""
+    with pytest.raises(ValueError):
+        parse_patch("Just a commit message\n\nwith no diff")
+
+
+class _CountingClient(MockLLMClient):
+    """Mock client tracking how many generate calls overlap."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.active = 0
+        self.peak = 0
+
+    async def generate(self, prompt, **kwargs):
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            await asyncio.sleep(0.01)
+            return await super().generate(prompt, **kwargs)
+        finally:
+            self.active -= 1
+
+
+@pytest.mark.asyncio
+async def test_summarize_patch_runs_files_concurrently():
+    """Test each file is summarized concurrently, then merged with one more call."""
+    client = _CountingClient()
+    engine = CompressionEngine(llm_client=client)
+
+    result = await engine.summarize_patch(make_patch(8) + "\n" + SERIES)
+
+    files = result.metadata["files"]
+    assert len(files) == 11
+    # 9 files need the LLM (8 modules and client.py), plus the merge
+    assert client.call_count == 10
+    assert client.peak == 8  # compression.patch.max_concurrent_files
+    assert result.metadata["files_summarized"] == 9
+    assert [f["path"] for f in files if f["local"]] == ["web/package-lock.json", "logo.png"]
+    assert result.metadata["commits"] == ["Add retry to the client", "Update dependencies"]
+
+
+@pytest.mark.asyncio
+async def test_summarize_patch_bounds_concurrent_files(monkeypatch):
+    """Test no more than max_concurrent_files file summaries are generated at once."""
+    settings = Settings.for_testing(
+        compression=CompressionConfig(patch=PatchConfig(max_concurrent_files=3))
+    )
+    monkeypatch.setattr(cognilens.config, "_settings", settings)
+    client = _CountingClient()
+
+    result = await CompressionEngine(llm_client=client).summarize_patch(make_patch(8))
+
+    assert result.metadata["files_summarized"] == 8
+    assert client.peak == 3
+
+
+@pytest.mark.asyncio
+async def test_summarize_patch_without_llm_files(mock_llm_client):
+    """Test a patch of only locally summarized files makes no LLM call."""
+    engine = CompressionEngine(llm_client=mock_llm_client)
+
+    result = await engine.summarize_patch(PLAIN.split("--- old/notes.txt")[0])
+
+    assert mock_llm_client.call_count == 0
+    assert result.compressed_text == "- new/app.py: Whitespace-only changes (+2 -1)"
+    assert result.metadata["model"] is None
@@ -0,0 +1,54 @@
+"""Unit tests for token-budget-aware prompt assembly."""
+
+import pytest
+
+from cognilens.core.types import CompressionStyle
+from cognilens.prompts.budget import COMPILED_TEMPLATES, CompiledTemplate, PromptBudget
+from cognilens.prompts.builder import PromptBuilder
+
+
+def test_compiled_template_static_text():
+    """Test templates are compiled into static text and slots."""
+    compiled = COMPILED_TEMPLATES["summarize"]
+
+    assert compiled.slots == ("style", "max_tokens", "preserve_instruction", "text")
+    assert "{" not in compiled.static_text
+    assert "要約:" in compiled.static_text
+
+
+@pytest.mark.asyncio
+async def test_static_tokens_cached_per_tokenizer(mock_llm_client):
+    """Test static template tokens are counted once per tokenizer."""
+    compiled = CompiledTemplate("test", "Static prefix text {text} and suffix")
+    first = await compiled.static_tokens(mock_llm_client)
+    compiled.static_text = "changed"
+
+    assert await compiled.static_tokens(mock_llm_client) == first
+
+
+@pytest.mark.asyncio
+async def test_prompt_budget_measures_without_reencoding(mock_llm_client):
+    """Test prompt size equals overhead plus content tokens."""
+    budget = PromptBudget(mock_llm_client)
+    values = PromptBuilder.summarize_values("word " * 200, 100, CompressionStyle.CONCISE, [])
+
+    prompt = await budget.fit("summarize", values, slot="text", context_length=4096, max_tokens=100)
+
+    assert not prompt.trimmed
+    assert prompt.content_tokens == await mock_llm_client.count_tokens("word " * 200)
+    assert prompt.prompt == PromptBuilder.build_summarize_prompt(
+        "word " * 200, 100, CompressionStyle.CONCISE, []
+    )
+
+
+@pytest.mark.asyncio
+async def test_prompt_budget_trims_content_to_window(mock_llm_client):
+    """Test content is trimmed so prompt plus max_tokens fits the window."""
+    budget = PromptBudget(mock_llm_client)
+    values = PromptBuilder.summarize_values("word " * 2000, 100, CompressionStyle.CONCISE, [])
+
+    prompt = await budget.fit("summarize", values, slot="text", context_length=800, max_tokens=100)
+
+    assert prompt.trimmed
+    assert prompt.prompt_tokens + 100 <= 800
+    assert prompt.prompt_tokens + 100 >= 790
@@ -0,0 +1,82 @@
+"""Unit tests for local quality evaluation."""
+
+import pytest
+
+from cognilens.core.quality import (
+    _ngram_overlap,
+    assess_quality,
+    changed_text,
+    evaluate_quality,
+    extract_salient_items,
+    tokenize,
+)
+
+SOURCE = """The deploy_service() function retries 3 times with a 250ms backoff.
+Acme Cloud charges 1,200 credits per month for the `worker.pool` tier.
+Latency dropped by 35% after switching to HttpClient."""
+
+
+def test_extract_salient_items():
+    """Test numbers, identifiers, code symbols and entities are found."""
+    items = extract_salient_items(SOURCE)
+
+    assert "1200" in items["numbers"]
+    assert "35%" in items["numbers"]
+    assert "deploy_service" in items["identifiers"]
+    assert "worker.pool" in items["code_symbols"]
+    assert "deploy_service" in items["code_symbols"]
+    assert "Acme Cloud" in items["entities"]
+
+
+def test_tokenize_splits_cjk_characters():
+    """Test CJK text is tokenized per character and Latin per word."""
+    assert tokenize("圧縮API v2") == ["圧", "縮", "api", "v2"]
+
+
+def test_faithful_summary_scores_higher_than_lossy_one():
+    """Test retention of salient items raises the score."""
+    faithful = evaluate_quality(
+        SOURCE,
+        "deploy_service() retries 3 times (250ms). Acme Cloud: 1,200 credits for "
+        "`worker.pool`. HttpClient cut latency 35%.",
+    )
+    lossy = evaluate_quality(SOURCE, "A service was changed and became somewhat faster.")
+
+    assert faithful.score > lossy.score
+    assert faithful.retention > lossy.retention
+    assert "numbers" in lossy.missing_items
+
+
+def test_missing_preserved_elements_are_reported():
+    """Test preserve items are checked case-insensitively."""
+    report = evaluate_quality(SOURCE, "acme cloud charges credits.", ["Acme Cloud", "HttpClient"])
+
+    assert report.missing_preserved == ["HttpClient"]
+    assert report.preservation == 0.5
+
+
+def test_structural_checks():
+    """Test unbalanced fences and truncated sentences are flagged."""
+    report = evaluate_quality(SOURCE, "```python\nretry(3")
+
+    assert {"balanced_code_fences", "balanced_brackets", "complete_last_sentence"} <= set(
+        report.failed_checks
+    )
+    assert evaluate_quality(SOURCE, "").score < 0.5
+
+
+def test_ngram_overlap_is_clipped():
+    """Test overlapping n-grams are counted at most as often as in both texts."""
+    assert _ngram_overlap([1, 2, 1, 2, 1], [1, 2, 1], 1, 3) == (3, 5, 3)
+    assert _ngram_overlap([1, 2, 1, 2, 1], [1, 2, 1], 2, 3) == (2, 4, 2)
+
+
+@pytest.mark.asyncio
+async def test_assess_quality_scores_changed_lines_for_diffs():
+    """Test diff summaries are scored against the changed lines only."""
+    before = "timeout: 30\nretries: 3\nname: api"
+    after = "timeout: 60\nretries: 3\nname: api"
+
+    assert changed_text(before, after) == "timeout: 30\ntimeout: 60"
+    report = await assess_quality(after, "timeout raised from 30 to 60.", diff_before=before)
+    assert report.retention == 1.0
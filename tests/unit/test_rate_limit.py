@@ -0,0 +1,153 @@
+"""Unit tests for client-side rate limiting."""
+
+import json
+import time
+
+import httpx
+import pytest
+
+from cognilens.config import LLMConfig, LLMProvider, RateLimitConfig
+from cognilens.llm.rate_limit import RateLimiter, TokenBucket, parse_reset
+
+
+def test_parse_reset_durations():
+    """Test reset headers in the formats OpenAI-compatible servers send."""
+    assert parse_reset("1s") == 1.0
+    assert parse_reset("6m0s") == 360.0
+    assert parse_reset("20ms") == pytest.approx(0.02)
+    assert parse_reset("1h2m3.5s") == pytest.approx(3723.5)
+    assert parse_reset("2.5") == 2.5
+    assert parse_reset("soon") is None
+    assert parse_reset(None) is None
+
+
+@pytest.mark.asyncio
+async def test_callers_wait_until_tokens_fit():
+    """Test a call exceeding the remaining tokens queues instead of failing."""
+    limiter = RateLimiter(tokens_per_minute=6000)  # 100 tokens per second
+    await limiter.acquire(6000)
+
+    started = time.perf_counter()
+    await limiter.acquire(20)
+
+    assert time.perf_counter() - started >= 0.15
+    assert limiter.waiting == 0
+
+
+def test_sync_learns_limits_from_headers():
+    """Test headers create unknown buckets and overwrite local balances."""
+    limiter = RateLimiter(tokens_per_minute=1000)
+
+    limiter.sync(
+        {
+            "x-ratelimit-limit-requests": "60",
+            "x-ratelimit-remaining-requests": "0",
+            "x-ratelimit-reset-requests": "1s",
+            "x-ratelimit-limit-tokens": "2000",
+            "x-ratelimit-remaining-tokens": "500",
+            "x-ratelimit-reset-tokens": "45s",
+        }
+    )
+
+    requests, tokens = limiter.buckets["requests"], limiter.buckets["tokens"]
+    assert requests is not None and requests.capacity == 60
+    assert requests.wait_time(1) == pytest.approx(1 / 60, rel=0.1)
+    assert tokens is not None and tokens.capacity == 2000
+    assert tokens.tokens == pytest.approx(500, abs=1)
+
+
+def test_oversized_charge_waits_for_full_bucket():
+    """Test a charge above capacity is admitted once the bucket is full."""
+    bucket = TokenBucket(capacity=100, rate=100)
+
+    assert bucket.wait_time(500) == 0.0
+    bucket.take(500)
+    assert bucket.wait_time(1) > 4.0
+
+
+def _openai_client(handler, monkeypatch, **rate_limit):
+    from openai import AsyncOpenAI
+
+    from cognilens.llm.openai_client import OpenAIClient
+
+    config = LLMConfig(
+        provider=LLMProvider.OPENAI,
+        api_key="test",
+        base_url="http://openai.test/v1",
+        rate_limit=RateLimitConfig(enabled=True, **rate_limit),
+    )
+    client = OpenAIClient(config)
+    client._clients["http://openai.test/v1"] = AsyncOpenAI(
+        api_key="test",
+        base_url="http://openai.test/v1",
+        max_retries=0,
+        http_client=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+    )
+
+    async def count_tokens(text: str) -> int:
+        return len(text.split())
+
+    monkeypatch.setattr(client, "count_tokens", count_tokens)
+    return client
+
+
+COMPLETION = {
+    "id": "c1",
+    "object": "chat.completion",
+    "created": 0,
+    "model": "gpt-4o-mini",
+    "choices": [
+        {"index": 0, "message": {"role": "assistant", "content": "ok"}, "finish_reason": "stop"}
+    ],
+    "usage": {"prompt_tokens": 5, "completion_tokens": 1, "total_tokens": 6},
+}
+
+
+@pytest.mark.asyncio
+async def test_openai_client_charges_and_resyncs(monkeypatch):
+    """Test calls are charged prompt plus max_tokens and resynced from headers."""
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        assert json.loads(request.content)["max_tokens"] == 50
+        headers = {"x-ratelimit-limit-tokens": "10000", "x-ratelimit-remaining-tokens": "9000"}
+        return httpx.Response(200, json=COMPLETION, headers=headers)
+
+    client = _openai_client(handler, monkeypatch, tokens_per_minute=100000)
+    limiter = client.rate_limiter()
+    charged = []
+    original = limiter.acquire
+
+    async def acquire(tokens: int) -> None:
+        charged.append(tokens)
+        await original(tokens)
+
+    monkeypatch.setattr(limiter, "acquire", acquire)
+
+    response = await client.generate("three word prompt", max_tokens=50)
+
+    assert response.content == "ok"
+    # Three prompt words, chat framing for one message and the reply, and max_tokens
+    assert charged == [3 + 3 + 3 + 50]
+    assert limiter.buckets["tokens"].capacity == 10000
+    assert limiter.buckets["tokens"].tokens == pytest.approx(9000, abs=50)
+
+
+@pytest.mark.asyncio
+async def test_openai_throttling_drains_bucket(monkeypatch):
+    """Test a 429 resyncs the buckets so the retry waits for the reset."""
+    from openai import RateLimitError
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        headers = {
+            "x-ratelimit-limit-requests": "60",
+            "x-ratelimit-remaining-requests": "0",
+            "x-ratelimit-reset-requests": "2s",
+        }
+        return httpx.Response(429, json={"error": {"message": "slow down"}}, headers=headers)
+
+    client = _openai_client(handler, monkeypatch)
+
+    with pytest.raises(RateLimitError):
+        await client.generate("prompt")
+
+    assert client.rate_limiter().buckets["requests"].wait_time(1) > 0.01
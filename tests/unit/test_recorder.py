@@ -0,0 +1,153 @@
+"""Unit tests for tool-call recording and replay."""
+
+import asyncio
+
+import pytest
+
+from cognilens.bench.replay import arrival_offsets, format_report, is_replayable, replay
+from cognilens.config import TraceArguments
+from cognilens.llm import MockServerError
+from cognilens.recorder import (
+    TextShape,
+    TraceEntry,
+    TraceRecorder,
+    load_trace,
+    materialize_arguments,
+    redact_arguments,
+    synthetic_text,
+)
+
+SECRET = "Customer ACME-42 reported an outage.\n障害の原因は設定ミスでした。\nFixed in v2.1."
+
+
+def test_synthetic_text_preserves_shape():
+    """Test stand-in text keeps the length and roughly the script mix."""
+    shape = TextShape.of(SECRET * 20)
+    text = synthetic_text(shape, "seed")
+
+    assert len(text) == shape.chars
+    assert abs(TextShape.of(text).cjk_ratio - shape.cjk_ratio) < 0.15
+    assert text == synthetic_text(shape, "seed")
+
+
+def test_redacted_arguments_hide_text_but_keep_style():
+    """Test redaction replaces text with same-length filler and keeps listed fields."""
+    arguments = {"text": SECRET, "style": "bullet", "max_tokens": 100, "preserve": ["ACME-42"]}
+
+    redacted = redact_arguments(arguments, TraceArguments.REDACTED, {"style"})
+
+    assert "ACME" not in str(redacted)
+    assert len(redacted["text"]) == len(SECRET)
+    assert redacted["style"] == "bullet"
+    assert redacted["max_tokens"] == 100
+
+
+def test_recorder_keeps_refs_and_node_ids_by_default(tmp_path):
+    """Test git refs and tree node ids survive redaction, and redacted repo calls are skipped."""
+    path = tmp_path / "trace.jsonl"
+    recorder = TraceRecorder(path)
+    recorder.record(TraceEntry("summarize_at_level", {"text": SECRET, "node": "L1.2"}, 1.0))
+    recorder.record(
+        TraceEntry("summarize_diff", {"repo": "/src/app", "base": "main", "head": "HEAD"}, 1.0)
+    )
+    recorder.close()
+
+    at_level, diff = load_trace(path)
+
+    assert at_level.arguments["node"] == "L1.2"
+    assert (diff.arguments["base"], diff.arguments["head"]) == ("main", "HEAD")
+    tools = {"summarize_at_level": None, "summarize_diff": None}
+    assert is_replayable(at_level, tools)
+    assert not is_replayable(diff, tools)
+
+
+def test_hashed_arguments_materialize_to_same_size():
+    """Test hashed traces store digests and replay with synthetic text of that size."""
+    hashed = redact_arguments({"text": SECRET}, TraceArguments.HASHED)
+
+    assert "sha256" in hashed["text"]["$text"]
+    assert len(materialize_arguments(hashed)["text"]) == len(SECRET)
+
+
+def test_redaction_uses_resolved_text_size():
+    """Test handles are measured by the text they refer to."""
+    redacted = redact_arguments(
+        {"text": "handle:abc"}, TraceArguments.REDACTED, resolve=lambda value: SECRET
+    )
+
+    assert len(redacted["text"]) == len(SECRET)
+
+
+def test_recorder_writes_jsonl(tmp_path):
+    """Test recorded calls are redacted on write and read back in order."""
+    path = tmp_path / "trace.jsonl"
+    recorder = TraceRecorder(path)
+    recorder.record(TraceEntry("summarize", {"text": SECRET}, duration_ms=12.5, ts=2.0))
+    recorder.record(TraceEntry("summarize_diff", {"before": "a", "after": "b"}, 3.0, ts=1.0))
+    recorder.close()
+
+    entries = load_trace(path)
+
+    assert [e.tool for e in entries] == ["summarize_diff", "summarize"]
+    assert entries[1].arguments_mode == "redacted"
+    assert len(entries[1].arguments["text"]) == len(SECRET)
+    assert "ACME" not in path.read_text(encoding="utf-8")
+
+
+def test_arrival_offsets_scale_recorded_times():
+    """Test recorded arrivals are compressed by the speed factor."""
+    entries = [TraceEntry("summarize", {}, 1.0, ts=ts) for ts in (100.0, 101.0, 104.0)]
+
+    assert arrival_offsets(entries, speed=2.0) == [0.0, 0.5, 2.0]
+    poisson = arrival_offsets(entries, rate=10.0, seed=1)
+    assert poisson == arrival_offsets(entries, rate=10.0, seed=1)
+    assert poisson[0] == 0.0 and poisson[1] < poisson[2]
+
+
+@pytest.mark.asyncio
+async def test_replay_closed_loop_reports_latency():
+    """Test a closed-loop replay calls the tools and reports per-tool latency."""
+    calls = []
+    active = 0
+    peak = 0
+
+    async def summarize(**arguments):
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        calls.append(arguments)
+        await asyncio.sleep(0.01)
+        active -= 1
+        return {}
+
+    entries = [
+        TraceEntry("summarize", {"text": {"$text": {"sha256": "x", "chars": 40}}}, 5.0, ts=i)
+        for i in range(6)
+    ]
+    entries.append(TraceEntry("store_text", {"text": "x"}, 1.0, ts=7))
+    entries.append(TraceEntry("summarize", {"path": "abc"}, 1.0, ts=8, arguments_mode="hashed"))
+
+    report = await replay(entries, concurrency=2, tools={"summarize": summarize})
+
+    assert len(report.results) == 6
+    assert report.skipped == 2
+    assert peak == 2
+    assert all(len(call["text"]) == 40 for call in calls)
+    assert "summarize" in format_report(report)
+
+
+@pytest.mark.asyncio
+async def test_replay_records_call_errors_and_raises_bugs():
+    """Test expected tool and backend failures are counted; other errors propagate."""
+    failure: Exception = MockServerError(429)
+
+    async def summarize(**arguments):
+        raise failure
+
+    entries = [TraceEntry("summarize", {"text": "x"}, 1.0)]
+    report = await replay(entries, tools={"summarize": summarize})
+    assert [r.error for r in report.results] == ["MockServerError"]
+
+    failure = ZeroDivisionError()
+    with pytest.raises(ZeroDivisionError):
+        await replay(entries, tools={"summarize": summarize})
@@ -0,0 +1,148 @@
+"""Unit tests for preserved-element verification and repair."""
+
+from typing import Optional
+
+import pytest
+
+import cognilens.config
+from cognilens.config import CompressionConfig, Settings
+from cognilens.core.compressor import CompressionEngine
+from cognilens.core.repair import find_snippets, splice
+from cognilens.llm.base import LLMResponse
+from cognilens.llm.mock import MockLLMClient
+
+SOURCE = (
+    "Intro text about the service. " * 10
+    + "The RetryPolicy class controls backoff between attempts. "
+    + "Closing remarks about deployment. " * 10
+)
+
+
+@pytest.fixture(autouse=True)
+def repair_enabled(monkeypatch):
+    """Enable repair, which is off by default."""
+    settings = Settings.for_testing(compression=CompressionConfig(repair_enabled=True))
+    monkeypatch.setattr(cognilens.config, "_settings", settings)
+
+
+class ScriptedLLMClient(MockLLMClient):
+    """Mock client that omits preserved elements until asked to repair."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.prompts: list[str] = []
+
+    async def generate(
+        self,
+        prompt: str,
+        *,
+        system_prompt: Optional[str] = None,
+        max_tokens: Optional[int] = None,
+        temperature: float = 0.7,
+        model: Optional[str] = None,
+    ) -> LLMResponse:
+        self._call_count += 1
+        self.prompts.append(prompt)
+        content = "RetryPolicy controls backoff." if "欠落" in prompt else "- Service overview."
+        return LLMResponse(content=content, model="mock-model", tokens_used=5)
+
+
+def test_find_snippets_returns_excerpt_around_item():
+    """Test excerpts contain the item and skip items absent from the source."""
+    snippets = find_snippets(SOURCE, ["retrypolicy", "CircuitBreaker"], 80)
+
+    assert list(snippets) == ["retrypolicy"]
+    assert "RetryPolicy class" in snippets["retrypolicy"]
+    assert len(snippets["retrypolicy"]) <= 80
+
+
+def test_splice_matches_bullet_formatting():
+    """Test additions become bullets in bullet summaries and paragraphs otherwise."""
+    assert splice("- a\n- b", "c") == "- a\n- b\n- c"
+    assert splice("One sentence.", "Another.") == "One sentence.\n\nAnother."
+
+
+@pytest.mark.asyncio
+async def test_engine_repairs_missing_preserved_elements():
+    """Test a missing element triggers one repair call with only its excerpt."""
+    client = ScriptedLLMClient()
+    engine = CompressionEngine(llm_client=client)
+
+    result = await engine.summarize(
+        SOURCE, max_tokens=50, style="bullet", preserve=["RetryPolicy", "CircuitBreaker"]
+    )
+
+    assert client.call_count == 2
+    assert len(client.prompts[1]) < len(SOURCE)
+    assert result.compressed_text == "- Service overview.\n- RetryPolicy controls backoff."
+    assert result.metadata["repair"]["repaired"] == ["RetryPolicy"]
+    assert result.metadata["repair"]["unrepairable"] == ["CircuitBreaker"]
+    assert result.metadata["quality"]["missing_preserved"] == ["CircuitBreaker"]
+
+
+@pytest.mark.asyncio
+async def test_items_beyond_the_repair_limit_are_skipped(monkeypatch):
+    """Test only repair_max_items items are attempted and the rest reported as skipped."""
+    settings = Settings.for_testing(
+        compression=CompressionConfig(repair_enabled=True, repair_max_items=1)
+    )
+    monkeypatch.setattr(cognilens.config, "_settings", settings)
+    engine = CompressionEngine(llm_client=ScriptedLLMClient())
+
+    result = await engine.summarize(
+        SOURCE, max_tokens=50, style="bullet", preserve=["CircuitBreaker", "RetryPolicy"]
+    )
+
+    repair = result.metadata["repair"]
+    assert repair["unrepairable"] == ["CircuitBreaker"]
+    assert repair["skipped"] == ["RetryPolicy"]
+    assert "repaired" not in repair
+
+
+class LongSummaryClient(MockLLMClient):
+    """Mock client whose summary fills the budget and omits the preserved element."""
+
+    async def generate(
+        self,
+        prompt: str,
+        *,
+        system_prompt: Optional[str] = None,
+        max_tokens: Optional[int] = None,
+        temperature: float = 0.7,
+        model: Optional[str] = None,
+    ) -> LLMResponse:
+        self._call_count += 1
+        if "欠落" in prompt:
+            content = "The ZetaWidget renders the dashboard."
+        else:
+            content = " ".join(f"Point number {i} about the service." for i in range(12))
+        return LLMResponse(content=content, model="mock-model", tokens_used=80)
+
+
+@pytest.mark.asyncio
+async def test_repaired_element_survives_the_output_budget():
+    """Test the budget trim drops other sentences before the repaired element."""
+    source = SOURCE + "The ZetaWidget renders the dashboard. "
+    client = LongSummaryClient()
+    engine = CompressionEngine(llm_client=client)
+
+    result = await engine.summarize(source, max_tokens=40, preserve=["ZetaWidget"])
+
+    assert client.call_count == 2
+    assert result.metadata["output_budget"]["trimmed"]
+    assert "ZetaWidget" in result.compressed_text
+    assert result.compressed_tokens <= 40
+    assert result.metadata["repair"]["repaired"] == ["ZetaWidget"]
+    assert "ZetaWidget" not in result.metadata["quality"].get("missing_preserved", [])
+
+
+@pytest.mark.asyncio
+async def test_engine_skips_repair_when_nothing_is_missing():
+    """Test no follow-up call is made when every element is kept."""
+    client = ScriptedLLMClient()
+    engine = CompressionEngine(llm_client=client)
+
+    result = await engine.summarize(SOURCE, max_tokens=50, preserve=["Service"])
+
+    assert client.call_count == 1
+    assert "repair" not in result.metadata
@@ -0,0 +1,151 @@
+"""Unit tests for retries, retry budgets and hedging."""
+
+import asyncio
+
+import pytest
+
+from cognilens.config import ResilienceConfig
+from cognilens.llm.base import LLMResponse
+from cognilens.llm.mock import MockLLMClient
+from cognilens.llm.resilience import (
+    LatencyTracker,
+    ResilientLLMClient,
+    RetryBudget,
+    is_retryable,
+)
+
+
+class StatusError(Exception):
+    """Exception carrying an HTTP status code, like SDK API errors."""
+
+    def __init__(self, status_code: int) -> None:
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+
+class FlakyClient(MockLLMClient):
+    """Mock client that fails a fixed number of times before succeeding."""
+
+    def __init__(self, failures: int, error: Exception) -> None:
+        super().__init__()
+        self.failures = failures
+        self.error = error
+
+    async def generate(self, prompt, **kwargs):
+        self._call_count += 1
+        if self._call_count <= self.failures:
+            raise self.error
+        return LLMResponse(content="ok", model="mock-model", tokens_used=1)
+
+
+class SlowFirstClient(MockLLMClient):
+    """Mock client whose first call hangs, while later calls answer quickly."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.cancelled = False
+
+    async def generate(self, prompt, **kwargs):
+        self._call_count += 1
+        if self._call_count == 1:
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                self.cancelled = True
+                raise
+        return LLMResponse(
+            content=f"call {self._call_count}",
+            model=kwargs.get("model") or "mock-model",
+            tokens_used=1,
+        )
+
+
+def fast_config(**overrides) -> ResilienceConfig:
+    defaults = {"backoff_base_seconds": 0.001, "backoff_max_seconds": 0.002}
+    defaults.update(overrides)
+    return ResilienceConfig(**defaults)
+
+
+def test_is_retryable():
+    """Test classification of transient and permanent errors."""
+    assert is_retryable(TimeoutError())
+    assert is_retryable(StatusError(503))
+    assert is_retryable(StatusError(429))
+    assert not is_retryable(StatusError(400))
+    assert not is_retryable(ValueError("bad input"))
+
+
+@pytest.mark.asyncio
+async def test_retries_transient_failures():
+    """Test transient failures are retried until success."""
+    inner = FlakyClient(failures=2, error=StatusError(503))
+    client = ResilientLLMClient(inner, fast_config(), max_retries=3)
+
+    response = await client.generate("prompt")
+
+    assert response.content == "ok"
+    assert inner.call_count == 3
+
+
+@pytest.mark.asyncio
+async def test_does_not_retry_permanent_failures():
+    """Test non-retryable errors are raised immediately."""
+    inner = FlakyClient(failures=1, error=StatusError(400))
+    client = ResilientLLMClient(inner, fast_config(), max_retries=3)
+
+    with pytest.raises(StatusError):
+        await client.generate("prompt")
+    assert inner.call_count == 1
+
+
+@pytest.mark.asyncio
+async def test_retry_budget_stops_retry_storms():
+    """Test retries stop once the budget is exhausted."""
+    inner = FlakyClient(failures=100, error=StatusError(503))
+    config = fast_config(retry_budget_ratio=0.0, retry_budget_min_per_second=0.1)
+    client = ResilientLLMClient(inner, config, max_retries=5)
+
+    with pytest.raises(StatusError):
+        await client.generate("prompt")
+    # One original request plus the single retry the budget allows per window
+    assert inner.call_count == 2
+
+
+def test_retry_budget_scales_with_traffic():
+    """Test the budget grants retries in proportion to requests."""
+    budget = RetryBudget(ratio=0.5, min_per_second=0.0, window_seconds=60)
+    for _ in range(4):
+        budget.record_request()
+
+    granted = sum(budget.try_withdraw() for _ in range(5))
+    assert granted == 2
+
+
+def test_latency_tracker_percentile():
+    """Test latency percentile calculation."""
+    tracker = LatencyTracker()
+    assert tracker.percentile(0.95) is None
+    for ms in range(1, 101):
+        tracker.record(ms / 1000)
+
+    assert tracker.percentile(0.5) == pytest.approx(0.051)
+    assert tracker.percentile(0.95) == pytest.approx(0.096)
+
+
+@pytest.mark.asyncio
+async def test_hedging_returns_first_answer_and_cancels_loser():
+    """Test a hedged request wins over a stuck primary, which gets cancelled."""
+    inner = SlowFirstClient()
+    config = fast_config(
+        hedging_enabled=True,
+        hedge_initial_delay_seconds=0.01,
+        hedge_model="backup-model",
+    )
+    client = ResilientLLMClient(inner, config)
+
+    response = await client.generate("prompt", model="primary-model")
+    await asyncio.sleep(0)
+
+    assert response.content == "call 2"
+    assert response.model == "backup-model"
+    assert inner.cancelled
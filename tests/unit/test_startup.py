@@ -0,0 +1,31 @@
+"""Unit tests for start-up import behaviour."""
+
+from cognilens.bench.startup import measure_import, parse_importtime
+
+
+def test_parse_importtime():
+    """Test parsing of python -X importtime output."""
+    output = (
+        "import time: self [us] | cumulative | imported package\n"
+        "import time:       120 |        120 |   yaml.error\n"
+        "import time:      3000 |       5000 | cognilens.config\n"
+    )
+    timings = parse_importtime(output)
+
+    assert [t.module for t in timings] == ["yaml.error", "cognilens.config"]
+    assert timings[1].cumulative_us == 5000
+
+
+def test_provider_sdks_are_not_imported_eagerly():
+    """Test importing the tool stack does not load openai, tiktoken or httpx."""
+    timings, eager = measure_import("cognilens.tools")
+
+    assert any(t.module == "cognilens.tools" for t in timings)
+    assert eager == []
+
+
+def test_llm_package_imports_standalone():
+    """Test cognilens.llm can be imported before cognilens.core."""
+    _, eager = measure_import("cognilens.llm")
+
+    assert eager == []
@@ -1,5 +1,7 @@
 """Unit tests for compression strategies."""
 
+import json
+
 import pytest
 
 from cognilens.core.types import CompressionRequest, CompressionStyle
@@ -7,6 +9,8 @@ from cognilens.strategies.bullet import BulletStrategy
 from cognilens.strategies.code_aware import CodeAwareStrategy
 from cognilens.strategies.concise import ConciseStrategy
 from cognilens.strategies.detailed import DetailedStrategy
+from cognilens.strategies.log import LogStrategy
+from cognilens.strategies.structured import StructuredStrategy
 
 
 @pytest.mark.asyncio
@@ -96,3 +100,47 @@ async def test_strategy_preserves_elements(mock_llm_client):
     result = await strategy.compress(request)
 
     assert result.preserved_elements == ["API", "REST"]
+
+
+@pytest.mark.asyncio
+async def test_log_strategy_sends_only_the_digest(mock_llm_client, make_log):
+    """Test the log strategy summarizes the local digest, or returns it without the LLM."""
+    text = make_log()
+    strategy = LogStrategy(mock_llm_client)
+
+    result = await strategy.compress(
+        CompressionRequest(text=text, style=CompressionStyle.LOG, target_tokens=200)
+    )
+    assert mock_llm_client.call_count == 1
+    assert result.metadata["digest"]["error_lines"] == 12
+    assert result.compression_ratio < 0.1
+
+    digest = await strategy.compress(
+        CompressionRequest(text=text, style=CompressionStyle.LOG, metadata={"use_llm": False})
+    )
+    assert mock_llm_client.call_count == 1
+    assert digest.metadata["llm"] is False
+    assert "RecursionError: maximum recursion depth exceeded" in digest.compressed_text
+
+
+@pytest.mark.asyncio
+async def test_structured_strategy_sends_only_the_digest(mock_llm_client, make_users):
+    """Test the structured strategy summarizes the schema digest, or returns it without the LLM."""
+    text = json.dumps({"users": make_users(2000)})
+    strategy = StructuredStrategy(mock_llm_client)
+
+    result = await strategy.compress(
+        CompressionRequest(text=text, style=CompressionStyle.STRUCTURED, target_tokens=200)
+    )
+    assert mock_llm_client.call_count == 1
+    assert result.metadata["digest"]["format"] == "JSON"
+    assert result.compression_ratio < 0.05
+
+    digest = await strategy.compress(
+        CompressionRequest(
+            text=text, style=CompressionStyle.STRUCTURED, metadata={"use_llm": False}
+        )
+    )
+    assert mock_llm_client.call_count == 1
+    assert digest.metadata["llm"] is False
+    assert ".users: array, items 2000..2000" in digest.compressed_text
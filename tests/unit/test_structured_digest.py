@@ -0,0 +1,66 @@
+"""Unit tests for structured data schema inference."""
+
+import json
+
+import pytest
+
+from cognilens.config import StructuredDigestConfig
+from cognilens.core.structured_digest import digest_structured
+
+
+def test_schema_reports_enums_ranges_and_optional_fields(make_users):
+    """Test field statistics are inferred across all records."""
+    text = json.dumps({"users": make_users(), "total": 100})
+    rendered = digest_structured(text).render()
+
+    assert ".users: array, items 100..100" in rendered
+    assert '.status: str, enum {"active": 34, "banned": 33, "pending": 33}' in rendered
+    assert ".id: int, range 0..99, mean 49.5" in rendered
+    assert ".email? (20%): str" in rendered
+    assert "null 25%" in rendered
+    assert ".total: int, always 100" in rendered
+
+
+def test_samples_keep_one_record_per_key_shape(make_users):
+    """Test samples are representative records with distinct key sets."""
+    config = StructuredDigestConfig(max_samples=3)
+    digest = digest_structured(json.dumps(make_users()), config)
+
+    samples = digest.samples["$[]"]
+    assert len(samples) == 2
+    assert {"email" in json.loads(sample) for sample in samples} == {True, False}
+
+
+def test_json_lines_are_digested_as_one_array(make_users):
+    """Test one JSON document per line counts as records of a root array."""
+    text = "\n".join(json.dumps(user) for user in make_users(5))
+    digest = digest_structured(text)
+
+    assert digest.format == "JSON Lines"
+    assert digest.documents == 5
+    assert "$: array, items 5..5" in digest.render()
+
+
+def test_yaml_documents_share_a_schema():
+    """Test multi-document YAML is merged into one schema."""
+    digest = digest_structured("name: api\nreplicas: 2\n---\nname: worker\nreplicas: 4\n")
+
+    assert digest.format == "YAML"
+    assert digest.documents == 2
+    assert ".replicas: int, range 2..4" in digest.render()
+
+
+def test_prose_is_rejected():
+    """Test text without structured data raises ValueError."""
+    with pytest.raises(ValueError):
+        digest_structured("Just a plain sentence about nothing in particular.")
+
+
+def test_large_array_digest_stays_small(make_users):
+    """Test the digest size does not grow with the number of records."""
+    text = json.dumps({"users": make_users(20000)})
+    rendered = digest_structured(text).render()
+
+    assert len(text) > 1_000_000
+    assert len(rendered) < 2000
+    assert ".users: array, items 20000..20000" in rendered
@@ -0,0 +1,81 @@
+"""Unit tests for hierarchical summary trees."""
+
+import pytest
+
+from cognilens.core.compressor import CompressionEngine
+from cognilens.core.summary_tree import SummaryNode, SummaryTree, SummaryTreeStore, select_nodes
+
+
+def _tree() -> SummaryTree:
+    leaves = [
+        SummaryNode(f"L0.{i}", 0, i * 100, (i + 1) * 100, f"leaf {i}", 40, 100 + i)
+        for i in range(4)
+    ]
+    sections = [
+        SummaryNode("L1.0", 1, 0, 200, "section 0", 30, 201, ["L0.0", "L0.1"]),
+        SummaryNode("L1.1", 1, 200, 400, "section 1", 30, 205, ["L0.2", "L0.3"]),
+    ]
+    root = SummaryNode("L2.0", 2, 0, 400, "document", 20, 406, ["L1.0", "L1.1"])
+    return SummaryTree("hash", [leaves, sections, [root]])
+
+
+def test_select_nodes_uses_most_detail_that_fits():
+    """Test whole levels, then single nodes, are expanded while they fit."""
+    tree = _tree()
+
+    assert [n.id for n in select_nodes(tree, 25)] == ["L2.0"]
+    assert [n.id for n in select_nodes(tree, 60)] == ["L1.0", "L1.1"]
+    # Only the larger section fits expanded
+    assert [n.id for n in select_nodes(tree, 110)] == ["L1.0", "L0.2", "L0.3"]
+    assert [n.id for n in select_nodes(tree, 1000)] == ["L0.0", "L0.1", "L0.2", "L0.3"]
+
+
+def test_select_nodes_within_section_and_level():
+    """Test zooming into a section and asking for an exact level."""
+    tree = _tree()
+
+    assert [n.id for n in select_nodes(tree, 100, tree.node("L1.1"))] == ["L0.2", "L0.3"]
+    assert [n.id for n in select_nodes(tree, 10, level=1)] == ["L1.0", "L1.1"]
+    with pytest.raises(KeyError):
+        tree.node("L9.9")
+
+
+@pytest.mark.asyncio
+async def test_zoom_reuses_tree(mock_llm_client, make_document):
+    """Test repeat views of a document need at most one reduce call."""
+    engine = CompressionEngine(llm_client=mock_llm_client, summary_trees=SummaryTreeStore())
+    text = "\n\n".join(make_document(paragraphs=600))
+
+    tree, cached = await engine.build_summary_tree(text)
+    built_calls = mock_llm_client.call_count
+    assert not cached
+    assert len(tree.levels) >= 2
+    assert built_calls >= len(tree.levels[0])
+
+    for max_tokens in (50, 400, 2000):
+        result = await engine.summarize_at_level(text, max_tokens=max_tokens)
+        assert result.metadata["tree"]["cached"]
+        assert result.compressed_tokens <= max_tokens or result.metadata["tree"]["reduced"]
+    assert mock_llm_client.call_count <= built_calls + 3
+
+    section = tree.levels[1][0]
+    result = await engine.summarize_at_level(
+        text, max_tokens=section.source_tokens, node=section.id
+    )
+    assert result.compressed_text == text[section.start : section.end]
+    assert result.metadata["tree"]["scope"] == section.id
+
+
+@pytest.mark.asyncio
+async def test_edited_document_reuses_node_summaries(mock_llm_client, make_document):
+    """Test rebuilding after an edit only summarizes changed chunks and their ancestors."""
+    engine = CompressionEngine(llm_client=mock_llm_client, summary_trees=SummaryTreeStore())
+    paragraphs = make_document(paragraphs=600)
+
+    tree, _ = await engine.build_summary_tree("\n\n".join(paragraphs))
+    first_calls = mock_llm_client.call_count
+
+    paragraphs[300] = "An inserted remark. " + paragraphs[300]
+    await engine.build_summary_tree("\n\n".join(paragraphs))
+
+    assert mock_llm_client.call_count - first_calls <= 2 * len(tree.levels)
@@ -0,0 +1,139 @@
+"""Unit tests for concurrent steps and speculative model selection."""
+
+import asyncio
+from typing import Optional
+
+import pytest
+
+import cognilens.config
+from cognilens.config import LLMConfig, LLMProvider, Settings, SmartModelSelectionConfig
+from cognilens.core.compressor import CompressionEngine
+from cognilens.core.types import CompressionRequest, CompressionStyle
+from cognilens.llm.mock import MockLLMClient
+from cognilens.llm.model_selector import ModelSelection, SelectionMethod
+from cognilens.llm.token_estimator import estimate_tokens
+from cognilens.strategies import get_strategy
+from cognilens.taskgraph import task_group
+
+
+class SlowLLMClient(MockLLMClient):
+    """Mock client with delays that logs when calls start and end."""
+
+    def __init__(self, generate_delay: float = 0.0, count_delay: float = 0.0) -> None:
+        super().__init__()
+        self.generate_delay = generate_delay
+        self.count_delay = count_delay
+        self.events: list[str] = []
+        self.models: list[Optional[str]] = []
+
+    async def generate(self, prompt, *, model=None, **kwargs):
+        self.events.append("generate:start")
+        self.models.append(model)
+        await asyncio.sleep(self.generate_delay)
+        return await super().generate(prompt, model=model, **kwargs)
+
+    async def count_tokens(self, text: str) -> int:
+        self.events.append("count:start")
+        await asyncio.sleep(self.count_delay)
+        self.events.append("count:end")
+        return await super().count_tokens(text)
+
+
+class SlowSelector:
+    """Model selector stub that answers after a delay."""
+
+    is_enabled = True
+
+    def __init__(self, model_id: str, delay: float) -> None:
+        self.model_id = model_id
+        self.delay = delay
+        self.required_tokens: Optional[int] = None
+
+    async def select_model(self, style, content_preview=None, required_tokens=None):
+        self.required_tokens = required_tokens
+        await asyncio.sleep(self.delay)
+        return ModelSelection(model_id=self.model_id, method=SelectionMethod.CAPABILITY_MATCH)
+
+
+@pytest.fixture
+def speculative_settings(monkeypatch):
+    settings = Settings.for_testing(
+        llm=LLMConfig(
+            provider=LLMProvider.MOCK,
+            model="default-model",
+            smart_selection=SmartModelSelectionConfig(speculative_start_seconds=0.01),
+        )
+    )
+    monkeypatch.setattr(cognilens.config, "_settings", settings)
+    return settings
+
+
+TEXT = "The deployment pipeline builds, tests and publishes every release automatically. " * 5
+
+
+@pytest.mark.asyncio
+async def test_task_group_raises_original_exception():
+    """Test failures surface as themselves rather than as an ExceptionGroup."""
+
+    async def fail():
+        raise ValueError("bad input")
+
+    with pytest.raises(ValueError, match="bad input"):
+        async with task_group() as group:
+            group.create_task(fail())
+            await asyncio.sleep(1)
+
+
+@pytest.mark.asyncio
+async def test_strategy_counts_input_while_generating():
+    """Test generation does not wait for the input count when a target is given."""
+    llm = SlowLLMClient(count_delay=0.05)
+    strategy = get_strategy(CompressionStyle.CONCISE, llm)
+
+    result = await strategy.compress(
+        CompressionRequest(text=TEXT, style=CompressionStyle.CONCISE, target_tokens=50)
+    )
+
+    assert llm.events.index("generate:start") < llm.events.index("count:end")
+    assert result.original_tokens == estimate_tokens(TEXT)
+
+
+@pytest.mark.asyncio
+async def test_engine_starts_on_default_model_when_selection_is_slow(speculative_settings):
+    """Test a slow selection is overtaken by generation on the default model."""
+    llm = SlowLLMClient()
+    engine = CompressionEngine(llm_client=llm, model_selector=SlowSelector("big-model", 0.5))
+
+    result = await engine.summarize(TEXT, max_tokens=50)
+
+    assert result.metadata["speculative"] is True
+    assert result.metadata["selected_model"] == "default-model"
+    assert llm.models == ["default-model"]
+
+
+@pytest.mark.asyncio
+async def test_engine_discards_speculation_for_a_different_model(speculative_settings):
+    """Test speculative work is cancelled when selection picks another model first."""
+    llm = SlowLLMClient(generate_delay=0.2)
+    selector = SlowSelector("big-model", 0.05)
+    engine = CompressionEngine(llm_client=llm, model_selector=selector)
+
+    result = await engine.summarize(TEXT, max_tokens=50)
+
+    assert "speculative" not in result.metadata
+    assert result.metadata["selected_model"] == "big-model"
+    assert llm.models == ["default-model", "big-model"]
+    # The token estimate (input, prompt overhead and output) reached the selector
+    assert selector.required_tokens > estimate_tokens(TEXT) + 50
+
+
+@pytest.mark.asyncio
+async def test_engine_keeps_speculation_when_selection_agrees(speculative_settings):
+    """Test speculative work is kept when selection settles on the default model."""
+    llm = SlowLLMClient(generate_delay=0.2)
+    engine = CompressionEngine(llm_client=llm, model_selector=SlowSelector("default-model", 0.05))
+
+    result = await engine.compress_context(TEXT, "Describe the pipeline", target_tokens=50)
+
+    assert result.metadata["speculative"] is True
+    assert llm.models == ["default-model"]
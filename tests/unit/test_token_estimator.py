@@ -0,0 +1,65 @@
+"""Unit tests for the per-script token estimator."""
+
+import random
+
+from cognilens.llm import token_estimator
+from cognilens.llm.token_estimator import (
+    SCRIPTS,
+    TokenEstimator,
+    estimate_tokens,
+    fit_token_ratios,
+    load_token_ratios,
+    script_counts,
+)
+
+MIXED = "abcXYZ019 \n,.;{}日本語ひらがなカタカナ한국어。「」Жé😀\x7f"
+
+
+def test_script_counts_classifies_characters():
+    """Test characters are counted by script."""
+    counts = dict(zip(SCRIPTS, script_counts("Tokyo 東京 とうきょう 2024。")))
+
+    assert counts["latin"] == 5
+    assert counts["han"] == 2
+    assert counts["kana"] == 5
+    assert counts["digit"] == 4
+    assert counts["space"] == 3
+    assert counts["cjk_punct"] == 1
+
+
+def test_long_text_counts_match_single_pass(monkeypatch):
+    """Test the regex path for long strings counts like the per-character pass."""
+    rng = random.Random(0)
+    text = "".join(rng.choice(MIXED) for _ in range(5000))
+
+    vectorized = script_counts(text)
+    monkeypatch.setattr(token_estimator, "_VECTORIZE_CHARS", len(text) + 1)
+
+    assert script_counts(text) == vectorized
+    assert sum(vectorized) == len(text)
+
+
+def test_japanese_is_not_undercounted():
+    """Test CJK text is estimated well above the 4 chars/token rule."""
+    japanese = "今日は良い天気ですね。散歩に行きましょう。" * 10
+    english = "The weather is nice today, so let us go for a walk. " * 10
+
+    assert estimate_tokens(japanese) >= 2 * (len(japanese) // 4)
+    assert len(english) // 6 < estimate_tokens(english) < len(english) // 3
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("a") == 1
+
+
+def test_fit_recovers_ratios():
+    """Test fitting recovers the ratios that generated the counts."""
+    truth = {**load_token_ratios(), "latin": 0.3, "han": 1.5}
+    rng = random.Random(1)
+    samples = []
+    for _ in range(50):
+        text = "".join(rng.choice(MIXED) for _ in range(rng.randint(50, 300)))
+        samples.append((text, TokenEstimator(truth).estimate(text)))
+
+    fitted = fit_token_ratios(samples)
+
+    assert abs(fitted["latin"] - 0.3) < 0.05
+    assert abs(fitted["han"] - 1.5) < 0.1
@@ -0,0 +1,115 @@
+"""Unit tests for output token budget enforcement."""
+
+from typing import Optional
+
+import pytest
+
+from cognilens.core.compressor import CompressionEngine
+from cognilens.core.trimming import split_units, trim_to_tokens
+from cognilens.llm.base import LLMResponse
+from cognilens.llm.mock import MockLLMClient
+
+PROSE = "First sentence is here. Second sentence follows it. Third one ends the text."
+
+
+def test_split_units_round_trips():
+    """Test units split at sentences, bullets and code lines and concatenate back."""
+    text = (
+        "Intro. More intro.\n- item one\n- item two\n```py\nx = 1\ny = 2\n```\n最後の文。終わり。"
+    )
+    units = split_units(text)
+
+    assert "".join(units) == text
+    assert "- item one\n" in units
+    assert "x = 1\n" in units
+    assert "最後の文。" in units
+
+
+@pytest.mark.asyncio
+async def test_trim_keeps_whole_sentences(mock_llm_client):
+    """Test trimming drops whole sentences to fit the budget."""
+    result = await trim_to_tokens(PROSE, 12, mock_llm_client)
+
+    assert result.text == "First sentence is here. Second sentence follows it."
+    assert result.trimmed
+    assert result.tokens <= 12
+    assert result.trimmed_tokens == result.original_tokens - result.tokens
+
+
+@pytest.mark.asyncio
+async def test_trim_closes_open_code_block(mock_llm_client):
+    """Test a code block cut short is closed."""
+    text = "Example:\n```python\n" + "".join(f"value_{i} = {i}\n" for i in range(40)) + "```\n"
+
+    result = await trim_to_tokens(text, 30, mock_llm_client)
+
+    assert result.text.endswith("\n```")
+    assert result.text.count("```") == 2
+    assert result.tokens <= 30
+
+
+@pytest.mark.asyncio
+async def test_text_within_budget_is_untouched(mock_llm_client):
+    """Test no trimming happens when the text fits."""
+    result = await trim_to_tokens(PROSE, 1000, mock_llm_client)
+
+    assert result.text == PROSE
+    assert not result.trimmed
+
+
+@pytest.mark.asyncio
+async def test_trim_drops_units_without_preserved_items_first(mock_llm_client):
+    """Test units mentioning a preserved item survive while others are dropped."""
+    text = PROSE + " The ZetaWidget must stay."
+
+    result = await trim_to_tokens(text, 14, mock_llm_client, preserve=["zetawidget"])
+
+    assert result.text.endswith("The ZetaWidget must stay.")
+    assert result.text.startswith("First sentence is here.")
+    assert "Third one" not in result.text
+    assert result.tokens <= 14
+
+
+class VerboseLLMClient(MockLLMClient):
+    """Mock client ignoring max_tokens."""
+
+    async def generate(
+        self,
+        prompt: str,
+        *,
+        system_prompt: Optional[str] = None,
+        max_tokens: Optional[int] = None,
+        temperature: float = 0.7,
+        model: Optional[str] = None,
+    ) -> LLMResponse:
+        self._call_count += 1
+        content = " ".join(f"Point number {i} matters." for i in range(100))
+        return LLMResponse(content=content, model="mock-model", tokens_used=500)
+
+
+@pytest.mark.asyncio
+async def test_engine_enforces_max_tokens(sample_text):
+    """Test engine outputs never exceed the requested budget."""
+    engine = CompressionEngine(llm_client=VerboseLLMClient())
+
+    result = await engine.summarize(sample_text * 20, max_tokens=50)
+
+    assert result.compressed_tokens <= 50
+    assert result.compressed_text.endswith("matters.")
+    assert result.metadata["output_budget"]["trimmed"]
+    assert result.metadata["output_budget"]["trimmed_tokens"] > 0
+
+
+@pytest.mark.asyncio
+async def test_compress_context_trim_does_not_preserve_the_task(sample_text):
+    """Test the task description is not treated as text the trim must keep."""
+    engine = CompressionEngine(llm_client=VerboseLLMClient())
+
+    result = await engine.compress_context(
+        sample_text * 20, "Point number 99 matters.", target_tokens=50
+    )
+
+    assert result.compressed_tokens <= 50
+    assert result.compressed_text.startswith("Point number 0 matters.")
+    assert "Point number 99" not in result.compressed_text
+    assert not result.metadata["quality"].get("missing_preserved")
@@ -0,0 +1,114 @@
+"""Unit tests for token accounting and budgets."""
+
+import asyncio
+
+import pytest
+
+from cognilens.config import BudgetAction, UsageConfig
+from cognilens.llm import LLMResponse, MockLLMClient
+from cognilens.usage import (
+    EVICTED_SESSION,
+    BudgetExceededError,
+    MeteredLLMClient,
+    UsageTracker,
+    usage_scope,
+)
+
+
+class UnmeteredClient(MockLLMClient):
+    """Mock backend that does not report token usage."""
+
+    async def generate(self, prompt, **kwargs) -> LLMResponse:
+        response = await super().generate(prompt, **kwargs)
+        response.tokens_used = 0
+        return response
+
+
+def _metered(**config) -> MeteredLLMClient:
+    return MeteredLLMClient(MockLLMClient(), UsageTracker(UsageConfig(**config)))
+
+
+@pytest.mark.asyncio
+async def test_usage_is_totalled_per_tool_model_and_session():
+    """Test calls are attributed to the tool and session in scope."""
+    client = _metered()
+
+    with usage_scope("summarize", "s1"):
+        await client.generate("one two three")
+        await client.generate("four five", model="small")
+    with usage_scope("progressive_compress", "s2"):
+        await client.generate("six")
+
+    report = client.tracker.report(session="s1")
+    assert report["total"]["calls"] == 3
+    assert report["by_tool"]["summarize"]["calls"] == 2
+    assert report["by_model"]["small"]["calls"] == 1
+    assert set(report["by_session"]) == {"s1", "s2"}
+    assert report["session"]["calls"] == 2
+    assert report["budgets"]["session_used"] == report["session"]["tokens"] > 0
+
+
+@pytest.mark.asyncio
+async def test_session_budget_rejects_only_that_session():
+    """Test a session over budget is rejected while others continue."""
+    client = _metered(session_token_budget=1)
+
+    with usage_scope("progressive_compress", "noisy"):
+        await client.generate("a runaway loop")
+        with pytest.raises(BudgetExceededError):
+            await client.generate("a runaway loop")
+    with usage_scope("summarize", "quiet"):
+        assert (await client.generate("text")).content
+
+
+@pytest.mark.asyncio
+async def test_global_budget_downgrades_model():
+    """Test calls over the global budget move to the downgrade model."""
+    client = _metered(
+        global_token_budget=1,
+        on_exceeded=BudgetAction.DOWNGRADE,
+        downgrade_model="cheap",
+    )
+
+    await client.generate("first call")
+    response = await client.generate("second call")
+
+    assert response.model == "cheap"
+    assert client.tracker.report()["by_model"]["cheap"]["downgraded"] == 1
+
+
+@pytest.mark.asyncio
+async def test_budget_window_resets():
+    """Test budgets apply per window."""
+    client = _metered(session_token_budget=1, budget_window_seconds=0.02)
+
+    await client.generate("text")
+    assert client.tracker.exceeded("local") is not None
+
+    await asyncio.sleep(0.03)
+    assert client.tracker.exceeded("local") is None
+
+
+@pytest.mark.asyncio
+async def test_least_recent_sessions_are_folded_into_aggregate():
+    """Test only max_sessions sessions are tracked, without losing totals."""
+    client = _metered(max_sessions=2)
+
+    for session in ("s1", "s2", "s1", "s3"):
+        with usage_scope("summarize", session):
+            await client.generate("one two three")
+
+    report = client.tracker.report()
+    assert set(report["by_session"]) == {"s1", "s3", EVICTED_SESSION}
+    assert report["by_session"][EVICTED_SESSION]["calls"] == 1
+    assert report["total"]["calls"] == report["by_tool"]["summarize"]["calls"] == 4
+
+
+@pytest.mark.asyncio
+async def test_unreported_usage_is_counted():
+    """Test prompt and output are counted when the backend reports no usage."""
+    client = MeteredLLMClient(UnmeteredClient(), UsageTracker(UsageConfig()))
+
+    await client.generate("some prompt text " * 10, system_prompt="system")
+
+    assert client.tracker.report()["total"]["tokens"] > 0